@@ -0,0 +1,66 @@
+"""add_search_indexes
+
+Full-text (tsvector) and trigram GIN indexes backing app.core.search for
+complaint, forum topic and FAQ search.
+
+Revision ID: 5b2f3c9d1e47
+Revises: 261ff5732719
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '5b2f3c9d1e47'
+down_revision = '261ff5732719'
+branch_labels = None
+depends_on = None
+
+
+# Searched columns per table, in the same order as the routers pass them to
+# text_search_clause(). The tsvector expressions below must match
+# app.core.search.search_document() exactly or the planner ignores them.
+SEARCH_TABLES = {
+    'complaints': ('title', 'description', 'location_description'),
+    'forum_topics': ('title', 'description', 'tags'),
+    'faq_solutions': ('question_keywords', 'title', 'kannada_title'),
+}
+
+SEARCH_CONFIGS = ('english', 'simple')
+
+
+def _document(columns) -> str:
+    parts = [f"coalesce({column}, '')" for column in columns]
+    document = parts[0]
+    for part in parts[1:]:
+        document = f"(({document} || ' ') || {part})"
+    return document
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # CONCURRENTLY cannot run inside a transaction; keep large tables writable
+    with op.get_context().autocommit_block():
+        for table, columns in SEARCH_TABLES.items():
+            document = _document(columns)
+            for config in SEARCH_CONFIGS:
+                op.execute(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_{table}_fts_{config} "
+                    f"ON {table} USING gin (to_tsvector('{config}'::regconfig, {document}))"
+                )
+            for column in columns:
+                op.execute(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_{table}_{column}_trgm "
+                    f"ON {table} USING gin ({column} gin_trgm_ops)"
+                )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table, columns in SEARCH_TABLES.items():
+            for config in SEARCH_CONFIGS:
+                op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS idx_{table}_fts_{config}")
+            for column in columns:
+                op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS idx_{table}_{column}_trgm")
@@ -0,0 +1,28 @@
+"""add_broadcast_sending_status
+
+SENDING status, held by the delivery run that claimed a broadcast.
+
+Revision ID: 6e2a9c4f8b13
+Revises: 4b8e2f6c1a57
+Create Date: 2026-10-20 09:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '6e2a9c4f8b13'
+down_revision = '4b8e2f6c1a57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # ADD VALUE cannot run inside a transaction block before PostgreSQL 12
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE broadcaststatus ADD VALUE IF NOT EXISTS 'SENDING' AFTER 'SCHEDULED'")
+
+
+def downgrade() -> None:
+    # PostgreSQL cannot drop an enum value; hand claimed broadcasts back as retryable
+    op.execute("UPDATE scheduled_broadcasts SET status = 'FAILED' WHERE status = 'SENDING'")
@@ -0,0 +1,26 @@
+"""add_broadcast_delivery_cursor
+
+Checkpoint column for chunked broadcast delivery.
+
+Revision ID: 7c4e1a2b9d30
+Revises: 5b2f3c9d1e47
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '7c4e1a2b9d30'
+down_revision = '5b2f3c9d1e47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('scheduled_broadcasts', sa.Column('delivery_cursor', postgresql.UUID(as_uuid=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('scheduled_broadcasts', 'delivery_cursor')
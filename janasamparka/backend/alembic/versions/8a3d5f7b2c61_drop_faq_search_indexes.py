@@ -0,0 +1,54 @@
+"""drop_faq_search_indexes
+
+FAQ search is served by the in-memory BM25 index (app.services.faq_search_service),
+so the faq_solutions full-text and trigram indexes from 5b2f3c9d1e47 are never
+used by a query and only slow down FAQ writes.
+
+Revision ID: 8a3d5f7b2c61
+Revises: 6e2a9c4f8b13
+Create Date: 2026-10-20 10:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '8a3d5f7b2c61'
+down_revision = '6e2a9c4f8b13'
+branch_labels = None
+depends_on = None
+
+
+FAQ_COLUMNS = ('question_keywords', 'title', 'kannada_title')
+SEARCH_CONFIGS = ('english', 'simple')
+
+
+def _document(columns) -> str:
+    parts = [f"coalesce({column}, '')" for column in columns]
+    document = parts[0]
+    for part in parts[1:]:
+        document = f"(({document} || ' ') || {part})"
+    return document
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for config in SEARCH_CONFIGS:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS idx_faq_solutions_fts_{config}")
+        for column in FAQ_COLUMNS:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS idx_faq_solutions_{column}_trgm")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        document = _document(FAQ_COLUMNS)
+        for config in SEARCH_CONFIGS:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_faq_solutions_fts_{config} "
+                f"ON faq_solutions USING gin (to_tsvector('{config}'::regconfig, {document}))"
+            )
+        for column in FAQ_COLUMNS:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_faq_solutions_{column}_trgm "
+                f"ON faq_solutions USING gin ({column} gin_trgm_ops)"
+            )
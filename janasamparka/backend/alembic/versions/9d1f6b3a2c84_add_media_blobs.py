@@ -0,0 +1,46 @@
+"""add_media_blobs
+
+Content-addressed, reference-counted media storage.
+
+Revision ID: 9d1f6b3a2c84
+Revises: 7c4e1a2b9d30
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '9d1f6b3a2c84'
+down_revision = '7c4e1a2b9d30'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'media_blobs',
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('path', sa.String(length=255), nullable=False),
+        sa.Column('content_type', sa.String(length=100), nullable=False),
+        sa.Column('size', sa.BigInteger(), nullable=False),
+        sa.Column('lat', sa.Numeric(precision=10, scale=7), nullable=True),
+        sa.Column('lng', sa.Numeric(precision=10, scale=7), nullable=True),
+        sa.Column('ref_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('released_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('sha256')
+    )
+    op.create_index(op.f('ix_media_blobs_released_at'), 'media_blobs', ['released_at'], unique=False)
+
+    op.add_column('media', sa.Column('blob_sha256', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_media_blob_sha256'), 'media', ['blob_sha256'], unique=False)
+    op.create_foreign_key('fk_media_blob_sha256', 'media', 'media_blobs', ['blob_sha256'], ['sha256'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('fk_media_blob_sha256', 'media', type_='foreignkey')
+    op.drop_index(op.f('ix_media_blob_sha256'), table_name='media')
+    op.drop_column('media', 'blob_sha256')
+    op.drop_index(op.f('ix_media_blobs_released_at'), table_name='media_blobs')
+    op.drop_table('media_blobs')
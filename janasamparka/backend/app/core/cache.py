@@ -23,7 +23,7 @@ class CacheManager:
     """Redis cache manager with async support"""
     
     def __init__(self):
-        self.redis_url = getattr(settings, 'REDIS_URL', 'redis://localhost:6379/0')
+        self.redis_url = getattr(settings, 'REDIS_URL', None) or 'redis://localhost:6379/0'
         self.redis_password = getattr(settings, 'REDIS_PASSWORD', None)
         self.default_ttl = getattr(settings, 'CACHE_TTL_DEFAULT', 300)
         self.long_ttl = getattr(settings, 'CACHE_TTL_LONG', 3600)
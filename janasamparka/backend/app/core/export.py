@@ -3,188 +3,291 @@ Data export utilities for generating CSV, Excel, and PDF reports
 """
 import csv
 import io
-from typing import List, Dict, Any, Optional
+import json
+import zlib
+from typing import List, Dict, Any, Iterable, Iterator, Optional
 from datetime import datetime
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.models.complaint import Complaint
+from app.models.constituency import Constituency
+from app.models.department import Department
 from app.schemas.analytics import ReportFilter
 
 
+# Rows fetched per server-side cursor round trip
+EXPORT_BATCH_SIZE = 1000
+
+CSV_HEADER = [
+    'ID',
+    'Title',
+    'Category',
+    'Priority',
+    'Status',
+    'Created Date',
+    'Resolved Date',
+    'Closed Date',
+    'Constituency',
+    'Department',
+    'Location',
+    'Description'
+]
+
+
+def _enum_value(value):
+    return getattr(value, 'value', value)
+
+
+def gzip_chunks(chunks: Iterable, level: int = 6) -> Iterator[bytes]:
+    """Gzip-compress a stream of str/bytes chunks incrementally"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31: gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
 class ExportService:
     """Service for exporting data in various formats"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, batch_size: int = EXPORT_BATCH_SIZE):
         self.db = db
-    
-    def filter_complaints(self, filters: Optional[ReportFilter] = None) -> List[Complaint]:
-        """
-        Apply filters and return complaint queryset
-        """
-        query = self.db.query(Complaint)
-        
+        self.batch_size = batch_size
+
+    @staticmethod
+    def _apply_filters(query, filters: Optional[ReportFilter]):
+        """Apply report filters to a complaint query or select()"""
         if not filters:
-            return query.all()
-        
-        # Apply filters
+            return query
+
+        conditions = []
         if filters.constituency_id:
-            query = query.filter(Complaint.constituency_id == filters.constituency_id)
+            conditions.append(Complaint.constituency_id == filters.constituency_id)
         
         if filters.department_id:
-            query = query.filter(Complaint.dept_id == filters.department_id)
+            conditions.append(Complaint.dept_id == filters.department_id)
         
         if filters.category:
-            query = query.filter(Complaint.category == filters.category)
+            conditions.append(Complaint.category == filters.category)
         
         if filters.priority:
-            query = query.filter(Complaint.priority == filters.priority)
+            conditions.append(Complaint.priority == filters.priority)
         
         if filters.status:
-            query = query.filter(Complaint.status == filters.status)
+            conditions.append(Complaint.status == filters.status)
         
         if filters.start_date:
-            query = query.filter(Complaint.created_at >= filters.start_date)
+            conditions.append(Complaint.created_at >= filters.start_date)
         
         if filters.end_date:
-            query = query.filter(Complaint.created_at <= filters.end_date)
+            conditions.append(Complaint.created_at <= filters.end_date)
         
         if filters.created_by:
-            query = query.filter(Complaint.created_by == filters.created_by)
+            conditions.append(Complaint.user_id == filters.created_by)
         
         if filters.assigned_to:
-            query = query.filter(Complaint.assigned_to == filters.assigned_to)
-        
-        return query.all()
+            conditions.append(Complaint.assigned_to == filters.assigned_to)
+
+        return query.filter(*conditions) if conditions else query
+    
+    def filter_complaints(self, filters: Optional[ReportFilter] = None) -> List[Complaint]:
+        """
+        Apply filters and return complaint queryset
+        """
+        return self._apply_filters(self.db.query(Complaint), filters).all()
+
+    def _stream(self, statement) -> Iterator[Any]:
+        """Iterate rows through a server-side cursor, ``batch_size`` at a time"""
+        result = self.db.execute(statement.execution_options(yield_per=self.batch_size))
+        try:
+            for partition in result.partitions():
+                yield from partition
+        finally:
+            result.close()
+
+    def export_rows(self, filters: Optional[ReportFilter] = None) -> Iterator[Any]:
+        """
+        Stream complaint rows with constituency and department names.
+
+        A single outer-joined select replaces the per-row name lookups, and
+        only the exported columns are fetched.
+        """
+        statement = (
+            select(
+                Complaint.id,
+                Complaint.title,
+                Complaint.category,
+                Complaint.priority,
+                Complaint.status,
+                Complaint.created_at,
+                Complaint.resolved_at,
+                Complaint.closed_at,
+                Complaint.constituency_id,
+                Complaint.dept_id,
+                Complaint.location_description,
+                Complaint.lat,
+                Complaint.lng,
+                Complaint.description,
+                Complaint.work_approved,
+                Complaint.approval_comments,
+                Constituency.name.label('constituency_name'),
+                Department.name.label('department_name'),
+            )
+            .outerjoin(Constituency, Constituency.id == Complaint.constituency_id)
+            .outerjoin(Department, Department.id == Complaint.dept_id)
+        )
+        return self._stream(self._apply_filters(statement, filters))
+
+    @staticmethod
+    def _csv_row(row) -> List[Any]:
+        description = row.description or ''
+        return [
+            str(row.id),
+            row.title,
+            row.category,
+            _enum_value(row.priority),
+            _enum_value(row.status),
+            row.created_at.strftime('%Y-%m-%d %H:%M:%S') if row.created_at else '',
+            row.resolved_at.strftime('%Y-%m-%d %H:%M:%S') if row.resolved_at else '',
+            row.closed_at.strftime('%Y-%m-%d %H:%M:%S') if row.closed_at else '',
+            row.constituency_name or '',
+            row.department_name or '',
+            row.location_description or '',
+            description[:200] + '...' if len(description) > 200 else description
+        ]
+
+    @staticmethod
+    def _row_dict(row) -> Dict[str, Any]:
+        # Calculate resolution time if resolved
+        resolution_time_hours = None
+        if row.resolved_at and row.created_at:
+            delta = row.resolved_at - row.created_at
+            resolution_time_hours = round(delta.total_seconds() / 3600, 2)
+
+        return {
+            'id': str(row.id),
+            'title': row.title,
+            'category': row.category,
+            'priority': _enum_value(row.priority),
+            'status': _enum_value(row.status),
+            'created_at': row.created_at.isoformat() if row.created_at else None,
+            'resolved_at': row.resolved_at.isoformat() if row.resolved_at else None,
+            'closed_at': row.closed_at.isoformat() if row.closed_at else None,
+            'resolution_time_hours': resolution_time_hours,
+            'constituency_id': str(row.constituency_id) if row.constituency_id else None,
+            'constituency_name': row.constituency_name,
+            'department_id': str(row.dept_id) if row.dept_id else None,
+            'department_name': row.department_name,
+            'location_description': row.location_description,
+            'latitude': float(row.lat) if row.lat else None,
+            'longitude': float(row.lng) if row.lng else None,
+            'description': row.description,
+            'work_approved': row.work_approved,
+            'approval_comments': row.approval_comments,
+        }
+
+    def stream_csv(self, filters: Optional[ReportFilter] = None) -> Iterator[str]:
+        """Yield CSV text, one chunk per cursor batch"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(CSV_HEADER)
+
+        for count, row in enumerate(self.export_rows(filters), 1):
+            writer.writerow(self._csv_row(row))
+            if count % self.batch_size == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+        yield buffer.getvalue()
+
+    def stream_ndjson(self, filters: Optional[ReportFilter] = None) -> Iterator[str]:
+        """Yield newline-delimited JSON, one complaint per line"""
+        lines = []
+        for row in self.export_rows(filters):
+            lines.append(json.dumps(self._row_dict(row), ensure_ascii=False))
+            if len(lines) >= self.batch_size:
+                yield '\n'.join(lines) + '\n'
+                lines = []
+        if lines:
+            yield '\n'.join(lines) + '\n'
+
+    def stream_json(self, filters: Optional[ReportFilter] = None,
+                    header: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """
+        Yield ``{**header, "summary": ..., "data": [...]}`` as JSON text.
+
+        The summary is computed in a first streaming pass, so neither the
+        rows nor the serialized document are held in memory.
+        """
+        document = dict(header or {})
+        document['summary'] = self.generate_summary_report(filters)
+        opening = json.dumps(document, ensure_ascii=False, default=str)
+        yield opening[:-1] + ', "data": ['
+
+        separator = ''
+        chunk = []
+        for row in self.export_rows(filters):
+            chunk.append(separator + json.dumps(self._row_dict(row), ensure_ascii=False))
+            separator = ', '
+            if len(chunk) >= self.batch_size:
+                yield ''.join(chunk)
+                chunk = []
+        chunk.append(']}')
+        yield ''.join(chunk)
     
     def export_to_csv(self, filters: Optional[ReportFilter] = None) -> str:
         """
         Export complaints to CSV format
         Returns CSV content as string
         """
-        complaints = self.filter_complaints(filters)
-        
-        # Create CSV in memory
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        # Write header
-        writer.writerow([
-            'ID',
-            'Title',
-            'Category',
-            'Priority',
-            'Status',
-            'Created Date',
-            'Resolved Date',
-            'Closed Date',
-            'Constituency',
-            'Department',
-            'Location',
-            'Description'
-        ])
-        
-        # Write data
-        for complaint in complaints:
-            # Get constituency name if available
-            constituency_name = ''
-            if complaint.constituency_id:
-                from app.models.constituency import Constituency
-                constituency = self.db.query(Constituency).filter(
-                    Constituency.id == complaint.constituency_id
-                ).first()
-                if constituency:
-                    constituency_name = constituency.name
-            
-            # Get department name if available
-            department_name = ''
-            if complaint.dept_id:
-                from app.models.department import Department
-                dept = self.db.query(Department).filter(
-                    Department.id == complaint.dept_id
-                ).first()
-                if dept:
-                    department_name = dept.name
-            
-            writer.writerow([
-                str(complaint.id),
-                complaint.title,
-                complaint.category,
-                complaint.priority,
-                complaint.status,
-                complaint.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-                complaint.resolved_at.strftime('%Y-%m-%d %H:%M:%S') if complaint.resolved_at else '',
-                complaint.closed_at.strftime('%Y-%m-%d %H:%M:%S') if complaint.closed_at else '',
-                constituency_name,
-                department_name,
-                complaint.location_description or '',
-                complaint.description[:200] + '...' if len(complaint.description) > 200 else complaint.description
-            ])
-        
-        return output.getvalue()
+        return ''.join(self.stream_csv(filters))
     
     def export_to_dict(self, filters: Optional[ReportFilter] = None) -> List[Dict[str, Any]]:
         """
         Export complaints to dictionary format (for JSON or Excel)
         """
-        complaints = self.filter_complaints(filters)
-        
-        data = []
-        for complaint in complaints:
-            # Calculate resolution time if resolved
-            resolution_time_hours = None
-            if complaint.resolved_at:
-                delta = complaint.resolved_at - complaint.created_at
-                resolution_time_hours = round(delta.total_seconds() / 3600, 2)
-            
-            # Get constituency name
-            constituency_name = None
-            if complaint.constituency_id:
-                from app.models.constituency import Constituency
-                constituency = self.db.query(Constituency).filter(
-                    Constituency.id == complaint.constituency_id
-                ).first()
-                if constituency:
-                    constituency_name = constituency.name
-            
-            # Get department name
-            department_name = None
-            if complaint.dept_id:
-                from app.models.department import Department
-                dept = self.db.query(Department).filter(
-                    Department.id == complaint.dept_id
-                ).first()
-                if dept:
-                    department_name = dept.name
-            
-            data.append({
-                'id': str(complaint.id),
-                'title': complaint.title,
-                'category': complaint.category,
-                'priority': complaint.priority,
-                'status': complaint.status,
-                'created_at': complaint.created_at.isoformat(),
-                'resolved_at': complaint.resolved_at.isoformat() if complaint.resolved_at else None,
-                'closed_at': complaint.closed_at.isoformat() if complaint.closed_at else None,
-                'resolution_time_hours': resolution_time_hours,
-                'constituency_id': str(complaint.constituency_id) if complaint.constituency_id else None,
-                'constituency_name': constituency_name,
-                'department_id': str(complaint.dept_id) if complaint.dept_id else None,
-                'department_name': department_name,
-                'location_description': complaint.location_description,
-                'latitude': float(complaint.lat) if complaint.lat else None,
-                'longitude': float(complaint.lng) if complaint.lng else None,
-                'description': complaint.description,
-                'work_approved': complaint.work_approved,
-                'approval_comments': complaint.approval_comments,
-            })
-        
-        return data
+        return [self._row_dict(row) for row in self.export_rows(filters)]
     
     def generate_summary_report(self, filters: Optional[ReportFilter] = None) -> Dict[str, Any]:
         """
         Generate a summary report with statistics
         """
-        complaints = self.filter_complaints(filters)
-        total = len(complaints)
+        statement = select(
+            Complaint.status,
+            Complaint.category,
+            Complaint.priority,
+            Complaint.created_at,
+            Complaint.resolved_at,
+        )
+
+        total = 0
+        status_dist: Dict[Any, int] = {}
+        category_dist: Dict[Any, int] = {}
+        priority_dist: Dict[Any, int] = {}
+        resolved_count = 0
+        total_hours = 0.0
+        first_created = None
+        last_created = None
+
+        for row in self._stream(self._apply_filters(statement, filters)):
+            total += 1
+            status = _enum_value(row.status)
+            priority = _enum_value(row.priority)
+            status_dist[status] = status_dist.get(status, 0) + 1
+            category_dist[row.category] = category_dist.get(row.category, 0) + 1
+            priority_dist[priority] = priority_dist.get(priority, 0) + 1
+
+            if row.resolved_at:
+                resolved_count += 1
+                total_hours += (row.resolved_at - row.created_at).total_seconds() / 3600
+
+            if row.created_at:
+                if first_created is None or row.created_at < first_created:
+                    first_created = row.created_at
+                if last_created is None or row.created_at > last_created:
+                    last_created = row.created_at
         
         if total == 0:
             return {
@@ -195,67 +298,188 @@ class ExportService:
                 'avg_resolution_time_hours': None
             }
         
-        # Status distribution
-        status_dist = {}
-        for complaint in complaints:
-            status_dist[complaint.status] = status_dist.get(complaint.status, 0) + 1
-        
-        # Category distribution
-        category_dist = {}
-        for complaint in complaints:
-            category_dist[complaint.category] = category_dist.get(complaint.category, 0) + 1
-        
-        # Priority distribution
-        priority_dist = {}
-        for complaint in complaints:
-            priority_dist[complaint.priority] = priority_dist.get(complaint.priority, 0) + 1
-        
-        # Average resolution time
-        resolved_complaints = [c for c in complaints if c.resolved_at]
-        if resolved_complaints:
-            total_hours = sum(
-                (c.resolved_at - c.created_at).total_seconds() / 3600
-                for c in resolved_complaints
-            )
-            avg_resolution_hours = round(total_hours / len(resolved_complaints), 2)
-        else:
-            avg_resolution_hours = None
-        
         return {
             'total_complaints': total,
             'status_distribution': status_dist,
             'category_distribution': category_dist,
             'priority_distribution': priority_dist,
-            'avg_resolution_time_hours': avg_resolution_hours,
-            'resolved_count': len(resolved_complaints),
-            'resolution_rate': round((len(resolved_complaints) / total) * 100, 2) if total > 0 else 0,
+            'avg_resolution_time_hours': round(total_hours / resolved_count, 2) if resolved_count else None,
+            'resolved_count': resolved_count,
+            'resolution_rate': round((resolved_count / total) * 100, 2),
             'date_range': {
-                'start': min(c.created_at for c in complaints).isoformat() if complaints else None,
-                'end': max(c.created_at for c in complaints).isoformat() if complaints else None
+                'start': first_created.isoformat() if first_created else None,
+                'end': last_created.isoformat() if last_created else None
             }
         }
 
 
+# Excel worksheets hold at most 1,048,576 rows including the header
+EXCEL_MAX_ROWS = 1_048_575
+
+# PDF reports are for reading, not bulk data: list at most this many complaints
+PDF_MAX_ROWS = 500
+
+REPORT_COLUMNS = [
+    ('id', 'ID', 38),
+    ('title', 'Title', 40),
+    ('category', 'Category', 14),
+    ('priority', 'Priority', 10),
+    ('status', 'Status', 12),
+    ('created_at', 'Created', 20),
+    ('resolved_at', 'Resolved', 20),
+    ('resolution_time_hours', 'Resolution (h)', 14),
+    ('constituency_name', 'Constituency', 20),
+    ('department_name', 'Department', 24),
+    ('location_description', 'Location', 30),
+]
+
+
+def _summary_rows(summary: Dict) -> List[List[Any]]:
+    rows = [
+        ['Total complaints', summary.get('total_complaints', 0)],
+        ['Resolved', summary.get('resolved_count', 0)],
+        ['Resolution rate (%)', summary.get('resolution_rate', 0)],
+        ['Avg resolution time (h)', summary.get('avg_resolution_time_hours')],
+    ]
+    date_range = summary.get('date_range') or {}
+    if date_range:
+        rows.append(['First complaint', date_range.get('start')])
+        rows.append(['Last complaint', date_range.get('end')])
+    for title, key in (('Status', 'status_distribution'),
+                       ('Category', 'category_distribution'),
+                       ('Priority', 'priority_distribution')):
+        rows.append([])
+        rows.append([title, 'Count'])
+        for name, count in sorted((summary.get(key) or {}).items(), key=lambda item: -item[1]):
+            rows.append([name or 'unspecified', count])
+    return rows
+
+
+def write_excel_report(target, data: Iterable[Dict], summary: Dict) -> int:
+    """
+    Write an .xlsx report (Summary and Complaints sheets) to a path or file object.
+
+    Uses xlsxwriter's constant-memory mode, which flushes each row to disk
+    as soon as the next one starts, so ``data`` can be a streaming iterator.
+    Returns the number of complaint rows written.
+    """
+    import xlsxwriter
+
+    in_memory = not isinstance(target, (str, bytes)) and not hasattr(target, '__fspath__')
+    workbook = xlsxwriter.Workbook(target, {
+        'constant_memory': not in_memory,
+        'in_memory': in_memory,
+        'default_date_format': 'yyyy-mm-dd hh:mm',
+    })
+    try:
+        bold = workbook.add_format({'bold': True})
+
+        summary_sheet = workbook.add_worksheet('Summary')
+        summary_sheet.set_column(0, 0, 28)
+        summary_sheet.set_column(1, 1, 24)
+        for row_index, row in enumerate(_summary_rows(summary)):
+            for col_index, value in enumerate(row):
+                summary_sheet.write(row_index, col_index, value, bold if col_index == 0 else None)
+
+        sheet = workbook.add_worksheet('Complaints')
+        for col_index, (_, header, width) in enumerate(REPORT_COLUMNS):
+            sheet.set_column(col_index, col_index, width)
+            sheet.write(0, col_index, header, bold)
+        sheet.freeze_panes(1, 0)
+
+        written = 0
+        for record in data:
+            if written >= EXCEL_MAX_ROWS:
+                break
+            written += 1
+            for col_index, (key, _, _) in enumerate(REPORT_COLUMNS):
+                value = record.get(key)
+                if value is not None:
+                    sheet.write(written, col_index, value)
+        return written
+    finally:
+        workbook.close()
+
+
 def create_excel_report(data: List[Dict], summary: Dict) -> bytes:
     """
     Create Excel report with data and summary
-    Requires openpyxl or xlsxwriter library
-    
-    TODO: Implement Excel generation
-    Returns placeholder for now
+    Requires the xlsxwriter library
     """
-    # This would use openpyxl or xlsxwriter to create Excel file
-    # For now, return CSV-like format
-    raise NotImplementedError("Excel export requires openpyxl library. Use CSV for now.")
+    output = io.BytesIO()
+    write_excel_report(output, data, summary)
+    return output.getvalue()
+
+
+def write_pdf_report(target, data: Iterable[Dict], summary: Dict,
+                     title: str = 'Complaints Report', max_rows: int = PDF_MAX_ROWS) -> int:
+    """
+    Render a PDF report from a reportlab page template.
+
+    The summary tables come first, followed by up to ``max_rows`` complaints.
+    Returns the number of complaint rows listed.
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.units import mm
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+    styles = getSampleStyleSheet()
+    cell = styles['BodyText'].clone('cell', fontSize=7, leading=8)
+    table_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1f4e79')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('FONTSIZE', (0, 0), (-1, -1), 7),
+        ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f2f2f2')]),
+    ])
+
+    generated = datetime.utcnow().strftime('%Y-%m-%d %H:%M UTC')
+
+    def decorate(canvas, doc):
+        canvas.saveState()
+        canvas.setFont('Helvetica', 7)
+        canvas.drawString(10 * mm, 7 * mm, f'Janasamparka - {title} - generated {generated}')
+        canvas.drawRightString(doc.pagesize[0] - 10 * mm, 7 * mm, f'Page {doc.page}')
+        canvas.restoreState()
+
+    story = [Paragraph(title, styles['Title']), Spacer(1, 4 * mm)]
+    summary_table = Table([[str(v) if v is not None else '' for v in row] for row in _summary_rows(summary) if row],
+                          hAlign='LEFT')
+    summary_table.setStyle(TableStyle([('FONTSIZE', (0, 0), (-1, -1), 8),
+                                       ('LINEBELOW', (0, 0), (-1, -1), 0.25, colors.lightgrey)]))
+    story += [Paragraph('Summary', styles['Heading2']), summary_table, Spacer(1, 6 * mm)]
+
+    columns = [column for column in REPORT_COLUMNS if column[0] not in ('id', 'constituency_name')]
+    rows = [[header for _, header, _ in columns]]
+    listed = 0
+    for record in data:
+        if listed >= max_rows:
+            break
+        listed += 1
+        rows.append([Paragraph(str(record.get(key) or ''), cell) for key, _, _ in columns])
+
+    total = summary.get('total_complaints', listed)
+    heading = f'Complaints ({listed} of {total})' if total > listed else 'Complaints'
+    widths = [width for _, _, width in columns]
+    page_width = landscape(A4)[0] - 20 * mm
+    complaints_table = Table(rows, colWidths=[page_width * w / sum(widths) for w in widths], repeatRows=1)
+    complaints_table.setStyle(table_style)
+    story += [Paragraph(heading, styles['Heading2']), complaints_table]
+
+    doc = SimpleDocTemplate(target, pagesize=landscape(A4), title=title,
+                            leftMargin=10 * mm, rightMargin=10 * mm, topMargin=10 * mm, bottomMargin=12 * mm)
+    doc.build(story, onFirstPage=decorate, onLaterPages=decorate)
+    return listed
 
 
 def create_pdf_report(data: List[Dict], summary: Dict) -> bytes:
     """
     Create PDF report with data and summary
-    Requires reportlab library
-    
-    TODO: Implement PDF generation
-    Returns placeholder for now
+    Requires the reportlab library
     """
-    # This would use reportlab to create PDF
-    raise NotImplementedError("PDF export requires reportlab library. Use CSV for now.")
+    output = io.BytesIO()
+    write_pdf_report(output, data, summary)
+    return output.getvalue()
@@ -0,0 +1,208 @@
+"""
+Application-scoped HTTP clients for outbound integrations
+"""
+import asyncio
+import importlib.util
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, FrozenSet, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.core.logging import logger
+
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+# Errors raised before the request reached the server: always safe to retry
+_RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Exponential backoff with full jitter"""
+
+    attempts: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 10.0
+    statuses: FrozenSet[int] = frozenset({429, 502, 503, 504})
+    # Methods retried on a retryable status or read timeout; connection
+    # failures are retried for every method
+    methods: FrozenSet[str] = IDEMPOTENT_METHODS
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+
+@dataclass(frozen=True)
+class ClientProfile:
+    """Pool, timeout and retry settings for one integration"""
+
+    base_url: str = ""
+    max_connections: int = 20
+    max_keepalive: int = 10
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 5.0
+    read_timeout: float = 10.0
+    http2: bool = True
+    # Connect over this Unix domain socket instead of TCP
+    uds: Optional[str] = None
+    retry: RetryPolicy = field(default_factory=RetryPolicy)
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class HTTPClientRegistry:
+    """
+    One pooled ``httpx.AsyncClient`` per outbound integration.
+
+    Clients are opened by the application lifespan and reused by every
+    request, so connections (and TLS sessions) to FCM, Twilio, Zoom and
+    webhook receivers stay alive between sends. Each integration talks to
+    its own host, which makes the per-client limits per-host limits.
+    Clients belong to the event loop that created them; code running on
+    another loop (a worker thread, a script) gets its own set.
+    """
+
+    def __init__(self, profiles: Dict[str, ClientProfile]):
+        self.profiles = profiles
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _build(self, name: str) -> httpx.AsyncClient:
+        profile = self.profiles.get(name) or ClientProfile()
+        # Limits and HTTP/2 belong to the transport when one is given explicitly
+        transport = httpx.AsyncHTTPTransport(
+            http2=profile.http2 and HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=profile.max_connections,
+                max_keepalive_connections=profile.max_keepalive,
+                keepalive_expiry=profile.keepalive_expiry,
+            ),
+            uds=profile.uds,
+        )
+        return httpx.AsyncClient(
+            base_url=profile.base_url,
+            transport=transport,
+            timeout=httpx.Timeout(
+                profile.read_timeout,
+                connect=profile.connect_timeout,
+                pool=profile.connect_timeout,
+            ),
+            headers={"User-Agent": f"{settings.APP_NAME}/{settings.APP_VERSION}"},
+        )
+
+    def client(self, name: str) -> httpx.AsyncClient:
+        """The pooled client for ``name``, created on first use"""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Pools cannot cross event loops; the old loop's clients are dropped
+            self._clients = {}
+            self._loop = loop
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = self._clients[name] = self._build(name)
+        return client
+
+    async def start(self) -> None:
+        """Open a client for every configured integration"""
+        for name in self.profiles:
+            self.client(name)
+        logger.info("HTTP clients ready", clients=sorted(self.profiles), http2=HTTP2_AVAILABLE)
+
+    async def close(self) -> None:
+        clients, self._clients, self._loop = self._clients, {}, None
+        await asyncio.gather(*(client.aclose() for client in clients.values()), return_exceptions=True)
+
+    async def request(self, name: str, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """
+        Send a request through the ``name`` client, retrying per its policy.
+        The final response is returned whatever its status; the last
+        transport error is raised once attempts run out.
+        """
+        policy = (self.profiles.get(name) or ClientProfile()).retry
+        method = method.upper()
+        client = self.client(name)
+
+        for attempt in range(policy.attempts):
+            last_attempt = attempt == policy.attempts - 1
+            try:
+                response = await client.request(method, url, **kwargs)
+            except _RETRYABLE_ERRORS as exc:
+                if last_attempt:
+                    raise
+                delay, reason = policy.delay(attempt), type(exc).__name__
+            except httpx.TimeoutException as exc:
+                if last_attempt or method not in policy.methods:
+                    raise
+                delay, reason = policy.delay(attempt), type(exc).__name__
+            else:
+                if last_attempt or response.status_code not in policy.statuses or method not in policy.methods:
+                    return response
+                delay, reason = policy.delay(attempt, _retry_after(response)), response.status_code
+                await response.aclose()
+
+            logger.warning("Retrying outbound request", client=name, method=method,
+                           attempt=attempt + 1, reason=reason, delay=round(delay, 2))
+            await asyncio.sleep(delay)
+
+        raise AssertionError("unreachable")  # pragma: no cover
+
+
+def _inference_profile() -> ClientProfile:
+    """INFERENCE_URL as a profile; ``unix:///path`` connects over a local socket"""
+    url = getattr(settings, "INFERENCE_URL", None) or ""
+    uds = None
+    if url.startswith("unix://"):
+        uds, url = url[len("unix://"):], "http://inference"
+    return ClientProfile(
+        base_url=url,
+        max_connections=50,
+        max_keepalive=50,
+        read_timeout=getattr(settings, "INFERENCE_TIMEOUT_SECONDS", 30.0),
+        http2=False,
+        uds=uds,
+        # Encoding is side-effect free, so an overloaded server is retried too
+        retry=RetryPolicy(methods=IDEMPOTENT_METHODS | {"POST"}, backoff_base=0.1, backoff_max=2.0),
+    )
+
+
+# FCM asks senders to retry 429/5xx with backoff. Twilio and webhook POSTs
+# are only retried when the connection failed, so nothing is sent twice.
+http_clients = HTTPClientRegistry({
+    "fcm": ClientProfile(
+        base_url="https://fcm.googleapis.com",
+        max_connections=getattr(settings, "BROADCAST_CHANNEL_CONCURRENCY", 50),
+        max_keepalive=getattr(settings, "BROADCAST_CHANNEL_CONCURRENCY", 50),
+        read_timeout=30.0,
+        retry=RetryPolicy(methods=IDEMPOTENT_METHODS | {"POST"}),
+    ),
+    "twilio": ClientProfile(
+        base_url="https://api.twilio.com",
+        max_connections=getattr(settings, "BROADCAST_CHANNEL_CONCURRENCY", 50),
+        max_keepalive=getattr(settings, "BROADCAST_CHANNEL_CONCURRENCY", 50),
+        read_timeout=15.0,
+    ),
+    "zoom": ClientProfile(base_url="https://api.zoom.us", max_connections=10, max_keepalive=5),
+    "webhooks": ClientProfile(read_timeout=getattr(settings, "WEBHOOK_TIMEOUT_SECONDS", 10.0)),
+    "inference": _inference_profile(),
+})
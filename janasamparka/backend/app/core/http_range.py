@@ -0,0 +1,129 @@
+"""
+HTTP byte-range support for serving large files
+"""
+import os
+import re
+from email.utils import formatdate
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+from fastapi import HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+
+
+RANGE_CHUNK_SIZE = 64 * 1024
+
+_RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range_header(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single ``Range: bytes=start-end`` header into an inclusive span.
+
+    Returns None when the whole file should be served (no header, a
+    multi-range or otherwise unsupported header); raises 416 when the range
+    cannot be satisfied.
+    """
+    if not header:
+        return None
+
+    match = _RANGE_PATTERN.match(header.strip())
+    if not match:
+        return None
+
+    start_text, end_text = match.groups()
+    if not start_text and not end_text:
+        return None
+
+    if not start_text:
+        # Suffix range: the last N bytes
+        length = int(end_text)
+        if length == 0:
+            raise _not_satisfiable(size)
+        return max(size - length, 0), size - 1
+
+    start = int(start_text)
+    end = int(end_text) if end_text else size - 1
+    if start >= size or end < start:
+        raise _not_satisfiable(size)
+    return start, min(end, size - 1)
+
+
+def _not_satisfiable(size: int) -> HTTPException:
+    return HTTPException(
+        status_code=416,
+        detail="Requested range not satisfiable",
+        headers={"Content-Range": f"bytes */{size}"},
+    )
+
+
+def _iter_file(path: Path, start: int, length: int) -> Iterator[bytes]:
+    with open(path, "rb") as handle:
+        handle.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = handle.read(min(RANGE_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an ``If-None-Match`` header lists ``etag`` (or ``*``)"""
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def ranged_file_response(
+    path: Path,
+    request: Request,
+    media_type: str = "application/octet-stream",
+    filename: Optional[str] = None,
+    etag: Optional[str] = None,
+    extra_headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """
+    Serve ``path`` honouring a single byte range (206) when requested, and
+    answering 304 when ``If-None-Match`` still matches. ``etag`` overrides
+    the default mtime/size validator, e.g. with a content hash.
+    """
+    stat = os.stat(path)
+    size = stat.st_size
+    etag = etag or f'"{stat.st_mtime_ns:x}-{size:x}"'
+
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        **(extra_headers or {}),
+    }
+    if filename:
+        headers["Content-Disposition"] = f"attachment; filename={filename}"
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        headers.pop("Content-Disposition", None)
+        return Response(status_code=304, headers=headers)
+
+    span = parse_range_header(request.headers.get("range"), size)
+    # A stale If-Range validator means the client's partial copy is outdated
+    if_range = request.headers.get("if-range")
+    if span is not None and if_range and if_range != etag:
+        span = None
+
+    if span is None:
+        headers["Content-Length"] = str(size)
+        return StreamingResponse(_iter_file(path, 0, size), media_type=media_type, headers=headers)
+
+    start, end = span
+    length = end - start + 1
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(length)
+    return StreamingResponse(
+        _iter_file(path, start, length),
+        status_code=206,
+        media_type=media_type,
+        headers=headers,
+    )
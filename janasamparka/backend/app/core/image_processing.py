@@ -3,68 +3,147 @@ Image processing utilities for media uploads
 """
 from PIL import Image, ImageOps
 import io
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Union
 
 # Image quality settings
 THUMBNAIL_SIZE = (300, 300)
 MEDIUM_SIZE = (800, 800)
 MAX_SIZE = (1920, 1920)
 JPEG_QUALITY = 85
+MEDIUM_QUALITY = 80
 THUMBNAIL_QUALITY = 70
 
+# Renditions produced per upload, largest first: each one is downscaled
+# from the previous so the original is only decoded and resized once
+RENDITIONS: Dict[str, Tuple[Tuple[int, int], int]] = {
+    "full": (MAX_SIZE, JPEG_QUALITY),
+    "medium": (MEDIUM_SIZE, MEDIUM_QUALITY),
+    "thumbnail": (THUMBNAIL_SIZE, THUMBNAIL_QUALITY),
+}
 
-def create_thumbnail(image_bytes: bytes, size: Tuple[int, int] = THUMBNAIL_SIZE) -> bytes:
+# EXIF tags kept from uploads
+EXIF_GPS_IFD = 0x8825
+EXIF_TAGS = {306: 'datetime', 271: 'make', 272: 'model'}
+
+
+@dataclass
+class Rendition:
+    """One encoded size of an uploaded image"""
+    name: str
+    format: str  # JPEG or WEBP
+    width: int
+    height: int
+    content: bytes
+
+    @property
+    def extension(self) -> str:
+        return '.webp' if self.format == 'WEBP' else '.jpg'
+
+
+@dataclass
+class ProcessedImage:
+    """Result of :func:`process_image`; plain data so it crosses process boundaries"""
+    renditions: List[Rendition]
+    exif: Optional[dict] = None
+    gps: Optional[Tuple[float, float]] = None
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    def get(self, name: str, format: str = 'JPEG') -> Optional[Rendition]:
+        for rendition in self.renditions:
+            if rendition.name == name and rendition.format == format:
+                return rendition
+        return None
+
+
+def _to_rgb(img: Image.Image) -> Image.Image:
+    """Flatten transparency onto white and convert to RGB"""
+    if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
+        img = img.convert('RGBA')
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img.split()[3])
+        return background
+    if img.mode != 'RGB':
+        return img.convert('RGB')
+    return img
+
+
+def _open_rgb(source: Union[bytes, str, Path], max_size: Tuple[int, int]) -> Tuple[Image.Image, Optional[dict], Optional[Tuple[float, float]]]:
     """
-    Create a thumbnail from image bytes
+    Decode an upload (bytes or a file path) once, oriented and in RGB,
+    plus its EXIF summary.
+
+    JPEGs are decoded in draft mode: the decoder scales by 1/2..1/8 while
+    staying at least ``max_size``, which skips most of the IDCT work for
+    large camera photos.
     """
-    img = Image.open(io.BytesIO(image_bytes))
-    
-    # Auto-orient based on EXIF data
+    img = Image.open(io.BytesIO(source) if isinstance(source, bytes) else source)
+    exif, gps = _read_exif(img)
+    if img.format == 'JPEG':
+        img.draft('RGB', max_size)
     img = ImageOps.exif_transpose(img)
-    
-    # Convert RGBA to RGB if necessary
-    if img.mode == 'RGBA':
-        background = Image.new('RGB', img.size, (255, 255, 255))
-        background.paste(img, mask=img.split()[3])
-        img = background
-    elif img.mode != 'RGB':
-        img = img.convert('RGB')
-    
-    # Create thumbnail
-    img.thumbnail(size, Image.Resampling.LANCZOS)
-    
-    # Save to bytes
+    return _to_rgb(img), exif, gps
+
+
+def _fit(img: Image.Image, size: Tuple[int, int]) -> Image.Image:
+    """Downscale to fit ``size`` keeping the aspect ratio; never upscale"""
+    if img.width <= size[0] and img.height <= size[1]:
+        return img
+    resized = img.copy()
+    resized.thumbnail(size, Image.Resampling.LANCZOS)
+    return resized
+
+
+def _encode(img: Image.Image, format: str, quality: int) -> bytes:
     output = io.BytesIO()
-    img.save(output, format='JPEG', quality=THUMBNAIL_QUALITY, optimize=True)
+    if format == 'WEBP':
+        img.save(output, format='WEBP', quality=quality, method=4)
+    else:
+        img.save(output, format='JPEG', quality=quality, optimize=True)
     return output.getvalue()
 
 
+def process_image(source: Union[bytes, str, Path], webp: bool = False,
+                  renditions: Dict[str, Tuple[Tuple[int, int], int]] = RENDITIONS) -> ProcessedImage:
+    """
+    Decode an image once and encode every rendition (JPEG, plus WebP when
+    requested). ``source`` may be a path so spooled uploads reach the
+    worker process without being pickled. CPU bound: run it through
+    ``app.services.image_pipeline`` rather than on the event loop.
+    """
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+    largest = max((size for size, _ in renditions.values()), key=lambda s: s[0] * s[1])
+    img, exif, gps = _open_rgb(source, largest)
+    timings['decode'] = time.perf_counter() - started
+
+    results: List[Rendition] = []
+    for name, (size, quality) in sorted(renditions.items(), key=lambda item: -item[1][0][0] * item[1][0][1]):
+        started = time.perf_counter()
+        img = _fit(img, size)
+        for format in (('JPEG', 'WEBP') if webp else ('JPEG',)):
+            results.append(Rendition(name, format, img.width, img.height, _encode(img, format, quality)))
+        timings[name] = time.perf_counter() - started
+
+    return ProcessedImage(renditions=results, exif=exif, gps=gps, timings=timings)
+
+
+def create_thumbnail(image_bytes: bytes, size: Tuple[int, int] = THUMBNAIL_SIZE) -> bytes:
+    """
+    Create a thumbnail from image bytes
+    """
+    img, _, _ = _open_rgb(image_bytes, size)
+    return _encode(_fit(img, size), 'JPEG', THUMBNAIL_QUALITY)
+
+
 def optimize_image(image_bytes: bytes, max_size: Tuple[int, int] = MAX_SIZE) -> bytes:
     """
     Optimize and resize image
     """
-    img = Image.open(io.BytesIO(image_bytes))
-    
-    # Auto-orient based on EXIF data
-    img = ImageOps.exif_transpose(img)
-    
-    # Convert RGBA to RGB if necessary
-    if img.mode == 'RGBA':
-        background = Image.new('RGB', img.size, (255, 255, 255))
-        background.paste(img, mask=img.split()[3])
-        img = background
-    elif img.mode != 'RGB':
-        img = img.convert('RGB')
-    
-    # Resize if larger than max size
-    if img.size[0] > max_size[0] or img.size[1] > max_size[1]:
-        img.thumbnail(max_size, Image.Resampling.LANCZOS)
-    
-    # Save optimized
-    output = io.BytesIO()
-    img.save(output, format='JPEG', quality=JPEG_QUALITY, optimize=True)
-    return output.getvalue()
+    img, _, _ = _open_rgb(image_bytes, max_size)
+    return _encode(_fit(img, max_size), 'JPEG', JPEG_QUALITY)
 
 
 def get_image_dimensions(image_bytes: bytes) -> Tuple[int, int]:
@@ -75,42 +154,54 @@ def get_image_dimensions(image_bytes: bytes) -> Tuple[int, int]:
     return img.size
 
 
+def gps_to_decimal(gps_info: dict) -> Optional[Tuple[float, float]]:
+    """
+    Convert an EXIF GPS IFD to decimal (lat, lng)
+    GPSInfo tag 2 = latitude, tag 4 = longitude,
+    tag 1 = latitude ref (N/S), tag 3 = longitude ref (E/W)
+    """
+    try:
+        lat, lng = gps_info.get(2), gps_info.get(4)
+        if not (isinstance(lat, (list, tuple)) and len(lat) == 3
+                and isinstance(lng, (list, tuple)) and len(lng) == 3):
+            return None
+        lat_value = float(lat[0]) + float(lat[1]) / 60 + float(lat[2]) / 3600
+        lng_value = float(lng[0]) + float(lng[1]) / 60 + float(lng[2]) / 3600
+        if gps_info.get(1, 'N') == 'S':
+            lat_value = -lat_value
+        if gps_info.get(3, 'E') == 'W':
+            lng_value = -lng_value
+        return lat_value, lng_value
+    except (TypeError, ValueError, ZeroDivisionError):
+        return None
+
+
+def _read_exif(img: Image.Image) -> Tuple[Optional[dict], Optional[Tuple[float, float]]]:
+    """EXIF summary (datetime, make, model as strings) and decimal GPS of an open image"""
+    try:
+        exif = img.getexif()
+    except Exception:
+        return None, None
+    if not exif:
+        return None, None
+
+    summary = {key: str(exif[tag]) for tag, key in EXIF_TAGS.items() if tag in exif}
+    gps = gps_to_decimal(exif.get_ifd(EXIF_GPS_IFD)) if EXIF_GPS_IFD in exif else None
+    return summary or None, gps
+
+
 def extract_exif_data(image_bytes: bytes) -> Optional[dict]:
     """
     Extract EXIF data from image (for geo-tagging, timestamp, etc.)
     """
     try:
-        img = Image.open(io.BytesIO(image_bytes))
-        exif_data = img._getexif()
-        
-        if not exif_data:
-            return None
-        
-        # Extract relevant EXIF tags
-        exif_dict = {}
-        
-        # GPS coordinates (tags 34853)
-        if 34853 in exif_data:
-            gps_info = exif_data[34853]
-            exif_dict['gps'] = gps_info
-        
-        # DateTime (tag 306)
-        if 306 in exif_data:
-            exif_dict['datetime'] = exif_data[306]
-        
-        # Camera make (tag 271)
-        if 271 in exif_data:
-            exif_dict['make'] = exif_data[271]
-        
-        # Camera model (tag 272)
-        if 272 in exif_data:
-            exif_dict['model'] = exif_data[272]
-        
-        return exif_dict if exif_dict else None
-    
+        exif, gps = _read_exif(Image.open(io.BytesIO(image_bytes)))
     except Exception as e:
         print(f"Error extracting EXIF data: {e}")
         return None
+    if gps:
+        exif = {**(exif or {}), 'gps': gps}
+    return exif
 
 
 def is_image_file(filename: str) -> bool:
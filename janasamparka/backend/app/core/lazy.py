@@ -0,0 +1,47 @@
+"""
+Deferred imports for heavy optional dependencies (ML, Parquet, cloud SDKs)
+"""
+import importlib
+import importlib.util
+from types import ModuleType
+from typing import Optional
+
+
+class LazyModule:
+    """
+    Stand-in for a module that is imported on first attribute access.
+
+    ``faiss = LazyModule("faiss")`` at module level costs nothing at
+    startup; ``faiss.IndexFlatIP`` imports faiss the first time it runs.
+    ``available`` tells whether the dependency is installed without
+    importing it.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module: Optional[ModuleType] = None
+
+    @property
+    def available(self) -> bool:
+        if self._module is not None:
+            return True
+        try:
+            return importlib.util.find_spec(self._name.split(".")[0]) is not None
+        except (ImportError, ValueError):
+            return False
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def load(self) -> ModuleType:
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr: str):
+        return getattr(self.load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<LazyModule {self._name!r} ({state})>"
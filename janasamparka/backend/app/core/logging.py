@@ -1,83 +1,190 @@
 """
 Structured logging configuration for Janasamparka
+
+Log calls only build an event dict on the calling thread; rendering (JSON
+via orjson when installed) and file I/O happen on a background
+``QueueListener`` thread. Routine events can be sampled per logger with
+``LOG_SAMPLE_RATES``.
 """
+import atexit
+import json
 import logging
-import logging.config
+import queue
+import random
 import sys
-import json
-import time
-from typing import Any, Dict
-from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
 
 import structlog
-from pythonjsonlogger import jsonlogger
 
 from app.core.config import settings
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
 
-class JSONFormatter(jsonlogger.JsonFormatter):
-    """Custom JSON formatter with additional fields"""
-    
-    def add_fields(self, log_record: Dict[str, Any], record: logging.LogRecord, message_dict: Dict[str, Any]):
-        """Add custom fields to log record"""
-        super().add_fields(log_record, record, message_dict)
-        
-        # Add timestamp if not present
-        if not log_record.get('timestamp'):
-            log_record['timestamp'] = datetime.utcnow().isoformat()
-        
-        # Add log level
-        if log_record.get('level'):
-            log_record['level'] = log_record['level'].upper()
-        else:
-            log_record['level'] = record.levelname
-        
-        # Add application info
-        log_record['application'] = settings.APP_NAME
-        log_record['environment'] = settings.ENVIRONMENT
-        log_record['version'] = settings.APP_VERSION
-        
-        # Add request context if available
-        if hasattr(record, 'request_id'):
-            log_record['request_id'] = record.request_id
-        
-        if hasattr(record, 'user_id'):
-            log_record['user_id'] = record.user_id
-        
-        if hasattr(record, 'constituency_id'):
-            log_record['constituency_id'] = record.constituency_id
 
+_listener: Optional[QueueListener] = None
+
+# Loggers that only go to the log files, never to the console
+_FILE_ONLY_LOGGERS = ("sqlalchemy.engine", "httpx")
+
+
+def json_dumps(obj: Any, **kwargs: Any) -> str:
+    """JSON serializer for the renderer; orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(obj, default=str, ensure_ascii=False)
+
+
+class LogSampler:
+    """
+    Keep a fraction of routine events per logger.
+
+    ``rates`` maps logger names to the share of events kept (a name also
+    covers its children). Warnings and errors, responses with a status of
+    400 or more, and requests slower than ``slow_ms`` are always kept.
+    """
+
+    def __init__(self, rates: Dict[str, float], slow_ms: float):
+        self.rates = dict(rates)
+        self.slow_ms = slow_ms
+        self._resolved: Dict[str, float] = {}
+
+    def rate_for(self, name: Optional[str]) -> float:
+        if not self.rates or not name:
+            return 1.0
+        rate = self._resolved.get(name)
+        if rate is None:
+            rate = 1.0
+            candidate = name
+            while candidate:
+                if candidate in self.rates:
+                    rate = self.rates[candidate]
+                    break
+                candidate = candidate.rpartition(".")[0]
+            self._resolved[name] = rate
+        return rate
+
+    def keep(self, name: Optional[str], levelno: int, fields: Dict[str, Any]) -> float:
+        """The rate the event was sampled at, or 0.0 when it is dropped"""
+        rate = self.rate_for(name)
+        if rate >= 1.0 or levelno >= logging.WARNING:
+            return 1.0
+        status_code = fields.get("status_code")
+        if isinstance(status_code, int) and status_code >= 400:
+            return 1.0
+        duration_ms = fields.get("duration_ms")
+        if isinstance(duration_ms, (int, float)) and duration_ms >= self.slow_ms:
+            return 1.0
+        return rate if random.random() < rate else 0.0
+
+    def processor(self, logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+        """structlog processor: runs before anything else is added to the event"""
+        levelno = logging.getLevelName(method_name.upper())
+        rate = self.keep(getattr(logger, "name", None), levelno if isinstance(levelno, int) else logging.INFO, event_dict)
+        if not rate:
+            raise structlog.DropEvent
+        if rate < 1.0:
+            event_dict["sample_rate"] = rate
+        return event_dict
+
+
+class SamplingFilter(logging.Filter):
+    """The same sampling for plain ``logging`` records (uvicorn access logs, libraries)"""
+
+    def __init__(self, sampler: LogSampler):
+        super().__init__()
+        self.sampler = sampler
 
-class ContextFilter(logging.Filter):
-    """Filter to add context information to log records"""
-    
     def filter(self, record: logging.LogRecord) -> bool:
-        """Add context to log record"""
-        record.app_name = settings.APP_NAME
-        record.environment = settings.ENVIRONMENT
-        return True
+        if isinstance(record.msg, dict):
+            # structlog events were sampled when they were logged
+            return True
+        return bool(self.sampler.keep(record.name, record.levelno, record.__dict__))
+
+
+class ExcludeLoggersFilter(logging.Filter):
+    """Drop records from the given loggers (and their children)"""
+
+    def __init__(self, names: Iterable[str]):
+        super().__init__()
+        self.prefixes = tuple(names)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return not any(record.name == name or record.name.startswith(name + ".") for name in self.prefixes)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Enqueue records as they are, so formatting happens on the listener thread.
+
+    The stock ``QueueHandler.prepare`` formats the message on the caller's
+    thread to make records picklable; an in-process queue does not need that.
+    """
 
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
 
-def setup_logging():
+
+def _capture_exc_info(logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+    # The traceback is rendered on the listener thread, where sys.exc_info() is empty
+    exc_info = event_dict.get("exc_info")
+    if exc_info is True or (exc_info is None and method_name == "exception"):
+        event_dict["exc_info"] = sys.exc_info()
+    return event_dict
+
+
+def _add_app_context(logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+    event_dict.setdefault("application", settings.APP_NAME)
+    event_dict.setdefault("environment", settings.ENVIRONMENT)
+    event_dict.setdefault("version", settings.APP_VERSION)
+    return event_dict
+
+
+def _formatter(renderer: Any) -> structlog.stdlib.ProcessorFormatter:
+    return structlog.stdlib.ProcessorFormatter(
+        # Records from plain logging (uvicorn, libraries) get the same fields
+        foreign_pre_chain=[
+            structlog.stdlib.add_logger_name,
+            structlog.stdlib.add_log_level,
+            structlog.stdlib.ExtraAdder(),
+            structlog.processors.TimeStamper(fmt="iso", utc=True),
+        ],
+        processors=[
+            structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+            _add_app_context,
+            structlog.processors.format_exc_info,
+            renderer,
+        ],
+    )
+
+
+def setup_logging(log_dir: Path = Path("logs")):
     """Setup structured logging configuration"""
     
-    # Create logs directory if it doesn't exist
-    log_dir = Path("logs")
+    shutdown_logging()
     log_dir.mkdir(exist_ok=True)
+
+    sampler = LogSampler(
+        getattr(settings, "LOG_SAMPLE_RATES", {}),
+        getattr(settings, "LOG_SLOW_REQUEST_MS", 1000.0),
+    )
     
-    # Configure structlog
+    # Configure structlog: only cheap steps run on the calling thread
     structlog.configure(
         processors=[
             structlog.stdlib.filter_by_level,
+            sampler.processor,
             structlog.stdlib.add_logger_name,
             structlog.stdlib.add_log_level,
             structlog.stdlib.PositionalArgumentsFormatter(),
-            structlog.processors.TimeStamper(fmt="iso"),
+            structlog.processors.TimeStamper(fmt="iso", utc=True),
             structlog.processors.StackInfoRenderer(),
-            structlog.processors.format_exc_info,
-            structlog.processors.UnicodeDecoder(),
-            structlog.processors.JSONRenderer()
+            _capture_exc_info,
+            structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
         ],
         context_class=dict,
         logger_factory=structlog.stdlib.LoggerFactory(),
@@ -85,83 +192,54 @@ def setup_logging():
         cache_logger_on_first_use=True,
     )
     
-    # Configure standard logging
-    logging_config = {
-        "version": 1,
-        "disable_existing_loggers": False,
-        "formatters": {
-            "json": {
-                "()": JSONFormatter,
-                "format": "%(asctime)s %(name)s %(levelname)s %(message)s"
-            },
-            "console": {
-                "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-            }
-        },
-        "filters": {
-            "context": {
-                "()": ContextFilter
-            }
-        },
-        "handlers": {
-            "console": {
-                "class": "logging.StreamHandler",
-                "level": settings.LOG_LEVEL,
-                "formatter": "json" if settings.LOG_FORMAT == "json" else "console",
-                "filters": ["context"],
-                "stream": sys.stdout
-            },
-            "file": {
-                "class": "logging.handlers.RotatingFileHandler",
-                "level": settings.LOG_LEVEL,
-                "formatter": "json",
-                "filters": ["context"],
-                "filename": f"logs/{settings.ENVIRONMENT}.log",
-                "maxBytes": 10485760,  # 10MB
-                "backupCount": 5,
-                "encoding": "utf8"
-            },
-            "error_file": {
-                "class": "logging.handlers.RotatingFileHandler",
-                "level": "ERROR",
-                "formatter": "json",
-                "filters": ["context"],
-                "filename": f"logs/{settings.ENVIRONMENT}-error.log",
-                "maxBytes": 10485760,  # 10MB
-                "backupCount": 5,
-                "encoding": "utf8"
-            }
-        },
-        "loggers": {
-            "": {  # Root logger
-                "level": settings.LOG_LEVEL,
-                "handlers": ["console", "file", "error_file"]
-            },
-            "uvicorn": {
-                "level": "INFO",
-                "handlers": ["console", "file"],
-                "propagate": False
-            },
-            "uvicorn.access": {
-                "level": "INFO",
-                "handlers": ["console", "file"],
-                "propagate": False
-            },
-            "sqlalchemy.engine": {
-                "level": "WARNING",
-                "handlers": ["file"],
-                "propagate": False
-            },
-            "httpx": {
-                "level": "WARNING",
-                "handlers": ["file"],
-                "propagate": False
-            }
-        }
-    }
-    
-    # Apply logging configuration
-    logging.config.dictConfig(logging_config)
+    json_formatter = _formatter(structlog.processors.JSONRenderer(serializer=json_dumps))
+
+    console = logging.StreamHandler(sys.stdout)
+    console.setLevel(settings.LOG_LEVEL)
+    console.setFormatter(
+        json_formatter if settings.LOG_FORMAT == "json"
+        else _formatter(structlog.dev.ConsoleRenderer(colors=False))
+    )
+    console.addFilter(ExcludeLoggersFilter(_FILE_ONLY_LOGGERS))
+
+    file_handler = RotatingFileHandler(
+        log_dir / f"{settings.ENVIRONMENT}.log",
+        maxBytes=10485760,  # 10MB
+        backupCount=5,
+        encoding="utf8",
+    )
+    file_handler.setLevel(settings.LOG_LEVEL)
+    file_handler.setFormatter(json_formatter)
+
+    error_file = RotatingFileHandler(
+        log_dir / f"{settings.ENVIRONMENT}-error.log",
+        maxBytes=10485760,  # 10MB
+        backupCount=5,
+        encoding="utf8",
+    )
+    error_file.setLevel(logging.ERROR)
+    error_file.setFormatter(json_formatter)
+
+    # Callers only enqueue; the listener thread renders and writes
+    global _listener
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(sampler))
+    _listener = QueueListener(log_queue, console, file_handler, error_file, respect_handler_level=True)
+    _listener.start()
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(settings.LOG_LEVEL)
+
+    for name, level in (("uvicorn", "INFO"), ("uvicorn.access", "INFO"),
+                        ("sqlalchemy.engine", "WARNING"), ("httpx", "WARNING")):
+        library_logger = logging.getLogger(name)
+        library_logger.handlers = []
+        library_logger.setLevel(level)
+        library_logger.propagate = True
     
     # Setup Sentry if configured
     if settings.SENTRY_DSN:
@@ -189,6 +267,19 @@ def setup_logging():
         )
 
 
+def shutdown_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+atexit.register(shutdown_logging)
+
+
 class RequestLogger:
     """Logger for HTTP requests with context"""
     
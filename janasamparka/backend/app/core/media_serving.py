@@ -0,0 +1,119 @@
+"""
+Serving uploaded media: cache validators, signed URLs and nginx offload
+"""
+import hashlib
+import hmac
+import mimetypes
+import re
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+from urllib.parse import urlencode
+
+from fastapi import HTTPException, Request, Response
+
+from app.core.config import settings
+from app.core.http_range import etag_matches, ranged_file_response
+
+
+# File names embedding a SHA-256 (content-addressed blobs and their renditions)
+_CONTENT_HASH = re.compile(r"(?:^|_)([0-9a-f]{64})\.[a-z0-9]+$")
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+MUTABLE_CACHE_CONTROL = "public, max-age=3600"
+
+
+def _signing_key() -> bytes:
+    key = getattr(settings, "MEDIA_URL_SIGNING_KEY", None) or settings.SECRET_KEY
+    return key.encode("utf-8")
+
+
+def media_signature(path: str, expires: int) -> str:
+    """HMAC-SHA256 over the URL path and expiry"""
+    message = f"{path}\n{expires}".encode("utf-8")
+    return hmac.new(_signing_key(), message, hashlib.sha256).hexdigest()
+
+
+def sign_media_url(url: str, expires_in: Optional[int] = None, now: Optional[float] = None) -> str:
+    """Append ``expires`` and ``sig`` query parameters to a ``/uploads/...`` URL"""
+    ttl = expires_in if expires_in is not None else getattr(settings, "MEDIA_SIGNED_URL_TTL_SECONDS", 3600)
+    # Round the expiry up so URLs signed within the same window are identical
+    # and stay cacheable by browsers and the dashboard
+    window = max(ttl // 4, 1)
+    expires = (int(now if now is not None else time.time()) + ttl + window - 1) // window * window
+    return f"{url}?{urlencode({'expires': expires, 'sig': media_signature(url, expires)})}"
+
+
+def present_media_url(url: str) -> str:
+    """URL to hand to clients: complaint media gets signed when signing is enforced"""
+    if not getattr(settings, "MEDIA_REQUIRE_SIGNED_URLS", False):
+        return url
+    if not url.startswith("/uploads/media/") or "sig=" in url:
+        return url
+    return sign_media_url(url)
+
+
+def verify_media_signature(path: str, expires: Optional[int], sig: Optional[str],
+                           now: Optional[float] = None) -> bool:
+    if expires is None or not sig:
+        return False
+    if expires < (now if now is not None else time.time()):
+        return False
+    return hmac.compare_digest(media_signature(path, expires), sig)
+
+
+def resolve_media_path(root: Path, relative: str) -> Optional[Path]:
+    """Map a URL path below ``root`` to a file, refusing traversal and dot-files"""
+    parts = [part for part in relative.split("/") if part]
+    if not parts or any(part.startswith(".") for part in parts):
+        return None
+    base = root.resolve()
+    path = base.joinpath(*parts).resolve()
+    if base not in path.parents or not path.is_file():
+        return None
+    return path
+
+
+def content_hash_of(path: Path) -> Optional[str]:
+    match = _CONTENT_HASH.search(path.name)
+    return match.group(1) if match else None
+
+
+def _validators(path: Path) -> Tuple[str, str]:
+    """(ETag, Cache-Control) for a stored file"""
+    if content_hash_of(path):
+        # The name changes whenever the bytes do: a strong, stat-free validator
+        return f'"{path.stem}"', IMMUTABLE_CACHE_CONTROL
+    stat = path.stat()
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"', MUTABLE_CACHE_CONTROL
+
+
+def media_file_response(root: Path, relative: str, request: Request, signed: bool = False) -> Response:
+    """
+    Serve ``root/relative`` with strong ETags and ``If-None-Match``/``Range``
+    support. Content-hashed names are cached as immutable; signed URLs are
+    only cached privately. With ``MEDIA_ACCEL_REDIRECT_PREFIX`` set the
+    bytes are left to nginx via ``X-Accel-Redirect`` (sendfile, ranges).
+    """
+    path = resolve_media_path(root, relative)
+    if path is None:
+        raise HTTPException(status_code=404, detail="File not found")
+
+    etag, cache_control = _validators(path)
+    if signed:
+        cache_control = cache_control.replace("public", "private", 1)
+    headers = {
+        "Cache-Control": cache_control,
+        "X-Content-Type-Options": "nosniff",
+    }
+    media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+
+    accel_prefix = getattr(settings, "MEDIA_ACCEL_REDIRECT_PREFIX", None)
+    if accel_prefix:
+        headers["ETag"] = etag
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        headers["X-Accel-Redirect"] = f"{accel_prefix.rstrip('/')}/{path.relative_to(root.resolve()).as_posix()}"
+        return Response(status_code=200, media_type=media_type, headers=headers)
+
+    return ranged_file_response(path, request, media_type=media_type, etag=etag, extra_headers=headers)
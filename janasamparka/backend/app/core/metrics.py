@@ -1,18 +1,106 @@
 """
 Metrics collection for Janasamparka
 """
+import asyncio
+import gc
+import hashlib
+import os
+import threading
 import time
 import psutil
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, Optional
 from functools import wraps
 from contextlib import contextmanager
 
-from prometheus_client import Counter, Histogram, Gauge, Info, generate_latest
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Histogram, Gauge, Info, generate_latest
+from prometheus_client import multiprocess
 from fastapi import Response
 
+from app.core.config import settings
 from app.core.logging import performance_logger, database_logger
 
 
+# Label cardinality
+OVERFLOW_LABEL = "other"
+UNMATCHED_ROUTE = "unmatched"
+HTTP_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+
+metrics_label_overflow_total = Counter(
+    'janasamparka_metrics_label_overflow_total',
+    'Label sets folded into the "other" series after a metric reached its cardinality cap',
+    ['metric']
+)
+
+
+def hash_label(value: Any) -> str:
+    """Short stable digest for label values that must not be exposed verbatim"""
+    return hashlib.sha256(str(value).encode("utf-8")).hexdigest()[:12]
+
+
+def route_label(scope: Dict[str, Any]) -> str:
+    """Route template matched for an ASGI scope (``/api/complaints/{complaint_id}``)"""
+    route = scope.get("route")
+    return getattr(route, "path_format", None) or getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+def method_label(method: str) -> str:
+    """HTTP method, with anything non-standard folded into ``"other"``"""
+    return method if method in HTTP_METHODS else OVERFLOW_LABEL
+
+
+class BoundedMetric:
+    """
+    Cap the number of label sets a metric can create.
+
+    The first ``max_series`` distinct label sets are recorded as given.
+    After that, a new label set has its ``bounded`` labels (all labels by
+    default) replaced with ``"other"``, so growth stops at one overflow
+    series per combination of the remaining labels, and the fold is
+    counted in ``janasamparka_metrics_label_overflow_total``. Labels named
+    in ``hashed`` are digested before anything else.
+
+    Everything other than ``labels`` is delegated to the wrapped metric.
+    """
+
+    def __init__(self, metric, max_series: Optional[int] = None,
+                 bounded: Optional[Iterable[str]] = None, hashed: Iterable[str] = ()):
+        self._metric = metric
+        self._labelnames = tuple(metric._labelnames)
+        self.max_series = max_series or getattr(settings, 'METRICS_MAX_SERIES_PER_METRIC', 1000)
+        self.bounded = tuple(bounded) if bounded is not None else self._labelnames
+        self.hashed = tuple(hashed)
+        self._seen = set()
+        self._lock = threading.Lock()
+
+    def labels(self, *labelvalues, **labelkwargs):
+        if labelvalues:
+            labelkwargs = dict(zip(self._labelnames, labelvalues))
+        values = {name: str(labelkwargs[name]) for name in self._labelnames}
+        for name in self.hashed:
+            values[name] = hash_label(values[name])
+
+        key = tuple(values[name] for name in self._labelnames)
+        if key not in self._seen:
+            with self._lock:
+                if key in self._seen:
+                    pass
+                elif len(self._seen) < self.max_series:
+                    self._seen.add(key)
+                else:
+                    metrics_label_overflow_total.labels(metric=self._metric._name).inc()
+                    for name in self.bounded:
+                        values[name] = OVERFLOW_LABEL
+        return self._metric.labels(**values)
+
+    @property
+    def series_count(self) -> int:
+        """Label sets recorded as given (overflow series not included)"""
+        return len(self._seen)
+
+    def __getattr__(self, name):
+        return getattr(self._metric, name)
+
+
 # Application info
 app_info = Info('janasamparka_app_info', 'Application information')
 app_info.info({
@@ -20,39 +108,40 @@ app_info.info({
     'environment': 'production'  # This will be updated from config
 })
 
-# HTTP metrics
-http_requests_total = Counter(
+# HTTP metrics; ``endpoint`` is the matched route template (see route_label),
+# never the raw path, and is capped in case routes are added dynamically
+http_requests_total = BoundedMetric(Counter(
     'janasamparka_http_requests_total',
     'Total HTTP requests',
     ['method', 'endpoint', 'status_code', 'user_role']
-)
+), bounded=['endpoint'])
 
-http_request_duration = Histogram(
+http_request_duration = BoundedMetric(Histogram(
     'janasamparka_http_request_duration_seconds',
     'HTTP request duration in seconds',
     ['method', 'endpoint', 'user_role'],
     buckets=[0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0]
-)
+), bounded=['endpoint'])
 
-http_request_size = Histogram(
+http_request_size = BoundedMetric(Histogram(
     'janasamparka_http_request_size_bytes',
     'HTTP request size in bytes',
     ['method', 'endpoint'],
     buckets=[100, 1000, 10000, 100000, 1000000, 10000000]
-)
+), bounded=['endpoint'])
 
-http_response_size = Histogram(
+http_response_size = BoundedMetric(Histogram(
     'janasamparka_http_response_size_bytes',
     'HTTP response size in bytes',
     ['method', 'endpoint', 'status_code'],
     buckets=[100, 1000, 10000, 100000, 1000000, 10000000]
-)
+), bounded=['endpoint'])
 
-# Authentication metrics
+# Authentication metrics (no per-user labels: phone numbers are PII and unbounded)
 auth_attempts_total = Counter(
     'janasamparka_auth_attempts_total',
     'Total authentication attempts',
-    ['phone', 'success']
+    ['success']
 )
 
 auth_failures_total = Counter(
@@ -64,7 +153,8 @@ auth_failures_total = Counter(
 # Database metrics
 db_connections_active = Gauge(
     'janasamparka_db_connections_active',
-    'Active database connections'
+    'Active database connections',
+    multiprocess_mode='livesum'
 )
 
 db_query_duration = Histogram(
@@ -81,11 +171,12 @@ db_queries_total = Counter(
 )
 
 # Business metrics
-complaints_total = Counter(
+# Constituency/category labels come from data, so these are capped
+complaints_total = BoundedMetric(Counter(
     'janasamparka_complaints_total',
     'Total complaints created',
     ['constituency_id', 'category', 'priority']
-)
+), max_series=5000, bounded=['constituency_id', 'category'])
 
 complaint_status_changes = Counter(
     'janasamparka_complaint_status_changes_total',
@@ -93,33 +184,64 @@ complaint_status_changes = Counter(
     ['old_status', 'new_status', 'changed_by_role']
 )
 
-users_total = Gauge(
+users_total = BoundedMetric(Gauge(
     'janasamparka_users_total',
     'Total number of users',
     ['role', 'constituency_id', 'active']
-)
+), bounded=['constituency_id'])
 
-departments_total = Gauge(
+departments_total = BoundedMetric(Gauge(
     'janasamparka_departments_total',
     'Total number of departments',
     ['constituency_id', 'active']
-)
+), bounded=['constituency_id'])
 
-# System metrics
+# System metrics (refreshed by SystemMetricsSampler; host-wide values are
+# identical in every worker, so multiprocess mode keeps the latest)
 system_cpu_usage = Gauge(
     'janasamparka_system_cpu_usage_percent',
-    'System CPU usage percentage'
+    'System CPU usage percentage',
+    multiprocess_mode='mostrecent'
 )
 
 system_memory_usage = Gauge(
     'janasamparka_system_memory_usage_bytes',
-    'System memory usage in bytes'
+    'System memory usage in bytes',
+    multiprocess_mode='mostrecent'
 )
 
 system_disk_usage = Gauge(
     'janasamparka_system_disk_usage_bytes',
     'System disk usage in bytes',
-    ['mount_point']
+    ['mount_point'],
+    multiprocess_mode='mostrecent'
+)
+
+# Per-process metrics, aggregated over live workers in multiprocess mode
+process_open_fds = Gauge(
+    'janasamparka_process_open_fds',
+    'Open file descriptors',
+    multiprocess_mode='livesum'
+)
+
+event_loop_lag = Gauge(
+    'janasamparka_event_loop_lag_seconds',
+    'How late the metrics sampler woke up, i.e. time callbacks wait for the event loop',
+    multiprocess_mode='livemax'
+)
+
+gc_collections = Gauge(
+    'janasamparka_gc_collections',
+    'Garbage collections run since process start',
+    ['generation'],
+    multiprocess_mode='livesum'
+)
+
+gc_collected_objects = Gauge(
+    'janasamparka_gc_collected_objects',
+    'Objects collected by the garbage collector since process start',
+    ['generation'],
+    multiprocess_mode='livesum'
 )
 
 # File upload metrics
@@ -155,6 +277,86 @@ cache_size = Gauge(
     ['cache_type']
 )
 
+# Broadcast delivery metrics
+broadcast_messages_total = Counter(
+    'janasamparka_broadcast_messages_total',
+    'Total broadcast messages attempted',
+    ['channel', 'success']
+)
+
+broadcast_chunk_duration = Histogram(
+    'janasamparka_broadcast_chunk_duration_seconds',
+    'Time to deliver one chunk of broadcast recipients on a channel',
+    ['channel'],
+    buckets=[0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0]
+)
+
+# Image processing metrics
+image_processing_duration = Histogram(
+    'janasamparka_image_processing_duration_seconds',
+    'Image pipeline time per stage (queue wait, decode, each rendition)',
+    ['stage'],
+    buckets=[0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0]
+)
+
+image_processing_in_flight = Gauge(
+    'janasamparka_image_processing_in_flight',
+    'Images currently being processed by the worker pool',
+    multiprocess_mode='livesum'
+)
+
+# Webhook delivery metrics
+webhook_deliveries_total = Counter(
+    'janasamparka_webhook_deliveries_total',
+    'Webhook events by delivery outcome (delivered, retry, dead)',
+    ['endpoint', 'result']
+)
+
+webhook_delivery_lag = Histogram(
+    'janasamparka_webhook_delivery_lag_seconds',
+    'Time from an event being committed to its delivery',
+    ['endpoint'],
+    buckets=[0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 1800.0, 3600.0]
+)
+
+webhook_outbox_pending = Gauge(
+    'janasamparka_webhook_outbox_pending',
+    'Webhook events waiting in the outbox',
+    multiprocess_mode='livemostrecent'
+)
+
+# Embedding inference metrics
+inference_batch_size = Histogram(
+    'janasamparka_inference_batch_size',
+    'Texts encoded per model call by the micro-batching scheduler',
+    buckets=[1, 2, 4, 8, 16, 32, 64, 128]
+)
+
+inference_queue_wait = Histogram(
+    'janasamparka_inference_queue_wait_seconds',
+    'Time an encode request waited for its batch to start',
+    buckets=[0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0]
+)
+
+inference_batch_duration = Histogram(
+    'janasamparka_inference_batch_duration_seconds',
+    'Model time per batch',
+    buckets=[0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0]
+)
+
+vector_registry_vectors = Gauge(
+    'janasamparka_vector_registry_vectors',
+    'Complaint vectors held in the vector registry indexes',
+    multiprocess_mode='livesum'
+)
+
+duplicate_check_duration = Histogram(
+    'janasamparka_duplicate_check_seconds',
+    'Duplicate detection time per complaint, by how candidates were ranked',
+    ['mode'],
+    buckets=[0.001, 0.0025, 0.005, 0.01, 0.02, 0.03, 0.05, 0.1, 0.25]
+)
+
 
 def track_http_request(func):
     """Decorator to track HTTP request metrics"""
@@ -294,41 +496,92 @@ def track_operation(operation_name: str, labels: Optional[Dict[str, str]] = None
         raise
 
 
-class MetricsCollector:
-    """Collect and update system metrics"""
-    
-    def __init__(self):
-        self.last_update = 0
-        self.update_interval = 30  # seconds
-    
-    def update_system_metrics(self):
-        """Update system-level metrics"""
-        current_time = time.time()
-        if current_time - self.last_update < self.update_interval:
-            return
-        
+class SystemMetricsSampler:
+    """
+    Refresh system and process gauges in the background.
+
+    ``run`` samples every ``interval`` seconds from the application
+    lifespan, so a scrape of ``/metrics`` only serialises stored values.
+    CPU usage is measured between two samples rather than by blocking for a
+    second, and psutil calls (disk usage can stall on network mounts) run
+    in a worker thread. How late each wake-up is gives the event-loop lag.
+    """
+
+    def __init__(self, interval: float = 15.0):
+        self.interval = interval
+        self._process = psutil.Process()
+        self.last_sample = 0.0
+        # The first non-blocking cpu_percent() call only sets the baseline
+        psutil.cpu_percent(interval=None)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        await asyncio.to_thread(self.sample)
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            event_loop_lag.set(max(loop.time() - expected, 0.0))
+            await asyncio.to_thread(self.sample)
+
+    def sample(self):
+        """Take one sample of every system and process gauge"""
         try:
-            # CPU usage
-            cpu_percent = psutil.cpu_percent(interval=1)
-            system_cpu_usage.set(cpu_percent)
-            
-            # Memory usage
-            memory = psutil.virtual_memory()
-            system_memory_usage.set(memory.used)
-            
-            # Disk usage
-            disk_partitions = psutil.disk_partitions()
-            for partition in disk_partitions:
-                usage = psutil.disk_usage(partition.mountpoint)
+            system_cpu_usage.set(psutil.cpu_percent(interval=None))
+            system_memory_usage.set(psutil.virtual_memory().used)
+
+            for partition in psutil.disk_partitions(all=False):
+                try:
+                    usage = psutil.disk_usage(partition.mountpoint)
+                except OSError:
+                    continue
                 system_disk_usage.labels(mount_point=partition.mountpoint).set(usage.used)
-            
-            self.last_update = current_time
-            
+
+            if hasattr(self._process, "num_fds"):
+                process_open_fds.set(self._process.num_fds())
+
+            for generation, stats in enumerate(gc.get_stats()):
+                gc_collections.labels(generation=str(generation)).set(stats["collections"])
+                gc_collected_objects.labels(generation=str(generation)).set(stats["collected"])
+
+            self.last_sample = time.time()
+
         except Exception as e:
             performance_logger.logger.error(
                 "Failed to update system metrics",
                 error=str(e)
             )
+
+
+class MetricsCollector:
+    """Collect and update system metrics"""
+    
+    def update_system_metrics(self):
+        """Sample system-level metrics now (normally done by the background sampler)"""
+        system_metrics_sampler.sample()
+    
+    def record_http_request(self, scope: Dict[str, Any], status_code: int, duration: float,
+                            user_role: Optional[str] = None, response_size: Optional[int] = None):
+        """Record one HTTP request, labelled by route template rather than path"""
+        method = method_label(scope.get("method", ""))
+        endpoint = route_label(scope)
+        user_role = user_role or "anonymous"
+        http_requests_total.labels(
+            method=method,
+            endpoint=endpoint,
+            status_code=str(status_code),
+            user_role=user_role
+        ).inc()
+        http_request_duration.labels(
+            method=method,
+            endpoint=endpoint,
+            user_role=user_role
+        ).observe(duration)
+        if response_size is not None:
+            http_response_size.labels(
+                method=method,
+                endpoint=endpoint,
+                status_code=str(status_code)
+            ).observe(response_size)
     
     def record_complaint_created(self, constituency_id: str, category: str, priority: str):
         """Record complaint creation metric"""
@@ -347,9 +600,8 @@ class MetricsCollector:
         ).inc()
     
     def record_auth_attempt(self, phone: str, success: bool):
-        """Record authentication attempt"""
+        """Record authentication attempt (the phone number is not recorded)"""
         auth_attempts_total.labels(
-            phone=phone,
             success=str(success).lower()
         ).inc()
         
@@ -377,14 +629,27 @@ class MetricsCollector:
 
 # Global metrics collector instance
 metrics_collector = MetricsCollector()
+system_metrics_sampler = SystemMetricsSampler()
+
+
+def metrics_registry() -> CollectorRegistry:
+    """
+    Registry to expose. With ``PROMETHEUS_MULTIPROC_DIR`` set (one
+    directory shared by all workers), values written by every worker
+    process are merged; otherwise this process's registry is used.
+    """
+    if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    # Info metrics are not written to the shared files; report this worker's copy
+    registry.register(app_info)
+    return registry
 
 
 def get_metrics_response() -> Response:
-    """Return Prometheus metrics"""
-    # Update system metrics before returning
-    metrics_collector.update_system_metrics()
-    
-    metrics_data = generate_latest()
+    """Return Prometheus metrics, serialising the values sampled in the background"""
+    metrics_data = generate_latest(metrics_registry())
     return Response(
         content=metrics_data,
         media_type="text/plain; version=0.0.4; charset=utf-8"
@@ -401,9 +666,11 @@ def setup_metrics(app):
         'environment': settings.ENVIRONMENT
     })
     
-    # Add metrics endpoint
+    system_metrics_sampler.interval = getattr(settings, 'METRICS_SAMPLE_INTERVAL_SECONDS', 15.0)
+
+    # Add metrics endpoint (sync, so serialisation runs in the threadpool)
     @app.get("/metrics")
-    async def metrics():
+    def metrics():
         return get_metrics_response()
     
     return app
@@ -0,0 +1,128 @@
+"""
+Full-text search helpers for complaints, forum topics and FAQs.
+
+On PostgreSQL a search term is matched against two ``tsvector`` documents
+(``english`` for stemmed English, ``simple`` for Kannada and transliterated
+words that must not be stemmed) and against ``ILIKE`` substring probes that
+are served by ``pg_trgm`` GIN indexes (see the ``add_search_indexes``
+migration).  Results carry a ``ts_rank_cd`` + trigram similarity rank.
+
+Other dialects (SQLite in tests) fall back to per-term ``LIKE`` filters with a
+CASE-based rank, so call sites do not need to know which database they hit.
+"""
+from __future__ import annotations
+
+import re
+from typing import List, Sequence, Tuple
+
+from sqlalchemy import and_, case, func, literal_column, or_
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+# Text search configurations indexed for every searchable table
+SEARCH_CONFIGS = ("english", "simple")
+
+# Upper bound on terms used by the SQLite fallback to keep the SQL small
+MAX_FALLBACK_TERMS = 8
+
+_TERM_SPLIT = re.compile(r"\s+")
+
+# ESCAPE character for LIKE; avoids backslash quoting differences between dialects
+_LIKE_ESCAPE = "/"
+
+
+def _dialect_name(db: Session) -> str:
+    """Return the dialect name of the engine bound to the session."""
+    return db.get_bind().dialect.name
+
+
+def _escape_like(term: str) -> str:
+    """Escape LIKE wildcards so user input is matched literally."""
+    return (
+        term.replace(_LIKE_ESCAPE, _LIKE_ESCAPE * 2)
+        .replace("%", f"{_LIKE_ESCAPE}%")
+        .replace("_", f"{_LIKE_ESCAPE}_")
+    )
+
+
+def _sum(expressions: Sequence[ColumnElement]) -> ColumnElement:
+    total = expressions[0]
+    for expression in expressions[1:]:
+        total = total + expression
+    return total
+
+
+def search_document(columns: Sequence[ColumnElement]) -> ColumnElement:
+    """
+    Build ``coalesce(a, '') || ' ' || coalesce(b, '') ...`` for the columns.
+
+    The expression must stay byte-for-byte compatible with the expression
+    indexes created by the migration, otherwise Postgres will not use them.
+    """
+    parts = [func.coalesce(column, literal_column("''")) for column in columns]
+    document = parts[0]
+    for part in parts[1:]:
+        document = document.op("||")(literal_column("' '")).op("||")(part)
+    return document
+
+
+def tsvector(config: str, columns: Sequence[ColumnElement]) -> ColumnElement:
+    """``to_tsvector('<config>'::regconfig, <document>)`` for the columns."""
+    return func.to_tsvector(literal_column(f"'{config}'::regconfig"), search_document(columns))
+
+
+def _postgres_clause(
+    columns: Sequence[ColumnElement], search: str
+) -> Tuple[ColumnElement, ColumnElement]:
+    like = f"%{_escape_like(search)}%"
+
+    matches: List[ColumnElement] = []
+    ranks: List[ColumnElement] = []
+    for config in SEARCH_CONFIGS:
+        document = tsvector(config, columns)
+        query = func.websearch_to_tsquery(literal_column(f"'{config}'::regconfig"), search)
+        matches.append(document.op("@@")(query))
+        ranks.append(func.ts_rank_cd(document, query))
+
+    # Substring matches keep the old ILIKE recall; pg_trgm indexes serve them
+    matches.extend(column.ilike(like, escape=_LIKE_ESCAPE) for column in columns)
+    ranks.append(func.similarity(func.coalesce(columns[0], literal_column("''")), search))
+
+    return or_(*matches), _sum(ranks)
+
+
+def _fallback_clause(
+    columns: Sequence[ColumnElement], search: str
+) -> Tuple[ColumnElement, ColumnElement]:
+    terms = [term for term in _TERM_SPLIT.split(search.strip()) if term][:MAX_FALLBACK_TERMS]
+    if not terms:
+        terms = [search]
+
+    conditions: List[ColumnElement] = []
+    ranks: List[ColumnElement] = []
+    weights = [float(len(columns) - index) for index in range(len(columns))]
+    for term in terms:
+        like = f"%{_escape_like(term)}%"
+        term_matches = [column.ilike(like, escape=_LIKE_ESCAPE) for column in columns]
+        conditions.append(or_(*term_matches))
+        for weight, matched in zip(weights, term_matches):
+            ranks.append(case((matched, weight), else_=0.0))
+
+    return and_(*conditions), _sum(ranks)
+
+
+def text_search_clause(
+    db: Session, columns: Sequence[ColumnElement], search: str
+) -> Tuple[ColumnElement, ColumnElement]:
+    """
+    Return ``(where_clause, rank)`` for searching ``columns`` for ``search``.
+
+    Columns are listed in decreasing importance (typically the title first);
+    the rank expression is suitable for ``ORDER BY rank DESC``.
+    """
+    if not columns:
+        raise ValueError("text_search_clause requires at least one column")
+
+    if _dialect_name(db) == "postgresql":
+        return _postgres_clause(columns, search)
+    return _fallback_clause(columns, search)
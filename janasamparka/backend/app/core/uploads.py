@@ -0,0 +1,223 @@
+"""
+Streaming and resumable file uploads
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import re
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import AsyncIterator, Dict, Optional
+
+from fastapi import UploadFile
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None
+
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+_UPLOAD_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+class UploadTooLarge(Exception):
+    """Raised as soon as an upload passes its size limit"""
+
+    def __init__(self, max_size: int):
+        super().__init__(f"Upload exceeds maximum size of {max_size // (1024 * 1024)}MB")
+        self.max_size = max_size
+
+
+class UploadConflict(Exception):
+    """Resumable upload offset mismatch, or another request is writing it"""
+
+
+@dataclass
+class SpooledUpload:
+    """An upload received into a temporary file, with its size and SHA-256"""
+    path: Path
+    size: int
+    sha256: str
+    filename: str = ""
+
+    def move_to(self, destination: Path) -> Path:
+        """Move the bytes into storage without reading them (same filesystem)"""
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(self.path, destination)
+        return destination
+
+    def read_bytes(self) -> bytes:
+        return self.path.read_bytes()
+
+    def discard(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+async def _write_chunks(chunks: AsyncIterator[bytes], handle, max_size: int, size: int, hasher=None) -> int:
+    """Append chunks to ``handle``, hashing and enforcing ``max_size`` as they arrive"""
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        size += len(chunk)
+        if size > max_size:
+            raise UploadTooLarge(max_size)
+        if hasher is not None:
+            hasher.update(chunk)
+        await asyncio.to_thread(handle.write, chunk)
+    return size
+
+
+async def _iter_upload(file: UploadFile, chunk_size: int) -> AsyncIterator[bytes]:
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+async def receive_upload(file: UploadFile, directory: Path, max_size: int,
+                         chunk_size: int = UPLOAD_CHUNK_SIZE) -> SpooledUpload:
+    """
+    Copy a multipart upload into ``directory`` chunk by chunk.
+
+    At most one chunk is held in memory; the size limit is checked and the
+    SHA-256 computed while reading, so an oversized upload is rejected
+    after ``max_size`` bytes rather than after buffering all of it.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{uuid.uuid4().hex}.upload"
+    hasher = hashlib.sha256()
+    try:
+        with open(path, "wb") as handle:
+            size = await _write_chunks(_iter_upload(file, chunk_size), handle, max_size, 0, hasher)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    return SpooledUpload(path=path, size=size, sha256=hasher.hexdigest(), filename=file.filename or "")
+
+
+async def spool_bytes(content: bytes, directory: Path, filename: str = "") -> SpooledUpload:
+    """Wrap content that is already in memory as a :class:`SpooledUpload`"""
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{uuid.uuid4().hex}.upload"
+    await asyncio.to_thread(path.write_bytes, content)
+    return SpooledUpload(path=path, size=len(content), sha256=hashlib.sha256(content).hexdigest(), filename=filename)
+
+
+def parse_upload_metadata(header: Optional[str]) -> Dict[str, str]:
+    """Decode a tus ``Upload-Metadata`` header (``key base64value,...``)"""
+    metadata: Dict[str, str] = {}
+    for pair in (header or "").split(","):
+        parts = pair.strip().split(" ", 1)
+        if not parts[0]:
+            continue
+        try:
+            metadata[parts[0]] = base64.b64decode(parts[1]).decode("utf-8") if len(parts) == 2 else ""
+        except (ValueError, UnicodeDecodeError):
+            continue
+    return metadata
+
+
+@dataclass
+class ResumableUpload:
+    """Bookkeeping for one resumable upload; the offset is the part file's size"""
+    id: str
+    length: int
+    filename: str
+    owner_id: str
+    created_at: float = field(default_factory=time.time)
+    offset: int = 0
+
+
+class ResumableUploadStore:
+    """
+    Server side of tus-style resumable uploads (creation, HEAD, PATCH,
+    termination from the tus 1.0 core protocol).
+
+    Each upload is ``<id>.part`` plus ``<id>.json`` under ``directory``.
+    The part file's size is the committed offset, so a PATCH cut off by a
+    dropped connection keeps whatever reached the disk and the client
+    resumes from there. Writers take an exclusive ``flock`` on the part
+    file, which keeps API workers sharing the directory from interleaving.
+    """
+
+    def __init__(self, directory: Path, max_age_seconds: int = 24 * 3600):
+        self.directory = Path(directory)
+        self.max_age_seconds = max_age_seconds
+
+    def _part(self, upload_id: str) -> Path:
+        return self.directory / f"{upload_id}.part"
+
+    def _info(self, upload_id: str) -> Path:
+        return self.directory / f"{upload_id}.json"
+
+    def create(self, length: int, filename: str, owner_id: str) -> ResumableUpload:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.purge_expired()
+        upload = ResumableUpload(id=uuid.uuid4().hex, length=length, filename=filename, owner_id=owner_id)
+        self._part(upload.id).touch()
+        self._info(upload.id).write_text(json.dumps(asdict(upload)))
+        return upload
+
+    def get(self, upload_id: str) -> Optional[ResumableUpload]:
+        if not _UPLOAD_ID.match(upload_id):
+            return None
+        try:
+            upload = ResumableUpload(**json.loads(self._info(upload_id).read_text()))
+            upload.offset = self._part(upload_id).stat().st_size
+        except (OSError, ValueError, TypeError):
+            return None
+        return upload
+
+    def expires_at(self, upload: ResumableUpload) -> float:
+        return upload.created_at + self.max_age_seconds
+
+    async def append(self, upload: ResumableUpload, offset: int, chunks: AsyncIterator[bytes]) -> int:
+        """Append a PATCH body at ``offset``; returns the new offset"""
+        with open(self._part(upload.id), "ab") as handle:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    raise UploadConflict("Upload is being written by another request")
+            current = os.fstat(handle.fileno()).st_size
+            if offset != current:
+                raise UploadConflict(f"Upload-Offset {offset} does not match current offset {current}")
+            try:
+                return await _write_chunks(chunks, handle, upload.length, current)
+            finally:
+                handle.flush()
+
+    def complete(self, upload: ResumableUpload) -> SpooledUpload:
+        """Hand a finished upload over as a :class:`SpooledUpload` (hashed in chunks)"""
+        path = self._part(upload.id)
+        hasher = hashlib.sha256()
+        with open(path, "rb") as handle:
+            for chunk in iter(lambda: handle.read(UPLOAD_CHUNK_SIZE), b""):
+                hasher.update(chunk)
+        self._info(upload.id).unlink(missing_ok=True)
+        return SpooledUpload(path=path, size=upload.length, sha256=hasher.hexdigest(), filename=upload.filename)
+
+    def delete(self, upload_id: str) -> None:
+        self._part(upload_id).unlink(missing_ok=True)
+        self._info(upload_id).unlink(missing_ok=True)
+
+    def purge_expired(self) -> int:
+        """Remove uploads abandoned for longer than ``max_age_seconds``"""
+        cutoff = time.time() - self.max_age_seconds
+        removed = 0
+        for info in self.directory.glob("*.json"):
+            try:
+                expired = info.stat().st_mtime < cutoff
+            except OSError:
+                continue
+            if expired:
+                self.delete(info.stem)
+                removed += 1
+        return removed
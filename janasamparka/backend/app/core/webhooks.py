@@ -1,44 +1,89 @@
-"""Utility helpers for dispatching outbound webhook events."""
+"""Utility helpers for recording and signing outbound webhook events."""
 
 from __future__ import annotations
 
-import asyncio
-import inspect
-from typing import Any, Dict, Iterable
+import hashlib
+import hmac
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
 
-try:  # pragma: no cover - optional dependency
-    import httpx  # type: ignore[import]
-except ImportError:  # pragma: no cover - fallback when httpx missing
-    httpx = None  # type: ignore[assignment]
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.models.webhook import WebhookOutbox
 
+# Session.info flag telling the dispatcher to wake up once the transaction commits
+OUTBOX_PENDING = "webhook_outbox_pending"
 
-async def dispatch_event(event_name: str, payload: Dict[str, Any]) -> None:
-    """Send the given payload to all configured webhook endpoints."""
+SIGNATURE_HEADER = "X-Janasamparka-Signature"
+TIMESTAMP_HEADER = "X-Janasamparka-Timestamp"
+
+
+def _event_document(event_id: uuid.UUID, event_name: str, now: datetime, payload: Dict[str, Any]) -> str:
+    return json.dumps(
+        {"id": str(event_id), "event": event_name, "created_at": now.isoformat() + "Z", "payload": payload},
+        default=str,
+        separators=(",", ":"),
+    )
+
+
+def enqueue_event(db: Session, event_name: str, payload: Dict[str, Any]) -> None:
+    """
+    Record an event for every configured endpoint in the caller's transaction.
+
+    Nothing is sent here: the rows become visible to the webhook dispatcher
+    when the caller commits, and disappear with it on rollback.
+    """
 
     endpoints: Iterable[str] = settings.WEBHOOK_ENDPOINTS
     if not endpoints:
         return
 
-    body: Dict[str, Any] = {"event": event_name, "payload": payload}
+    event_id = uuid.uuid4()
+    now = datetime.utcnow()
+    document = _event_document(event_id, event_name, now, payload)
+    for endpoint in endpoints:
+        db.add(WebhookOutbox(
+            event_id=event_id,
+            event=event_name,
+            endpoint=endpoint,
+            payload=document,
+            created_at=now,
+            next_attempt_at=now,
+        ))
+    db.info[OUTBOX_PENDING] = True
+
+
+def enqueue_events(db: Session, event_name: str, payloads: Iterable[Dict[str, Any]]) -> None:
+    """``enqueue_event`` for many events, written with one multi-row insert."""
+
+    endpoints: Iterable[str] = settings.WEBHOOK_ENDPOINTS
+    if not endpoints:
+        return
 
-    async def _post(url: str) -> None:
-        if httpx is None:
-            return
+    now = datetime.utcnow()
+    rows = []
+    for payload in payloads:
+        event_id = uuid.uuid4()
+        document = _event_document(event_id, event_name, now, payload)
+        rows.extend(
+            {"event_id": event_id, "event": event_name, "endpoint": endpoint, "payload": document,
+             "created_at": now, "next_attempt_at": now}
+            for endpoint in endpoints
+        )
+    if rows:
+        db.execute(insert(WebhookOutbox), rows)
+        db.info[OUTBOX_PENDING] = True
 
-        async_client_cls = getattr(httpx, "AsyncClient", None)
-        if async_client_cls is None:
-            return
 
-        try:
-            async with async_client_cls(timeout=10.0) as client:  # type: ignore[misc]
-                post_method = getattr(client, "post", None)
-                if callable(post_method):
-                    response = post_method(url, json=body)
-                    if inspect.isawaitable(response):
-                        await response
-        except Exception as exc:  # pragma: no cover - network failures are non-fatal
-            print(f"Webhook dispatch failed for {url}: {exc}")
+def sign_payload(body: bytes, timestamp: int, secret: Optional[str] = None) -> Optional[str]:
+    """``sha256=<hex>`` HMAC over ``"<timestamp>." + body``, or None without a secret."""
 
-    await asyncio.gather(*(_post(endpoint) for endpoint in endpoints))
+    secret = secret or getattr(settings, "WEBHOOK_SIGNING_SECRET", None)
+    if not secret:
+        return None
+    digest = hmac.new(secret.encode("utf-8"), f"{timestamp}.".encode("ascii") + body, hashlib.sha256)
+    return f"sha256={digest.hexdigest()}"
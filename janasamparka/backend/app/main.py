@@ -1,28 +1,72 @@
 """
 Main FastAPI application with monitoring and logging
 """
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.core.config import settings
+from app.core.config import APP_ROLES, serves, settings
 from app.core.database import engine, Base
-from app.core.logging import setup_logging, logger
-from app.core.metrics import setup_metrics
-from app.middleware.monitoring import (
-    RequestMonitoringMiddleware,
-    SecurityHeadersMiddleware,
-    HealthCheckMiddleware
-)
-from app.routers import (
-    auth, complaints, users, constituencies, departments, wards, polls, 
-    media, geocode, map as map_router, ai, bhoomi, analytics, ratings, 
-    case_management, budgets, faqs, database, panchayats, interventions, 
-    department_types, news, citizen_engagement, votebank_engagement, conference_chat, forum, social_feed
-)
+from app.core.logging import setup_logging, shutdown_logging, logger
+from app.core.metrics import setup_metrics, system_metrics_sampler
+from app.core.http_clients import http_clients
+from app.middleware.monitoring import ObservabilityMiddleware
 from pathlib import Path
 
+# (module in app.routers, router attribute, prefix, tags, role). Routers are
+# imported only when this process serves their role.
+ROUTERS = [
+    ("auth", "router", "/api/auth", ["Authentication"], "api"),
+    ("users", "router", "/api/users", ["Users"], "api"),
+    ("complaints", "router", "/api/complaints", ["Complaints"], "api"),
+    ("constituencies", "router", "/api/constituencies", ["Constituencies"], "api"),
+    ("departments", "router", "/api/departments", ["Departments"], "api"),
+    ("department_types", "router", "/api/department-types", ["Department Types"], "api"),
+    ("wards", "router", "/api/wards", ["Wards"], "api"),
+    ("polls", "router", "/api/polls", ["Polls"], "api"),
+    ("media", "router", "/api/media", ["Media"], "api"),
+    ("geocode", "router", "/api/geocode", ["Geocoding"], "api"),
+    ("map", "router", "/api/map", ["Map"], "api"),
+    ("ai", "router", "/api/ai", ["AI & ML"], "ai"),
+    ("bhoomi", "router", "/api/bhoomi", ["Bhoomi Land Records"], "api"),
+    ("analytics", "router", "/api/analytics", ["Analytics & Reporting"], "api"),
+    ("ratings", "router", "/api/ratings", ["Citizen Ratings & Feedback"], "api"),
+    ("interventions", "router", "/api/interventions", ["Satisfaction Interventions"], "api"),
+    ("case_management", "router", None, ["Case Management"], "api"),
+    ("budgets", "router", None, ["Budget Tracking"], "api"),
+    ("faqs", "router", None, ["FAQ & Knowledge Base"], "api"),
+    ("database", "router", "/api/database", ["Database Management"], "api"),
+    ("panchayats", "router", None, ["Panchayats"], "api"),
+    ("news", "router", "/api/news", ["News, Schedule & Ticker"], "api"),
+    ("citizen_engagement", "router", "/api/engagement", ["Citizen Engagement"], "api"),
+    ("conference_chat", "router", "/api/chat", ["Conference Chat"], "api"),
+    ("votebank_engagement", "router", "/api/votebank", ["Votebank Engagement"], "api"),
+    ("forum", "router", "/api/forum", ["Knowledge Forum"], "api"),
+    ("social_feed", "router", "/api/social", ["MLA Social Feed"], "api"),
+    # Serve uploaded media (ETag, Range, immutable caching, signed URLs and
+    # X-Accel-Redirect offload to nginx; see app/core/media_serving.py)
+    ("media", "files_router", None, ["Media"], "api"),
+    ("inference", "router", "/internal/inference", ["Inference"], "inference"),
+]
+
+
+def include_routers(app: FastAPI) -> None:
+    """Import and mount the routers for this process's APP_ROLE"""
+    if settings.APP_ROLE not in APP_ROLES:
+        raise ValueError(f"APP_ROLE must be one of {', '.join(APP_ROLES)}, not {settings.APP_ROLE!r}")
+    for module_name, attribute, prefix, tags, role in ROUTERS:
+        if not serves(role):
+            continue
+        # __import__ rather than importlib.import_module, so -X importtime
+        # attributes each router's cost to it (scripts/profile_imports.py)
+        module = __import__(f"app.routers.{module_name}", fromlist=[attribute])
+        if prefix:
+            app.include_router(getattr(module, attribute), prefix=prefix, tags=tags)
+        else:
+            app.include_router(getattr(module, attribute), tags=tags)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -44,12 +88,66 @@ async def lifespan(app: FastAPI):
     
     # Setup metrics
     setup_metrics(app)
-    logger.info("Metrics collection initialized")
+    metrics_task = asyncio.create_task(system_metrics_sampler.run())
+    logger.info("Metrics collection initialized", role=settings.APP_ROLE)
+
+    # Pooled keep-alive clients for webhooks, push, SMS/WhatsApp and Zoom
+    await http_clients.start()
+
+    # The inference server loads its model before taking requests
+    embedding_service = None
+    if serves("ai") or serves("inference"):
+        from app.services.inference import embedding_service
+        if serves("inference"):
+            await asyncio.to_thread(embedding_service.encoder.load)
+
+    # Background work for the API routers; AI-only processes skip it
+    snapshot_task = None
+    webhook_task = None
+    if serves("api"):
+        from app.services.notification_service import notification_service
+        from app.services.snapshot_service import snapshot_service
+        from app.services.report_jobs import report_queue
+        from app.services.image_pipeline import image_pipeline
+        from app.services.webhook_dispatcher import webhook_dispatcher
+        from app.services.faq_search_service import faq_search_index
+
+        # Offline analytics snapshots (optional in-process scheduler)
+        if settings.ANALYTICS_SNAPSHOT_INTERVAL_MINUTES > 0:
+            snapshot_task = asyncio.create_task(
+                snapshot_service.run_periodically(settings.ANALYTICS_SNAPSHOT_INTERVAL_MINUTES)
+            )
+            logger.info("Analytics snapshot job scheduled",
+                        interval_minutes=settings.ANALYTICS_SNAPSHOT_INTERVAL_MINUTES)
+
+        # Load the FAQ search index before the first search needs it
+        faq_search_index.refresh_in_background()
+
+        # Report job workers; completion events are pushed from worker threads
+        report_queue.start(asyncio.get_running_loop())
+
+        # Deliver webhook events committed to the outbox
+        if settings.WEBHOOK_ENDPOINTS:
+            webhook_task = asyncio.create_task(webhook_dispatcher.run())
     
     yield
     
     # Shutdown
     logger.info("Shutting down ಜನಮನಾ ಸಂಪರ್ಕ | JanaMana Samparka API")
+    metrics_task.cancel()
+    if snapshot_task:
+        snapshot_task.cancel()
+    if webhook_task:
+        webhook_task.cancel()
+    if serves("api"):
+        # Lets running reports finish and joins the worker threads
+        await asyncio.to_thread(report_queue.shutdown)
+        image_pipeline.shutdown()
+        await notification_service.close()
+    if embedding_service:
+        await embedding_service.close()
+    await http_clients.close()
+    shutdown_logging()
 
 
 # Initialize FastAPI app
@@ -62,10 +160,8 @@ app = FastAPI(
     lifespan=lifespan
 )
 
-# Add monitoring middleware
-app.add_middleware(HealthCheckMiddleware)
-app.add_middleware(RequestMonitoringMiddleware)
-app.add_middleware(SecurityHeadersMiddleware)
+# Request IDs, timing, logs, metrics and security headers (pure ASGI)
+app.add_middleware(ObservabilityMiddleware)
 
 # CORS middleware
 app.add_middleware(
@@ -76,44 +172,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Include routers
-app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
-app.include_router(users.router, prefix="/api/users", tags=["Users"])
-app.include_router(complaints.router, prefix="/api/complaints", tags=["Complaints"])
-app.include_router(constituencies.router, prefix="/api/constituencies", tags=["Constituencies"])
-app.include_router(departments.router, prefix="/api/departments", tags=["Departments"])
-app.include_router(department_types.router, prefix="/api/department-types", tags=["Department Types"])
-app.include_router(wards.router, prefix="/api/wards", tags=["Wards"])
-app.include_router(polls.router, prefix="/api/polls", tags=["Polls"])
-app.include_router(media.router, prefix="/api/media", tags=["Media"])
-app.include_router(geocode.router, prefix="/api/geocode", tags=["Geocoding"])
-app.include_router(map_router.router, prefix="/api/map", tags=["Map"])
-app.include_router(ai.router, prefix="/api/ai", tags=["AI & ML"])
-app.include_router(bhoomi.router, prefix="/api/bhoomi", tags=["Bhoomi Land Records"])
-app.include_router(analytics.router, prefix="/api/analytics", tags=["Analytics & Reporting"])
-app.include_router(ratings.router, prefix="/api/ratings", tags=["Citizen Ratings & Feedback"])
-app.include_router(interventions.router, prefix="/api/interventions", tags=["Satisfaction Interventions"])
-app.include_router(case_management.router, tags=["Case Management"])
-app.include_router(budgets.router, tags=["Budget Tracking"])
-app.include_router(faqs.router, tags=["FAQ & Knowledge Base"])
-app.include_router(database.router, prefix="/api/database", tags=["Database Management"])
-app.include_router(panchayats.router, tags=["Panchayats"])
-app.include_router(news.router, prefix="/api/news", tags=["News, Schedule & Ticker"])
-app.include_router(citizen_engagement.router, prefix="/api/engagement", tags=["Citizen Engagement"])
-app.include_router(conference_chat.router, prefix="/api/chat", tags=["Conference Chat"])
-app.include_router(votebank_engagement.router, prefix="/api/votebank", tags=["Votebank Engagement"])
-app.include_router(forum.router, prefix="/api/forum", tags=["Knowledge Forum"])
-app.include_router(social_feed.router, prefix="/api/social", tags=["MLA Social Feed"])
-
 # Create uploads directory if it doesn't exist
 uploads_dir = Path("uploads")
 uploads_dir.mkdir(exist_ok=True)
 (uploads_dir / "media").mkdir(exist_ok=True)
 (uploads_dir / "profile_photos").mkdir(exist_ok=True)
 
-# Mount static files for serving uploaded media
-from fastapi.staticfiles import StaticFiles
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+# Include routers
+include_routers(app)
 
 
 @app.get("/")
@@ -183,7 +249,8 @@ async def detailed_health_check():
         detailed_health = {
             **basic_health,
             "system": {
-                "cpu_usage_percent": psutil.cpu_percent(interval=1),
+                # Since the previous call (the metrics sampler keeps it fresh); never blocks
+                "cpu_usage_percent": psutil.cpu_percent(interval=None),
                 "memory_usage_mb": round(psutil.virtual_memory().used / 1024 / 1024, 2),
                 "disk_usage_gb": round(psutil.disk_usage('/').used / 1024 / 1024 / 1024, 2),
                 "load_average": list(psutil.getloadavg()) if hasattr(psutil, 'getloadavg') else None
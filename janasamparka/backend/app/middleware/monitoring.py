@@ -1,130 +1,141 @@
 """
 Monitoring middleware for FastAPI application
 """
+import itertools
+import os
 import time
-import uuid
-from typing import Callable
+from typing import Callable, Iterable, List, Tuple
 from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from app.core.config import settings
 from app.core.logging import request_logger, performance_logger
-from app.core.auth import get_current_user
+from app.core.metrics import metrics_collector
 
+# Served without request IDs, logging or metrics
+HEALTH_PATHS = ("/health", "/health/detailed")
 
-class RequestMonitoringMiddleware(BaseHTTPMiddleware):
-    """Middleware to monitor HTTP requests"""
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        # Generate request ID
-        request_id = str(uuid.uuid4())
-        request.state.request_id = request_id
-        
-        # Get start time
-        start_time = time.time()
-        
-        # Get client info
-        client_ip = request.client.host if request.client else "unknown"
-        user_agent = request.headers.get("user-agent", "unknown")
-        
-        # Try to get user info (if authenticated)
-        user_id = None
-        constituency_id = None
-        try:
-            # This will work if the request has valid auth
-            current_user = await get_current_user(
-                request.headers.get("authorization"),
-                None  # We don't have db session here, but that's ok for monitoring
-            )
-            if current_user:
-                user_id = str(current_user.id)
-                constituency_id = str(current_user.constituency_id) if current_user.constituency_id else None
-        except:
-            pass  # User not authenticated, that's fine
-        
-        # Log request start
-        request_logger.logger.info(
-            "HTTP request started",
-            method=request.method,
-            path=request.url.path,
-            query_string=str(request.url.query) if request.url.query else None,
-            client_ip=client_ip,
-            user_agent=user_agent,
-            user_id=user_id,
-            request_id=request_id
+
+def security_headers() -> List[Tuple[bytes, bytes]]:
+    """Raw security headers added to every monitored response"""
+    headers = [
+        (b"x-content-type-options", b"nosniff"),
+        (b"x-frame-options", b"DENY"),
+        (b"x-xss-protection", b"1; mode=block"),
+        (b"referrer-policy", b"strict-origin-when-cross-origin"),
+    ]
+    if settings.ENVIRONMENT == "production":
+        hsts = (
+            f"max-age={settings.SECURITY_HSTS_SECONDS}; "
+            f"includeSubDomains={str(settings.SECURITY_HSTS_INCLUDE_SUBDOMAINS).lower()}; "
+            f"preload={str(settings.SECURITY_HSTS_PRELOAD).lower()}"
         )
-        
-        # Process request
+        headers.append((b"strict-transport-security", hsts.encode("latin-1")))
+    return headers
+
+
+class ObservabilityMiddleware:
+    """
+    Request IDs, timing, request logs, HTTP metrics and security headers
+    as a single pure ASGI middleware.
+
+    Unlike ``BaseHTTPMiddleware`` there is no task group or memory stream
+    per request, so streaming responses pass through untouched. Request
+    IDs come from a per-process counter rather than ``uuid4``, the
+    security headers are built once, and the user is not resolved here:
+    requests are labelled ``authenticated`` or ``anonymous`` from the
+    presence of an Authorization header. ``HEALTH_PATHS`` bypass it.
+    """
+
+    def __init__(self, app: ASGIApp, skip_paths: Iterable[str] = HEALTH_PATHS):
+        self.app = app
+        self.skip_paths = frozenset(skip_paths)
+        self.headers = security_headers()
+        self.slow_threshold = settings.LOG_SLOW_REQUEST_MS / 1000
+        self._id_prefix = os.urandom(4).hex()
+        self._ids = itertools.count(1)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        request_id = f"{self._id_prefix}-{next(self._ids):x}"
+        scope.setdefault("state", {})["request_id"] = request_id
+        response_headers = self.headers + [(b"x-request-id", request_id.encode("latin-1"))]
+        status_code = 500
+        response_size = 0
+        start_time = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = list(message.get("headers", ())) + response_headers
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
         try:
-            response = await call_next(request)
-            
-            # Calculate duration
-            duration = time.time() - start_time
-            
-            # Log successful request
-            request_logger.log_request(
-                method=request.method,
-                path=request.url.path,
-                status_code=response.status_code,
-                duration=duration,
-                user_id=user_id,
-                request_id=request_id,
-                client_ip=client_ip,
-                constituency_id=constituency_id
-            )
-            
-            # Log performance metrics
-            performance_logger.log_api_response_time(
-                endpoint=request.url.path,
-                method=request.method,
-                duration=duration
-            )
-            
-            # Add request ID to response headers
-            response.headers["X-Request-ID"] = request_id
-            
-            return response
-            
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:
-            # Calculate duration
-            duration = time.time() - start_time
-            
-            # Log error
+            duration = time.perf_counter() - start_time
+            _, user_role = self._request_info(scope)
+            metrics_collector.record_http_request(
+                scope, status_code=500, duration=duration, user_role=user_role
+            )
             request_logger.log_error(
-                method=request.method,
-                path=request.url.path,
+                method=scope["method"],
+                path=scope["path"],
                 error=e,
-                user_id=user_id,
                 request_id=request_id,
-                client_ip=client_ip,
+                client_ip=scope["client"][0] if scope.get("client") else "unknown",
                 duration=duration
             )
-            
-            # Re-raise the exception
             raise
 
+        duration = time.perf_counter() - start_time
+        user_agent, user_role = self._request_info(scope)
+        metrics_collector.record_http_request(
+            scope,
+            status_code=status_code,
+            duration=duration,
+            user_role=user_role,
+            response_size=response_size
+        )
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    """Middleware to add security headers"""
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        response = await call_next(request)
-        
-        # Add security headers
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        
-        # Add HSTS header in production
-        from app.core.config import settings
-        if settings.ENVIRONMENT == "production":
-            response.headers["Strict-Transport-Security"] = (
-                f"max-age={settings.SECURITY_HSTS_SECONDS}; "
-                f"includeSubDomains={str(settings.SECURITY_HSTS_INCLUDE_SUBDOMAINS).lower()}; "
-                f"preload={str(settings.SECURITY_HSTS_PRELOAD).lower()}"
+        # One line per request (sampled per LOG_SAMPLE_RATES)
+        request_logger.log_request(
+            method=scope["method"],
+            path=scope["path"],
+            status_code=status_code,
+            duration=duration,
+            request_id=request_id,
+            client_ip=scope["client"][0] if scope.get("client") else "unknown",
+            user_agent=user_agent,
+            user_role=user_role
+        )
+
+        # Slow requests are also reported to the performance log
+        if duration > self.slow_threshold:
+            performance_logger.log_api_response_time(
+                endpoint=scope["path"],
+                method=scope["method"],
+                duration=duration,
+                threshold=self.slow_threshold
             )
-        
-        return response
+
+    @staticmethod
+    def _request_info(scope: Scope) -> Tuple[str, str]:
+        user_agent = "unknown"
+        user_role = "anonymous"
+        for name, value in scope["headers"]:
+            if name == b"user-agent":
+                user_agent = value.decode("latin-1")
+            elif name == b"authorization":
+                user_role = "authenticated"
+        return user_agent, user_role
 
 
 class RateLimitingMiddleware(BaseHTTPMiddleware):
@@ -174,14 +185,3 @@ class DatabaseMonitoringMiddleware(BaseHTTPMiddleware):
         # This is a simplified version - in production you'd want to use
         # SQLAlchemy event listeners for more accurate monitoring
         return await call_next(request)
-
-
-class HealthCheckMiddleware(BaseHTTPMiddleware):
-    """Middleware to handle health checks without logging"""
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        if request.url.path in ["/health", "/health/detailed"]:
-            # Skip monitoring for health checks
-            return await call_next(request)
-        
-        return await call_next(request)
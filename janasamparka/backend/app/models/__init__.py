@@ -6,7 +6,8 @@ from .user import User
 from .ward import Ward
 from .department import Department
 from .department_type import DepartmentType
-from .complaint import Complaint, Media, StatusLog
+from .complaint import Complaint, Media, MediaBlob, StatusLog
+from .webhook import WebhookOutbox
 from .poll import Poll, PollOption, Vote
 from .case_note import CaseNote, DepartmentRouting, ComplaintEscalation
 from .budget import WardBudget, DepartmentBudget, BudgetTransaction
@@ -55,7 +56,9 @@ __all__ = [
     "DepartmentType",
     "Complaint",
     "Media",
+    "MediaBlob",
     "StatusLog",
+    "WebhookOutbox",
     "Poll",
     "PollOption",
     "Vote",
@@ -447,6 +447,7 @@ class BroadcastStatus(str, Enum):
     """Broadcast status"""
     DRAFT = "draft"
     SCHEDULED = "scheduled"
+    SENDING = "sending"
     SENT = "sent"
     FAILED = "failed"
     CANCELLED = "cancelled"
@@ -499,7 +500,10 @@ class ScheduledBroadcast(Base):
     delivered_count = Column(Integer, default=0)
     read_count = Column(Integer, default=0)
     click_count = Column(Integer, default=0)
-    
+
+    # Delivery checkpoint: last user id (keyset order) whose chunk was committed
+    delivery_cursor = Column(UUID(as_uuid=True), nullable=True)
+
     # Priority and expiration
     priority = Column(Integer, default=1)  # 1-10, higher = more important
     expires_at = Column(DateTime)  # When to stop showing in app
@@ -8,7 +8,7 @@ from datetime import datetime, timezone
 from decimal import Decimal
 from typing import Optional, TYPE_CHECKING
 
-from sqlalchemy import Boolean, DateTime, Enum, ForeignKey, Integer, Numeric, String, Text
+from sqlalchemy import BigInteger, Boolean, DateTime, Enum, ForeignKey, Integer, Numeric, String, Text
 from sqlalchemy.dialects.postgresql import UUID as PGUUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -199,10 +199,37 @@ class Media(Base):
     uploaded_at: Mapped[datetime] = mapped_column(DateTime, default=_utcnow)
     uploaded_by: Mapped[Optional[UUIDType]] = mapped_column(PGUUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
 
+    # Content-addressed file shared with every identical upload (NULL for legacy files)
+    blob_sha256: Mapped[Optional[str]] = mapped_column(String(64), ForeignKey("media_blobs.sha256"), nullable=True, index=True)
+
     def __repr__(self) -> str:  # pragma: no cover - debug helper
         return f"<Media {self.media_type}: {self.url}>"
 
 
+class MediaBlob(Base):
+    """Stored media file keyed by the SHA-256 of the uploaded bytes, reference counted."""
+
+    __tablename__ = "media_blobs"
+
+    sha256: Mapped[str] = mapped_column(String(64), primary_key=True)
+    # Path of the main file relative to the blob root, e.g. ab/cd/<sha256>.jpg
+    path: Mapped[str] = mapped_column(String(255), nullable=False)
+    content_type: Mapped[str] = mapped_column(String(100), nullable=False)
+    size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+    # EXIF GPS of the original upload, reused when the same bytes are uploaded again
+    lat: Mapped[Optional[float]] = mapped_column(Numeric(precision=10, scale=7), nullable=True)
+    lng: Mapped[Optional[float]] = mapped_column(Numeric(precision=10, scale=7), nullable=True)
+
+    ref_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=_utcnow)
+    # Set when ref_count drops to zero; unreferenced blobs are removed after a grace period
+    released_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True, index=True)
+
+    def __repr__(self) -> str:  # pragma: no cover - debug helper
+        return f"<MediaBlob {self.sha256[:12]} refs={self.ref_count}>"
+
+
 class StatusLog(Base):
     """Status change history for complaints."""
 
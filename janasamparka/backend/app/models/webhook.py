@@ -0,0 +1,48 @@
+"""Transactional outbox for outbound webhook events."""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import BigInteger, DateTime, Index, Integer, String, Text, Uuid
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+from uuid import UUID as UUIDType
+
+
+def _utcnow() -> datetime:
+    """Naive UTC timestamp, compared against the dispatcher's clock."""
+
+    return datetime.utcnow()
+
+
+class WebhookOutbox(Base):
+    """One webhook event awaiting delivery to one endpoint."""
+
+    __tablename__ = "webhook_outbox"
+    __table_args__ = (
+        Index("ix_webhook_outbox_due", "status", "next_attempt_at"),
+    )
+
+    id: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True
+    )
+    # Shared by the rows of one event across endpoints; receivers deduplicate on it
+    event_id: Mapped[UUIDType] = mapped_column(Uuid(as_uuid=True), nullable=False, default=uuid.uuid4)
+    event: Mapped[str] = mapped_column(String(100), nullable=False)
+    endpoint: Mapped[str] = mapped_column(String(500), nullable=False)
+    # Serialized event envelope, sent as-is inside a batch
+    payload: Mapped[str] = mapped_column(Text, nullable=False)
+
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending")
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    next_attempt_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=_utcnow)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=_utcnow)
+    delivered_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    def __repr__(self) -> str:  # pragma: no cover - debug helper
+        return f"<WebhookOutbox {self.id} {self.event} -> {self.endpoint} ({self.status})>"
@@ -3,66 +3,40 @@ AI router - Duplicate detection and AI-powered features
 """
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, List, Optional
 from uuid import UUID
-import numpy as np
 
+from app.core.config import settings
 from app.core.database import get_db
 from app.models.complaint import Complaint
+from app.services.duplicate_engine import DuplicateEngine
+from app.services.inference import InferenceUnavailable
+from app.services.vector_registry import VectorIndex, complaint_text, vector_registry
 
 router = APIRouter()
 
-# Global variable for model and index (will be initialized on first use)
-_model = None
-_faiss_index = None
-_complaint_embeddings = {}
 
+def model_unavailable(e: InferenceUnavailable) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=f"AI model not available: {e}"
+    )
 
-def get_embedding_model():
-    """
-    Lazy load the sentence transformer model
-    """
-    global _model
-    if _model is None:
-        try:
-            from sentence_transformers import SentenceTransformer
-            # Use multilingual model for Kannada + English support
-            _model = SentenceTransformer('paraphrase-multilingual-mpnet-base-v2')
-        except Exception as e:
-            print(f"Error loading embedding model: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="AI model not available. Please install sentence-transformers."
-            )
-    return _model
-
-
-def get_faiss_index():
-    """
-    Lazy load the FAISS index
-    """
-    global _faiss_index
-    if _faiss_index is None:
-        try:
-            import faiss
-            # Initialize with dimension 768 (model embedding size)
-            _faiss_index = faiss.IndexFlatL2(768)
-        except Exception as e:
-            print(f"Error loading FAISS: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="FAISS not available. Please install faiss-cpu."
-            )
-    return _faiss_index
 
-
-def generate_embedding(text: str):
+async def sync_indexes(complaints: List[Complaint]) -> List[VectorIndex]:
     """
-    Generate embedding for given text
+    Bring the registry index of each constituency in ``complaints`` up to
+    date (only new or edited complaints are embedded). ``complaints`` must
+    hold every complaint of those constituencies.
     """
-    model = get_embedding_model()
-    embedding = model.encode([text])[0]
-    return embedding
+    by_constituency: Dict[str, Dict[str, str]] = {}
+    for complaint in complaints:
+        by_constituency.setdefault(str(complaint.constituency_id), {})[str(complaint.id)] = \
+            complaint_text(complaint.title, complaint.description)
+    return [
+        await vector_registry.sync(constituency_id, items)
+        for constituency_id, items in by_constituency.items()
+    ]
 
 
 @router.post("/duplicate-check")
@@ -70,22 +44,27 @@ async def check_for_duplicates(
     title: str,
     description: str,
     threshold: float = 0.85,
+    constituency_id: Optional[UUID] = None,
+    lat: Optional[float] = None,
+    lng: Optional[float] = None,
     db: Session = Depends(get_db)
 ):
     """
     Check if a complaint is a duplicate of existing complaints
     
-    Returns list of similar complaints with similarity scores
+    With a constituency and location, only open complaints nearby are
+    compared (the duplicate engine used at complaint creation); otherwise
+    every complaint is. Returns list of similar complaints with similarity scores
     """
     try:
-        model = get_embedding_model()
-        
-        # Combine title and description for embedding
-        complaint_text = f"{title} {description}"
-        new_embedding = generate_embedding(complaint_text)
+        if constituency_id and lat is not None and lng is not None:
+            return await check_nearby_duplicates(db, title, description, threshold, constituency_id, lat, lng)
         
         # Get all complaints for comparison
-        complaints = db.query(Complaint).all()
+        query = db.query(Complaint)
+        if constituency_id:
+            query = query.filter(Complaint.constituency_id == constituency_id)
+        complaints = query.all()
         
         if not complaints:
             return {
@@ -94,24 +73,22 @@ async def check_for_duplicates(
                 "message": "No existing complaints to compare"
             }
         
+        # Existing complaints come from the registry; only the new text is embedded here
+        indexes = await sync_indexes(complaints)
+        vector = (await vector_registry.embed([complaint_text(title, description)]))[0]
+        by_id = {str(complaint.id): complaint for complaint in complaints}
+        
         # Calculate similarities
         similar_complaints = []
         
-        for complaint in complaints:
-            existing_text = f"{complaint.title} {complaint.description}"
-            existing_embedding = generate_embedding(existing_text)
-            
-            # Calculate cosine similarity
-            similarity = np.dot(new_embedding, existing_embedding) / (
-                np.linalg.norm(new_embedding) * np.linalg.norm(existing_embedding)
-            )
-            
-            if similarity >= threshold:
+        for index in indexes:
+            for match in index.search(vector, threshold=threshold):
+                complaint = by_id[match.key]
                 similar_complaints.append({
-                    "complaint_id": str(complaint.id),
+                    "complaint_id": match.key,
                     "title": complaint.title,
                     "description": complaint.description,
-                    "similarity_score": round(float(similarity), 3),
+                    "similarity_score": round(match.similarity, 3),
                     "status": complaint.status.value if hasattr(complaint.status, 'value') else complaint.status,
                     "created_at": complaint.created_at.isoformat() if complaint.created_at else None
                 })
@@ -127,6 +104,10 @@ async def check_for_duplicates(
             "message": "Potential duplicates found" if similar_complaints else "No duplicates found"
         }
         
+    except InferenceUnavailable as e:
+        raise model_unavailable(e)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -134,6 +115,44 @@ async def check_for_duplicates(
         )
 
 
+async def check_nearby_duplicates(db: Session, title: str, description: str, threshold: float,
+                                  constituency_id: UUID, lat: float, lng: float):
+    # An explicit check waits for the model rather than using the creation-time budget
+    engine = DuplicateEngine(threshold=threshold, budget_ms=settings.INFERENCE_TIMEOUT_SECONDS * 1000)
+    result = await engine.find(
+        db, constituency_id=constituency_id, title=title, description=description, lat=lat, lng=lng
+    )
+    if result.mode != "semantic":
+        raise InferenceUnavailable("no embedding model answered")
+    
+    ids = [match.complaint_id for match in result.matches]
+    by_id = {complaint.id: complaint for complaint in db.query(Complaint).filter(Complaint.id.in_(ids)).all()} \
+        if ids else {}
+    
+    similar_complaints = []
+    for match in result.matches:
+        complaint = by_id.get(match.complaint_id)
+        if complaint is None:
+            continue
+        similar_complaints.append({
+            "complaint_id": str(complaint.id),
+            "title": complaint.title,
+            "description": complaint.description,
+            "similarity_score": round(match.similarity, 3),
+            "distance_meters": round(match.distance_meters, 1),
+            "status": complaint.status.value if hasattr(complaint.status, 'value') else complaint.status,
+            "created_at": complaint.created_at.isoformat() if complaint.created_at else None
+        })
+    
+    return {
+        "is_duplicate": len(similar_complaints) > 0,
+        "duplicate_count": len(similar_complaints),
+        "similar_complaints": similar_complaints,
+        "threshold": threshold,
+        "message": "Potential duplicates found" if similar_complaints else "No duplicates found"
+    }
+
+
 @router.get("/complaints/{complaint_id}/similar")
 async def find_similar_complaints(
     complaint_id: UUID,
@@ -142,7 +161,7 @@ async def find_similar_complaints(
     db: Session = Depends(get_db)
 ):
     """
-    Find complaints similar to a given complaint
+    Find complaints in the same constituency similar to a given complaint
     """
     complaint = db.query(Complaint).filter(Complaint.id == complaint_id).first()
     
@@ -153,47 +172,40 @@ async def find_similar_complaints(
         )
     
     try:
-        model = get_embedding_model()
-        
-        # Get embedding for target complaint
-        target_text = f"{complaint.title} {complaint.description}"
-        target_embedding = generate_embedding(target_text)
-        
-        # Get all other complaints
-        other_complaints = db.query(Complaint).filter(Complaint.id != complaint_id).all()
+        # The constituency's complaints, target included, so its vector comes from the index too
+        constituency_complaints = db.query(Complaint).filter(
+            Complaint.constituency_id == complaint.constituency_id
+        ).all()
+        index, = await sync_indexes(constituency_complaints)
+        by_id = {str(other.id): other for other in constituency_complaints}
         
         similar_complaints = []
         
-        for other in other_complaints:
-            other_text = f"{other.title} {other.description}"
-            other_embedding = generate_embedding(other_text)
-            
-            # Calculate similarity
-            similarity = np.dot(target_embedding, other_embedding) / (
-                np.linalg.norm(target_embedding) * np.linalg.norm(other_embedding)
-            )
-            
-            if similarity >= threshold:
-                similar_complaints.append({
-                    "complaint_id": str(other.id),
-                    "title": other.title,
-                    "description": other.description,
-                    "similarity_score": round(float(similarity), 3),
-                    "status": other.status.value if hasattr(other.status, 'value') else other.status,
-                    "category": other.category,
-                    "created_at": other.created_at.isoformat() if other.created_at else None
-                })
-        
-        # Sort by similarity
-        similar_complaints.sort(key=lambda x: x['similarity_score'], reverse=True)
+        target_key = str(complaint_id)
+        for match in index.search(index.vector(target_key), limit=limit, threshold=threshold,
+                                  exclude=[target_key]):
+            other = by_id[match.key]
+            similar_complaints.append({
+                "complaint_id": match.key,
+                "title": other.title,
+                "description": other.description,
+                "similarity_score": round(match.similarity, 3),
+                "status": other.status.value if hasattr(other.status, 'value') else other.status,
+                "category": other.category,
+                "created_at": other.created_at.isoformat() if other.created_at else None
+            })
         
         return {
             "target_complaint_id": str(complaint_id),
             "similar_count": len(similar_complaints),
-            "similar_complaints": similar_complaints[:limit],
+            "similar_complaints": similar_complaints,
             "threshold": threshold
         }
         
+    except InferenceUnavailable as e:
+        raise model_unavailable(e)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1,8 +1,8 @@
 """
 Analytics router - Metrics, statistics, and reporting endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from fastapi.responses import Response, JSONResponse
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, status, Query
+from fastapi.responses import Response, JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import func, case
 from typing import Optional, List, Dict, Any
@@ -10,9 +10,10 @@ from uuid import UUID
 from datetime import date, datetime, timedelta
 
 from app.core.database import get_db
-from app.core.auth import require_auth, get_user_constituency_id
+from app.core.auth import require_auth, require_role, get_user_constituency_id
 from app.core.analytics import AnalyticsService
-from app.core.export import ExportService
+from app.core.export import ExportService, gzip_chunks
+from app.core.http_range import ranged_file_response
 from app.models.user import User, UserRole
 from app.models.complaint import Complaint, ComplaintStatus
 from app.models.ward import Ward
@@ -29,9 +30,12 @@ from app.schemas.analytics import (
     ComparativeAnalysis,
     UserActivityStats,
     ReportFilter,
-    ExportRequest
+    ExportRequest,
+    ReportJobResponse
 )
 from app.schemas.rating import RatingSummary
+from app.services.report_jobs import REPORT_FORMATS, ReportJob, JobStatus, report_queue
+from app.services.snapshot_service import snapshot_service
 
 router = APIRouter()
 
@@ -353,10 +357,27 @@ async def get_performance_alerts(
     return {"alerts": alerts}
 
 
+def _export_response(chunks, filename: str, media_type: str, compress: bool) -> StreamingResponse:
+    """Stream export chunks to the client, optionally gzip-compressed"""
+    if compress:
+        chunks = gzip_chunks(chunks)
+        filename += ".gz"
+        media_type = "application/gzip"
+
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}"
+        }
+    )
+
+
 @router.get("/export/csv")
 async def export_data_csv(
     status: Optional[str] = None,
     category: Optional[str] = None,
+    gzip: bool = Query(False, description="Gzip-compress the download"),
     current_user: User = Depends(require_auth),
     constituency_filter: Optional[UUID] = Depends(get_user_constituency_id),
     db: Session = Depends(get_db)
@@ -373,25 +394,45 @@ async def export_data_csv(
     )
     
     service = ExportService(db)
-    csv_content = service.export_to_csv(filters)
     
     # Generate filename with timestamp
     timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
     filename = f"complaints_export_{timestamp}.csv"
     
-    return Response(
-        content=csv_content,
-        media_type="text/csv",
-        headers={
-            "Content-Disposition": f"attachment; filename={filename}"
-        }
+    return _export_response(service.stream_csv(filters), filename, "text/csv", gzip)
+
+
+@router.get("/export/ndjson")
+async def export_data_ndjson(
+    status: Optional[str] = None,
+    category: Optional[str] = None,
+    gzip: bool = Query(False, description="Gzip-compress the download"),
+    current_user: User = Depends(require_auth),
+    constituency_filter: Optional[UUID] = Depends(get_user_constituency_id),
+    db: Session = Depends(get_db)
+):
+    """
+    Export complaints as newline-delimited JSON, one complaint per line
+    """
+    filters = ReportFilter(
+        constituency_id=constituency_filter,
+        status=status,
+        category=category
     )
+    
+    service = ExportService(db)
+    
+    timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
+    filename = f"complaints_export_{timestamp}.ndjson"
+    
+    return _export_response(service.stream_ndjson(filters), filename, "application/x-ndjson", gzip)
 
 
 @router.get("/export/json")
 async def export_data_json(
     status: Optional[str] = None,
     category: Optional[str] = None,
+    gzip: bool = Query(False, description="Gzip-compress the download"),
     current_user: User = Depends(require_auth),
     constituency_filter: Optional[UUID] = Depends(get_user_constituency_id),
     db: Session = Depends(get_db)
@@ -408,17 +449,151 @@ async def export_data_json(
     )
     
     service = ExportService(db)
-    data = service.export_to_dict(filters)
-    summary = service.generate_summary_report(filters)
-    
-    return {
+    chunks = service.stream_json(filters, header={
         "export_date": datetime.utcnow().isoformat(),
         "exported_by": current_user.name,
-        "summary": summary,
-        "data": data
+    })
+    
+    if gzip:
+        timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
+        return _export_response(chunks, f"complaints_export_{timestamp}.json", "application/json", True)
+    return StreamingResponse(chunks, media_type="application/json")
+
+
+@router.get("/snapshots")
+async def list_snapshots(
+    current_user: User = Depends(require_auth),
+    constituency_filter: Optional[UUID] = Depends(get_user_constituency_id)
+):
+    """
+    List offline analytics snapshot files (Parquet, partitioned by
+    constituency and month) visible to the current user
+    """
+    return {
+        "state": snapshot_service.load_state(),
+        "files": snapshot_service.list_files(constituency_filter)
     }
 
 
+@router.get("/snapshots/{dataset}/{constituency_id}/{month}/{filename}")
+async def download_snapshot(
+    dataset: str,
+    constituency_id: str,
+    month: str,
+    filename: str,
+    request: Request,
+    current_user: User = Depends(require_auth),
+    constituency_filter: Optional[UUID] = Depends(get_user_constituency_id)
+):
+    """
+    Download one snapshot part file; supports HTTP range requests
+    """
+    if constituency_filter and constituency_id != str(constituency_filter):
+        raise HTTPException(status_code=403, detail="Access denied to this constituency")
+    
+    path = snapshot_service.resolve_file(dataset, constituency_id, month, filename)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Snapshot file not found")
+    
+    return ranged_file_response(
+        path,
+        request,
+        media_type="application/vnd.apache.parquet",
+        filename=f"{dataset}_{constituency_id}_{month}_{filename}"
+    )
+
+
+@router.post("/snapshots/run", status_code=202)
+async def run_snapshot(
+    background_tasks: BackgroundTasks,
+    full: bool = Query(False, description="Rebuild every dataset instead of appending changes"),
+    current_user: User = Depends(require_role(UserRole.ADMIN))
+):
+    """
+    Trigger the analytics snapshot job (admin only)
+    """
+    background_tasks.add_task(snapshot_service.run, full)
+    return {"message": "Snapshot job queued", "full": full}
+
+
+def _report_job_response(job: ReportJob) -> ReportJobResponse:
+    return ReportJobResponse(
+        job_id=job.id,
+        status=job.status,
+        format=job.format,
+        created_at=datetime.utcfromtimestamp(job.created_at),
+        finished_at=datetime.utcfromtimestamp(job.finished_at) if job.finished_at else None,
+        rows=job.rows,
+        error=job.error,
+        download_url=(f"/api/analytics/reports/jobs/{job.id}/download"
+                      if job.status == JobStatus.COMPLETED else None)
+    )
+
+
+def _get_report_job(job_id: str, constituency_filter: Optional[UUID]) -> ReportJob:
+    job = report_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    if constituency_filter and job.filters.get("constituency_id") != str(constituency_filter):
+        raise HTTPException(status_code=403, detail="Access denied to this report")
+    return job
+
+
+@router.post("/reports", response_model=ReportJobResponse, status_code=202)
+async def create_report(
+    export_request: ExportRequest,
+    current_user: User = Depends(require_auth),
+    constituency_filter: Optional[UUID] = Depends(get_user_constituency_id)
+):
+    """
+    Queue an Excel, PDF, CSV or summary report for background generation.
+    Identical requests share one job; poll the job or wait for the
+    ``report_ready`` websocket event, then download the file.
+    """
+    if export_request.format not in REPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported format. Use one of: {', '.join(REPORT_FORMATS)}"
+        )
+    
+    filters = export_request.filters or ReportFilter()
+    if constituency_filter:
+        filters = filters.model_copy(update={"constituency_id": constituency_filter})
+    
+    job = report_queue.submit(export_request.format, filters, requested_by=str(current_user.id))
+    return _report_job_response(job)
+
+
+@router.get("/reports/jobs/{job_id}", response_model=ReportJobResponse)
+async def get_report_job(
+    job_id: str,
+    current_user: User = Depends(require_auth),
+    constituency_filter: Optional[UUID] = Depends(get_user_constituency_id)
+):
+    """
+    Poll the status of a queued report
+    """
+    return _report_job_response(_get_report_job(job_id, constituency_filter))
+
+
+@router.get("/reports/jobs/{job_id}/download")
+async def download_report(
+    job_id: str,
+    request: Request,
+    current_user: User = Depends(require_auth),
+    constituency_filter: Optional[UUID] = Depends(get_user_constituency_id)
+):
+    """
+    Download a finished report; supports HTTP range requests
+    """
+    job = _get_report_job(job_id, constituency_filter)
+    path = report_queue.artifact_path(job)
+    if job.status != JobStatus.COMPLETED or not path.exists():
+        raise HTTPException(status_code=409, detail=f"Report is {job.status}")
+    
+    return ranged_file_response(path, request, media_type=job.media_type, filename=job.file_name)
+
+
 @router.get("/reports/summary")
 async def get_summary_report(
     status: Optional[str] = None,
@@ -595,17 +595,14 @@ async def create_scheduled_broadcast(
         requires_approval=broadcast_data.requires_approval
     )
     
-    # Set status based on scheduling
+    # Delivery marks the broadcast SENT once every chunk has gone out
+    broadcast.status = BroadcastStatus.SCHEDULED
     if broadcast_data.scheduled_at <= datetime.utcnow():
-        broadcast.status = BroadcastStatus.SENT
-        broadcast.sent_at = datetime.utcnow()
         # Queue for immediate sending
         background_tasks.add_task(
             notification_service.send_broadcast,
             broadcast_id
         )
-    else:
-        broadcast.status = BroadcastStatus.SCHEDULED
     
     db.add(broadcast)
     db.commit()
@@ -674,6 +671,10 @@ async def get_scheduled_broadcasts(
     )
 
 
+# Broadcasts send-now may start; FAILED ones resume from their checkpoint
+SEND_NOW_STATUSES = (BroadcastStatus.DRAFT, BroadcastStatus.SCHEDULED, BroadcastStatus.FAILED)
+
+
 @router.post("/broadcasts/{broadcast_id}/send-now")
 async def send_broadcast_now(
     broadcast_id: str,
@@ -692,18 +693,17 @@ async def send_broadcast_now(
         broadcast.sender_id != current_user.id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     
-    if broadcast.status == BroadcastStatus.SENT:
-        raise HTTPException(status_code=400, detail="Broadcast already sent")
-    
-    # Update status and send
-    broadcast.status = BroadcastStatus.SENT
-    broadcast.sent_at = datetime.utcnow()
-    db.commit()
+    # Claim it before queueing so a second request or a retry cannot start a
+    # parallel delivery; failed runs continue from their delivery checkpoint
+    claimed = notification_service.delivery_engine.claim(db, broadcast.id, SEND_NOW_STATUSES)
+    if not claimed:
+        raise HTTPException(status_code=409, detail="Broadcast is already being sent or was sent")
     
     # Queue for sending
     background_tasks.add_task(
         notification_service.send_broadcast,
-        broadcast_id
+        broadcast_id,
+        claimed=True
     )
     
     return {"message": "Broadcast sent successfully"}
@@ -1,21 +1,29 @@
 """Complaint management endpoints with authentication and workflow enforcement."""
+import asyncio
+import uuid
 from datetime import datetime, timezone, timedelta
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterable, List, Optional, Union
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import ValidationError
+from sqlalchemy import insert, select
 from sqlalchemy.orm import Query as SAQuery, Session
 
 from app.core.auth import get_user_constituency_id, require_auth
 from app.core.database import get_db
+from app.core.media_serving import present_media_url
+from app.core.search import text_search_clause
 from app.core.workflow import WorkflowError, WorkflowValidator, validate_status_transition
 from app.core.notifications import ComplaintNotifications
-from app.core.webhooks import dispatch_event
+from app.core.webhooks import enqueue_event, enqueue_events
 from app.models.complaint import Complaint, ComplaintPriority, ComplaintStatus, Media, MediaType, StatusLog
 from app.models.department import Department
 from app.models.user import User, UserRole
 from app.models.ward import Ward
 from app.models.panchayat import GramPanchayat
+from app.services.duplicate_engine import DuplicateResult, duplicate_engine
+from app.services.media_store import media_store
 from app.services.complaint_routing import (
     escalate_to_taluk_panchayat,
     escalate_to_zilla_panchayat,
@@ -24,7 +32,11 @@ from app.services.complaint_routing import (
 )
 from app.schemas.complaint import (
     ComplaintAssign,
+    ComplaintBatchCreate,
+    ComplaintBatchItemResult,
+    ComplaintBatchResponse,
     ComplaintCreate,
+    ComplaintCreatedResponse,
     ComplaintAdvancedAnalytics,
     ComplaintListResponse,
     ComplaintResponse,
@@ -32,6 +44,7 @@ from app.schemas.complaint import (
     ComplaintTrendPoint,
     ComplaintStatusUpdate,
     DepartmentBacklog,
+    DuplicateSuggestion,
     PriorityCount,
     StatusCount,
 )
@@ -52,6 +65,9 @@ from app.schemas.ward_workflow import (
 
 router = APIRouter()
 
+# Searched columns, most important first (drives rank weighting)
+COMPLAINT_SEARCH_COLUMNS = (Complaint.title, Complaint.description, Complaint.location_description)
+
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -126,6 +142,39 @@ def _resolve_priority(priority: Optional[str]) -> ComplaintPriority:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid priority") from exc
 
 
+EMERGENCY_KEYWORDS = ["emergency", "urgent", "immediately", "bega", "sikkantu", "danger", "critical"]
+IMPACT_KEYWORDS = ["entire", "whole", "all", "many", "multiple", "area"]
+
+
+def _initial_priority_fields(description: str) -> Dict[str, Any]:
+    """Keyword-based emergency, impact and priority score for a new located complaint."""
+    desc_lower = description.lower()
+    is_emergency = any(keyword in desc_lower for keyword in EMERGENCY_KEYWORDS)
+    affected_pop = 10 if any(kw in desc_lower for kw in IMPACT_KEYWORDS) else 1
+
+    # Simple priority score based on emergency + impact
+    if is_emergency:
+        priority_score = 0.9
+    elif affected_pop > 5:
+        priority_score = 0.7
+    else:
+        priority_score = 0.5
+    return {
+        "is_emergency": is_emergency,
+        "affected_population_estimate": affected_pop,
+        "priority_score": priority_score,
+    }
+
+
+def _constituencies_by_id(db: Session, model: Any, ids: Iterable[Optional[UUID]]) -> Dict[UUID, UUID]:
+    """Map ids of ``model`` rows (wards, departments) to their constituency, in one query."""
+    wanted = {item for item in ids if item}
+    if not wanted:
+        return {}
+    rows = db.execute(select(model.id, model.constituency_id).where(model.id.in_(wanted))).all()
+    return {row.id: row.constituency_id for row in rows}
+
+
 def _ensure_owner_or_admin(complaint: Complaint, user: User) -> None:
     """Ensure the actor owns the complaint or has elevated privileges."""
 
@@ -170,6 +219,12 @@ def _resolve_media_type(raw: str) -> MediaType:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid media_type. Allowed: {allowed}") from exc
 
 
+def _present_media(media: Media) -> MediaResponse:
+    response = MediaResponse.model_validate(media)
+    response.url = present_media_url(media.url)
+    return response
+
+
 def _avg(values: List[float]) -> Optional[float]:
     if not values:
         return None
@@ -256,9 +311,68 @@ def _add_status_log(
     )
 
 
-def _paginate(query: SAQuery[Complaint], *, page: int, page_size: int) -> List[Complaint]:
+def _duplicate_suggestions(result: Optional[DuplicateResult]) -> List[DuplicateSuggestion]:
+    if result is None:
+        return []
+    return [
+        DuplicateSuggestion(complaint_id=match.complaint_id, distance_meters=round(match.distance_meters, 1),
+                            similarity=match.similarity)
+        for match in result.matches
+    ]
+
+
+async def _find_batch_duplicates(
+    db: Session,
+    items: Dict[int, ComplaintCreate],
+    constituency_ids: Dict[int, UUID],
+    categories: Dict[int, str],
+) -> Dict[int, DuplicateResult]:
+    """Duplicate checks for the located items of a batch, with candidates fetched per grid cell"""
+    located: Dict[UUID, List[int]] = {}
+    for index in categories:
+        if items[index].lat is not None and items[index].lng is not None:
+            located.setdefault(constituency_ids[index], []).append(index)
+
+    checks = []
+    for constituency_id, indexes in located.items():
+        points = [(float(items[index].lat), float(items[index].lng)) for index in indexes]
+        candidates = duplicate_engine.candidates_for_points(db, constituency_id, points)
+        for index, (lat, lng), rows in zip(indexes, points, candidates):
+            checks.append((index, duplicate_engine.rank(
+                rows,
+                constituency_id=constituency_id,
+                title=items[index].title,
+                description=items[index].description,
+                lat=lat,
+                lng=lng,
+                category=categories[index],
+            )))
+
+    # Reranked together, so the items' embeds share model batches
+    ranked = await asyncio.gather(*(check for _, check in checks))
+    return {index: result for (index, _), result in zip(checks, ranked)}
+
+
+def _validation_message(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'item'}: {error['msg']}" for error in exc.errors()
+    )
+
+
+def _apply_search(db: Session, query: SAQuery[Complaint], search: str) -> tuple[SAQuery[Complaint], Any]:
+    """Filter by full-text search and return the query with its rank expression."""
+    clause, rank = text_search_clause(db, COMPLAINT_SEARCH_COLUMNS, search)
+    return query.filter(clause), rank
+
+
+def _paginate(
+    query: SAQuery[Complaint], *, page: int, page_size: int, rank: Optional[Any] = None
+) -> List[Complaint]:
+    ordering = [Complaint.created_at.desc()]
+    if rank is not None:
+        ordering.insert(0, rank.desc())
     return (
-        query.order_by(Complaint.created_at.desc())
+        query.order_by(*ordering)
         .offset((page - 1) * page_size)
         .limit(page_size)
         .all()
@@ -270,7 +384,7 @@ def _paginate(query: SAQuery[Complaint], *, page: int, page_size: int) -> List[C
 # ---------------------------------------------------------------------------
 
 
-@router.post("/", response_model=ComplaintResponse, status_code=status.HTTP_201_CREATED)
+@router.post("/", response_model=ComplaintCreatedResponse, status_code=status.HTTP_201_CREATED)
 async def create_complaint(
     payload: ComplaintCreate,
     current_user: User = Depends(require_auth),
@@ -292,6 +406,17 @@ async def create_complaint(
     # Use detected category if none provided, or fall back to 'other'
     category = payload.category or detected_category or "other"
     
+    # Open complaints nearby that look like the same problem (bounded by DUPLICATE_CHECK_BUDGET_MS)
+    duplicates = await duplicate_engine.find(
+        db,
+        constituency_id=constituency_id,
+        title=payload.title,
+        description=payload.description,
+        lat=payload.lat,
+        lng=payload.lng,
+        category=category,
+    )
+
     # NEW FLOW: All complaints go to WARD first
     # Ward officers will then assign to appropriate departments
     # No direct GP/TP/ZP/Department assignment from citizens
@@ -331,23 +456,8 @@ async def create_complaint(
     # Calculate priority score (using simple scoring for now - async service needs async session)
     # For immediate use, set basic priority data
     if complaint.lat and complaint.lng:
-        # Simple emergency detection from keywords
-        desc_lower = complaint.description.lower()
-        emergency_keywords = ["emergency", "urgent", "immediately", "bega", "sikkantu", "danger", "critical"]
-        complaint.is_emergency = any(keyword in desc_lower for keyword in emergency_keywords)
-        
-        # Simple population estimate
-        impact_keywords = ["entire", "whole", "all", "many", "multiple", "area"]
-        affected_pop = 10 if any(kw in desc_lower for kw in impact_keywords) else 1
-        complaint.affected_population_estimate = affected_pop
-        
-        # Simple priority score based on emergency + impact
-        if complaint.is_emergency:
-            complaint.priority_score = 0.9
-        elif affected_pop > 5:
-            complaint.priority_score = 0.7
-        else:
-            complaint.priority_score = 0.5
+        for field, value in _initial_priority_fields(complaint.description).items():
+            setattr(complaint, field, value)
 
     _add_status_log(
         db,
@@ -358,11 +468,166 @@ async def create_complaint(
         note="Complaint submitted",
     )
 
+    enqueue_event(db, "complaint.created", _serialize_complaint(complaint))
     db.commit()
     db.refresh(complaint)
+    duplicate_engine.remember(constituency_id, complaint.id, complaint.title, complaint.description, duplicates)
     await ComplaintNotifications.notify_complaint_created(complaint, current_user)  # type: ignore[func-returns-value]
-    await dispatch_event("complaint.created", _serialize_complaint(complaint))
-    return complaint
+    return ComplaintCreatedResponse.model_validate(complaint).model_copy(update={
+        "possible_duplicates": _duplicate_suggestions(duplicates)
+    })
+
+
+BATCH_CREATE_ROLES = (UserRole.ADMIN, UserRole.MODERATOR)
+
+
+@router.post("/batch", response_model=ComplaintBatchResponse)
+async def create_complaints_batch(
+    payload: ComplaintBatchCreate,
+    current_user: User = Depends(require_auth),
+    db: Session = Depends(get_db),
+):
+    """
+    File many complaints in one request (call centre, SMS/IVR gateway).
+
+    Each item is checked like a single submission, but wards and departments
+    are looked up with one query each, categories are detected for the whole
+    batch at once, and complaints, status logs and webhook events are written
+    with one multi-row insert per table in a single transaction. Results are
+    returned per item, in request order; invalid items (422 for a malformed
+    item) do not block the rest. Located items get the same duplicate check
+    as single submissions, with one capped candidate query per radius-sized
+    grid cell; items of the same batch are not checked against each other.
+    A department on an item is kept as the suggested department: complaints
+    still go to the ward first.
+    """
+    if current_user.role not in BATCH_CREATE_ROLES:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only moderators and admins can file complaints in batches",
+        )
+
+    results = [ComplaintBatchItemResult(index=index, status_code=status.HTTP_201_CREATED)
+               for index in range(len(payload.complaints))]
+    items: Dict[int, ComplaintCreate] = {}
+    priorities: Dict[int, ComplaintPriority] = {}
+    constituency_ids: Dict[int, UUID] = {}
+    for index, raw in enumerate(payload.complaints):
+        try:
+            item = ComplaintCreate.model_validate(raw)
+            priorities[index] = _resolve_priority(item.priority)
+            constituency_ids[index] = _resolve_constituency(current_user, item.constituency_id)
+        except ValidationError as exc:
+            results[index] = ComplaintBatchItemResult(
+                index=index, status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, error=_validation_message(exc)
+            )
+            continue
+        except HTTPException as exc:
+            results[index] = ComplaintBatchItemResult(index=index, status_code=exc.status_code, error=exc.detail)
+            continue
+        items[index] = item
+
+    wards = _constituencies_by_id(db, Ward, (item.ward_id for item in items.values()))
+    departments = _constituencies_by_id(db, Department, (item.dept_id for item in items.values()))
+    for index, constituency_id in list(constituency_ids.items()):
+        item = items[index]
+        for reference, found, label in ((item.ward_id, wards, "Ward"), (item.dept_id, departments, "Department")):
+            if not reference:
+                continue
+            if reference not in found:
+                error = (status.HTTP_404_NOT_FOUND, f"{label} not found")
+            elif found[reference] != constituency_id:
+                error = (status.HTTP_403_FORBIDDEN, f"{label} belongs to a different constituency")
+            else:
+                continue
+            results[index] = ComplaintBatchItemResult(index=index, status_code=error[0], error=error[1])
+            del constituency_ids[index]
+            break
+
+    accepted = sorted(constituency_ids)
+    from app.services.predictive_planning_service import MultilingualNormalizer
+    detected = MultilingualNormalizer().detect_categories(
+        f"{items[index].title} {items[index].description}" for index in accepted
+    )
+    categories = {
+        index: items[index].category or detected_category or "other"
+        for index, detected_category in zip(accepted, detected)
+    }
+    duplicates = await _find_batch_duplicates(db, items, constituency_ids, categories)
+
+    now = _utcnow()
+    complaints: List[Dict[str, Any]] = []
+    status_logs: List[Dict[str, Any]] = []
+    for index in accepted:
+        item = items[index]
+        complaint_id = uuid.uuid4()
+        row = {
+            "id": complaint_id,
+            "constituency_id": constituency_ids[index],
+            "user_id": current_user.id,
+            "title": item.title,
+            "description": item.description,
+            "category": categories[index],
+            "priority": priorities[index],
+            "lat": item.lat,
+            "lng": item.lng,
+            "ward_id": item.ward_id,
+            "location_description": item.location_description,
+            "voice_transcript": item.voice_transcript,
+            "status": ComplaintStatus.SUBMITTED,
+            "assignment_type": "ward",
+            "suggested_dept_id": item.dept_id,
+            "citizen_selected_dept": bool(item.dept_id and item.citizen_selected_dept),
+            "is_emergency": False,
+            "priority_score": None,
+            "affected_population_estimate": None,
+            "created_at": now,
+            "updated_at": now,
+            "last_activity_at": now,
+        }
+        if item.lat and item.lng:
+            row.update(_initial_priority_fields(item.description))
+        complaints.append(row)
+        status_logs.append({
+            "id": uuid.uuid4(),
+            "complaint_id": complaint_id,
+            "old_status": None,
+            "new_status": ComplaintStatus.SUBMITTED.value,
+            "changed_by": current_user.id,
+            "note": "Complaint submitted",
+            "timestamp": now,
+        })
+        results[index] = ComplaintBatchItemResult(
+            index=index, status_code=status.HTTP_201_CREATED, complaint_id=complaint_id, category=row["category"],
+            possible_duplicates=_duplicate_suggestions(duplicates.get(index)),
+        )
+
+    if complaints:
+        db.execute(insert(Complaint), complaints)
+        db.execute(insert(StatusLog), status_logs)
+        enqueue_events(db, "complaint.created", (
+            ComplaintResponse.model_validate({
+                **row,
+                "status": row["status"].value,
+                "priority": row["priority"].value,
+                "dept_id": None,
+                "assigned_to": None,
+                "resolved_at": None,
+                "closed_at": None,
+            }).model_dump(mode="json")
+            for row in complaints
+        ))
+        db.commit()
+        for index, row in zip(accepted, complaints):
+            if index in duplicates:
+                duplicate_engine.remember(row["constituency_id"], row["id"], row["title"], row["description"],
+                                          duplicates[index])
+
+    return ComplaintBatchResponse(
+        created=len(complaints),
+        failed=len(payload.complaints) - len(complaints),
+        results=results,
+    )
 
 
 @router.patch("/{complaint_id}", response_model=ComplaintResponse)
@@ -410,12 +675,13 @@ async def update_complaint_details(
 
     complaint.updated_at = _utcnow()
 
-    db.commit()
-    db.refresh(complaint)
-    await dispatch_event(
+    enqueue_event(
+        db,
         "complaint.updated",
         {"complaint": _serialize_complaint(complaint), "changes": changes},
     )
+    db.commit()
+    db.refresh(complaint)
     return complaint
 
 
@@ -438,12 +704,16 @@ async def delete_complaint(
             detail="Only complaints that are not in progress can be deleted",
         )
 
+    # Each media row holds one reference on its stored blob
+    for blob_sha256 in db.scalars(
+        select(Media.blob_sha256).where(Media.complaint_id == complaint.id, Media.blob_sha256.is_not(None))
+    ).all():
+        media_store.release(db, blob_sha256)
     db.query(Media).filter(Media.complaint_id == complaint.id).delete(synchronize_session=False)
     db.query(StatusLog).filter(StatusLog.complaint_id == complaint.id).delete(synchronize_session=False)
     db.delete(complaint)
+    enqueue_event(db, "complaint.deleted", {"complaint_id": str(complaint_id)})
     db.commit()
-
-    await dispatch_event("complaint.deleted", {"complaint_id": str(complaint_id)})
     return None
 
 
@@ -482,18 +752,19 @@ async def add_complaint_media(
         db.add(media_record)
         created_media.append(media_record)
 
-    db.commit()
-    for record in created_media:
-        db.refresh(record)
-
-    await dispatch_event(
+    db.flush()  # assign media ids for the event
+    enqueue_event(
+        db,
         "complaint.media.attached",
         {
             "complaint_id": str(complaint.id),
             "media_ids": [str(record.id) for record in created_media],
         },
     )
-    return created_media
+    db.commit()
+    for record in created_media:
+        db.refresh(record)
+    return [_present_media(record) for record in created_media]
 
 
 @router.get("/{complaint_id}/media", response_model=List[MediaResponse])
@@ -519,7 +790,7 @@ async def list_complaint_media(
         query = query.filter(Media.photo_type == photo_type)
 
     media_items = query.order_by(Media.uploaded_at.asc()).all()
-    return media_items
+    return [_present_media(record) for record in media_items]
 
 
 @router.delete("/{complaint_id}/media/{media_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -543,13 +814,15 @@ async def delete_complaint_media(
     if current_user.role == UserRole.CITIZEN and media_entry.uploaded_by != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You can only remove media you uploaded")
 
+    if media_entry.blob_sha256:
+        media_store.release(db, media_entry.blob_sha256)
     db.delete(media_entry)
-    db.commit()
-
-    await dispatch_event(
+    enqueue_event(
+        db,
         "complaint.media.deleted",
         {"complaint_id": str(complaint.id), "media_id": str(media_id)},
     )
+    db.commit()
     return None
 
 
@@ -585,20 +858,16 @@ async def list_complaints(
             query = query.filter(Complaint.ward_id == UUID(ward_id))
         except ValueError as exc:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid ward_id") from exc
+    rank = None
     if search:
-        like = f"%{search}%"
-        query = query.filter(
-            Complaint.title.ilike(like)
-            | Complaint.description.ilike(like)
-            | Complaint.location_description.ilike(like)
-        )
+        query, rank = _apply_search(db, query, search)
     if date_from:
         query = query.filter(Complaint.created_at >= date_from)
     if date_to:
         query = query.filter(Complaint.created_at <= date_to)
 
     total = query.count()
-    complaints = _paginate(query, page=page, page_size=page_size)
+    complaints = _paginate(query, page=page, page_size=page_size, rank=rank)
     complaint_payloads = [ComplaintResponse.model_validate(item) for item in complaints]
 
     return ComplaintListResponse(
@@ -669,10 +938,8 @@ async def assign_complaint(
     if assignee_id:
         officer = db.query(User).filter(User.id == assignee_id).first()
 
-    db.commit()
-    db.refresh(complaint)
-    await ComplaintNotifications.notify_complaint_assigned(complaint, department, officer)  # type: ignore[func-returns-value]
-    await dispatch_event(
+    enqueue_event(
+        db,
         "complaint.assigned",
         {
             "complaint": _serialize_complaint(complaint),
@@ -680,6 +947,9 @@ async def assign_complaint(
             "assigned_to": str(assignee_id) if assignee_id else None,
         },
     )
+    db.commit()
+    db.refresh(complaint)
+    await ComplaintNotifications.notify_complaint_assigned(complaint, department, officer)  # type: ignore[func-returns-value]
     return complaint
 
 
@@ -737,6 +1007,15 @@ async def sub_assign_complaint(
     if new_assignee_id:
         new_assignee = db.query(User).filter(User.id == new_assignee_id).first()
 
+    enqueue_event(
+        db,
+        "complaint.sub_assigned",
+        {
+            "complaint": _serialize_complaint(complaint),
+            "sub_assigned_by": str(current_user.id),
+            "new_assignee": str(new_assignee_id) if new_assignee_id else None,
+        },
+    )
     db.commit()
     db.refresh(complaint)
 
@@ -748,14 +1027,6 @@ async def sub_assign_complaint(
             new_assignee
         )  # type: ignore[func-returns-value]
 
-    await dispatch_event(
-        "complaint.sub_assigned",
-        {
-            "complaint": _serialize_complaint(complaint),
-            "sub_assigned_by": str(current_user.id),
-            "new_assignee": str(new_assignee_id) if new_assignee_id else None,
-        },
-    )
     return complaint
 
 
@@ -801,6 +1072,15 @@ async def update_complaint_status(
         note=payload.note or auto_note,
     )
 
+    enqueue_event(
+        db,
+        "complaint.status_changed",
+        {
+            "complaint": _serialize_complaint(complaint),
+            "old_status": old_status.value,
+            "new_status": new_status.value,
+        },
+    )
     db.commit()
     db.refresh(complaint)
     citizen = current_user if complaint.user_id == current_user.id else db.query(User).filter(User.id == complaint.user_id).first()
@@ -810,14 +1090,6 @@ async def update_complaint_status(
         new_status.value,
         citizen,
     )
-    await dispatch_event(
-        "complaint.status_changed",
-        {
-            "complaint": _serialize_complaint(complaint),
-            "old_status": old_status.value,
-            "new_status": new_status.value,
-        },
-    )
     return complaint
 
 
@@ -857,6 +1129,14 @@ async def approve_work_completion(
         note=payload.comments or "Work approved and complaint closed",
     )
 
+    enqueue_event(
+        db,
+        "complaint.approved",
+        {
+            "complaint": _serialize_complaint(complaint),
+            "approved_by": str(current_user.id),
+        },
+    )
     db.commit()
     db.refresh(complaint)
     citizen = current_user if complaint.user_id == current_user.id else db.query(User).filter(User.id == complaint.user_id).first()
@@ -867,13 +1147,6 @@ async def approve_work_completion(
         ComplaintStatus.CLOSED.value,
         citizen,
     )
-    await dispatch_event(
-        "complaint.approved",
-        {
-            "complaint": _serialize_complaint(complaint),
-            "approved_by": str(current_user.id),
-        },
-    )
     return complaint
 
 
@@ -913,6 +1186,15 @@ async def reject_work_completion(
         note=f"Work rejected: {payload.reason}",
     )
 
+    enqueue_event(
+        db,
+        "complaint.rejected",
+        {
+            "complaint": _serialize_complaint(complaint),
+            "reason": payload.reason,
+            "rejected_by": str(current_user.id),
+        },
+    )
     db.commit()
     db.refresh(complaint)
     assigned_officer = None
@@ -926,14 +1208,6 @@ async def reject_work_completion(
         ComplaintStatus.IN_PROGRESS.value,
         citizen,
     )
-    await dispatch_event(
-        "complaint.rejected",
-        {
-            "complaint": _serialize_complaint(complaint),
-            "reason": payload.reason,
-            "rejected_by": str(current_user.id),
-        },
-    )
     return complaint
 
 
@@ -1191,16 +1465,12 @@ async def get_my_assigned_complaints(
         query = query.filter(Complaint.status == status_enum)
     if category:
         query = query.filter(Complaint.category == category)
+    rank = None
     if search:
-        like = f"%{search}%"
-        query = query.filter(
-            Complaint.title.ilike(like)
-            | Complaint.description.ilike(like)
-            | Complaint.location_description.ilike(like)
-        )
+        query, rank = _apply_search(db, query, search)
 
     total = query.count()
-    complaints = _paginate(query, page=page, page_size=page_size)
+    complaints = _paginate(query, page=page, page_size=page_size, rank=rank)
     complaint_payloads = [ComplaintResponse.model_validate(item) for item in complaints]
 
     return ComplaintListResponse(
@@ -1262,16 +1532,12 @@ async def get_my_department_complaints(
         query = query.filter(Complaint.status == status_enum)
     if category:
         query = query.filter(Complaint.category == category)
+    rank = None
     if search:
-        like = f"%{search}%"
-        query = query.filter(
-            Complaint.title.ilike(like)
-            | Complaint.description.ilike(like)
-            | Complaint.location_description.ilike(like)
-        )
+        query, rank = _apply_search(db, query, search)
     
     total = query.count()
-    complaints = _paginate(query, page=page, page_size=page_size)
+    complaints = _paginate(query, page=page, page_size=page_size, rank=rank)
     complaint_payloads = [ComplaintResponse.model_validate(item) for item in complaints]
     
     return ComplaintListResponse(
@@ -1392,16 +1658,12 @@ async def get_my_panchayat_complaints(
         query = query.filter(Complaint.status == status_enum)
     if category:
         query = query.filter(Complaint.category == category)
+    rank = None
     if search:
-        like = f"%{search}%"
-        query = query.filter(
-            Complaint.title.ilike(like)
-            | Complaint.description.ilike(like)
-            | Complaint.location_description.ilike(like)
-        )
+        query, rank = _apply_search(db, query, search)
 
     total = query.count()
-    complaints = _paginate(query, page=page, page_size=page_size)
+    complaints = _paginate(query, page=page, page_size=page_size, rank=rank)
     complaint_payloads = [ComplaintResponse.model_validate(item) for item in complaints]
 
     return ComplaintListResponse(
@@ -1424,7 +1686,7 @@ async def find_possible_duplicates(
     current_user: User = Depends(require_auth),
     db: Session = Depends(get_db),
 ) -> List[ComplaintResponse]:
-    """Find possible duplicate complaints within a certain radius."""
+    """Find possible duplicate complaints within a certain radius, most similar first."""
     complaint = db.query(Complaint).filter(Complaint.id == complaint_id).first()
     if not complaint:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Complaint not found")
@@ -1434,36 +1696,21 @@ async def find_possible_duplicates(
     if not complaint.lat or not complaint.lng:
         return []
     
-    # Find nearby complaints with similar category
-    from datetime import timedelta
-    
-    # Calculate distance using simple bounding box
-    lat = float(complaint.lat)
-    lng = float(complaint.lng)
-    
-    # Simple bounding box search (roughly 200m at equator = 0.0018 degrees)
-    lat_range = max_distance_meters / 111000  # 1 degree latitude ≈ 111km
-    lng_range = max_distance_meters / (111000 * 0.9)  # Approximate for mid-latitudes
-    
-    possible_duplicates = (
-        db.query(Complaint)
-        .filter(
-            Complaint.id != complaint_id,
-            Complaint.constituency_id == complaint.constituency_id,
-            Complaint.category == complaint.category,
-            Complaint.is_duplicate == False,
-            Complaint.status.in_([ComplaintStatus.SUBMITTED, ComplaintStatus.ASSIGNED]),
-            Complaint.lat.isnot(None),
-            Complaint.lng.isnot(None),
-            Complaint.lat.between(lat - lat_range, lat + lat_range),
-            Complaint.lng.between(lng - lng_range, lng + lng_range),
-            # Created within last 30 days
-            Complaint.created_at >= datetime.now(tz=timezone.utc) - timedelta(days=30)
-        )
-        .order_by(Complaint.created_at.desc())
-        .limit(10)
-        .all()
+    result = await duplicate_engine.find(
+        db,
+        constituency_id=complaint.constituency_id,
+        title=complaint.title,
+        description=complaint.description,
+        lat=complaint.lat,
+        lng=complaint.lng,
+        category=complaint.category,
+        exclude_id=complaint.id,
+        radius_meters=max_distance_meters,
+        limit=10,
     )
+    ids = [match.complaint_id for match in result.matches]
+    by_id = {item.id: item for item in db.query(Complaint).filter(Complaint.id.in_(ids)).all()} if ids else {}
+    possible_duplicates = [by_id[match_id] for match_id in ids if match_id in by_id]
     
     return [ComplaintResponse.model_validate(item) for item in possible_duplicates]
 
@@ -1540,12 +1787,8 @@ async def mark_complaint_as_duplicate(
         note=note_text,
     )
     
-    db.commit()
-    db.refresh(complaint)
-    
-    # Notify citizen
-    await ComplaintNotifications.notify_complaint_closed(complaint, current_user)  # type: ignore[func-returns-value]
-    await dispatch_event(
+    enqueue_event(
+        db,
         "complaint.marked_duplicate",
         {
             "complaint": _serialize_complaint(complaint),
@@ -1553,6 +1796,11 @@ async def mark_complaint_as_duplicate(
             "marked_by": str(current_user.id)
         }
     )
+    db.commit()
+    db.refresh(complaint)
+    
+    # Notify citizen
+    await ComplaintNotifications.notify_complaint_closed(complaint, current_user)  # type: ignore[func-returns-value]
     
     return ComplaintResponse.model_validate(complaint)
 
@@ -2046,16 +2294,12 @@ async def get_my_ward_complaints(
         query = query.filter(Complaint.status == status_enum)
     if category:
         query = query.filter(Complaint.category == category)
+    rank = None
     if search:
-        like = f"%{search}%"
-        query = query.filter(
-            Complaint.title.ilike(like)
-            | Complaint.description.ilike(like)
-            | Complaint.location_description.ilike(like)
-        )
+        query, rank = _apply_search(db, query, search)
 
     total = query.count()
-    complaints = _paginate(query, page=page, page_size=page_size)
+    complaints = _paginate(query, page=page, page_size=page_size, rank=rank)
     complaint_payloads = [ComplaintResponse.model_validate(item) for item in complaints]
 
     return ComplaintListResponse(
@@ -4,13 +4,14 @@ from typing import List, Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import select, and_, func, or_
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.core.auth import get_current_user, require_auth, get_user_constituency_id
 from app.models.faq import FAQSolution
 from app.models.user import User, UserRole
+from app.services.faq_search_service import faq_search_index
 from app.schemas.faq import (
     FAQSolutionCreate,
     FAQSolutionUpdate,
@@ -26,7 +27,7 @@ router = APIRouter(prefix="/api/v1/faqs", tags=["faqs"])
 @router.post("/", response_model=FAQSolutionResponse, status_code=status.HTTP_201_CREATED)
 async def create_faq(
     faq_data: FAQSolutionCreate,
-    db: AsyncSession = Depends(get_db),
+    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a new FAQ solution (Moderator/Admin only)."""
@@ -49,8 +50,9 @@ async def create_faq(
     )
     
     db.add(faq)
-    await db.commit()
-    await db.refresh(faq)
+    db.commit()
+    db.refresh(faq)
+    faq_search_index.upsert(faq)
     
     return faq
 
@@ -64,64 +66,44 @@ async def search_faqs(
     limit: int = Query(10, ge=1, le=50),
     current_user: User = Depends(require_auth),
     constituency_filter: Optional[UUID] = Depends(get_user_constituency_id),
-    db: AsyncSession = Depends(get_db)
+    db: Session = Depends(get_db)
 ):
     """
     Search FAQs by keywords. Non-admin users only see FAQs from their constituency.
     Supports Kannada transliteration and poor English.
     """
-    # Normalize search query
-    from app.services.predictive_planning_service import MultilingualNormalizer
-    normalizer = MultilingualNormalizer()
-    normalized_query = normalizer.normalize_text(q)
-    
-    # Build base query
-    query = select(FAQSolution)
-    
-    if constituency_id:
-        query = query.where(FAQSolution.constituency_id == constituency_id)
-    if category:
-        query = query.where(FAQSolution.category == category)
-    
-    # Search in keywords and title
-    search_terms = normalized_query.split()
-    search_conditions = []
-    
-    for term in search_terms:
-        if language == "kannada" and FAQSolution.kannada_title:
-            search_conditions.append(
-                or_(
-                    FAQSolution.question_keywords.ilike(f"%{term}%"),
-                    FAQSolution.title.ilike(f"%{term}%"),
-                    FAQSolution.kannada_title.ilike(f"%{term}%")
-                )
-            )
-        else:
-            search_conditions.append(
-                or_(
-                    FAQSolution.question_keywords.ilike(f"%{term}%"),
-                    FAQSolution.title.ilike(f"%{term}%")
-                )
-            )
-    
-    if search_conditions:
-        query = query.where(and_(*search_conditions))
-    
-    query = query.order_by(FAQSolution.effectiveness_score.desc()).limit(limit)
-    
-    result = await db.execute(query)
-    faqs = result.scalars().all()
+    # Only the very first search waits for the shared in-memory index; later
+    # rebuilds run in the background while the current contents are searched
+    if not faq_search_index.is_loaded:
+        result = db.execute(select(FAQSolution))
+        faq_search_index.build(result.scalars().all())
+    elif faq_search_index.is_stale:
+        faq_search_index.refresh_in_background()
+    
+    # Non-admin users are scoped to their own constituency
+    scope = constituency_filter or constituency_id
+    ranked = faq_search_index.search(q, constituency_id=scope, category=category, limit=limit)
+    if not ranked:
+        return []
+    
+    result = db.execute(select(FAQSolution).where(FAQSolution.id.in_([faq_id for faq_id, _ in ranked])))
+    faqs_by_id = {faq.id: faq for faq in result.scalars().all()}
+    
+    search_terms = set(faq_search_index.tokenize(q))
+    top_score = ranked[0][1] or 1.0
     
     # Calculate relevance scores
     search_results = []
-    for faq in faqs:
-        # Simple relevance: count matched keywords
-        keywords = faq.question_keywords.split(',')
-        matched = [kw.strip() for kw in keywords if any(term in kw.lower() for term in search_terms)]
-        relevance = len(matched) / len(keywords) if keywords else 0.0
+    for faq_id, score in ranked:
+        faq = faqs_by_id.get(faq_id)
+        if faq is None:  # Deleted by another worker since the last rebuild
+            continue
+        
+        keywords = [kw.strip() for kw in faq.question_keywords.split(',') if kw.strip()]
+        matched = [kw for kw in keywords if search_terms.intersection(faq_search_index.tokenize(kw))]
         
-        # Boost by effectiveness
-        relevance = (relevance * 0.7) + (min(faq.effectiveness_score / 100, 1.0) * 0.3)
+        # BM25 relative to the best hit, boosted by effectiveness
+        relevance = (score / top_score * 0.7) + (min(faq.effectiveness_score / 100, 1.0) * 0.3)
         
         search_results.append(
             FAQSearchResult(
@@ -143,7 +125,7 @@ async def get_faqs_by_category(
     constituency_id: Optional[UUID] = None,
     current_user: User = Depends(require_auth),
     constituency_filter: Optional[UUID] = Depends(get_user_constituency_id),
-    db: AsyncSession = Depends(get_db)
+    db: Session = Depends(get_db)
 ):
     """Get all FAQs for a specific category. Non-admin users only see FAQs from their constituency."""
     query = select(FAQSolution).where(FAQSolution.category == category)
@@ -156,7 +138,7 @@ async def get_faqs_by_category(
     
     query = query.order_by(FAQSolution.effectiveness_score.desc())
     
-    result = await db.execute(query)
+    result = db.execute(query)
     faqs = result.scalars().all()
     
     return faqs
@@ -168,7 +150,7 @@ async def get_top_solutions(
     limit: int = Query(10, ge=1, le=50),
     current_user: User = Depends(require_auth),
     constituency_filter: Optional[UUID] = Depends(get_user_constituency_id),
-    db: AsyncSession = Depends(get_db)
+    db: Session = Depends(get_db)
 ):
     """Get top performing FAQ solutions by effectiveness score. Non-admin users only see FAQs from their constituency."""
     query = select(FAQSolution)
@@ -181,7 +163,7 @@ async def get_top_solutions(
     
     query = query.order_by(FAQSolution.effectiveness_score.desc()).limit(limit)
     
-    result = await db.execute(query)
+    result = db.execute(query)
     faqs = result.scalars().all()
     
     return faqs
@@ -192,10 +174,10 @@ async def get_faq(
     faq_id: UUID,
     current_user: User = Depends(require_auth),
     constituency_filter: Optional[UUID] = Depends(get_user_constituency_id),
-    db: AsyncSession = Depends(get_db)
+    db: Session = Depends(get_db)
 ):
     """Get a specific FAQ by ID and increment view count. Non-admin users can only access FAQs from their constituency."""
-    result = await db.execute(select(FAQSolution).where(FAQSolution.id == faq_id))
+    result = db.execute(select(FAQSolution).where(FAQSolution.id == faq_id))
     faq = result.scalar_one_or_none()
     
     if not faq:
@@ -210,8 +192,8 @@ async def get_faq(
     
     # Increment view count
     faq.view_count += 1
-    await db.commit()
-    await db.refresh(faq)
+    db.commit()
+    db.refresh(faq)
     
     return faq
 
@@ -220,10 +202,10 @@ async def get_faq(
 async def submit_faq_feedback(
     faq_id: UUID,
     feedback: FAQFeedback,
-    db: AsyncSession = Depends(get_db)
+    db: Session = Depends(get_db)
 ):
     """Submit feedback on whether FAQ was helpful."""
-    result = await db.execute(select(FAQSolution).where(FAQSolution.id == faq_id))
+    result = db.execute(select(FAQSolution).where(FAQSolution.id == faq_id))
     faq = result.scalar_one_or_none()
     
     if not faq:
@@ -238,7 +220,7 @@ async def submit_faq_feedback(
     if feedback.prevented_complaint:
         faq.prevented_complaints_count += 1
     
-    await db.commit()
+    db.commit()
     
     return {
         "message": "Feedback recorded",
@@ -251,7 +233,7 @@ async def submit_faq_feedback(
 async def update_faq(
     faq_id: UUID,
     faq_data: FAQSolutionUpdate,
-    db: AsyncSession = Depends(get_db),
+    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Update an FAQ solution (Moderator/Admin only)."""
@@ -261,7 +243,7 @@ async def update_faq(
             detail="Only admins and moderators can update FAQs"
         )
     
-    result = await db.execute(select(FAQSolution).where(FAQSolution.id == faq_id))
+    result = db.execute(select(FAQSolution).where(FAQSolution.id == faq_id))
     faq = result.scalar_one_or_none()
     
     if not faq:
@@ -281,8 +263,9 @@ async def update_faq(
     if faq_data.kannada_solution is not None:
         faq.kannada_solution = faq_data.kannada_solution
     
-    await db.commit()
-    await db.refresh(faq)
+    db.commit()
+    db.refresh(faq)
+    faq_search_index.upsert(faq)
     
     return faq
 
@@ -290,7 +273,7 @@ async def update_faq(
 @router.delete("/{faq_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_faq(
     faq_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Delete an FAQ solution (Admin only)."""
@@ -300,14 +283,15 @@ async def delete_faq(
             detail="Only admins can delete FAQs"
         )
     
-    result = await db.execute(select(FAQSolution).where(FAQSolution.id == faq_id))
+    result = db.execute(select(FAQSolution).where(FAQSolution.id == faq_id))
     faq = result.scalar_one_or_none()
     
     if not faq:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="FAQ not found")
     
-    await db.delete(faq)
-    await db.commit()
+    db.delete(faq)
+    db.commit()
+    faq_search_index.remove(faq_id)
     
     return None
 
@@ -317,7 +301,7 @@ async def get_faq_effectiveness_stats(
     constituency_id: Optional[UUID] = None,
     current_user: User = Depends(get_current_user),
     constituency_filter: Optional[UUID] = Depends(get_user_constituency_id),
-    db: AsyncSession = Depends(get_db)
+    db: Session = Depends(get_db)
 ):
     """Get FAQ effectiveness statistics (Admin/Moderator only). Non-admin users only see stats from their constituency."""
     if current_user.role not in (UserRole.ADMIN, UserRole.MODERATOR):
@@ -334,7 +318,7 @@ async def get_faq_effectiveness_stats(
     elif constituency_id:  # Only allow explicit filter if admin
         query = query.where(FAQSolution.constituency_id == constituency_id)
     
-    result = await db.execute(query)
+    result = db.execute(query)
     faqs = result.scalars().all()
     
     total_faqs = len(faqs)
@@ -11,6 +11,7 @@ import uuid
 
 from app.core.database import get_db
 from app.core.auth import get_current_user, require_role
+from app.core.search import text_search_clause
 from app.models.user import User, UserRole
 from app.models.forum import (
     ForumTopic, ForumPost, ForumLike, ForumSubscription,
@@ -89,21 +90,19 @@ async def get_topics(
         # By default, show open and pinned topics
         query = query.filter(ForumTopic.status.in_([TopicStatus.OPEN, TopicStatus.PINNED]))
     
-    # Search
+    # Search (ranked full-text + trigram match)
+    rank = None
     if search:
-        query = query.filter(
-            or_(
-                ForumTopic.title.ilike(f'%{search}%'),
-                ForumTopic.description.ilike(f'%{search}%'),
-                ForumTopic.tags.ilike(f'%{search}%')
-            )
+        search_clause, rank = text_search_clause(
+            db, (ForumTopic.title, ForumTopic.description, ForumTopic.tags), search
         )
+        query = query.filter(search_clause)
     
-    # Order by pinned first, then latest activity
-    query = query.order_by(
-        desc(ForumTopic.is_pinned),
-        desc(ForumTopic.last_activity_at)
-    )
+    # Order by relevance when searching, then pinned first, then latest activity
+    ordering = [desc(ForumTopic.is_pinned), desc(ForumTopic.last_activity_at)]
+    if rank is not None:
+        ordering.insert(0, desc(rank))
+    query = query.order_by(*ordering)
     
     topics = query.offset(skip).limit(limit).all()
     
@@ -0,0 +1,43 @@
+"""
+Inference router - embedding endpoint served by APP_ROLE=inference processes
+"""
+from fastapi import APIRouter, HTTPException, Response, status
+
+from app.schemas.inference import EncodeRequest, InferenceInfo
+from app.services.inference import (
+    SHAPE_HEADER,
+    InferenceUnavailable,
+    embedding_service,
+    pack_embeddings,
+)
+
+router = APIRouter()
+
+
+@router.post("/encode", response_class=Response)
+async def encode(request: EncodeRequest):
+    """
+    Embed texts with this process's model. Concurrent requests from all API
+    workers are batched together; the body is float32 rows with the shape in
+    the X-Embedding-Shape header.
+    """
+    try:
+        vectors = await embedding_service.encode_local(request.texts)
+    except InferenceUnavailable as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    body, shape = pack_embeddings(vectors)
+    return Response(content=body, media_type="application/octet-stream", headers={SHAPE_HEADER: shape})
+
+
+@router.get("/info", response_model=InferenceInfo)
+async def info():
+    """Model and batching settings of this inference server"""
+    encoder = embedding_service.encoder
+    return InferenceInfo(
+        model=encoder.model_name,
+        backend=encoder.backend,
+        loaded=encoder.loaded,
+        dimension=encoder.dimension if encoder.loaded else None,
+        max_batch_size=embedding_service.batcher.max_batch_size,
+        max_wait_ms=embedding_service.batcher.max_wait * 1000,
+    )
@@ -1,41 +1,64 @@
 """
 Media router - File upload operations
 """
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status, UploadFile, File, Form
 from sqlalchemy.orm import Session
+from starlette.requests import ClientDisconnect
 from typing import List, Optional
-from uuid import UUID, uuid4
-import aiofiles
+from uuid import UUID
+from decimal import Decimal
+from email.utils import formatdate
+import asyncio
 import os
 from pathlib import Path
 
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.logging import logger
 from app.core.auth import require_auth, get_user_constituency_id
-from app.core.image_processing import (
-    optimize_image, 
-    create_thumbnail, 
-    is_image_file,
-    extract_exif_data  # type: ignore[attr-defined]
+from app.core.media_serving import media_file_response, present_media_url, verify_media_signature
+from app.core.uploads import (
+    ResumableUpload,
+    ResumableUploadStore,
+    UploadConflict,
+    UploadTooLarge,
+    parse_upload_metadata,
+    receive_upload,
 )
-from app.models.complaint import Media, MediaType, Complaint
+from app.models.complaint import Media, MediaBlob, MediaType, Complaint
 from app.models.user import User
 from app.schemas.media import MediaResponse
+from app.services.media_store import media_store
 
 router = APIRouter()
 
-# Configure upload directory
-UPLOAD_DIR = Path("uploads/media")
+# Serves /uploads/... (mounted without a prefix in main.py)
+files_router = APIRouter()
+
+UPLOADS_ROOT = Path(getattr(settings, "UPLOAD_DIR", "./uploads"))
+
+# Configure upload directory (blobs live in UPLOAD_DIR/blobs, see media_store)
+UPLOAD_DIR = UPLOADS_ROOT / "media"
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
 # Allowed file extensions
 ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".mp4", ".mov", ".avi"}
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
 
+VALID_PHOTO_TYPES = ['before', 'during', 'after', 'evidence']
 
-def validate_file(file: UploadFile):
-    """Validate file type and size"""
-    # Check extension
-    file_ext = Path(file.filename or "").suffix.lower()
+# Partial uploads and resumable (tus) uploads in progress; kept on the same
+# filesystem as UPLOAD_DIR so finished files are moved, not copied
+INCOMING_DIR = UPLOAD_DIR / ".incoming"
+resumable_uploads = ResumableUploadStore(INCOMING_DIR / "resumable")
+
+TUS_VERSION = "1.0.0"
+TUS_HEADERS = {"Tus-Resumable": TUS_VERSION}
+
+
+def validate_extension(filename: str) -> str:
+    """Validate the file type from its name"""
+    file_ext = Path(filename or "").suffix.lower()
     if file_ext not in ALLOWED_EXTENSIONS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -45,6 +68,78 @@ def validate_file(file: UploadFile):
     return file_ext
 
 
+def validate_file(file: UploadFile):
+    """Validate file type"""
+    return validate_extension(file.filename or "")
+
+
+def validate_photo_type(photo_type: str) -> None:
+    if photo_type not in VALID_PHOTO_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid photo_type. Must be one of: {', '.join(VALID_PHOTO_TYPES)}"
+        )
+
+
+def _too_large(filename: Optional[str]) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File {filename} exceeds maximum size of 10MB"
+    )
+
+
+def media_type_for(file_ext: str) -> MediaType:
+    if file_ext in ['.jpg', '.jpeg', '.png', '.gif']:
+        return MediaType.PHOTO
+    if file_ext in ['.mp4', '.mov', '.avi']:
+        return MediaType.VIDEO
+    return MediaType.DOCUMENT
+
+
+def remove_stored_file(url: str) -> None:
+    """Delete a stored file and its renditions"""
+    file_path = UPLOAD_DIR / Path(url).name
+    for path in [file_path, *UPLOAD_DIR.glob(f"*_{file_path.stem}.*")]:
+        if path.exists():
+            os.remove(path)
+
+
+def present_media(media: Media) -> MediaResponse:
+    """Response for a media record, with a signed URL when signing is enforced"""
+    response = MediaResponse.model_validate(media)
+    response.url = present_media_url(media.url)
+    return response
+
+
+def attach_media(db: Session, complaint_id: UUID, blob: MediaBlob, file_ext: str,
+                 photo_type: str, caption: Optional[str], set_complaint_location: bool) -> Media:
+    """Add a media record for a stored blob; the first geo-tagged photo also locates the complaint"""
+    exif_gps_lat, exif_gps_lng = blob.lat, blob.lng
+    new_media = Media(
+        complaint_id=complaint_id,
+        url=media_store.url(blob.path),
+        media_type=media_type_for(file_ext),
+        photo_type=photo_type,
+        caption=caption,
+        file_size=blob.size,
+        lat=exif_gps_lat,
+        lng=exif_gps_lng,
+        blob_sha256=blob.sha256,
+    )
+    db.add(new_media)
+    
+    # If first media has GPS and complaint doesn't, update complaint
+    if exif_gps_lat and exif_gps_lng and set_complaint_location:
+        complaint = db.query(Complaint).filter(Complaint.id == complaint_id).first()
+        if complaint and (not complaint.lat or not complaint.lng):
+            complaint.lat = Decimal(str(exif_gps_lat))
+            complaint.lng = Decimal(str(exif_gps_lng))
+            logger.info("Complaint located from photo EXIF", complaint_id=str(complaint_id),
+                        lat=exif_gps_lat, lng=exif_gps_lng)
+    
+    return new_media
+
+
 @router.post("/upload", response_model=List[MediaResponse], status_code=status.HTTP_201_CREATED)
 async def upload_media(
     files: List[UploadFile] = File(...),
@@ -55,126 +150,37 @@ async def upload_media(
 ):
     """
     Upload multiple media files (photos/videos)
+    Files are streamed to disk in chunks; the size limit is enforced while reading
     """
-    # Validate photo_type
-    valid_photo_types = ['before', 'during', 'after', 'evidence']
-    if photo_type not in valid_photo_types:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid photo_type. Must be one of: {', '.join(valid_photo_types)}"
-        )
+    validate_photo_type(photo_type)
     
     uploaded_media: List[Media] = []
     
     for file in files:
-        # Initialize GPS variables for each file
-        exif_gps_lat: Optional[float] = None
-        exif_gps_lng: Optional[float] = None
-        
         try:
-            # Validate file
             file_ext = validate_file(file)
             
-            # Generate unique filename
-            unique_filename = f"{uuid4()}{file_ext}"
-            file_path = UPLOAD_DIR / unique_filename
-            
-            # Read file contents
-            contents = await file.read()
-            
-            # Check file size
-            if len(contents) > MAX_FILE_SIZE:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"File {file.filename} exceeds maximum size of 10MB"
-                )
+            try:
+                upload = await receive_upload(file, INCOMING_DIR, MAX_FILE_SIZE)
+            except UploadTooLarge:
+                raise _too_large(file.filename)
             
-            # Process images (optimize and create thumbnail)
-            if is_image_file(file.filename or ""):
-                # Extract EXIF data before optimization (optimization may strip EXIF)
-                exif_data = extract_exif_data(contents)  # type: ignore
-                exif_gps_lat = None
-                exif_gps_lng = None
-                
-                if exif_data and 'gps' in exif_data:
-                    try:
-                        gps_info = exif_data['gps']  # type: ignore
-                        # Extract GPS coordinates from EXIF
-                        # GPSInfo tag 2 = latitude, tag 4 = longitude
-                        # GPSInfo tag 1 = latitude ref (N/S), tag 3 = longitude ref (E/W)
-                        if 2 in gps_info and 4 in gps_info:  # type: ignore
-                            # Convert from degrees, minutes, seconds to decimal
-                            lat = gps_info[2]  # type: ignore
-                            lat_ref = gps_info.get(1, 'N')  # type: ignore
-                            lng = gps_info[4]  # type: ignore
-                            lng_ref = gps_info.get(3, 'E')  # type: ignore
-                            
-                            # Convert to decimal
-                            if isinstance(lat, (list, tuple)) and len(lat) == 3:  # type: ignore[arg-type]
-                                exif_gps_lat = float(lat[0]) + float(lat[1])/60 + float(lat[2])/3600  # type: ignore
-                                if lat_ref == 'S':
-                                    exif_gps_lat = -exif_gps_lat
-                            
-                            if isinstance(lng, (list, tuple)) and len(lng) == 3:  # type: ignore[arg-type]
-                                exif_gps_lng = float(lng[0]) + float(lng[1])/60 + float(lng[2])/3600  # type: ignore
-                                if lng_ref == 'W':
-                                    exif_gps_lng = -exif_gps_lng
-                    except Exception as e:
-                        print(f"Error extracting GPS from EXIF: {e}")
-                
-                # Optimize the main image
-                contents = optimize_image(contents)
-                
-                # Create thumbnail
-                thumbnail_filename = f"thumb_{unique_filename}"
-                thumbnail_path = UPLOAD_DIR / thumbnail_filename
-                thumbnail_bytes = create_thumbnail(contents)
-                
-                async with aiofiles.open(thumbnail_path, 'wb') as f:
-                    await f.write(thumbnail_bytes)
+            # Identical bytes already stored are reused, not processed again
+            try:
+                blob = await media_store.put(db, upload, file_ext)
+            finally:
+                upload.discard()
             
-            # Save main file
-            async with aiofiles.open(file_path, 'wb') as f:
-                await f.write(contents)
-            
-            # Determine media type
-            if file_ext in ['.jpg', '.jpeg', '.png', '.gif']:
-                media_type = MediaType.IMAGE  # type: ignore[attr-defined]
-            elif file_ext in ['.mp4', '.mov', '.avi']:
-                media_type = MediaType.VIDEO  # type: ignore[attr-defined]
-            else:
-                media_type = MediaType.DOCUMENT  # type: ignore[attr-defined]
-            
-            # Create media record with EXIF GPS if available
-            new_media = Media(
-                complaint_id=complaint_id,
-                url=f"/uploads/media/{unique_filename}",
-                media_type=media_type,
-                photo_type=photo_type,
-                caption=caption,
-                lat=exif_gps_lat,
-                lng=exif_gps_lng,
-            )
-            
-            db.add(new_media)
-            uploaded_media.append(new_media)
-            
-            # If first media has GPS and complaint doesn't, update complaint
-            if exif_gps_lat and exif_gps_lng and len(uploaded_media) == 1:
-                complaint = db.query(Complaint).filter(Complaint.id == complaint_id).first()
-                if complaint and (not complaint.lat or not complaint.lng):
-                    from decimal import Decimal
-                    complaint.lat = Decimal(str(exif_gps_lat))
-                    complaint.lng = Decimal(str(exif_gps_lng))
-                    print(f"Updated complaint {complaint_id} with GPS from photo EXIF: {exif_gps_lat}, {exif_gps_lng}")
+            uploaded_media.append(attach_media(
+                db, complaint_id, blob, file_ext, photo_type, caption,
+                set_complaint_location=not uploaded_media
+            ))
             
         except Exception as e:
-            # Clean up any uploaded files on error
-            for media in uploaded_media:
-                try:
-                    os.remove(UPLOAD_DIR / Path(media.url).name)
-                except:
-                    pass
+            # Undo the blob references taken for earlier files and drop files no row owns
+            media_store.rollback(db)
+            if isinstance(e, HTTPException):
+                raise
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Error uploading file {file.filename}: {str(e)}"
@@ -186,7 +192,154 @@ async def upload_media(
     for media in uploaded_media:
         db.refresh(media)
     
-    return uploaded_media
+    return [present_media(media) for media in uploaded_media]
+
+
+def _get_resumable(upload_id: str, current_user: User) -> ResumableUpload:
+    upload = resumable_uploads.get(upload_id)
+    if upload is None or upload.owner_id != str(current_user.id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found", headers=TUS_HEADERS)
+    return upload
+
+
+def _upload_headers(upload: ResumableUpload, offset: int) -> dict:
+    return {
+        **TUS_HEADERS,
+        "Upload-Offset": str(offset),
+        "Upload-Length": str(upload.length),
+        "Upload-Expires": formatdate(resumable_uploads.expires_at(upload), usegmt=True),
+        "Cache-Control": "no-store",
+    }
+
+
+@router.options("/uploads")
+async def resumable_upload_options():
+    """
+    Advertise tus protocol support
+    """
+    return Response(status_code=status.HTTP_204_NO_CONTENT, headers={
+        **TUS_HEADERS,
+        "Tus-Version": TUS_VERSION,
+        "Tus-Max-Size": str(MAX_FILE_SIZE),
+        "Tus-Extension": "creation,expiration,termination",
+    })
+
+
+@router.post("/uploads", status_code=status.HTTP_201_CREATED)
+async def create_resumable_upload(
+    upload_length: int = Header(..., alias="Upload-Length", ge=0),
+    upload_metadata: Optional[str] = Header(None, alias="Upload-Metadata"),
+    current_user: User = Depends(require_auth)
+):
+    """
+    Start a resumable (tus) upload. Send the bytes with PATCH requests to
+    the returned Location, then attach the file with POST .../complete.
+    ``Upload-Metadata`` must carry the base64-encoded ``filename``.
+    """
+    filename = parse_upload_metadata(upload_metadata).get("filename", "")
+    validate_extension(filename)
+    if upload_length > MAX_FILE_SIZE:
+        raise _too_large(filename)
+    
+    upload = resumable_uploads.create(upload_length, filename, str(current_user.id))
+    headers = _upload_headers(upload, 0)
+    headers["Location"] = f"/api/media/uploads/{upload.id}"
+    return Response(status_code=status.HTTP_201_CREATED, headers=headers)
+
+
+@router.head("/uploads/{upload_id}")
+async def get_resumable_upload_offset(
+    upload_id: str,
+    current_user: User = Depends(require_auth)
+):
+    """
+    Report how many bytes of a resumable upload the server has
+    """
+    upload = _get_resumable(upload_id, current_user)
+    return Response(status_code=status.HTTP_200_OK, headers=_upload_headers(upload, upload.offset))
+
+
+@router.patch("/uploads/{upload_id}")
+async def append_resumable_upload(
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(..., alias="Upload-Offset", ge=0),
+    current_user: User = Depends(require_auth)
+):
+    """
+    Append the request body at ``Upload-Offset``. Bytes received before a
+    dropped connection are kept; resume from the offset HEAD reports.
+    """
+    if request.headers.get("content-type") != "application/offset+octet-stream":
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                            detail="Content-Type must be application/offset+octet-stream", headers=TUS_HEADERS)
+    
+    upload = _get_resumable(upload_id, current_user)
+    try:
+        offset = await resumable_uploads.append(upload, upload_offset, request.stream())
+    except UploadConflict as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e), headers=TUS_HEADERS)
+    except UploadTooLarge:
+        raise _too_large(upload.filename)
+    except ClientDisconnect:
+        # Nothing to answer; the bytes already written stay for the next PATCH
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    
+    return Response(status_code=status.HTTP_204_NO_CONTENT, headers=_upload_headers(upload, offset))
+
+
+@router.delete("/uploads/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def terminate_resumable_upload(
+    upload_id: str,
+    current_user: User = Depends(require_auth)
+):
+    """
+    Abandon a resumable upload and discard its bytes
+    """
+    _get_resumable(upload_id, current_user)
+    resumable_uploads.delete(upload_id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT, headers=TUS_HEADERS)
+
+
+@router.post("/uploads/{upload_id}/complete", response_model=MediaResponse, status_code=status.HTTP_201_CREATED)
+async def complete_resumable_upload(
+    upload_id: str,
+    complaint_id: UUID = Form(...),
+    photo_type: str = Form(...),  # before, during, after, evidence
+    caption: Optional[str] = Form(None),
+    current_user: User = Depends(require_auth),
+    db: Session = Depends(get_db)
+):
+    """
+    Attach a fully received resumable upload to a complaint
+    """
+    validate_photo_type(photo_type)
+    upload = _get_resumable(upload_id, current_user)
+    if upload.offset != upload.length:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Upload incomplete: {upload.offset} of {upload.length} bytes received"
+        )
+    
+    file_ext = validate_extension(upload.filename)
+    spooled = await asyncio.to_thread(resumable_uploads.complete, upload)
+    try:
+        blob = await media_store.put(db, spooled, file_ext)
+    except Exception as e:
+        media_store.rollback(db)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error uploading file {upload.filename}: {str(e)}"
+        )
+    finally:
+        spooled.discard()
+    
+    has_media = db.query(Media.id).filter(Media.complaint_id == complaint_id).first() is not None
+    media = attach_media(db, complaint_id, blob, file_ext, photo_type, caption,
+                         set_complaint_location=not has_media)
+    db.commit()
+    db.refresh(media)
+    return present_media(media)
 
 
 @router.get("/complaint/{complaint_id}", response_model=List[MediaResponse])
@@ -222,7 +375,7 @@ async def get_complaint_media(
         query = query.filter(Media.photo_type == photo_type)
     
     media = query.all()
-    return media
+    return [present_media(item) for item in media]
 
 
 @router.delete("/{media_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -241,16 +394,37 @@ async def delete_media(
             detail="Media not found"
         )
     
-    # Delete file from filesystem
-    try:
-        file_path = UPLOAD_DIR / Path(media.url).name
-        if file_path.exists():
-            os.remove(file_path)
-    except Exception as e:
-        print(f"Error deleting file: {e}")
+    # Shared blobs lose a reference (files go once nothing uses them);
+    # files from before content addressing are deleted directly
+    if media.blob_sha256:
+        media_store.release(db, media.blob_sha256)
+    else:
+        try:
+            remove_stored_file(media.url)
+        except Exception as e:
+            logger.warning("Error deleting media file", media_id=str(media_id), error=str(e))
     
     # Delete database record
     db.delete(media)
     db.commit()
     
     return None
+
+
+@files_router.api_route("/uploads/{file_path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+async def serve_upload(
+    file_path: str,
+    request: Request,
+    expires: Optional[int] = None,
+    sig: Optional[str] = None
+):
+    """
+    Serve an uploaded file with ETag, Range and cache headers.
+    Complaint media needs a valid signature when MEDIA_REQUIRE_SIGNED_URLS is on.
+    """
+    signed = expires is not None or sig is not None
+    if signed or (getattr(settings, "MEDIA_REQUIRE_SIGNED_URLS", False) and file_path.startswith("media/")):
+        if not verify_media_signature(f"/uploads/{file_path}", expires, sig):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid or expired media URL")
+    
+    return media_file_response(UPLOADS_ROOT, file_path, request, signed=signed)
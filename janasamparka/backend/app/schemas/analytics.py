@@ -172,7 +172,7 @@ class ReportFilter(BaseModel):
 
 class ExportRequest(BaseModel):
     """Request for data export"""
-    format: str = Field(..., description="Export format: csv, excel, pdf")
+    format: str = Field(..., description="Export format: csv, excel, pdf, summary")
     filters: Optional[ReportFilter] = None
     include_media: bool = False
     
@@ -190,6 +190,18 @@ class ExportRequest(BaseModel):
         }
 
 
+class ReportJobResponse(BaseModel):
+    """Status of a queued report"""
+    job_id: str
+    status: str  # queued, running, completed, failed
+    format: str
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    rows: Optional[int] = None
+    error: Optional[str] = None
+    download_url: Optional[str] = None
+
+
 class ComparativeAnalysis(BaseModel):
     """Comparative analysis between periods"""
     current_period: ComplaintStats
@@ -1,9 +1,11 @@
 """Complaint schemas for request/response validation."""
-from pydantic import BaseModel, Field
-from typing import Dict, List, Optional
+from pydantic import BaseModel, Field, validator
+from typing import Any, Dict, List, Optional
 from datetime import date, datetime
 from uuid import UUID
 
+from app.core.media_serving import present_media_url
+
 
 class ComplaintCreate(BaseModel):
     """Schema for creating a complaint"""
@@ -27,6 +29,36 @@ class ComplaintCreate(BaseModel):
     citizen_selected_dept: Optional[bool] = False
 
 
+class DuplicateSuggestion(BaseModel):
+    """An open complaint nearby that probably reports the same problem"""
+    complaint_id: UUID
+    distance_meters: float
+    similarity: Optional[float] = None
+
+
+class ComplaintBatchCreate(BaseModel):
+    """Schema for filing many complaints in one request"""
+    # Raw items, each validated as a ComplaintCreate so one bad item fails alone
+    complaints: List[Dict[str, Any]] = Field(..., min_length=1, max_length=500)
+
+
+class ComplaintBatchItemResult(BaseModel):
+    """Outcome of one item of a batch, by its position in the request"""
+    index: int
+    status_code: int
+    complaint_id: Optional[UUID] = None
+    category: Optional[str] = None
+    error: Optional[str] = None
+    possible_duplicates: List[DuplicateSuggestion] = []
+
+
+class ComplaintBatchResponse(BaseModel):
+    """Schema for batch complaint creation results"""
+    created: int
+    failed: int
+    results: List[ComplaintBatchItemResult]
+
+
 class ComplaintUpdate(BaseModel):
     """Schema for updating a complaint"""
     title: Optional[str] = Field(None, min_length=5, max_length=500)
@@ -56,6 +88,11 @@ class MediaResponse(BaseModel):
     proof_type: Optional[str] = None
     uploaded_at: datetime
     
+    @validator('url')
+    def sign_url(cls, v):
+        """Signed when MEDIA_REQUIRE_SIGNED_URLS is on"""
+        return present_media_url(v)
+    
     class Config:
         from_attributes = True
 
@@ -105,6 +142,11 @@ class ComplaintResponse(BaseModel):
         from_attributes = True
 
 
+class ComplaintCreatedResponse(ComplaintResponse):
+    """Schema for a newly created complaint, with likely duplicates"""
+    possible_duplicates: List[DuplicateSuggestion] = []
+
+
 class ComplaintDetailResponse(ComplaintResponse):
     """Schema for detailed complaint response with media and logs"""
     media: List[MediaResponse] = []
@@ -0,0 +1,27 @@
+"""Inference server schemas for request/response validation."""
+
+from __future__ import annotations
+
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+# Most texts one encode request may carry; clients split larger jobs
+ENCODE_MAX_TEXTS = 512
+
+
+class EncodeRequest(BaseModel):
+    """Texts to embed; the response body is raw float32 rows."""
+
+    texts: List[str] = Field(..., min_length=1, max_length=ENCODE_MAX_TEXTS)
+
+
+class InferenceInfo(BaseModel):
+    """Model and batching configuration of an inference server."""
+
+    model: str
+    backend: str
+    loaded: bool
+    dimension: Optional[int] = None
+    max_batch_size: int
+    max_wait_ms: float
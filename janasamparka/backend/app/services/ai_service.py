@@ -1,41 +1,33 @@
 """
 AI/ML services for Janasamparka
 """
-import json
 import numpy as np
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
-from pathlib import Path
-import pickle
-
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
-import faiss
 
 from app.core.logging import logger
 from app.core.config import settings
+from app.services.keyword_matcher import keyword_matcher
+from app.services.vector_registry import VectorRegistry, complaint_text, vector_registry
 
 
 class ComplaintClassifier:
     """AI-powered complaint classification and categorization"""
     
-    def __init__(self):
-        self.model = None
+    def __init__(self, registry: Optional[VectorRegistry] = None):
+        self.registry = registry or vector_registry
         self.categories = [
             "road", "water", "electricity", "street_light", "garbage", 
             "drainage", "tree", "noise", "parking", "public_transport",
             "healthcare", "education", "corruption", "land", "building"
         ]
         self.category_embeddings = None
-        self._load_models()
     
-    def _load_models(self):
-        """Load pre-trained models"""
+    async def _load_models(self) -> bool:
+        """Embed the category descriptions (once, on first classification)"""
+        if self.category_embeddings is not None:
+            return True
         try:
-            # Load sentence transformer model
-            self.model = SentenceTransformer('all-MiniLM-L6-v2')
-            
-            # Pre-compute category embeddings
             category_descriptions = {
                 "road": "Road damage potholes street repair traffic accident",
                 "water": "Water supply pipeline leakage drainage sewage",
@@ -55,28 +47,24 @@ class ComplaintClassifier:
             }
             
             category_texts = [category_descriptions[cat] for cat in self.categories]
-            self.category_embeddings = self.model.encode(category_texts)
+            self.category_embeddings = await self.registry.embed(category_texts)
             
-            logger.info("AI models loaded successfully")
+            logger.info("AI models loaded successfully", model=self.registry.model_name)
+            return True
             
         except Exception as e:
             logger.error("Failed to load AI models", error=str(e))
-            self.model = None
+            return False
     
-    def classify_complaint(self, title: str, description: str) -> Dict[str, Any]:
+    async def classify_complaint(self, title: str, description: str) -> Dict[str, Any]:
         """Classify complaint into categories"""
-        if not self.model:
+        if not await self._load_models():
             return {"category": "general", "confidence": 0.0}
         
         try:
-            # Combine title and description
-            text = f"{title} {description}"
-            
-            # Generate embedding
-            text_embedding = self.model.encode([text])
-            
-            # Calculate similarities
-            similarities = cosine_similarity(text_embedding, self.category_embeddings)[0]
+            # Registry vectors are normalised, so the dot product is the cosine similarity
+            text_embedding = (await self.registry.embed([complaint_text(title, description)]))[0]
+            similarities = self.category_embeddings @ text_embedding
             
             # Get top prediction
             top_idx = np.argmax(similarities)
@@ -132,140 +120,82 @@ class ComplaintClassifier:
 
 
 class DuplicateDetector:
-    """AI-powered duplicate complaint detection"""
+    """AI-powered duplicate complaint detection over the shared vector registry"""
     
-    def __init__(self):
-        self.model = None
-        self.index = None
-        self.complaint_data = []
-        self.embedding_dim = 384  # For all-MiniLM-L6-v2
+    def __init__(self, registry: Optional[VectorRegistry] = None):
+        self.registry = registry or vector_registry
         self.similarity_threshold = 0.8
-        self._load_models()
     
-    def _load_models(self):
-        """Load models and initialize index"""
+    async def add_complaint(self, complaint_id: str, title: str, description: str,
+                            constituency_id: Any):
+        """Add complaint to its constituency's index"""
         try:
-            self.model = SentenceTransformer('all-MiniLM-L6-v2')
-            self.index = faiss.IndexFlatIP(self.embedding_dim)
-            logger.info("Duplicate detection models loaded")
-        except Exception as e:
-            logger.error("Failed to load duplicate detection models", error=str(e))
-    
-    def add_complaint(self, complaint_id: str, title: str, description: str, 
-                     category: str, location: str = ""):
-        """Add complaint to the index"""
-        if not self.model:
-            return
-        
-        try:
-            # Create searchable text
-            text = f"{title} {description} {category} {location}"
-            
-            # Generate embedding
-            embedding = self.model.encode([text])[0]
-            
-            # Normalize embedding for cosine similarity
-            embedding = embedding / np.linalg.norm(embedding)
-            
-            # Add to index
-            self.index.add(np.array([embedding], dtype=np.float32))
-            
-            # Store complaint data
-            self.complaint_data.append({
-                "id": complaint_id,
-                "text": text,
-                "embedding": embedding
-            })
-            
+            await self.registry.add(constituency_id, {str(complaint_id): complaint_text(title, description)})
         except Exception as e:
             logger.error("Failed to add complaint to duplicate detector", error=str(e))
     
-    def find_duplicates(self, title: str, description: str, category: str, 
-                        location: str = "", limit: int = 5) -> List[Dict[str, Any]]:
-        """Find potential duplicate complaints"""
-        if not self.model or not self.index or len(self.complaint_data) == 0:
-            return []
-        
+    async def find_duplicates(self, title: str, description: str, constituency_id: Any,
+                              limit: int = 5) -> List[Dict[str, Any]]:
+        """Find potential duplicate complaints in the same constituency"""
         try:
-            # Create searchable text
-            text = f"{title} {description} {category} {location}"
-            
-            # Generate embedding
-            embedding = self.model.encode([text])[0]
-            embedding = embedding / np.linalg.norm(embedding)
-            
-            # Search in index
-            embedding_array = np.array([embedding], dtype=np.float32)
-            similarities, indices = self.index.search(embedding_array, min(limit, len(self.complaint_data)))
-            
-            # Filter by similarity threshold
-            duplicates = []
-            for i, (similarity, idx) in enumerate(zip(similarities[0], indices[0])):
-                if similarity >= self.similarity_threshold:
-                    complaint = self.complaint_data[idx]
-                    duplicates.append({
-                        "complaint_id": complaint["id"],
-                        "similarity": float(similarity),
-                        "text": complaint["text"]
-                    })
-            
-            return duplicates
-            
+            matches = await self.registry.search(
+                constituency_id, complaint_text(title, description),
+                limit=limit, threshold=self.similarity_threshold
+            )
         except Exception as e:
             logger.error("Failed to find duplicates", error=str(e))
             return []
+        
+        return [
+            {"complaint_id": match.key, "similarity": match.similarity}
+            for match in matches
+        ]
     
     def save_index(self, filepath: str):
-        """Save the FAISS index and data"""
+        """Save the registry's indexes"""
         try:
-            if self.index:
-                faiss.write_index(self.index, f"{filepath}.index")
-            
-            with open(f"{filepath}.pkl", "wb") as f:
-                pickle.dump(self.complaint_data, f)
-            
+            self.registry.save(f"{filepath}.npz")
             logger.info("Duplicate detector index saved", filepath=filepath)
-            
         except Exception as e:
             logger.error("Failed to save duplicate detector index", error=str(e))
     
     def load_index(self, filepath: str):
-        """Load the FAISS index and data"""
+        """Load the registry's indexes"""
         try:
-            if Path(f"{filepath}.index").exists():
-                self.index = faiss.read_index(f"{filepath}.index")
-            
-            if Path(f"{filepath}.pkl").exists():
-                with open(f"{filepath}.pkl", "rb") as f:
-                    self.complaint_data = pickle.load(f)
-            
+            self.registry.load(f"{filepath}.npz")
             logger.info("Duplicate detector index loaded", filepath=filepath)
-            
         except Exception as e:
             logger.error("Failed to load duplicate detector index", error=str(e))
 
 
+POSITIVE_WORDS = [
+    "good", "excellent", "satisfied", "happy", "resolved", "quick",
+    "efficient", "helpful", "thank", "thanks", "appreciate", "great"
+]
+
+NEGATIVE_WORDS = [
+    "bad", "poor", "unsatisfied", "unhappy", "slow", "delayed",
+    "useless", "waste", "terrible", "awful", "disappointed", "frustrated"
+]
+
+keyword_matcher.register("sentiment.positive", POSITIVE_WORDS)
+keyword_matcher.register("sentiment.negative", NEGATIVE_WORDS)
+
+
 class SentimentAnalyzer:
     """Sentiment analysis for complaint feedback"""
     
     def __init__(self):
-        self.positive_words = [
-            "good", "excellent", "satisfied", "happy", "resolved", "quick",
-            "efficient", "helpful", "thank", "thanks", "appreciate", "great"
-        ]
-        
-        self.negative_words = [
-            "bad", "poor", "unsatisfied", "unhappy", "slow", "delayed",
-            "useless", "waste", "terrible", "awful", "disappointed", "frustrated"
-        ]
+        self.positive_words = POSITIVE_WORDS
+        self.negative_words = NEGATIVE_WORDS
     
     def analyze_sentiment(self, text: str) -> Dict[str, Any]:
         """Analyze sentiment of feedback text"""
-        text_lower = text.lower()
+        hits = keyword_matcher.scan(text.lower())
         
         # Count positive and negative words
-        positive_count = sum(1 for word in self.positive_words if word in text_lower)
-        negative_count = sum(1 for word in self.negative_words if word in text_lower)
+        positive_count = hits.count("sentiment.positive")
+        negative_count = hits.count("sentiment.negative")
         
         # Calculate sentiment score
         total_words = positive_count + negative_count
@@ -368,18 +298,16 @@ class PredictionService:
         self.sentiment_analyzer = SentimentAnalyzer()
         self.location_analyzer = LocationAnalyzer()
     
-    def process_new_complaint(self, title: str, description: str, 
-                             lat: float, lng: float, location_desc: str = "") -> Dict[str, Any]:
+    async def process_new_complaint(self, title: str, description: str, constituency_id: Any,
+                                    lat: float, lng: float) -> Dict[str, Any]:
         """Process a new complaint with AI analysis"""
         
         # Classification
-        classification = self.classifier.classify_complaint(title, description)
+        classification = await self.classifier.classify_complaint(title, description)
         priority = self.classifier.extract_priority(title, description)
         
         # Duplicate detection
-        duplicates = self.duplicate_detector.find_duplicates(
-            title, description, classification["category"], location_desc
-        )
+        duplicates = await self.duplicate_detector.find_duplicates(title, description, constituency_id)
         
         # Location analysis
         nearby = self.location_analyzer.find_nearby_complaints(lat, lng)
@@ -0,0 +1,370 @@
+"""Chunked, checkpointed delivery of scheduled broadcasts across notification channels."""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.logging import logger
+from app.core.metrics import broadcast_chunk_duration, broadcast_messages_total
+from app.models.citizen_engagement import BroadcastDelivery, BroadcastStatus, ScheduledBroadcast
+from app.models.user import User
+
+
+# Channel name -> User attribute holding the recipient address
+CHANNEL_CONTACTS = {
+    "push": "device_token",
+    "sms": "phone",
+    "email": "email",
+    "whatsapp": "phone",
+    "in_app": "id",
+}
+
+# Channel name -> BroadcastDelivery flag set when the send succeeded
+CHANNEL_DELIVERY_FLAGS = {
+    "push": "push_sent",
+    "sms": "sms_sent",
+    "email": "email_sent",
+    "whatsapp": "whatsapp_sent",
+    "in_app": "shown_in_app",
+}
+
+
+@dataclass
+class DeliveryStats:
+    """Running totals for one broadcast run."""
+
+    recipients: int = 0
+    chunks: int = 0
+    sent: Dict[str, int] = field(default_factory=dict)
+    failed: Dict[str, int] = field(default_factory=dict)
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def total_sent(self) -> int:
+        return sum(self.sent.values())
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def record(self, channel: str, results: Sequence[bool]) -> None:
+        succeeded = sum(1 for result in results if result)
+        self.sent[channel] = self.sent.get(channel, 0) + succeeded
+        self.failed[channel] = self.failed.get(channel, 0) + len(results) - succeeded
+
+    def as_dict(self) -> Dict[str, Any]:
+        elapsed = self.elapsed
+        attempted = self.total_sent + sum(self.failed.values())
+        return {
+            "recipients": self.recipients,
+            "chunks": self.chunks,
+            "sent": dict(self.sent),
+            "failed": dict(self.failed),
+            "elapsed_seconds": round(elapsed, 3),
+            "messages_per_second": round(attempted / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+
+
+class BroadcastDeliveryEngine:
+    """
+    Deliver a broadcast to its audience in fixed-size chunks.
+
+    A run first claims the broadcast by moving it to SENDING with a
+    conditional UPDATE, so concurrent runs (a second send-now, a retry)
+    cannot deliver the same broadcast twice. Recipients are read by keyset
+    pagination on ``users.id`` selecting only the contact columns, so
+    memory stays flat whatever the audience size. Each chunk is fanned out
+    to all enabled channels at once; every channel limits its own in-flight
+    sends (``NotificationChannel.concurrency``). After a chunk the
+    ``BroadcastDelivery`` rows are bulk-inserted and the last user id is
+    stored on the broadcast as ``delivery_cursor`` in the same commit, so a
+    failed run resumes where it stopped. Database work runs in a worker
+    thread with a short-lived session; no connection is held while a chunk
+    is being sent. Delivery is at-least-once: a chunk interrupted mid-send
+    is sent again.
+    """
+
+    def __init__(
+        self,
+        channels: Dict[str, Any],
+        chunk_size: int = 1000,
+        session_factory: Callable[[], Session] = SessionLocal,
+        stale_after: Optional[float] = None,
+    ):
+        self.channels = channels
+        self.chunk_size = chunk_size
+        self.session_factory = session_factory
+        if stale_after is None:
+            stale_after = getattr(settings, "BROADCAST_STALE_SECONDS", 900)
+        self.stale_after = stale_after
+
+    def claim(self, db: Session, broadcast_id: Any, statuses: Sequence[BroadcastStatus]) -> bool:
+        """
+        Atomically move the broadcast from one of ``statuses`` to SENDING.
+
+        A SENDING broadcast whose run stopped checkpointing more than
+        ``stale_after`` seconds ago (its process died) can be claimed again.
+        Returns False when another run holds it or it is not in ``statuses``.
+        """
+        now = datetime.utcnow()
+        claimable = ScheduledBroadcast.status.in_(list(statuses))
+        if self.stale_after:
+            claimable = or_(claimable, and_(
+                ScheduledBroadcast.status == BroadcastStatus.SENDING,
+                ScheduledBroadcast.updated_at < now - timedelta(seconds=self.stale_after),
+            ))
+        result = db.execute(
+            update(ScheduledBroadcast)
+            .where(ScheduledBroadcast.id == broadcast_id, claimable)
+            .values(status=BroadcastStatus.SENDING, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return result.rowcount == 1
+
+    async def run(
+        self,
+        broadcast_id: str,
+        message_builder: Callable[[ScheduledBroadcast], Dict[str, Any]],
+        resume: bool = False,
+        claimed: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Send ``broadcast_id``. A SCHEDULED broadcast is claimed here
+        (``resume=True`` also claims FAILED ones); pass ``claimed=True`` when
+        the caller already moved it to SENDING with ``claim``.
+        """
+        stats = DeliveryStats()
+        if not claimed:
+            statuses = [BroadcastStatus.SCHEDULED] + ([BroadcastStatus.FAILED] if resume else [])
+            try:
+                error = await asyncio.to_thread(self._claim, broadcast_id, statuses)
+            except Exception as e:
+                logger.error("Failed to claim broadcast", broadcast_id=broadcast_id, error=str(e))
+                return {"success": False, "error": str(e)}
+            if error:
+                return {"success": False, "error": error}
+
+        # From here on this run holds the claim and must release it
+        try:
+            plan = await asyncio.to_thread(self._start, broadcast_id, message_builder)
+            if plan is None:
+                logger.error("Broadcast not found", broadcast_id=broadcast_id)
+                return {"success": False, "error": "Broadcast not found"}
+
+            channels, message, cursor = plan["channels"], plan["message"], plan["cursor"]
+            previously_sent, resumed_from = plan["previously_sent"], plan["cursor"]
+            while True:
+                rows = await asyncio.to_thread(self._fetch_chunk, plan["query"], cursor)
+                if not rows:
+                    break
+
+                deliveries = await self.deliver_chunk(plan["broadcast_id"], rows, channels, message, stats)
+
+                cursor = rows[-1].id
+                await asyncio.to_thread(self._checkpoint, plan["broadcast_id"], deliveries, cursor,
+                                        previously_sent + stats.total_sent)
+                stats.recipients += len(rows)
+                stats.chunks += 1
+                logger.info("Broadcast chunk delivered",
+                            broadcast_id=broadcast_id, **stats.as_dict())
+
+            if stats.recipients == 0 and resumed_from is None:
+                logger.warning("No target users found for broadcast", broadcast_id=broadcast_id)
+                await asyncio.to_thread(self._set_status, plan["broadcast_id"], BroadcastStatus.FAILED)
+                return {"success": False, "error": "No target users found"}
+
+            total = previously_sent + stats.total_sent
+            await asyncio.to_thread(self._set_status, plan["broadcast_id"], BroadcastStatus.SENT,
+                                    sent_at=datetime.utcnow(), sent_count=total,
+                                    delivered_count=total)  # Will be updated via webhooks
+
+            logger.info("Broadcast sent successfully",
+                        broadcast_id=broadcast_id,
+                        resumed=resumed_from is not None,
+                        **stats.as_dict())
+
+            return {
+                "success": True,
+                "total_sent": stats.total_sent,
+                "delivery_results": dict(stats.sent),
+                "metrics": stats.as_dict(),
+            }
+
+        except Exception as e:
+            logger.error("Failed to send broadcast",
+                         broadcast_id=broadcast_id, error=str(e), **stats.as_dict())
+            # FAILED is claimable again; the cursor of the last committed chunk is kept for resume
+            try:
+                await asyncio.to_thread(self._set_status, broadcast_id, BroadcastStatus.FAILED)
+            except Exception as reset_error:
+                logger.error("Could not mark broadcast failed",
+                             broadcast_id=broadcast_id, error=str(reset_error))
+            return {"success": False, "error": str(e), "metrics": stats.as_dict()}
+
+    # Blocking database steps, run in a worker thread by ``run``
+
+    def _claim(self, broadcast_id, statuses: Sequence[BroadcastStatus]) -> Optional[str]:
+        """None once claimed, otherwise why the run cannot start"""
+        with self.session_factory() as db:
+            if self.claim(db, broadcast_id, statuses):
+                return None
+            if not db.query(ScheduledBroadcast.id).filter(ScheduledBroadcast.id == broadcast_id).first():
+                logger.error("Broadcast not found", broadcast_id=broadcast_id)
+                return "Broadcast not found"
+            logger.warning("Broadcast already processed", broadcast_id=broadcast_id)
+            return "Broadcast already processed"
+
+    def _start(self, broadcast_id, message_builder) -> Optional[Dict[str, Any]]:
+        with self.session_factory() as db:
+            broadcast = db.query(ScheduledBroadcast).filter(ScheduledBroadcast.id == broadcast_id).first()
+            if not broadcast:
+                return None
+
+            channels = self._enabled_channels(broadcast)
+            cursor = broadcast.delivery_cursor
+            return {
+                "broadcast_id": broadcast.id,
+                "channels": channels,
+                "message": message_builder(broadcast),
+                "query": self._recipients_query(broadcast, channels),
+                "cursor": cursor,
+                "previously_sent": (broadcast.sent_count or 0) if cursor is not None else 0,
+            }
+
+    def _fetch_chunk(self, recipients_query, cursor) -> List[Any]:
+        query = recipients_query
+        if cursor is not None:
+            query = query.where(User.id > cursor)
+        with self.session_factory() as db:
+            return db.execute(query.limit(self.chunk_size)).all()
+
+    def _checkpoint(self, broadcast_id, deliveries: List[Dict[str, Any]], cursor, sent_count: int) -> None:
+        with self.session_factory() as db:
+            db.execute(insert(BroadcastDelivery), deliveries)
+            db.execute(
+                update(ScheduledBroadcast)
+                .where(ScheduledBroadcast.id == broadcast_id)
+                .values(delivery_cursor=cursor, sent_count=sent_count, updated_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+
+    def _set_status(self, broadcast_id, status: BroadcastStatus, **values) -> None:
+        with self.session_factory() as db:
+            db.execute(
+                update(ScheduledBroadcast)
+                .where(ScheduledBroadcast.id == broadcast_id)
+                .values(status=status, updated_at=datetime.utcnow(), **values)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+
+    async def deliver_chunk(
+        self,
+        broadcast_id: Any,
+        rows: Sequence[Any],
+        channels: Dict[str, Any],
+        message: Dict[str, Any],
+        stats: Optional[DeliveryStats] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Send one chunk on every channel concurrently.
+
+        ``rows`` need an ``id`` plus the contact attribute of each channel.
+        Returns ``BroadcastDelivery`` insert mappings, one per row.
+        """
+        deliveries = [
+            {"broadcast_id": broadcast_id, "user_id": row.id}
+            for row in rows
+        ]
+
+        outcomes = await asyncio.gather(*(
+            self._send_channel(name, channel, rows, message)
+            for name, channel in channels.items()
+        ))
+
+        for name, (positions, results) in zip(channels, outcomes):
+            flag = CHANNEL_DELIVERY_FLAGS[name]
+            for position, result in zip(positions, results):
+                deliveries[position][flag] = bool(result)
+            if stats is not None:
+                stats.record(name, results)
+
+        return deliveries
+
+    async def _send_channel(
+        self,
+        name: str,
+        channel: Any,
+        rows: Sequence[Any],
+        message: Dict[str, Any],
+    ) -> Tuple[List[int], List[bool]]:
+        contact = CHANNEL_CONTACTS[name]
+        positions: List[int] = []
+        addresses: List[Any] = []
+        for position, row in enumerate(rows):
+            address = getattr(row, contact, None)
+            if address:
+                positions.append(position)
+                addresses.append(str(address) if name == "in_app" else address)
+        if not addresses:
+            return positions, []
+
+        started = time.perf_counter()
+        try:
+            results = await channel.bulk_send(addresses, message)
+        except Exception as e:
+            logger.error("Broadcast channel failed", channel=name, error=str(e))
+            results = [False] * len(addresses)
+        broadcast_chunk_duration.labels(channel=name).observe(time.perf_counter() - started)
+
+        succeeded = sum(1 for result in results if result)
+        broadcast_messages_total.labels(channel=name, success="true").inc(succeeded)
+        broadcast_messages_total.labels(channel=name, success="false").inc(len(results) - succeeded)
+        return positions, list(results)
+
+    def _enabled_channels(self, broadcast: ScheduledBroadcast) -> Dict[str, Any]:
+        enabled = {}
+        for name, channel in self.channels.items():
+            if name == "in_app":
+                wanted = broadcast.show_in_app
+            else:
+                wanted = getattr(broadcast, f"send_{name}", False)
+            if not wanted:
+                continue
+            if not hasattr(User, CHANNEL_CONTACTS[name]):
+                logger.warning("No recipient addresses stored for channel", channel=name)
+                continue
+            enabled[name] = channel
+        return enabled
+
+    @staticmethod
+    def _recipients_query(broadcast: ScheduledBroadcast, channels: Dict[str, Any]):
+        """Keyset-ordered select of the user id and contact columns only."""
+        columns = [User.id]
+        for name in channels:
+            column = getattr(User, CHANNEL_CONTACTS[name])
+            if all(column is not existing for existing in columns):
+                columns.append(column)
+
+        query = select(*columns).where(User.constituency_id == broadcast.constituency_id)
+
+        if not broadcast.target_all:
+            if broadcast.target_roles:
+                query = query.where(User.role.in_(broadcast.target_roles.split(',')))
+
+            if broadcast.target_wards:
+                query = query.where(User.ward_id.in_(broadcast.target_wards.split(',')))
+
+            if broadcast.target_departments:
+                query = query.where(User.department_id.in_(broadcast.target_departments.split(',')))
+
+        return query.order_by(User.id)
@@ -1,6 +1,7 @@
 """Department suggestion service for smart routing of complaints."""
 
-from typing import Optional
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
 from uuid import UUID
 
 from sqlalchemy import select
@@ -8,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.department import Department
 from app.schemas.case_management import DepartmentSuggestion
+from app.services.keyword_matcher import keyword_matcher
 
 
 # Department keywords and categories mapping
@@ -85,6 +87,33 @@ DEPARTMENT_KEYWORDS = {
 }
 
 
+for _category_name, _category_data in DEPARTMENT_KEYWORDS.items():
+    keyword_matcher.register(f"department.{_category_name}", _category_data["keywords"])
+
+
+@lru_cache(maxsize=1024)
+def categories_for_code(dept_code: str) -> Tuple[str, ...]:
+    """Keyword categories whose department codes appear in ``dept_code``."""
+    code = dept_code.lower()
+    return tuple(
+        category_name
+        for category_name, category_data in DEPARTMENT_KEYWORDS.items()
+        if any(known.lower() in code for known in category_data["codes"])
+    )
+
+
+def category_confidences(text: str) -> Dict[str, float]:
+    """Confidence per keyword category for lowercase ``text`` (matched categories only)."""
+    hits = keyword_matcher.scan(text)
+    confidences = {}
+    for category_name, category_data in DEPARTMENT_KEYWORDS.items():
+        keyword_matches = hits.count(f"department.{category_name}")
+        if keyword_matches > 0:
+            match_ratio = keyword_matches / len(category_data["keywords"])
+            confidences[category_name] = min(match_ratio + category_data["confidence_boost"], 1.0)
+    return confidences
+
+
 class DepartmentSuggestionService:
     """Service for suggesting appropriate departments based on complaint content."""
     
@@ -121,6 +150,11 @@ class DepartmentSuggestionService:
         
         combined_text = combined_text.lower()
         
+        # Score every keyword category once, independent of the departments
+        confidences = category_confidences(combined_text)
+        if not confidences:
+            return []
+        
         # Get all departments in the constituency
         result = await self.db.execute(
             select(Department).where(Department.constituency_id == constituency_id)
@@ -131,25 +165,11 @@ class DepartmentSuggestionService:
         suggestions = []
         
         for dept in departments:
-            confidence = 0.0
-            matched_categories = []
-            
-            # Check each category's keywords
-            for category_name, category_data in DEPARTMENT_KEYWORDS.items():
-                # Check if department code matches this category
-                if any(code.lower() in dept.code.lower() for code in category_data["codes"]):
-                    # Count keyword matches
-                    keyword_matches = sum(
-                        1 for keyword in category_data["keywords"]
-                        if keyword in combined_text
-                    )
-                    
-                    if keyword_matches > 0:
-                        # Calculate confidence based on matches
-                        match_ratio = keyword_matches / len(category_data["keywords"])
-                        category_confidence = match_ratio + category_data["confidence_boost"]
-                        confidence = max(confidence, min(category_confidence, 1.0))
-                        matched_categories.append(category_name)
+            matched_categories = [
+                category_name for category_name in categories_for_code(dept.code or "")
+                if category_name in confidences
+            ]
+            confidence = max((confidences[name] for name in matched_categories), default=0.0)
             
             # Add department if it has any confidence
             if confidence > 0.1:
@@ -0,0 +1,249 @@
+"""
+Duplicate detection for complaints: a spatial prefilter in SQL followed by
+an embedding-similarity rerank of the few candidates it returns
+"""
+import asyncio
+import math
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from sqlalchemy import Select, and_, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import duplicate_check_duration
+from app.models.complaint import Complaint, ComplaintStatus
+from app.services.inference import InferenceUnavailable
+from app.services.vector_registry import VectorRegistry, complaint_text, vector_registry
+
+EARTH_RADIUS_METERS = 6_371_000.0
+METERS_PER_DEGREE_LAT = 111_320.0
+
+# Complaints that can still absorb a duplicate
+OPEN_STATUSES = (ComplaintStatus.SUBMITTED, ComplaintStatus.ASSIGNED, ComplaintStatus.IN_PROGRESS)
+
+CANDIDATE_COLUMNS = (
+    Complaint.id, Complaint.title, Complaint.description, Complaint.category, Complaint.lat, Complaint.lng,
+)
+
+
+@dataclass
+class DuplicateMatch:
+    complaint_id: Any
+    distance_meters: float
+    similarity: Optional[float] = None
+
+
+@dataclass
+class DuplicateResult:
+    matches: List[DuplicateMatch] = field(default_factory=list)
+    # "semantic" when reranked by embeddings, "geo" when only distance and category were used
+    mode: str = "geo"
+    candidates: int = 0
+    # The new complaint's normalised vector, when it was embedded
+    vector: Optional[np.ndarray] = None
+
+
+def bounding_box(lat: float, lng: float, radius_meters: float):
+    """(min lat, max lat, min lng, max lng) of a square around the point"""
+    lat_delta = radius_meters / METERS_PER_DEGREE_LAT
+    lng_delta = radius_meters / (METERS_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 0.01))
+    return lat - lat_delta, lat + lat_delta, lng - lng_delta, lng + lng_delta
+
+
+def haversine_meters(lat: float, lng: float, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """Great-circle distance from one point to many"""
+    lat1, lng1 = math.radians(lat), math.radians(lng)
+    lat2, lng2 = np.radians(lats), np.radians(lngs)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_METERS * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class DuplicateEngine:
+    """
+    Finds open complaints that probably report the same problem.
+
+    1. Prefilter in SQL: same constituency, open, not itself a duplicate,
+       filed within ``window_days`` and inside a bounding box of
+       ``radius_meters`` (served by the (lat, lng) index). Exact haversine
+       distance then trims the box to a circle.
+    2. Rerank: the candidates' vectors come from the vector registry (only
+       unseen ones are embedded, in the same call as the new complaint) and
+       are scored in one matrix-vector product.
+
+    Embedding is bounded by ``budget_ms``; when it runs over or fails, or
+    this process has neither the model nor an inference server (an
+    ``APP_ROLE=api`` worker without ``INFERENCE_URL``), candidates in the
+    same category are returned nearest first.
+    An embed that runs over is left to finish in the background, so the
+    candidates it covered are in the registry for the next check.
+    """
+
+    def __init__(self, registry: Optional[VectorRegistry] = None, radius_meters: Optional[float] = None,
+                 window_days: Optional[int] = None, max_candidates: Optional[int] = None,
+                 threshold: Optional[float] = None, budget_ms: Optional[float] = None):
+        self.registry = registry or vector_registry
+        self.radius_meters = radius_meters or getattr(settings, "DUPLICATE_RADIUS_METERS", 200.0)
+        self.window_days = window_days or getattr(settings, "DUPLICATE_WINDOW_DAYS", 30)
+        self.max_candidates = max_candidates or getattr(settings, "DUPLICATE_MAX_CANDIDATES", 50)
+        self.threshold = threshold if threshold is not None else \
+            getattr(settings, "DUPLICATE_SIMILARITY_THRESHOLD", 0.8)
+        self.budget_ms = budget_ms if budget_ms is not None else getattr(settings, "DUPLICATE_CHECK_BUDGET_MS", 30.0)
+        # Embeds still running after their check timed out
+        self._pending: Set[asyncio.Task] = set()
+
+    def candidates_statement(self, constituency_id, lat: float, lng: float, radius_meters: Optional[float] = None,
+                             exclude_id=None, now: Optional[datetime] = None) -> Select:
+        """Open complaints in the bounding box, newest first"""
+        box = bounding_box(lat, lng, radius_meters or self.radius_meters)
+        conditions = self._candidate_conditions(constituency_id, box, now)
+        if exclude_id is not None:
+            conditions.append(Complaint.id != exclude_id)
+        return (
+            select(*CANDIDATE_COLUMNS)
+            .where(and_(*conditions))
+            .order_by(Complaint.created_at.desc())
+            .limit(self.max_candidates)
+        )
+
+    def area_candidates_statement(self, constituency_id, points: Sequence[Tuple[float, float]],
+                                  radius_meters: Optional[float] = None, now: Optional[datetime] = None) -> Select:
+        """Open complaints in one box around all ``points``, newest first"""
+        boxes = [bounding_box(lat, lng, radius_meters or self.radius_meters) for lat, lng in points]
+        box = (min(b[0] for b in boxes), max(b[1] for b in boxes),
+               min(b[2] for b in boxes), max(b[3] for b in boxes))
+        return (
+            select(*CANDIDATE_COLUMNS)
+            .where(and_(*self._candidate_conditions(constituency_id, box, now)))
+            .order_by(Complaint.created_at.desc())
+            .limit(self.max_candidates)
+        )
+
+    def candidates_for_points(self, db: Session, constituency_id, points: Sequence[Tuple[float, float]],
+                              radius_meters: Optional[float] = None) -> List[List]:
+        """
+        Candidate rows for each of many points (a batch of complaints).
+        Points are grouped into radius-sized grid cells and each cell is one
+        query capped at ``max_candidates``, so a batch spread over the
+        constituency costs one small query per neighbourhood.
+        """
+        radius_meters = radius_meters or self.radius_meters
+        step = radius_meters / METERS_PER_DEGREE_LAT
+        cells: Dict[Tuple[int, int], List[int]] = {}
+        for position, (lat, lng) in enumerate(points):
+            cells.setdefault((math.floor(lat / step), math.floor(lng / step)), []).append(position)
+
+        candidates: List[List] = [[] for _ in points]
+        for positions in cells.values():
+            rows = db.execute(self.area_candidates_statement(
+                constituency_id, [points[position] for position in positions], radius_meters
+            )).all()
+            for position in positions:
+                candidates[position] = self.candidates_near(rows, *points[position], radius_meters)
+        return candidates
+
+    def candidates_near(self, rows: Sequence, lat: float, lng: float,
+                        radius_meters: Optional[float] = None) -> List:
+        """The rows inside one point's bounding box, from a wider newest-first set"""
+        min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_meters or self.radius_meters)
+        return [
+            row for row in rows
+            if min_lat <= float(row.lat) <= max_lat and min_lng <= float(row.lng) <= max_lng
+        ][:self.max_candidates]
+
+    def _candidate_conditions(self, constituency_id, box, now: Optional[datetime]) -> list:
+        min_lat, max_lat, min_lng, max_lng = box
+        now = now or datetime.now(tz=timezone.utc)
+        return [
+            Complaint.constituency_id == constituency_id,
+            Complaint.status.in_(OPEN_STATUSES),
+            Complaint.is_duplicate == False,  # noqa: E712
+            Complaint.lat.between(min_lat, max_lat),
+            Complaint.lng.between(min_lng, max_lng),
+            Complaint.created_at >= now - timedelta(days=self.window_days),
+        ]
+
+    async def find(self, db: Session, *, constituency_id, title: str, description: str,
+                   lat: Optional[float], lng: Optional[float], category: Optional[str] = None,
+                   exclude_id=None, radius_meters: Optional[float] = None, limit: int = 5) -> DuplicateResult:
+        """Likely duplicates of a complaint, best first"""
+        if lat is None or lng is None:
+            return DuplicateResult()
+        started = time.perf_counter()
+        lat, lng = float(lat), float(lng)
+        rows = db.execute(
+            self.candidates_statement(constituency_id, lat, lng, radius_meters, exclude_id)
+        ).all()
+        return await self.rank(rows, constituency_id=constituency_id, title=title, description=description,
+                               lat=lat, lng=lng, category=category, radius_meters=radius_meters, limit=limit,
+                               started=started)
+
+    async def rank(self, rows: Sequence, *, constituency_id, title: str, description: str, lat: float,
+                   lng: float, category: Optional[str] = None, radius_meters: Optional[float] = None,
+                   limit: int = 5, started: Optional[float] = None) -> DuplicateResult:
+        """Trim candidate rows (CANDIDATE_COLUMNS) to the radius and rerank them"""
+        started = started or time.perf_counter()
+        radius_meters = radius_meters or self.radius_meters
+        distances = np.zeros(0)
+        if rows:
+            distances = haversine_meters(lat, lng, np.array([float(row.lat) for row in rows]),
+                                         np.array([float(row.lng) for row in rows]))
+            nearby = np.flatnonzero(distances <= radius_meters)
+            rows = [rows[i] for i in nearby]
+            distances = distances[nearby]
+        result = DuplicateResult(candidates=len(rows))
+
+        try:
+            if not self.registry.available:
+                raise InferenceUnavailable("No INFERENCE_URL and no model in this process")
+            matrix, vector = await self._vectors_within_budget(constituency_id, rows, title, description)
+            similarities = matrix @ vector if rows else np.zeros(0)
+        except Exception as e:
+            # The rerank is an enrichment; it never fails the complaint it checks
+            logger.warning("Duplicate check fell back to distance and category",
+                           reason=type(e).__name__, error=str(e), candidates=len(rows))
+            result.matches = [
+                DuplicateMatch(row.id, float(distance))
+                for row, distance in sorted(zip(rows, distances), key=lambda item: item[1])
+                if category and row.category == category
+            ][:limit]
+        else:
+            result.mode, result.vector = "semantic", vector
+            order = np.lexsort((distances, -similarities))
+            result.matches = [
+                DuplicateMatch(rows[i].id, float(distances[i]), float(similarities[i]))
+                for i in order if similarities[i] >= self.threshold
+            ][:limit]
+
+        duplicate_check_duration.labels(mode=result.mode).observe(time.perf_counter() - started)
+        return result
+
+    async def _vectors_within_budget(self, constituency_id, rows: Sequence, title: str, description: str):
+        embed = asyncio.ensure_future(self.registry.vectors_for(
+            constituency_id,
+            {str(row.id): complaint_text(row.title, row.description) for row in rows},
+            complaint_text(title, description),
+        ))
+        self._pending.add(embed)
+        embed.add_done_callback(self._embed_done)
+        # Shielded: a timeout stops the wait, not the embed that warms the registry
+        return await asyncio.wait_for(asyncio.shield(embed), timeout=self.budget_ms / 1000)
+
+    def _embed_done(self, task: asyncio.Task) -> None:
+        self._pending.discard(task)
+        # Retrieve the error so an embed nobody waited for does not log it as unhandled
+        if not task.cancelled():
+            task.exception()
+
+    def remember(self, constituency_id, complaint_id, title: str, description: str,
+                 result: DuplicateResult) -> None:
+        """Keep a new complaint's vector so later checks need not embed it again"""
+        if result.vector is not None:
+            self.registry.put(constituency_id, str(complaint_id), complaint_text(title, description), result.vector)
+
+
+duplicate_engine = DuplicateEngine()
@@ -0,0 +1,235 @@
+"""
+Embedding model backends: full-precision PyTorch, int8 dynamically quantised
+PyTorch, and ONNX Runtime (fp32 or int8) exports of the same models
+"""
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Type
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.lazy import LazyModule
+from app.core.logging import logger
+
+sentence_transformers = LazyModule("sentence_transformers")
+torch = LazyModule("torch")
+transformers = LazyModule("transformers")
+onnxruntime = LazyModule("onnxruntime")
+onnxruntime_quantization = LazyModule("onnxruntime.quantization")
+
+ONNX_MODEL_FILE = "model.onnx"
+ONNX_INT8_MODEL_FILE = "model.int8.onnx"
+POOLING_FILE = "pooling.json"
+
+
+class InferenceUnavailable(RuntimeError):
+    """The model could not be loaded, or the inference server did not answer"""
+
+
+def onnx_model_dir(model_name: str, root: Optional[str] = None) -> Path:
+    """Where the ONNX export of ``model_name`` lives under EMBEDDING_ONNX_DIR"""
+    root = root or getattr(settings, "EMBEDDING_ONNX_DIR", "./models/onnx")
+    return Path(root) / re.sub(r"[^A-Za-z0-9_.-]+", "--", model_name)
+
+
+class SentenceEncoder:
+    """The sentence-transformer model in full precision, loaded once per process on first use"""
+
+    backend = "torch"
+
+    def __init__(self, model_name: Optional[str] = None):
+        self.model_name = model_name or getattr(settings, "EMBEDDING_MODEL", "paraphrase-multilingual-mpnet-base-v2")
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    def _build_model(self):
+        return sentence_transformers.SentenceTransformer(self.model_name, device="cpu")
+
+    def load(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    try:
+                        self._model = self._build_model()
+                    except Exception as e:
+                        raise InferenceUnavailable(
+                            f"Embedding model {self.model_name} ({self.backend}) is not available: {e}"
+                        ) from e
+                    logger.info("Embedding model loaded", model=self.model_name, backend=self.backend,
+                                dimension=self._model.get_sentence_embedding_dimension())
+        return self._model
+
+    @property
+    def dimension(self) -> int:
+        return self.load().get_sentence_embedding_dimension()
+
+    def encode_batch(self, texts: List[str]) -> np.ndarray:
+        vectors = self.load().encode(texts, batch_size=len(texts), convert_to_numpy=True)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+class QuantizedSentenceEncoder(SentenceEncoder):
+    """
+    The same model with its Linear layers dynamically quantised to int8.
+    Needs no export step; weights shrink about 4x and matrix multiplies run
+    on int8 kernels, at a small cost in similarity accuracy.
+    """
+
+    backend = "torch-int8"
+
+    def _build_model(self):
+        model = super()._build_model()
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+class OnnxSentenceModel:
+    """
+    Tokenizer, ONNX Runtime session and pooling for an exported model, with
+    the ``encode`` / ``get_sentence_embedding_dimension`` surface of a
+    SentenceTransformer.
+    """
+
+    def __init__(self, tokenizer, session, pooling: Dict):
+        self.tokenizer = tokenizer
+        self.session = session
+        self.pooling = pooling
+        self.input_names = {model_input.name for model_input in session.get_inputs()}
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.pooling["dimension"]
+
+    def encode(self, texts: List[str], batch_size: int = 32, convert_to_numpy: bool = True) -> np.ndarray:
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            encoded = self.tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.pooling.get("max_seq_length", 128),
+                return_tensors="np",
+            )
+            feed = {name: np.asarray(value, dtype=np.int64) for name, value in encoded.items()
+                    if name in self.input_names}
+            token_embeddings = self.session.run(None, feed)[0]
+            batches.append(pool(token_embeddings, feed["attention_mask"], self.pooling))
+        return np.concatenate(batches) if batches else np.zeros((0, self.pooling["dimension"]), np.float32)
+
+
+def pool(token_embeddings: np.ndarray, attention_mask: np.ndarray, pooling: Dict) -> np.ndarray:
+    """Sentence vectors from token vectors, as the exported model's pooling layer did"""
+    if pooling.get("mode", "mean") == "cls":
+        vectors = token_embeddings[:, 0]
+    else:
+        mask = attention_mask[..., None].astype(token_embeddings.dtype)
+        vectors = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+    if pooling.get("normalize"):
+        vectors = vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+    return vectors.astype(np.float32)
+
+
+class OnnxSentenceEncoder(SentenceEncoder):
+    """
+    The model exported by scripts/export_embedding_model.py, run with ONNX
+    Runtime on the CPU execution provider (no PyTorch import at all).
+    """
+
+    backend = "onnx"
+    model_file = ONNX_MODEL_FILE
+
+    def __init__(self, model_name: Optional[str] = None, model_dir: Optional[str] = None):
+        super().__init__(model_name)
+        self.model_dir = Path(model_dir) if model_dir else onnx_model_dir(self.model_name)
+
+    def _build_model(self):
+        path = self.model_dir / self.model_file
+        if not path.exists():
+            raise FileNotFoundError(f"{path} not found; run scripts/export_embedding_model.py")
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        session = onnxruntime.InferenceSession(str(path), options, providers=["CPUExecutionProvider"])
+        tokenizer = transformers.AutoTokenizer.from_pretrained(str(self.model_dir))
+        pooling = json.loads((self.model_dir / POOLING_FILE).read_text())
+        return OnnxSentenceModel(tokenizer, session, pooling)
+
+
+class QuantizedOnnxSentenceEncoder(OnnxSentenceEncoder):
+    """The ONNX export with int8 dynamically quantised weights"""
+
+    backend = "onnx-int8"
+    model_file = ONNX_INT8_MODEL_FILE
+
+
+# EMBEDDING_BACKEND values
+EMBEDDING_BACKENDS: Dict[str, Type[SentenceEncoder]] = {
+    "torch": SentenceEncoder,
+    "torch-int8": QuantizedSentenceEncoder,
+    "onnx": OnnxSentenceEncoder,
+    "onnx-int8": QuantizedOnnxSentenceEncoder,
+}
+
+
+def build_encoder(backend: Optional[str] = None, model_name: Optional[str] = None) -> SentenceEncoder:
+    """Encoder for ``backend`` (default EMBEDDING_BACKEND)"""
+    backend = backend or getattr(settings, "EMBEDDING_BACKEND", "torch")
+    try:
+        encoder_class = EMBEDDING_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(
+            f"EMBEDDING_BACKEND must be one of {', '.join(EMBEDDING_BACKENDS)}, not {backend!r}"
+        ) from None
+    return encoder_class(model_name)
+
+
+def export_onnx_model(model_name: str, output_dir: Optional[Path] = None, quantize: bool = True,
+                      opset: int = 14) -> Path:
+    """
+    Export a SentenceTransformer's transformer to ONNX, alongside its
+    tokenizer and pooling settings, and optionally an int8 copy quantised
+    with ONNX Runtime. Returns the export directory.
+    """
+    output_dir = Path(output_dir) if output_dir else onnx_model_dir(model_name)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    model = sentence_transformers.SentenceTransformer(model_name, device="cpu")
+    transformer = model[0]
+    pooling_module = next((module for module in model if type(module).__name__ == "Pooling"), None)
+    pooling = {
+        "mode": "cls" if pooling_module is not None and pooling_module.pooling_mode_cls_token else "mean",
+        "normalize": any(type(module).__name__ == "Normalize" for module in model),
+        "dimension": model.get_sentence_embedding_dimension(),
+        "max_seq_length": model.max_seq_length,
+    }
+
+    sample = transformer.tokenizer(["sample"], return_tensors="pt")
+    transformer.auto_model.eval()
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer.auto_model,
+            (sample["input_ids"], sample["attention_mask"]),
+            str(output_dir / ONNX_MODEL_FILE),
+            input_names=["input_ids", "attention_mask"],
+            output_names=["last_hidden_state"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "last_hidden_state": {0: "batch", 1: "sequence"},
+            },
+            opset_version=opset,
+        )
+    transformer.tokenizer.save_pretrained(str(output_dir))
+    (output_dir / POOLING_FILE).write_text(json.dumps(pooling, indent=2))
+
+    if quantize:
+        onnxruntime_quantization.quantize_dynamic(
+            str(output_dir / ONNX_MODEL_FILE),
+            str(output_dir / ONNX_INT8_MODEL_FILE),
+            weight_type=onnxruntime_quantization.QuantType.QInt8,
+        )
+    return output_dir
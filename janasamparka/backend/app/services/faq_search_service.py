@@ -0,0 +1,282 @@
+"""In-memory inverted index with BM25 ranking for FAQ knowledge-base search."""
+
+import math
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.logging import logger
+from app.models.faq import FAQSolution
+from app.services.predictive_planning_service import multilingual_normalizer
+
+
+@dataclass
+class _IndexedFAQ:
+    """Per-document bookkeeping needed to remove or re-score an FAQ."""
+
+    constituency_id: Optional[UUID]
+    category: str
+    term_freqs: Dict[str, float]
+    length: float
+
+
+@dataclass
+class _Shard:
+    """Inverted index for a single constituency."""
+
+    postings: Dict[str, Dict[UUID, float]] = field(default_factory=lambda: defaultdict(dict))
+    total_length: float = 0.0
+    doc_count: int = 0
+
+    @property
+    def avg_length(self) -> float:
+        return self.total_length / self.doc_count if self.doc_count else 0.0
+
+
+class FAQSearchIndex:
+    """
+    Per-constituency inverted index over FAQ keywords, titles and Kannada titles.
+
+    Documents and queries go through the same ``MultilingualNormalizer`` so
+    transliterated Kannada and misspellings land on the same terms. Scores
+    use BM25 with per-field weights (keywords count more than titles).
+    The index is process-local; once it ``is_stale``, callers start
+    :meth:`refresh_in_background` to pick up edits made by other workers
+    and keep searching the current contents until the rebuild swaps in.
+    Upserts and removes made while a rebuild loads are replayed onto the
+    new contents before the swap, so the rebuild never undoes them.
+    """
+
+    K1 = 1.5
+    B = 0.75
+    FIELD_WEIGHTS = {
+        "question_keywords": 2.0,
+        "title": 1.0,
+        "kannada_title": 1.0,
+    }
+
+    def __init__(self, max_age_seconds: float = 300.0):
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.RLock()
+        self._shards: Dict[Optional[UUID], _Shard] = {}
+        self._docs: Dict[UUID, _IndexedFAQ] = {}
+        self._built_at: Optional[float] = None
+        self._refresh: Optional[threading.Thread] = None
+        # FAQ ids upserted or removed since each running rebuild started loading
+        self._rebuilds: List[Set[UUID]] = []
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._built_at is not None
+
+    @property
+    def is_stale(self) -> bool:
+        if self._built_at is None:
+            return True
+        return time.monotonic() - self._built_at > self.max_age_seconds
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def build(self, faqs: Iterable[FAQSolution]) -> None:
+        """Replace the index contents with the given FAQs."""
+        self._rebuild(lambda: faqs)
+
+    def _rebuild(self, load: Callable[[], Iterable[FAQSolution]]) -> None:
+        touched: Set[UUID] = set()
+        with self._lock:
+            self._rebuilds.append(touched)
+        try:
+            documents = {faq.id: self._analyze(faq) for faq in load()}
+
+            shards: Dict[Optional[UUID], _Shard] = {}
+            for faq_id, doc in documents.items():
+                self._add_to_shard(shards.setdefault(doc.constituency_id, _Shard()), faq_id, doc)
+
+            with self._lock:
+                # The live index is newer than the loaded rows for anything edited meanwhile
+                for faq_id in touched:
+                    self._discard(shards, documents, faq_id)
+                    doc = self._docs.get(faq_id)
+                    if doc is not None:
+                        documents[faq_id] = doc
+                        self._add_to_shard(shards.setdefault(doc.constituency_id, _Shard()), faq_id, doc)
+                self._shards = shards
+                self._docs = documents
+                self._built_at = time.monotonic()
+        finally:
+            with self._lock:
+                self._rebuilds = [ids for ids in self._rebuilds if ids is not touched]
+
+    def refresh_in_background(self, load: Optional[Callable[[], Iterable[FAQSolution]]] = None) -> bool:
+        """
+        Rebuild from ``load()`` (every FAQ by default) in a daemon thread.
+        Returns False when a rebuild is already running.
+        """
+        with self._lock:
+            if self._refresh is not None and self._refresh.is_alive():
+                return False
+            self._refresh = threading.Thread(
+                target=self._run_refresh, args=(load or load_faqs,), name="faq-index-refresh", daemon=True
+            )
+            self._refresh.start()
+        return True
+
+    def _run_refresh(self, load: Callable[[], Iterable[FAQSolution]]) -> None:
+        try:
+            self._rebuild(load)
+        except Exception as e:
+            logger.warning("FAQ search index refresh failed", error=str(e))
+        else:
+            logger.info("FAQ search index rebuilt", faqs=len(self))
+
+    def upsert(self, faq: FAQSolution) -> None:
+        """Add a new FAQ or re-index an edited one."""
+        doc = self._analyze(faq)
+        with self._lock:
+            self._remove_locked(faq.id)
+            self._docs[faq.id] = doc
+            self._add_to_shard(self._shards.setdefault(doc.constituency_id, _Shard()), faq.id, doc)
+
+    def remove(self, faq_id: UUID) -> None:
+        """Drop an FAQ from the index (no-op if it is not indexed)."""
+        with self._lock:
+            self._remove_locked(faq_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._shards = {}
+            self._docs = {}
+            self._built_at = None
+
+    # ------------------------------------------------------------------
+    # Query
+    # ------------------------------------------------------------------
+
+    def search(
+        self,
+        query: str,
+        constituency_id: Optional[UUID] = None,
+        category: Optional[str] = None,
+        limit: int = 10,
+    ) -> List[Tuple[UUID, float]]:
+        """
+        Return ``(faq_id, bm25_score)`` pairs, best first.
+
+        ``constituency_id=None`` searches every constituency; each shard is
+        scored with its own corpus statistics.
+        """
+        terms = self.tokenize(query)
+        if not terms:
+            return []
+
+        with self._lock:
+            if constituency_id is None:
+                shards = list(self._shards.values())
+            else:
+                shard = self._shards.get(constituency_id)
+                shards = [shard] if shard else []
+
+            scores: Dict[UUID, float] = defaultdict(float)
+            for shard in shards:
+                self._score_shard(shard, terms, scores)
+
+            if category:
+                scores = {
+                    faq_id: score for faq_id, score in scores.items()
+                    if self._docs[faq_id].category == category
+                }
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:limit]
+
+    @staticmethod
+    def tokenize(text: Optional[str]) -> List[str]:
+        """Normalize text into index terms."""
+        if not text:
+            return []
+        return multilingual_normalizer.normalize_text(text.replace(",", " ")).split()
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _analyze(self, faq: FAQSolution) -> _IndexedFAQ:
+        term_freqs: Dict[str, float] = defaultdict(float)
+        length = 0.0
+        for field_name, weight in self.FIELD_WEIGHTS.items():
+            for term in self.tokenize(getattr(faq, field_name, None)):
+                term_freqs[term] += weight
+                length += weight
+        return _IndexedFAQ(
+            constituency_id=faq.constituency_id,
+            category=faq.category,
+            term_freqs=dict(term_freqs),
+            length=length,
+        )
+
+    @staticmethod
+    def _add_to_shard(shard: _Shard, faq_id: UUID, doc: _IndexedFAQ) -> None:
+        for term, freq in doc.term_freqs.items():
+            shard.postings[term][faq_id] = freq
+        shard.total_length += doc.length
+        shard.doc_count += 1
+
+    def _remove_locked(self, faq_id: UUID) -> None:
+        for touched in self._rebuilds:
+            touched.add(faq_id)
+        self._discard(self._shards, self._docs, faq_id)
+
+    @staticmethod
+    def _discard(shards: Dict[Optional[UUID], _Shard], docs: Dict[UUID, _IndexedFAQ], faq_id: UUID) -> None:
+        doc = docs.pop(faq_id, None)
+        if doc is None:
+            return
+        shard = shards.get(doc.constituency_id)
+        if shard is None:
+            return
+        for term in doc.term_freqs:
+            postings = shard.postings.get(term)
+            if postings is not None:
+                postings.pop(faq_id, None)
+                if not postings:
+                    del shard.postings[term]
+        shard.total_length -= doc.length
+        shard.doc_count -= 1
+        if shard.doc_count <= 0:
+            del shards[doc.constituency_id]
+
+    def _score_shard(self, shard: _Shard, terms: List[str], scores: Dict[UUID, float]) -> None:
+        avg_length = shard.avg_length or 1.0
+        for term in set(terms):
+            postings = shard.postings.get(term)
+            if not postings:
+                continue
+            doc_freq = len(postings)
+            idf = math.log(1 + (shard.doc_count - doc_freq + 0.5) / (doc_freq + 0.5))
+            for faq_id, freq in postings.items():
+                norm = self.K1 * (1 - self.B + self.B * self._docs[faq_id].length / avg_length)
+                scores[faq_id] += idf * freq * (self.K1 + 1) / (freq + norm)
+
+
+def load_faqs() -> List[FAQSolution]:
+    """Every FAQ, read in a session of its own (for rebuilds off the request path)"""
+    with SessionLocal() as db:
+        return list(db.scalars(select(FAQSolution)).all())
+
+
+# Shared, process-wide index
+faq_search_index = FAQSearchIndex(
+    max_age_seconds=getattr(settings, "FAQ_INDEX_MAX_AGE_SECONDS", 300)
+)
@@ -1,24 +1,32 @@
 """
 Enhanced file upload service with cloud storage and optimization
 """
+import asyncio
 import os
 import uuid
 import hashlib
 from typing import Optional, Dict, Any, List, BinaryIO
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
-from PIL import Image, ImageOps
-import io
 import mimetypes
 
-import boto3
-from botocore.exceptions import ClientError, NoCredentialsError
 import aiofiles
 import aiofiles.os
+from fastapi import UploadFile
 
 from app.core.config import settings
 from app.core.logging import logger
 from app.core.metrics import metrics_collector
+from app.core.database import SessionLocal
+from app.core.lazy import LazyModule
+from app.core.uploads import SpooledUpload, UploadTooLarge, receive_upload, spool_bytes
+from app.models.complaint import MediaBlob
+from app.services.image_pipeline import image_pipeline
+from app.services.media_store import media_store
+
+# The AWS SDK is only imported when S3 storage is configured
+boto3 = LazyModule("boto3")
+botocore_exceptions = LazyModule("botocore.exceptions")
 
 
 class FileUploadService:
@@ -33,6 +41,11 @@ class FileUploadService:
         (self.upload_dir / "profile_photos").mkdir(exist_ok=True)
         (self.upload_dir / "documents").mkdir(exist_ok=True)
         
+        # Uploads are spooled here before being moved into place
+        self.incoming_dir = self.upload_dir / ".incoming"
+        self.incoming_dir.mkdir(exist_ok=True)
+        self.session_factory = SessionLocal
+        
         # Initialize S3 client if configured
         self.s3_client = None
         self.s3_bucket = None
@@ -119,66 +132,6 @@ class FileUploadService:
         """Calculate SHA-256 hash of file content"""
         return hashlib.sha256(file_content).hexdigest()
     
-    async def _optimize_image(self, file_content: bytes, filename: str) -> bytes:
-        """Optimize image for web"""
-        try:
-            # Open image
-            image = Image.open(io.BytesIO(file_content))
-            
-            # Convert to RGB if necessary
-            if image.mode in ('RGBA', 'P'):
-                image = image.convert('RGB')
-            
-            # Auto-orient image based on EXIF data
-            image = ImageOps.exif_transpose(image)
-            
-            # Resize if too large (max 1920x1080)
-            max_width, max_height = 1920, 1080
-            if image.width > max_width or image.height > max_height:
-                image.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
-            
-            # Optimize and save
-            output = io.BytesIO()
-            
-            # Determine format
-            ext = Path(filename).suffix.lower()
-            if ext in ['.jpg', '.jpeg']:
-                image.save(output, format='JPEG', quality=85, optimize=True)
-            elif ext == '.png':
-                image.save(output, format='PNG', optimize=True)
-            elif ext == '.webp':
-                image.save(output, format='WEBP', quality=85, optimize=True)
-            else:
-                # Default to JPEG
-                image.save(output, format='JPEG', quality=85, optimize=True)
-            
-            return output.getvalue()
-            
-        except Exception as e:
-            logger.error("Failed to optimize image", filename=filename, error=str(e))
-            return file_content
-    
-    async def _generate_thumbnail(self, file_content: bytes, filename: str) -> bytes:
-        """Generate thumbnail for image"""
-        try:
-            image = Image.open(io.BytesIO(file_content))
-            
-            # Convert to RGB if necessary
-            if image.mode in ('RGBA', 'P'):
-                image = image.convert('RGB')
-            
-            # Create thumbnail (300x300)
-            image.thumbnail((300, 300), Image.Resampling.LANCZOS)
-            
-            output = io.BytesIO()
-            image.save(output, format='JPEG', quality=80, optimize=True)
-            
-            return output.getvalue()
-            
-        except Exception as e:
-            logger.error("Failed to generate thumbnail", filename=filename, error=str(e))
-            return None
-    
     async def _save_local(self, file_content: bytes, filename: str, 
                          subdirectory: str = "media") -> str:
         """Save file to local storage"""
@@ -218,7 +171,30 @@ class FileUploadService:
             
             return url
             
-        except ClientError as e:
+        except botocore_exceptions.ClientError as e:
+            logger.error("Failed to upload file to S3", filename=filename, error=str(e))
+            raise
+    
+    async def _save_s3_file(self, path: Path, filename: str, content_type: str) -> str:
+        """Stream a file on disk to S3 (multipart for large files) without buffering it"""
+        if not self.s3_client:
+            raise Exception("S3 client not initialized")
+        
+        try:
+            await asyncio.to_thread(
+                self.s3_client.upload_file,
+                str(path),
+                self.s3_bucket,
+                filename,
+                ExtraArgs={
+                    'ContentType': content_type,
+                    'ACL': 'private',
+                    'Metadata': {'upload_time': datetime.utcnow().isoformat()}
+                }
+            )
+            return f"https://{self.s3_bucket}.s3.amazonaws.com/{filename}"
+            
+        except botocore_exceptions.ClientError as e:
             logger.error("Failed to upload file to S3", filename=filename, error=str(e))
             raise
     
@@ -228,103 +204,96 @@ class FileUploadService:
         """Upload file with optimization and validation"""
         start_time = datetime.utcnow()
         
+        # Validate file
+        validation = self._validate_file(filename, len(file_content))
+        if not validation["valid"]:
+            metrics_collector.record_file_upload(
+                validation.get("file_type", "unknown"), 
+                False, len(file_content)
+            )
+            return {
+                "success": False,
+                "error": validation["error"]
+            }
+        
+        upload = await spool_bytes(file_content, self.incoming_dir, filename)
+        return await self._store(upload, filename, validation["file_type"], subdirectory, optimize, start_time)
+    
+    async def upload_stream(self, file: UploadFile, subdirectory: str = "media",
+                            optimize: bool = True) -> Dict[str, Any]:
+        """
+        Upload a multipart file without reading it into memory: it is copied
+        to a temporary file in chunks, with the size limit and SHA-256
+        checked while reading
+        """
+        start_time = datetime.utcnow()
+        filename = file.filename or ""
+        
+        validation = self._validate_file(filename, 0)
+        if not validation["valid"]:
+            metrics_collector.record_file_upload("unknown", False, 0)
+            return {
+                "success": False,
+                "error": validation["error"]
+            }
+        
+        file_type = validation["file_type"]
+        max_size = self.max_file_sizes.get(file_type, 5 * 1024 * 1024)
+        try:
+            upload = await receive_upload(file, self.incoming_dir, max_size)
+        except UploadTooLarge:
+            metrics_collector.record_file_upload(file_type, False, max_size)
+            return {
+                "success": False,
+                "error": f"File size exceeds limit of {max_size // (1024*1024)}MB for {file_type} files"
+            }
+        
+        return await self._store(upload, filename, file_type, subdirectory, optimize, start_time)
+    
+    async def _store(self, upload: SpooledUpload, filename: str, file_type: str,
+                     subdirectory: str, optimize: bool, start_time: datetime) -> Dict[str, Any]:
+        """
+        Save a spooled upload under its SHA-256; the temp file is always removed.
+        Identical uploads share one stored copy and are only optimized once.
+        """
         try:
-            # Validate file
-            validation = self._validate_file(filename, len(file_content))
-            if not validation["valid"]:
-                metrics_collector.record_file_upload(
-                    validation.get("file_type", "unknown"), 
-                    False, len(file_content)
-                )
-                return {
-                    "success": False,
-                    "error": validation["error"]
-                }
-            
-            file_type = validation["file_type"]
-            
-            # Calculate file hash
-            file_hash = self._calculate_file_hash(file_content)
-            
-            # Generate unique filename
-            unique_filename = self._generate_filename(filename, file_type)
-            
-            # Optimize if it's an image
-            optimized_content = file_content
-            thumbnail_content = None
-            
-            if file_type == "image" and optimize:
-                optimized_content = await self._optimize_image(file_content, filename)
-                thumbnail_content = await self._generate_thumbnail(optimized_content, filename)
-            
-            # Determine content type
-            content_type, _ = mimetypes.guess_type(filename)
-            if not content_type:
-                content_type = "application/octet-stream"
-            
-            # Save to storage
             if self.s3_client:
-                # Use S3
-                file_url = await self._save_s3(optimized_content, unique_filename, content_type)
-                
-                # Save thumbnail if generated
-                thumbnail_url = None
-                if thumbnail_content:
-                    thumb_filename = f"thumb_{unique_filename}"
-                    thumbnail_url = await self._save_s3(thumbnail_content, thumb_filename, "image/jpeg")
-                
-                storage_type = "s3"
+                result = await self._store_s3(upload, filename, file_type, optimize)
             else:
-                # Use local storage
-                file_path = await self._save_local(optimized_content, unique_filename, subdirectory)
-                file_url = f"/uploads/{subdirectory}/{unique_filename}"
-                
-                # Save thumbnail if generated
-                thumbnail_url = None
-                if thumbnail_content:
-                    thumb_filename = f"thumb_{unique_filename}"
-                    thumb_path = await self._save_local(thumbnail_content, thumb_filename, subdirectory)
-                    thumbnail_url = f"/uploads/{subdirectory}/{thumb_filename}"
-                
-                storage_type = "local"
+                result = await self._store_local(upload, filename, file_type, optimize)
             
             # Calculate metrics
             duration = (datetime.utcnow() - start_time).total_seconds()
-            original_size = len(file_content)
-            final_size = len(optimized_content)
+            original_size = upload.size
+            final_size = result["file_size"]
             compression_ratio = (1 - final_size / original_size) * 100 if original_size > 0 else 0
             
             # Record metrics
             metrics_collector.record_file_upload(file_type, True, final_size)
             
-            result = {
+            result.update({
                 "success": True,
-                "filename": unique_filename,
                 "original_filename": filename,
                 "file_type": file_type,
-                "file_size": final_size,
                 "original_size": original_size,
                 "compression_ratio": round(compression_ratio, 2),
-                "file_hash": file_hash,
-                "content_type": content_type,
-                "url": file_url,
-                "thumbnail_url": thumbnail_url,
-                "storage_type": storage_type,
+                "file_hash": upload.sha256,
                 "upload_time": datetime.utcnow().isoformat(),
                 "duration_ms": round(duration * 1000, 2)
-            }
+            })
             
             logger.info("File uploaded successfully", 
-                       filename=unique_filename, 
+                       filename=result["filename"], 
                        file_type=file_type,
                        size_kb=round(final_size / 1024, 2),
-                       storage=storage_type)
+                       storage=result["storage_type"],
+                       deduplicated=result["deduplicated"])
             
             return result
             
         except Exception as e:
             duration = (datetime.utcnow() - start_time).total_seconds()
-            metrics_collector.record_file_upload("unknown", False, len(file_content))
+            metrics_collector.record_file_upload("unknown", False, upload.size)
             
             logger.error("File upload failed", 
                         filename=filename, 
@@ -335,12 +304,104 @@ class FileUploadService:
                 "success": False,
                 "error": f"Upload failed: {str(e)}"
             }
+        finally:
+            upload.discard()
+    
+    async def _store_local(self, upload: SpooledUpload, filename: str, file_type: str,
+                           optimize: bool) -> Dict[str, Any]:
+        """Reference-counted, content-addressed local storage (see MediaBlobStore)"""
+        db = self.session_factory()
+        try:
+            existing = db.get(MediaBlob, upload.sha256)
+            deduplicated = existing is not None and media_store.file_path(existing.path).exists()
+            blob = await media_store.put(db, upload, Path(filename).suffix,
+                                         process_images=file_type == "image" and optimize)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        
+        return {
+            "filename": Path(blob.path).name,
+            "file_size": blob.size,
+            "content_type": blob.content_type,
+            "url": media_store.url(blob.path),
+            "thumbnail_url": media_store.rendition_url(blob, "thumbnail"),
+            "storage_type": "local",
+            "deduplicated": deduplicated,
+        }
+    
+    async def _store_s3(self, upload: SpooledUpload, filename: str, file_type: str,
+                        optimize: bool) -> Dict[str, Any]:
+        """Content-addressed S3 keys: an object already stored for the same bytes is reused"""
+        optimized_content = None
+        thumbnail_content = None
+        suffix = Path(filename).suffix.lower()
+        
+        # Optimize if it's an image: the shared pipeline decodes the spooled
+        # file once in a worker process and returns the optimized JPEG plus a thumbnail
+        if file_type == "image" and optimize:
+            try:
+                processed = await image_pipeline.process(str(upload.path), webp=False)
+                optimized_content = processed.get("full").content
+                thumbnail_content = processed.get("thumbnail").content
+                suffix = ".jpg"
+            except Exception as e:
+                logger.error("Failed to optimize image", filename=filename, error=str(e))
+        
+        key = media_store.relative_path(upload.sha256, suffix)
+        content_type = mimetypes.guess_type(key)[0] or "application/octet-stream"
+        deduplicated = await self._s3_exists(key)
+        
+        if deduplicated:
+            file_url = f"https://{self.s3_bucket}.s3.amazonaws.com/{key}"
+        elif optimized_content is not None:
+            file_url = await self._save_s3(optimized_content, key, content_type)
+        else:
+            file_url = await self._save_s3_file(upload.path, key, content_type)
+        
+        # Save thumbnail if generated
+        thumbnail_url = None
+        if thumbnail_content:
+            thumb_key = media_store.relative_path(upload.sha256, ".jpg", "thumb_")
+            thumbnail_url = f"https://{self.s3_bucket}.s3.amazonaws.com/{thumb_key}"
+            if not deduplicated:
+                thumbnail_url = await self._save_s3(thumbnail_content, thumb_key, "image/jpeg")
+        
+        return {
+            "filename": Path(key).name,
+            "file_size": len(optimized_content) if optimized_content is not None else upload.size,
+            "content_type": content_type,
+            "url": file_url,
+            "thumbnail_url": thumbnail_url,
+            "storage_type": "s3",
+            "deduplicated": deduplicated,
+        }
+    
+    async def _s3_exists(self, key: str) -> bool:
+        try:
+            await asyncio.to_thread(self.s3_client.head_object, Bucket=self.s3_bucket, Key=key)
+            return True
+        except botocore_exceptions.ClientError:
+            return False
     
     async def delete_file(self, filename: str, storage_type: str = "local") -> bool:
-        """Delete file from storage"""
+        """
+        Delete file from storage. Content-addressed local files drop one
+        reference; the bytes go once no upload refers to them
+        """
         try:
             if storage_type == "s3" and self.s3_client:
                 self.s3_client.delete_object(Bucket=self.s3_bucket, Key=filename)
+            elif media_store.sha_from_name(Path(filename).name):
+                db = self.session_factory()
+                try:
+                    media_store.release(db, media_store.sha_from_name(Path(filename).name))
+                    db.commit()
+                finally:
+                    db.close()
             else:
                 # Local storage
                 file_path = self.upload_dir / filename
@@ -385,21 +446,24 @@ class FileUploadService:
             return None
     
     async def cleanup_old_files(self, days: int = 30) -> int:
-        """Clean up files older than specified days"""
+        """
+        Remove media blobs that have been unreferenced for ``days`` days,
+        plus abandoned spooled uploads. Driven by media_blobs reference
+        counts, so the upload tree itself is never walked.
+        """
         try:
-            cutoff_date = datetime.utcnow() - timedelta(days=days)
-            deleted_count = 0
-            
-            # Walk through upload directory
-            for root, dirs, files in os.walk(self.upload_dir):
-                for file in files:
-                    file_path = Path(root) / file
-                    
-                    # Check file age
-                    file_mtime = datetime.fromtimestamp(file_path.stat().st_mtime)
-                    if file_mtime < cutoff_date:
-                        await aiofiles.os.remove(file_path)
-                        deleted_count += 1
+            db = self.session_factory()
+            try:
+                deleted_count = await asyncio.to_thread(media_store.collect_garbage, db, days * 24 * 3600)
+            finally:
+                db.close()
+            
+            # Spooled uploads live for one request; anything older was abandoned
+            cutoff = datetime.utcnow().timestamp() - 24 * 3600
+            for entry in os.scandir(self.incoming_dir):
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                    deleted_count += 1
             
             logger.info("Old files cleaned up", deleted_count=deleted_count, days=days)
             return deleted_count
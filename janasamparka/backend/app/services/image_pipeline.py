@@ -0,0 +1,86 @@
+"""
+Off-loop image processing: uploads are decoded and resized in a process pool
+"""
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Optional, Union
+
+from app.core.config import settings
+from app.core.image_processing import ProcessedImage, process_image
+from app.core.logging import logger
+from app.core.metrics import image_processing_duration, image_processing_in_flight
+
+
+class ImagePipeline:
+    """
+    Run :func:`process_image` off the event loop.
+
+    Work goes to a ``ProcessPoolExecutor`` of ``workers`` processes (Pillow
+    holds the GIL for most of a resize, so threads would serialise). With
+    ``workers=0`` images are processed in a thread instead, for tests and
+    single-core deployments. At most ``max_pending`` images are queued or
+    running at once; further uploads wait on the semaphore rather than
+    piling decoded bitmaps into worker memory.
+    """
+
+    def __init__(self, workers: int = 2, max_pending: Optional[int] = None, webp: bool = False):
+        self.workers = workers
+        self.max_pending = max_pending or max(workers, 1) * 2
+        self.webp = webp
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers > 0 and self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    async def process(self, source: Union[bytes, str, Path], webp: Optional[bool] = None) -> ProcessedImage:
+        """Produce every rendition of ``source`` (bytes or a path) without blocking the loop"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_pending)
+        webp = self.webp if webp is None else webp
+
+        queued = time.perf_counter()
+        async with self._semaphore:
+            image_processing_duration.labels(stage='queue_wait').observe(time.perf_counter() - queued)
+            image_processing_in_flight.inc()
+            started = time.perf_counter()
+            try:
+                result = await self._run(source, webp)
+            finally:
+                image_processing_in_flight.dec()
+
+        image_processing_duration.labels(stage='total').observe(time.perf_counter() - started)
+        for stage, seconds in result.timings.items():
+            image_processing_duration.labels(stage=stage).observe(seconds)
+        return result
+
+    async def _run(self, source: Union[bytes, str, Path], webp: bool) -> ProcessedImage:
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        if executor is None:
+            return await asyncio.to_thread(process_image, source, webp)
+        try:
+            return await loop.run_in_executor(executor, process_image, source, webp)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM on a decompression bomb); start a fresh pool
+            logger.error("Image worker pool broke, restarting")
+            self._executor = None
+            raise
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Global pipeline instance; the pool starts on first use
+image_pipeline = ImagePipeline(
+    workers=getattr(settings, 'IMAGE_WORKERS', 2),
+    max_pending=getattr(settings, 'IMAGE_MAX_PENDING', None),
+    webp=getattr(settings, 'IMAGE_WEBP_RENDITIONS', False),
+)
@@ -0,0 +1,220 @@
+"""
+Sentence-embedding inference: one model per process, micro-batched, and
+optionally moved into a dedicated inference server
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import httpx
+import numpy as np
+
+from app.core.config import serves, settings
+from app.core.http_clients import http_clients
+from app.core.metrics import inference_batch_duration, inference_batch_size, inference_queue_wait
+from app.schemas.inference import ENCODE_MAX_TEXTS
+from app.services.embedding_backends import InferenceUnavailable, SentenceEncoder, build_encoder
+
+# Wire format of the inference server: little-endian float32 rows, shape in a header
+ENCODE_PATH = "/internal/inference/encode"
+EMBEDDING_DTYPE = np.dtype("<f4")
+SHAPE_HEADER = "X-Embedding-Shape"
+
+
+def pack_embeddings(vectors: np.ndarray) -> Tuple[bytes, str]:
+    """Response body and shape header for a matrix of embeddings"""
+    vectors = np.ascontiguousarray(vectors, dtype=EMBEDDING_DTYPE)
+    return vectors.tobytes(), f"{vectors.shape[0]},{vectors.shape[1]}"
+
+
+def unpack_embeddings(body: bytes, shape: str) -> np.ndarray:
+    rows, dimension = (int(part) for part in shape.split(","))
+    return np.frombuffer(body, dtype=EMBEDDING_DTYPE).reshape(rows, dimension)
+
+
+@dataclass
+class _Pending:
+    texts: List[str]
+    future: asyncio.Future
+    enqueued: float
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent encode calls into batched model calls.
+
+    Callers ``await submit(texts)``. A consumer task takes queued requests
+    until the batch holds ``max_batch_size`` texts or ``max_wait_ms`` has
+    passed since its first request, calls ``encode_batch`` once on a single
+    model thread and hands every caller its rows. Under load the batch fills
+    before the deadline, so the wait only costs anything when traffic is
+    light. Requests larger than ``max_batch_size`` are split into slices
+    that queue separately, so no model call exceeds it. At most
+    ``max_pending`` requests queue before ``submit`` waits.
+    """
+
+    def __init__(self, encode_batch: Callable[[List[str]], np.ndarray],
+                 max_batch_size: Optional[int] = None, max_wait_ms: Optional[float] = None,
+                 max_pending: int = 1024):
+        self.encode_batch = encode_batch
+        self.max_batch_size = max_batch_size or getattr(settings, "INFERENCE_MAX_BATCH_SIZE", 32)
+        if max_wait_ms is None:
+            max_wait_ms = getattr(settings, "INFERENCE_MAX_WAIT_MS", 5.0)
+        self.max_wait = max_wait_ms / 1000
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _ensure_running(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference")
+        if loop is not self._loop or self._task is None or self._task.done():
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.max_pending)
+            self._task = loop.create_task(self._run(self._queue))
+        return self._queue
+
+    async def submit(self, texts: Sequence[str]) -> np.ndarray:
+        """Embeddings for ``texts``, one row per text"""
+        texts = list(texts)
+        if len(texts) > self.max_batch_size:
+            slices = [texts[start:start + self.max_batch_size] for start in range(0, len(texts), self.max_batch_size)]
+            return np.concatenate(await asyncio.gather(*(self.submit(part) for part in slices)))
+        queue = self._ensure_running()
+        future = asyncio.get_running_loop().create_future()
+        await queue.put(_Pending(texts, future, time.perf_counter()))
+        return await future
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        loop = asyncio.get_running_loop()
+        carry: Optional[_Pending] = None
+        while True:
+            first = carry or await queue.get()
+            carry = None
+            batch, size = [first], len(first.texts)
+            deadline = loop.time() + self.max_wait
+
+            while size < self.max_batch_size:
+                if not queue.empty():
+                    item = queue.get_nowait()
+                else:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if size + len(item.texts) > self.max_batch_size:
+                    # Starts the next batch rather than overfilling this one
+                    carry = item
+                    break
+                batch.append(item)
+                size += len(item.texts)
+
+            # Callers that gave up (cancelled, timed out) are not encoded
+            batch = [item for item in batch if not item.future.done()]
+            if batch:
+                await self._encode(batch)
+
+    async def _encode(self, batch: List[_Pending]) -> None:
+        started = time.perf_counter()
+        texts = [text for item in batch for text in item.texts]
+        for item in batch:
+            inference_queue_wait.observe(started - item.enqueued)
+        inference_batch_size.observe(len(texts))
+
+        try:
+            vectors = await asyncio.get_running_loop().run_in_executor(self._executor, self.encode_batch, texts)
+        except Exception as e:
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_exception(e)
+            return
+        inference_batch_duration.observe(time.perf_counter() - started)
+
+        offset = 0
+        for item in batch:
+            end = offset + len(item.texts)
+            if not item.future.done():
+                item.future.set_result(vectors[offset:end])
+            offset = end
+
+    async def close(self) -> None:
+        """Stop the consumer, failing requests still queued"""
+        task, queue, self._task, self._queue, self._loop = self._task, self._queue, None, None, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        while queue is not None and not queue.empty():
+            item = queue.get_nowait()
+            if not item.future.done():
+                item.future.set_exception(InferenceUnavailable("Inference is shutting down"))
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+class EmbeddingService:
+    """
+    Sentence embeddings for the AI features.
+
+    With ``INFERENCE_URL`` set, texts are sent to the inference server
+    (``APP_ROLE=inference``), so API workers never load the model; without
+    it the model is loaded in this process. Either way the process that
+    owns the model micro-batches concurrent requests, running the
+    EMBEDDING_BACKEND variant of the model (PyTorch, int8 or ONNX).
+    """
+
+    def __init__(self, encoder: Optional[SentenceEncoder] = None):
+        self.encoder = encoder or build_encoder()
+        self.batcher = MicroBatcher(self.encoder.encode_batch)
+
+    @property
+    def remote(self) -> bool:
+        return bool(getattr(settings, "INFERENCE_URL", None))
+
+    @property
+    def available(self) -> bool:
+        """Remote, or this process serves the model routers; API-only workers never load it"""
+        return self.remote or serves("ai") or serves("inference")
+
+    async def encode(self, texts: Sequence[str]) -> np.ndarray:
+        """One float32 row per text"""
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        if self.remote:
+            return await self._encode_remote(texts)
+        return await self.encode_local(texts)
+
+    async def encode_local(self, texts: Sequence[str]) -> np.ndarray:
+        """Encode with this process's model, batched with concurrent callers"""
+        return await self.batcher.submit(texts)
+
+    async def _encode_remote(self, texts: Sequence[str]) -> np.ndarray:
+        # The server takes at most ENCODE_MAX_TEXTS per request; concurrent
+        # chunks are batched together again on its side
+        size = min(self.batcher.max_batch_size, ENCODE_MAX_TEXTS)
+        texts = list(texts)
+        chunks = [texts[start:start + size] for start in range(0, len(texts), size)]
+        return np.concatenate(await asyncio.gather(*(self._encode_remote_chunk(chunk) for chunk in chunks)))
+
+    async def _encode_remote_chunk(self, texts: List[str]) -> np.ndarray:
+        try:
+            response = await http_clients.request("inference", "POST", ENCODE_PATH, json={"texts": texts})
+        except httpx.HTTPError as e:
+            raise InferenceUnavailable(f"Inference server unreachable: {type(e).__name__}: {e}") from e
+        if response.status_code != 200:
+            raise InferenceUnavailable(f"Inference server returned HTTP {response.status_code}")
+        return unpack_embeddings(response.content, response.headers[SHAPE_HEADER])
+
+    async def close(self) -> None:
+        await self.batcher.close()
+
+
+embedding_service = EmbeddingService()
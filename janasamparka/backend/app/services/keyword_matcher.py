@@ -0,0 +1,121 @@
+"""Shared one-pass keyword matcher for priority, department, category and sentiment detection."""
+
+import re
+import threading
+from typing import Dict, FrozenSet, Iterable, Optional, Set
+
+
+class KeywordHits:
+    """Keywords found in one text, queryable per registered group."""
+
+    __slots__ = ("keywords", "_groups")
+
+    def __init__(self, keywords: FrozenSet[str], groups: Dict[str, FrozenSet[str]]):
+        self.keywords = keywords
+        self._groups = groups
+
+    def found(self, group: str) -> Set[str]:
+        """Distinct keywords of ``group`` that occur in the text."""
+        return set(self.keywords & self._groups.get(group, frozenset()))
+
+    def count(self, group: str) -> int:
+        """Number of distinct keywords of ``group`` that occur in the text."""
+        return len(self.keywords & self._groups.get(group, frozenset()))
+
+    def __contains__(self, keyword: str) -> bool:
+        return keyword in self.keywords
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """
+    Build a regex matching the longest keyword at the current position.
+
+    Keywords are merged into a character trie so the engine only follows
+    branches whose first characters match, instead of trying every
+    alternative at every offset.
+    """
+    trie: Dict[str, dict] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def emit(node: Dict[str, dict]) -> str:
+        terminal = "" in node
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # Greedy optional: prefer the longer keyword when this node also ends one
+        if terminal:
+            return "(?:" + body + ")?"
+        return body
+
+    return emit(trie)
+
+
+class KeywordMatcher:
+    """
+    Multi-keyword substring matcher backed by a compiled regex trie.
+
+    Services register their keyword tables under a group name at import
+    time; the pattern is compiled once, on the first scan after a
+    registration.  ``scan`` makes a single pass over the text and returns
+    every registered keyword that occurs in it as a substring, i.e. the
+    same answer as ``keyword in text`` for each keyword.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._groups: Dict[str, FrozenSet[str]] = {}
+        self._pattern: Optional["re.Pattern[str]"] = None
+        self._shorter_keywords: Dict[str, FrozenSet[str]] = {}
+
+    def register(self, group: str, keywords: Iterable[str]) -> None:
+        """Register (or replace) the keyword list for ``group``."""
+        normalized = frozenset(keyword.lower() for keyword in keywords if keyword)
+        with self._lock:
+            self._groups[group] = normalized
+            self._pattern = None
+
+    def groups(self) -> Dict[str, FrozenSet[str]]:
+        return dict(self._groups)
+
+    def _compile(self) -> "re.Pattern[str]":
+        with self._lock:
+            if self._pattern is not None:
+                return self._pattern
+
+            vocabulary = set().union(*self._groups.values()) if self._groups else set()
+            # Any keyword occurring at a position is a prefix of the longest
+            # keyword matched there, so remember each keyword's keyword-prefixes
+            self._shorter_keywords = {
+                keyword: frozenset(
+                    keyword[:end] for end in range(1, len(keyword)) if keyword[:end] in vocabulary
+                )
+                for keyword in vocabulary
+            }
+            if vocabulary:
+                pattern = re.compile("(?=(" + _trie_pattern(vocabulary) + "))")
+            else:
+                pattern = re.compile(r"(?!)")
+            self._pattern = pattern
+            return pattern
+
+    def scan(self, text: Optional[str]) -> KeywordHits:
+        """Find all registered keywords in ``text`` (expected lowercase)."""
+        pattern = self._pattern or self._compile()
+        found: Set[str] = set()
+        if text:
+            shorter = self._shorter_keywords
+            for match in pattern.finditer(text):
+                keyword = match.group(1)
+                if keyword and keyword not in found:
+                    found.add(keyword)
+                    found.update(shorter[keyword])
+        return KeywordHits(frozenset(found), self._groups)
+
+
+# Shared, process-wide matcher
+keyword_matcher = KeywordMatcher()
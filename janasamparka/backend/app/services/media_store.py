@@ -0,0 +1,234 @@
+"""
+Content-addressed media storage: one stored copy per distinct upload, reference counted
+"""
+import asyncio
+import mimetypes
+import os
+import re
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select, update, delete
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.image_processing import is_image_file
+from app.core.logging import logger
+from app.core.uploads import SpooledUpload
+from app.models.complaint import MediaBlob
+from app.services.image_pipeline import image_pipeline
+
+
+# Rendition file name prefixes, matching the thumb_<name> convention of older uploads
+RENDITION_PREFIXES = {"full": "", "medium": "medium_", "thumbnail": "thumb_"}
+
+_SHA256 = re.compile(r"([0-9a-f]{64})")
+
+# Session.info key for blobs whose files were written in the open transaction
+_WRITTEN = "media_store.written"
+
+
+def _utcnow() -> datetime:
+    return datetime.utcnow()
+
+
+class MediaBlobStore:
+    """
+    Store uploads under the SHA-256 of their bytes.
+
+    Files live in sharded directories (``ab/cd/<sha256>.jpg`` plus
+    ``thumb_``/``medium_`` renditions next to it) below ``root``. Each
+    distinct upload is processed and written once; later identical uploads
+    only increment ``media_blobs.ref_count``. Releasing the last reference
+    stamps ``released_at`` and :meth:`collect_garbage` deletes blobs that
+    stayed unreferenced past the grace period, so cleanup never has to
+    walk or ``stat`` the upload tree.
+    """
+
+    def __init__(self, root: Path, url_prefix: str, grace_seconds: int = 24 * 3600):
+        self.root = Path(root)
+        self.url_prefix = url_prefix.rstrip("/")
+        self.grace_seconds = grace_seconds
+
+    # ------------------------------------------------------------------
+    # Naming
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def relative_path(sha256: str, suffix: str, prefix: str = "") -> str:
+        return f"{sha256[:2]}/{sha256[2:4]}/{prefix}{sha256}{suffix}"
+
+    def file_path(self, relative_path: str) -> Path:
+        return self.root / relative_path
+
+    def url(self, relative_path: str) -> str:
+        return f"{self.url_prefix}/{relative_path}"
+
+    def rendition_url(self, blob: MediaBlob, name: str, suffix: str = ".jpg") -> Optional[str]:
+        """URL of a rendition of an image blob, if it was stored"""
+        relative = self.relative_path(blob.sha256, suffix, RENDITION_PREFIXES[name])
+        return self.url(relative) if self.file_path(relative).exists() else None
+
+    def blob_files(self, sha256: str) -> List[Path]:
+        shard = self.root / sha256[:2] / sha256[2:4]
+        return list(shard.glob(f"*{sha256}*")) if shard.exists() else []
+
+    @staticmethod
+    def sha_from_name(name: str) -> Optional[str]:
+        match = _SHA256.search(name)
+        return match.group(1) if match else None
+
+    # ------------------------------------------------------------------
+    # Storing
+    # ------------------------------------------------------------------
+
+    async def put(self, db: Session, upload: SpooledUpload, file_ext: str,
+                  process_images: bool = True) -> MediaBlob:
+        """
+        Take a reference to the blob for ``upload``, writing it first unless
+        an identical upload is already stored. The caller commits and still
+        owns (and discards) the spooled file.
+        """
+        sha256 = upload.sha256
+        existing = db.get(MediaBlob, sha256)
+        if existing is not None and self.file_path(existing.path).exists():
+            if self._acquire(db, sha256):
+                db.refresh(existing)
+                logger.info("Media upload deduplicated", sha256=sha256, ref_count=existing.ref_count)
+                return existing
+
+        fields = await self._write(upload, file_ext, process_images)
+        db.info.setdefault(_WRITTEN, set()).add(sha256)
+        self._upsert(db, sha256, fields)
+        blob = db.get(MediaBlob, sha256)
+        db.refresh(blob)
+        return blob
+
+    async def _write(self, upload: SpooledUpload, file_ext: str, process_images: bool) -> Dict[str, Any]:
+        """Write the files for a new blob; returns its column values"""
+        sha256 = upload.sha256
+        if process_images and is_image_file(upload.filename or f"upload{file_ext}"):
+            processed = await image_pipeline.process(str(upload.path))
+            for rendition in processed.renditions:
+                relative = self.relative_path(sha256, rendition.extension, RENDITION_PREFIXES[rendition.name])
+                await asyncio.to_thread(self._write_file, self.file_path(relative), rendition.content)
+            full = processed.get("full")
+            lat, lng = processed.gps or (None, None)
+            return {
+                "path": self.relative_path(sha256, full.extension),
+                "content_type": "image/jpeg",
+                "size": len(full.content),
+                "lat": lat,
+                "lng": lng,
+            }
+
+        relative = self.relative_path(sha256, file_ext.lower())
+        destination = self.file_path(relative)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(upload.path, destination)
+        return {
+            "path": relative,
+            "content_type": mimetypes.guess_type(relative)[0] or "application/octet-stream",
+            "size": upload.size,
+            "lat": None,
+            "lng": None,
+        }
+
+    @staticmethod
+    def _write_file(path: Path, content: bytes) -> None:
+        # Identical concurrent uploads write the same bytes; the rename keeps readers whole
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp = path.with_name(f".{uuid.uuid4().hex}.tmp")
+        temp.write_bytes(content)
+        os.replace(temp, path)
+
+    def _acquire(self, db: Session, sha256: str) -> bool:
+        result = db.execute(
+            update(MediaBlob)
+            .where(MediaBlob.sha256 == sha256)
+            .values(ref_count=MediaBlob.ref_count + 1, released_at=None)
+        )
+        return result.rowcount == 1
+
+    def _upsert(self, db: Session, sha256: str, fields: Dict[str, Any]) -> None:
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            if not self._acquire(db, sha256):
+                db.add(MediaBlob(sha256=sha256, ref_count=1, created_at=_utcnow(), **fields))
+                db.flush()
+            return
+
+        statement = insert(MediaBlob).values(sha256=sha256, ref_count=1, created_at=_utcnow(), **fields)
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[MediaBlob.sha256],
+            set_={"ref_count": MediaBlob.ref_count + 1, "released_at": None, **fields},
+        ))
+
+    def rollback(self, db: Session) -> None:
+        """
+        Roll back ``db`` and delete the files :meth:`put` wrote in that
+        transaction for blobs that have no committed row
+        """
+        db.rollback()
+        for sha256 in db.info.pop(_WRITTEN, set()):
+            if db.get(MediaBlob, sha256) is not None:
+                continue
+            for path in self.blob_files(sha256):
+                path.unlink(missing_ok=True)
+            logger.info("Media blob files discarded after rollback", sha256=sha256)
+
+    # ------------------------------------------------------------------
+    # Releasing
+    # ------------------------------------------------------------------
+
+    def release(self, db: Session, sha256: str) -> None:
+        """Drop one reference; the caller commits"""
+        db.execute(
+            update(MediaBlob)
+            .where(MediaBlob.sha256 == sha256, MediaBlob.ref_count > 0)
+            .values(ref_count=MediaBlob.ref_count - 1)
+        )
+        db.execute(
+            update(MediaBlob)
+            .where(MediaBlob.sha256 == sha256, MediaBlob.ref_count <= 0, MediaBlob.released_at.is_(None))
+            .values(released_at=_utcnow())
+        )
+
+    def collect_garbage(self, db: Session, older_than_seconds: Optional[int] = None) -> int:
+        """Delete blobs unreferenced for longer than the grace period; returns how many"""
+        cutoff = _utcnow() - timedelta(seconds=self.grace_seconds if older_than_seconds is None else older_than_seconds)
+        candidates = db.execute(
+            select(MediaBlob.sha256)
+            .where(MediaBlob.ref_count <= 0, MediaBlob.released_at < cutoff)
+        ).scalars().all()
+
+        removed = 0
+        for sha256 in candidates:
+            # Re-check in the DELETE: an upload may have re-referenced it meanwhile
+            result = db.execute(
+                delete(MediaBlob)
+                .where(MediaBlob.sha256 == sha256, MediaBlob.ref_count <= 0, MediaBlob.released_at < cutoff)
+            )
+            db.commit()
+            if result.rowcount != 1:
+                continue
+            for path in self.blob_files(sha256):
+                path.unlink(missing_ok=True)
+            removed += 1
+
+        if removed:
+            logger.info("Unreferenced media blobs removed", count=removed)
+        return removed
+
+
+# Global store for complaint media (served from /uploads by the API)
+media_store = MediaBlobStore(
+    Path(getattr(settings, "UPLOAD_DIR", "./uploads")) / "media" / "blobs",
+    url_prefix="/uploads/media/blobs",
+)
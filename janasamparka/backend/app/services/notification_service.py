@@ -2,44 +2,85 @@
 Notification Service for Scheduled Broadcasts and Multi-channel Messaging
 """
 import asyncio
-import json
+import random
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
 
 from app.core.database import get_db
 from app.core.config import settings
+from app.core.http_clients import http_clients
 from app.core.logging import logger
-from app.models.user import User
 from app.models.citizen_engagement import (
     ScheduledBroadcast, BroadcastDelivery, BroadcastStatus
 )
+from app.services.broadcast_delivery import BroadcastDeliveryEngine
 from app.services.realtime_service import realtime_service
 
 
+async def send_twilio_message(account_sid: str, auth_token: str, from_: str,
+                              to: str, body: str) -> Optional[str]:
+    """Create a Twilio message over the shared connection pool; returns its sid"""
+    response = await http_clients.request(
+        "twilio", "POST", f"/2010-04-01/Accounts/{account_sid}/Messages.json",
+        data={"From": from_, "To": to, "Body": body},
+        auth=(account_sid, auth_token),
+    )
+    if response.status_code != 201:
+        logger.error("Twilio message failed", status=response.status_code, error=response.text)
+        return None
+    return response.json().get("sid")
+
+
 class NotificationChannel:
     """Base class for notification channels"""
+
+    def __init__(self, concurrency: Optional[int] = None):
+        # Upper bound on sends in flight for one bulk_send call
+        self.concurrency = concurrency or getattr(settings, 'BROADCAST_CHANNEL_CONCURRENCY', 50)
     
     async def send(self, recipient: str, message: Dict[str, Any]) -> bool:
         """Send notification through this channel"""
         raise NotImplementedError
     
     async def bulk_send(self, recipients: List[str], message: Dict[str, Any]) -> List[bool]:
-        """Send bulk notifications"""
-        results = []
-        for recipient in recipients:
-            result = await self.send(recipient, message)
-            results.append(result)
-        return results
+        """Send bulk notifications, at most ``concurrency`` at a time"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def send_one(recipient: str) -> bool:
+            async with semaphore:
+                try:
+                    return await self.send(recipient, message)
+                except Exception as e:
+                    logger.error("Notification send error", error=str(e))
+                    return False
+
+        return list(await asyncio.gather(*(send_one(recipient) for recipient in recipients)))
+
+    async def close(self):
+        """Release pooled connections held by the channel"""
 
 
 class PushNotificationChannel(NotificationChannel):
     """Push notification channel"""
+
+    # FCM legacy API accepts at most this many registration ids per request
+    MULTICAST_LIMIT = 500
     
-    def __init__(self):
+    def __init__(self, concurrency: Optional[int] = None):
+        super().__init__(concurrency)
         self.fcm_server_key = getattr(settings, 'FCM_SERVER_KEY', None)
         self.fcm_url = "https://fcm.googleapis.com/fcm/send"
+
+    @staticmethod
+    def _notification(message: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "title": message.get("title", ""),
+            "body": message.get("message", ""),
+            "icon": message.get("icon", "/icon.png"),
+            "click_action": message.get("click_action", "/"),
+            "badge": message.get("badge", "1"),
+            "sound": message.get("sound", "default")
+        }
     
     async def send(self, device_token: str, message: Dict[str, Any]) -> bool:
         """Send push notification via FCM"""
@@ -49,18 +90,9 @@ class PushNotificationChannel(NotificationChannel):
             return False
         
         try:
-            import aiohttp
-            
             payload = {
                 "to": device_token,
-                "notification": {
-                    "title": message.get("title", ""),
-                    "body": message.get("message", ""),
-                    "icon": message.get("icon", "/icon.png"),
-                    "click_action": message.get("click_action", "/"),
-                    "badge": message.get("badge", "1"),
-                    "sound": message.get("sound", "default")
-                },
+                "notification": self._notification(message),
                 "data": message.get("data", {}),
                 "priority": "high"
             }
@@ -70,77 +102,71 @@ class PushNotificationChannel(NotificationChannel):
                 "Content-Type": "application/json"
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(self.fcm_url, json=payload, headers=headers) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        return result.get("success", 0) > 0
-                    else:
-                        error_text = await response.text()
-                        logger.error("Push notification failed", error=error_text)
-                        return False
+            response = await http_clients.request("fcm", "POST", self.fcm_url, json=payload, headers=headers)
+            if response.status_code == 200:
+                result = response.json()
+                return result.get("success", 0) > 0
+            else:
+                logger.error("Push notification failed", error=response.text)
+                return False
                         
         except Exception as e:
             logger.error("Push notification error", error=str(e))
             return False
     
     async def bulk_send(self, device_tokens: List[str], message: Dict[str, Any]) -> List[bool]:
-        """Send bulk push notifications"""
+        """Send bulk push notifications as concurrent FCM multicast requests"""
         
-        # FCM supports multicast to multiple tokens
         if not self.fcm_server_key:
             return [False] * len(device_tokens)
         
-        try:
-            import aiohttp
-            
-            # Split into batches of 500 (FCM limit)
-            batch_size = 500
-            results = []
-            
-            for i in range(0, len(device_tokens), batch_size):
-                batch_tokens = device_tokens[i:i + batch_size]
-                
-                payload = {
-                    "registration_ids": batch_tokens,
-                    "notification": {
-                        "title": message.get("title", ""),
-                        "body": message.get("message", ""),
-                        "icon": message.get("icon", "/icon.png"),
-                        "click_action": message.get("click_action", "/"),
-                        "badge": message.get("badge", "1"),
-                        "sound": message.get("sound", "default")
-                    },
-                    "data": message.get("data", {}),
-                    "priority": "high"
-                }
-                
-                headers = {
-                    "Authorization": f"key={self.fcm_server_key}",
-                    "Content-Type": "application/json"
-                }
-                
-                async with aiohttp.ClientSession() as session:
-                    async with session.post(self.fcm_url, json=payload, headers=headers) as response:
-                        if response.status == 200:
-                            result = await response.json()
-                            batch_results = [True] * result.get("success", 0)
-                            batch_results.extend([False] * result.get("failure", 0))
-                            results.extend(batch_results)
-                        else:
-                            results.extend([False] * len(batch_tokens))
+        semaphore = asyncio.Semaphore(self.concurrency)
+        batches = [
+            device_tokens[i:i + self.MULTICAST_LIMIT]
+            for i in range(0, len(device_tokens), self.MULTICAST_LIMIT)
+        ]
+
+        async def send_batch(batch_tokens: List[str]) -> List[bool]:
+            payload = {
+                "registration_ids": batch_tokens,
+                "notification": self._notification(message),
+                "data": message.get("data", {}),
+                "priority": "high"
+            }
             
-            return results
+            headers = {
+                "Authorization": f"key={self.fcm_server_key}",
+                "Content-Type": "application/json"
+            }
             
-        except Exception as e:
-            logger.error("Bulk push notification error", error=str(e))
-            return [False] * len(device_tokens)
+            async with semaphore:
+                try:
+                    response = await http_clients.request("fcm", "POST", self.fcm_url, json=payload, headers=headers)
+                    if response.status_code != 200:
+                        return [False] * len(batch_tokens)
+                    result = response.json()
+                except Exception as e:
+                    logger.error("Bulk push notification error", error=str(e))
+                    return [False] * len(batch_tokens)
+
+            # FCM reports one result per registration id, in request order
+            per_token = result.get("results")
+            if per_token and len(per_token) == len(batch_tokens):
+                return ["message_id" in item for item in per_token]
+            succeeded = min(result.get("success", 0), len(batch_tokens))
+            return [True] * succeeded + [False] * (len(batch_tokens) - succeeded)
+
+        results: List[bool] = []
+        for batch_results in await asyncio.gather(*(send_batch(batch) for batch in batches)):
+            results.extend(batch_results)
+        return results
 
 
 class SMSChannel(NotificationChannel):
     """SMS notification channel"""
     
-    def __init__(self):
+    def __init__(self, concurrency: Optional[int] = None):
+        super().__init__(concurrency)
         self.sms_provider = getattr(settings, 'SMS_PROVIDER', 'twilio')
         self.twilio_account_sid = getattr(settings, 'TWILIO_ACCOUNT_SID', None)
         self.twilio_auth_token = getattr(settings, 'TWILIO_AUTH_TOKEN', None)
@@ -164,24 +190,20 @@ class SMSChannel(NotificationChannel):
             return False
         
         try:
-            from twilio.rest import Client
-            from twilio.base.exceptions import TwilioRestException
-            
-            client = Client(self.twilio_account_sid, self.twilio_auth_token)
-            
-            message_obj = client.messages.create(
-                body=message.get("message", ""),
+            sid = await send_twilio_message(
+                self.twilio_account_sid,
+                self.twilio_auth_token,
                 from_=self.twilio_phone_number,
-                to=phone_number
+                to=phone_number,
+                body=message.get("message", ""),
             )
+            if sid is None:
+                return False
             
             logger.info("SMS sent successfully", 
-                       sid=message_obj.sid, to=phone_number)
+                       sid=sid, to=phone_number)
             return True
             
-        except TwilioRestException as e:
-            logger.error("Twilio SMS failed", error=str(e))
-            return False
         except Exception as e:
             logger.error("SMS sending error", error=str(e))
             return False
@@ -190,7 +212,8 @@ class SMSChannel(NotificationChannel):
 class EmailChannel(NotificationChannel):
     """Email notification channel"""
     
-    def __init__(self):
+    def __init__(self, concurrency: Optional[int] = None):
+        super().__init__(concurrency)
         self.smtp_server = getattr(settings, 'SMTP_SERVER', None)
         self.smtp_port = getattr(settings, 'SMTP_PORT', 587)
         self.smtp_username = getattr(settings, 'SMTP_USERNAME', None)
@@ -235,12 +258,15 @@ class EmailChannel(NotificationChannel):
                 )
                 msg.attach(part)
             
-            # Send email
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            server.starttls()
-            server.login(self.smtp_username, self.smtp_password)
-            server.send_message(msg)
-            server.quit()
+            # Send email (smtplib blocks, so keep it off the event loop)
+            def deliver():
+                server = smtplib.SMTP(self.smtp_server, self.smtp_port)
+                server.starttls()
+                server.login(self.smtp_username, self.smtp_password)
+                server.send_message(msg)
+                server.quit()
+
+            await asyncio.to_thread(deliver)
             
             logger.info("Email sent successfully", to=email_address)
             return True
@@ -253,7 +279,8 @@ class EmailChannel(NotificationChannel):
 class WhatsAppChannel(NotificationChannel):
     """WhatsApp notification channel"""
     
-    def __init__(self):
+    def __init__(self, concurrency: Optional[int] = None):
+        super().__init__(concurrency)
         self.whatsapp_provider = getattr(settings, 'WHATSAPP_PROVIDER', 'twilio')
         self.twilio_account_sid = getattr(settings, 'TWILIO_ACCOUNT_SID', None)
         self.twilio_auth_token = getattr(settings, 'TWILIO_AUTH_TOKEN', None)
@@ -277,24 +304,20 @@ class WhatsAppChannel(NotificationChannel):
             return False
         
         try:
-            from twilio.rest import Client
-            from twilio.base.exceptions import TwilioRestException
-            
-            client = Client(self.twilio_account_sid, self.twilio_auth_token)
-            
-            message_obj = client.messages.create(
-                body=message.get("message", ""),
+            sid = await send_twilio_message(
+                self.twilio_account_sid,
+                self.twilio_auth_token,
                 from_=f'whatsapp:{self.twilio_whatsapp_number}',
-                to=f'whatsapp:{phone_number}'
+                to=f'whatsapp:{phone_number}',
+                body=message.get("message", ""),
             )
+            if sid is None:
+                return False
             
             logger.info("WhatsApp message sent successfully", 
-                       sid=message_obj.sid, to=phone_number)
+                       sid=sid, to=phone_number)
             return True
             
-        except TwilioRestException as e:
-            logger.error("Twilio WhatsApp failed", error=str(e))
-            return False
         except Exception as e:
             logger.error("WhatsApp sending error", error=str(e))
             return False
@@ -318,162 +341,75 @@ class InAppChannel(NotificationChannel):
         except Exception as e:
             logger.error("In-app notification error", error=str(e))
             return False
-    
-    async def bulk_send(self, user_ids: List[str], message: Dict[str, Any]) -> List[bool]:
-        """Send bulk in-app notifications"""
-        
-        results = []
-        for user_id in user_ids:
-            result = await self.send(user_id, message)
-            results.append(result)
-        return results
+
+
+class LocalChannel(NotificationChannel):
+    """
+    In-process fake channel for development and load tests.
+
+    Records every send in ``sent`` after an optional simulated latency and
+    fails a ``failure_rate`` fraction of them.
+    """
+
+    def __init__(self, name: str = "local", latency: float = 0.0,
+                 failure_rate: float = 0.0, concurrency: Optional[int] = None):
+        super().__init__(concurrency)
+        self.name = name
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.sent: List[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def send(self, recipient: str, message: Dict[str, Any]) -> bool:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            if self.failure_rate and random.random() < self.failure_rate:
+                return False
+            self.sent.append(recipient)
+            return True
+        finally:
+            self.in_flight -= 1
 
 
 class NotificationService:
     """Main notification service for managing multi-channel broadcasts"""
     
-    def __init__(self):
-        self.channels = {
-            'push': PushNotificationChannel(),
-            'sms': SMSChannel(),
-            'email': EmailChannel(),
-            'whatsapp': WhatsAppChannel(),
-            'in_app': InAppChannel()
-        }
-    
-    async def send_broadcast(self, broadcast_id: str) -> Dict[str, Any]:
-        """Send scheduled broadcast to all target users"""
-        
-        db = next(get_db())
-        try:
-            # Get broadcast details
-            broadcast = db.query(ScheduledBroadcast).filter(
-                ScheduledBroadcast.id == broadcast_id
-            ).first()
-            
-            if not broadcast:
-                logger.error("Broadcast not found", broadcast_id=broadcast_id)
-                return {"success": False, "error": "Broadcast not found"}
-            
-            if broadcast.status != BroadcastStatus.SCHEDULED:
-                logger.warning("Broadcast already processed", 
-                             broadcast_id=broadcast_id, status=broadcast.status.value)
-                return {"success": False, "error": "Broadcast already processed"}
-            
-            # Get target users
-            target_users = await self._get_target_users(broadcast, db)
-            
-            if not target_users:
-                logger.warning("No target users found for broadcast", broadcast_id=broadcast_id)
-                broadcast.status = BroadcastStatus.FAILED
-                db.commit()
-                return {"success": False, "error": "No target users found"}
-            
-            # Prepare message for each channel
-            message = self._prepare_message(broadcast)
-            
-            # Send notifications through each enabled channel
-            delivery_results = {}
-            total_sent = 0
-            
-            for channel_name, channel in self.channels.items():
-                if getattr(broadcast, f"send_{channel_name}", False) or (channel_name == "in_app" and broadcast.show_in_app):
-                    
-                    if channel_name == "push":
-                        # Send to device tokens
-                        device_tokens = [user.device_token for user in target_users if user.device_token]
-                        if device_tokens:
-                            results = await channel.bulk_send(device_tokens, message)
-                            delivery_results[channel_name] = sum(results)
-                            total_sent += sum(results)
-                    
-                    elif channel_name == "sms":
-                        # Send to phone numbers
-                        phone_numbers = [user.phone for user in target_users if user.phone]
-                        if phone_numbers:
-                            results = await channel.bulk_send(phone_numbers, message)
-                            delivery_results[channel_name] = sum(results)
-                            total_sent += sum(results)
-                    
-                    elif channel_name == "email":
-                        # Send to email addresses
-                        email_addresses = [user.email for user in target_users if user.email]
-                        if email_addresses:
-                            results = await channel.bulk_send(email_addresses, message)
-                            delivery_results[channel_name] = sum(results)
-                            total_sent += sum(results)
-                    
-                    elif channel_name == "whatsapp":
-                        # Send to phone numbers via WhatsApp
-                        phone_numbers = [user.phone for user in target_users if user.phone]
-                        if phone_numbers:
-                            results = await channel.bulk_send(phone_numbers, message)
-                            delivery_results[channel_name] = sum(results)
-                            total_sent += sum(results)
-                    
-                    elif channel_name == "in_app":
-                        # Send to user IDs
-                        user_ids = [user.id for user in target_users]
-                        if user_ids:
-                            results = await channel.bulk_send(user_ids, message)
-                            delivery_results[channel_name] = sum(results)
-                            total_sent += sum(results)
-            
-            # Create delivery records
-            await self._create_delivery_records(broadcast, target_users, delivery_results, db)
-            
-            # Update broadcast status
-            broadcast.status = BroadcastStatus.SENT
-            broadcast.sent_at = datetime.utcnow()
-            broadcast.sent_count = total_sent
-            broadcast.delivered_count = total_sent  # Will be updated via webhooks
-            
-            db.commit()
-            
-            logger.info("Broadcast sent successfully", 
-                       broadcast_id=broadcast_id,
-                       total_sent=total_sent,
-                       channels=list(delivery_results.keys()))
-            
-            return {
-                "success": True,
-                "total_sent": total_sent,
-                "delivery_results": delivery_results
-            }
-            
-        except Exception as e:
-            logger.error("Failed to send broadcast", 
-                        broadcast_id=broadcast_id, error=str(e))
-            
-            # Update status to failed
-            if broadcast:
-                broadcast.status = BroadcastStatus.FAILED
-                db.commit()
-            
-            return {"success": False, "error": str(e)}
-        finally:
-            db.close()
+    def __init__(self, channels: Optional[Dict[str, NotificationChannel]] = None):
+        if channels is None:
+            if getattr(settings, 'NOTIFICATION_FAKE_CHANNELS', False):
+                channels = {name: LocalChannel(name) for name in ('push', 'sms', 'email', 'whatsapp', 'in_app')}
+            else:
+                channels = {
+                    'push': PushNotificationChannel(),
+                    'sms': SMSChannel(),
+                    'email': EmailChannel(),
+                    'whatsapp': WhatsAppChannel(),
+                    'in_app': InAppChannel()
+                }
+        self.channels = channels
+        self.delivery_engine = BroadcastDeliveryEngine(
+            self.channels,
+            chunk_size=getattr(settings, 'BROADCAST_CHUNK_SIZE', 1000),
+        )
     
-    async def _get_target_users(self, broadcast: ScheduledBroadcast, db: Session) -> List[User]:
-        """Get list of target users for broadcast"""
-        
-        query = db.query(User).filter(User.constituency_id == broadcast.constituency_id)
-        
-        if not broadcast.target_all:
-            # Apply filters
-            if broadcast.target_roles:
-                target_roles = broadcast.target_roles.split(',')
-                query = query.filter(User.role.in_(target_roles))
-            
-            if broadcast.target_wards:
-                target_wards = broadcast.target_wards.split(',')
-                query = query.filter(User.ward_id.in_(target_wards))
-            
-            if broadcast.target_departments:
-                target_departments = broadcast.target_departments.split(',')
-                query = query.filter(User.department_id.in_(target_departments))
-        
-        return query.all()
+    async def send_broadcast(self, broadcast_id: str, resume: bool = False, claimed: bool = False) -> Dict[str, Any]:
+        """
+        Send scheduled broadcast to all target users.
+
+        Delivery is chunked and checkpointed by ``BroadcastDeliveryEngine``;
+        pass ``resume=True`` to continue a broadcast whose run failed, or
+        ``claimed=True`` when the caller already claimed it for sending.
+        """
+        return await self.delivery_engine.run(broadcast_id, self._prepare_message, resume=resume, claimed=claimed)
+
+    async def close(self):
+        """Close pooled connections of every channel"""
+        for channel in self.channels.values():
+            await channel.close()
     
     def _prepare_message(self, broadcast: ScheduledBroadcast) -> Dict[str, Any]:
         """Prepare message content for different channels"""
@@ -482,7 +418,7 @@ class NotificationService:
             "title": broadcast.title,
             "message": broadcast.message,
             "data": {
-                "broadcast_id": broadcast.id,
+                "broadcast_id": str(broadcast.id),
                 "type": broadcast.broadcast_type.value,
                 "priority": broadcast.priority,
                 "link_url": broadcast.link_url,
@@ -520,25 +456,6 @@ class NotificationService:
         
         return base_message
     
-    async def _create_delivery_records(self, broadcast: ScheduledBroadcast, 
-                                     target_users: List[User], 
-                                     delivery_results: Dict[str, int], 
-                                     db: Session):
-        """Create delivery tracking records"""
-        
-        for user in target_users:
-            delivery = BroadcastDelivery(
-                id=str(uuid.uuid4()),
-                broadcast_id=broadcast.id,
-                user_id=user.id,
-                push_sent=delivery_results.get('push', 0) > 0,
-                sms_sent=delivery_results.get('sms', 0) > 0,
-                email_sent=delivery_results.get('email', 0) > 0,
-                whatsapp_sent=delivery_results.get('whatsapp', 0) > 0,
-                shown_in_app=delivery_results.get('in_app', 0) > 0
-            )
-            db.add(delivery)
-    
     async def schedule_broadcast_reminder(self, broadcast_id: str, reminder_minutes: int = 60):
         """Schedule reminder for upcoming broadcast"""
         
@@ -1,15 +1,113 @@
 """Predictive planning service with multilingual support for Kannada and English."""
 
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable, Tuple
 from uuid import UUID
 from datetime import datetime, timedelta
 from collections import defaultdict
+from functools import lru_cache
 import re
 
 from sqlalchemy import select, func, and_, extract
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.complaint import Complaint
+from app.services.keyword_matcher import keyword_matcher
+
+
+_PUNCTUATION = re.compile(r'[^\w\s]')
+
+# Maximum edit distance accepted by fuzzy correction
+FUZZY_MAX_DISTANCE = 2
+
+# Distinct raw words whose normalized form is memoised
+NORMALIZED_WORD_CACHE_SIZE = 65536
+
+
+def levenshtein_distance(s1: str, s2: str, max_distance: Optional[int] = None) -> int:
+    """
+    Calculate edit distance between two strings.
+
+    With ``max_distance`` the computation stops as soon as the distance is
+    known to exceed it and returns ``max_distance + 1``.
+    """
+    if len(s1) < len(s2):
+        s1, s2 = s2, s1
+
+    if max_distance is not None and len(s1) - len(s2) > max_distance:
+        return max_distance + 1
+
+    if not s2:
+        return len(s1)
+
+    previous_row = list(range(len(s2) + 1))
+    for i, c1 in enumerate(s1):
+        current_row = [i + 1]
+        for j, c2 in enumerate(s2):
+            current_row.append(min(
+                previous_row[j + 1] + 1,       # insertion
+                current_row[j] + 1,            # deletion
+                previous_row[j] + (c1 != c2),  # substitution
+            ))
+        if max_distance is not None and min(current_row) > max_distance:
+            return max_distance + 1
+        previous_row = current_row
+
+    return previous_row[-1]
+
+
+def _deletes(word: str, max_distance: int) -> set:
+    """All strings reachable from ``word`` by up to ``max_distance`` deletions."""
+    results = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {
+            candidate[:i] + candidate[i + 1:]
+            for candidate in frontier
+            for i in range(len(candidate))
+        }
+        results |= frontier
+    return results
+
+
+class DeletionIndex:
+    """
+    SymSpell-style deletion index over a fixed vocabulary.
+
+    Every vocabulary word is registered under all of its deletion variants;
+    a lookup generates the query's variants, collects candidates with a few
+    dictionary probes and verifies only those with a bounded edit distance.
+    Insertion order is remembered so ``closest`` reproduces the original
+    "first dictionary entry within distance" behaviour.
+    """
+
+    def __init__(self, words: Iterable[str], max_distance: int):
+        self.max_distance = max_distance
+        self._order: Dict[str, int] = {}
+        self._variants: Dict[str, List[str]] = defaultdict(list)
+        for word in words:
+            if word in self._order:
+                continue
+            self._order[word] = len(self._order)
+            for variant in _deletes(word, max_distance):
+                self._variants[variant].append(word)
+
+    def search(self, word: str) -> List[Tuple[int, str]]:
+        """Return ``(order, entry)`` for every entry within ``max_distance``."""
+        candidates = set()
+        for variant in _deletes(word, self.max_distance):
+            candidates.update(self._variants.get(variant, ()))
+        return [
+            (self._order[candidate], candidate)
+            for candidate in candidates
+            if levenshtein_distance(word, candidate, self.max_distance) <= self.max_distance
+        ]
+
+    def closest(self, word: str) -> Optional[str]:
+        """Earliest-inserted entry within ``max_distance`` of ``word``."""
+        matches = self.search(word)
+        if not matches:
+            return None
+        return min(matches)[1]
 
 
 class MultilingualNormalizer:
@@ -112,25 +210,20 @@ class MultilingualNormalizer:
         if not text:
             return ""
         
-        # Convert to lowercase
-        text = text.lower()
-        
-        # Replace Kannada transliterations and fix spellings
-        words = text.split()
-        normalized_words = []
-        
-        for word in words:
-            # Remove punctuation for matching
-            clean_word = re.sub(r'[^\w\s]', '', word)
-            
-            # Check if it's a known Kannada word or common misspelling
-            if clean_word in self.KANNADA_ENGLISH_MAP:
-                normalized_words.append(self.KANNADA_ENGLISH_MAP[clean_word])
-            else:
-                # Try fuzzy matching for severe misspellings
-                normalized_words.append(self._fuzzy_correct(clean_word))
-        
-        return " ".join(normalized_words)
+        return " ".join(_normalize_word(word) for word in text.lower().split())
+    
+    def normalize_many(self, texts: Iterable[str]) -> List[str]:
+        """
+        Normalize a batch of texts.
+
+        Each distinct word in the batch is normalized once, which makes bulk
+        callers (imports, re-indexing) much cheaper than repeated
+        ``normalize_text`` calls.
+        """
+        tokenized = [text.lower().split() if text else [] for text in texts]
+        vocabulary = {word for words in tokenized for word in words}
+        mapping = {word: _normalize_word(word) for word in vocabulary}
+        return [" ".join(mapping[word] for word in words) for words in tokenized]
     
     def _fuzzy_correct(self, word: str) -> str:
         """Simple fuzzy matching for severe misspellings."""
@@ -138,41 +231,30 @@ class MultilingualNormalizer:
             return word
         
         # Check for phonetic similarities
-        for known_word, correct in self.KANNADA_ENGLISH_MAP.items():
-            if self._levenshtein_distance(word, known_word) <= 2:
-                return correct
+        known_word = _FUZZY_INDEX.closest(word)
+        if known_word is not None:
+            return self.KANNADA_ENGLISH_MAP[known_word]
         
         return word
     
     def _levenshtein_distance(self, s1: str, s2: str) -> int:
         """Calculate edit distance between two strings."""
-        if len(s1) < len(s2):
-            return self._levenshtein_distance(s2, s1)
-        
-        if len(s2) == 0:
-            return len(s1)
-        
-        previous_row = range(len(s2) + 1)
-        for i, c1 in enumerate(s1):
-            current_row = [i + 1]
-            for j, c2 in enumerate(s2):
-                insertions = previous_row[j + 1] + 1
-                deletions = current_row[j] + 1
-                substitutions = previous_row[j] + (c1 != c2)
-                current_row.append(min(insertions, deletions, substitutions))
-            previous_row = current_row
-        
-        return previous_row[-1]
+        return levenshtein_distance(s1, s2)
     
     def detect_category(self, text: str) -> Optional[str]:
         """Detect complaint category from multilingual text."""
-        normalized = self.normalize_text(text)
-        
-        scores = defaultdict(int)
-        for category, keywords in self.CATEGORY_KEYWORDS.items():
-            for keyword in keywords:
-                if keyword in normalized:
-                    scores[category] += 1
+        return self._category_from_hits(keyword_matcher.scan(self.normalize_text(text)))
+    
+    def detect_categories(self, texts: Iterable[str]) -> List[Optional[str]]:
+        """Detect categories for a batch of texts (normalized with ``normalize_many``)."""
+        return [self._category_from_hits(keyword_matcher.scan(text)) for text in self.normalize_many(texts)]
+    
+    def _category_from_hits(self, hits) -> Optional[str]:
+        scores = {}
+        for category in self.CATEGORY_KEYWORDS:
+            count = hits.count(f"category.{category}")
+            if count:
+                scores[category] = count
         
         if not scores:
             return None
@@ -181,6 +263,32 @@ class MultilingualNormalizer:
         return max(scores.items(), key=lambda x: x[1])[0]
 
 
+for _category, _keywords in MultilingualNormalizer.CATEGORY_KEYWORDS.items():
+    keyword_matcher.register(f"category.{_category}", _keywords)
+
+# Fuzzy-correction index over the known vocabulary, built once at import
+_FUZZY_INDEX = DeletionIndex(MultilingualNormalizer.KANNADA_ENGLISH_MAP, FUZZY_MAX_DISTANCE)
+
+
+@lru_cache(maxsize=NORMALIZED_WORD_CACHE_SIZE)
+def _normalize_word(word: str) -> str:
+    """Normalize a single lowercase word (memoised across all callers)."""
+    # Remove punctuation for matching
+    clean_word = _PUNCTUATION.sub('', word)
+    
+    # Check if it's a known Kannada word or common misspelling
+    mapped = MultilingualNormalizer.KANNADA_ENGLISH_MAP.get(clean_word)
+    if mapped is not None:
+        return mapped
+    
+    # Try fuzzy matching for severe misspellings
+    return multilingual_normalizer._fuzzy_correct(clean_word)
+
+
+# Shared normalizer; it is stateless so one instance serves every request
+multilingual_normalizer = MultilingualNormalizer()
+
+
 class PredictivePlanningService:
     """Predictive planning and forecasting service."""
     
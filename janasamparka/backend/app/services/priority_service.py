@@ -8,6 +8,8 @@ from sqlalchemy import select, func, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.complaint import Complaint
+from app.services.duplicate_engine import duplicate_engine
+from app.services.keyword_matcher import KeywordHits, keyword_matcher
 
 
 # SLA Configuration by Category (in days)
@@ -104,6 +106,21 @@ VULNERABILITY_KEYWORDS = [
     "handicapped", "blind", "slum", "poor", "ration card", "bpl"
 ]
 
+# Severity indicators
+SEVERITY_WORDS = ["major", "serious", "severe", "critical", "big", "large", "huge"]
+
+# Time-sensitive words
+URGENT_WORDS = ["urgent", "immediate", "asap", "quickly", "soon", "now"]
+
+keyword_matcher.register("priority.emergency", EMERGENCY_KEYWORDS)
+keyword_matcher.register("priority.high_impact", HIGH_IMPACT_KEYWORDS)
+keyword_matcher.register("priority.recurrence", RECURRENCE_KEYWORDS)
+keyword_matcher.register("priority.vulnerability", VULNERABILITY_KEYWORDS)
+keyword_matcher.register("priority.severity", SEVERITY_WORDS)
+keyword_matcher.register("priority.urgent", URGENT_WORDS)
+keyword_matcher.register("priority.hundreds", ["hundred", "100"])
+keyword_matcher.register("priority.thousands", ["thousand", "1000"])
+
 
 class PriorityCalculationService:
     """Service for calculating complaint priority scores."""
@@ -128,22 +145,25 @@ class PriorityCalculationService:
         """
         combined_text = f"{title} {description} {location_description or ''}".lower()
         
+        # Single pass over the text for every keyword table
+        hits = keyword_matcher.scan(combined_text)
+        
         # 1. Severity Factor (0-1)
-        severity_score = self._calculate_severity(combined_text, category)
+        severity_score = self._calculate_severity(combined_text, category, hits)
         
         # 2. Affected Population (0-1)
         population_score, population_estimate = self._estimate_affected_population(
-            combined_text, lat, lng
+            combined_text, lat, lng, hits
         )
         
         # 3. Legal/Urgency Factor (0-1)
-        urgency_score, is_emergency = self._calculate_urgency(combined_text, category)
+        urgency_score, is_emergency = self._calculate_urgency(combined_text, category, hits)
         
         # 4. Recurrence Factor (0-1)
-        recurrence_score = self._check_recurrence(combined_text)
+        recurrence_score = self._check_recurrence(combined_text, hits)
         
         # 5. Vulnerability Factor (0-1)
-        vulnerability_score = self._check_vulnerability(combined_text)
+        vulnerability_score = self._check_vulnerability(combined_text, hits)
         
         # Calculate weighted priority score
         priority_score = (
@@ -178,12 +198,15 @@ class PriorityCalculationService:
             }
         }
     
-    def _calculate_severity(self, text: str, category: Optional[str]) -> float:
+    def _calculate_severity(
+        self, text: str, category: Optional[str], hits: Optional[KeywordHits] = None
+    ) -> float:
         """Calculate severity score based on keywords."""
+        hits = hits or keyword_matcher.scan(text)
         score = 0.0
         
         # Check for emergency keywords
-        emergency_matches = sum(1 for keyword in EMERGENCY_KEYWORDS if keyword in text)
+        emergency_matches = hits.count("priority.emergency")
         if emergency_matches > 0:
             score = min(1.0, 0.8 + (emergency_matches * 0.1))
             return score
@@ -194,28 +217,29 @@ class PriorityCalculationService:
             score += 0.3
         
         # Check for severity indicators
-        severity_words = ["major", "serious", "severe", "critical", "big", "large", "huge"]
-        severity_matches = sum(1 for word in severity_words if word in text)
+        severity_matches = hits.count("priority.severity")
         score += min(0.4, severity_matches * 0.1)
         
         return min(1.0, score)
     
     def _estimate_affected_population(
-        self, text: str, lat: Optional[float], lng: Optional[float]
+        self, text: str, lat: Optional[float], lng: Optional[float], hits: Optional[KeywordHits] = None
     ) -> tuple[float, int]:
         """Estimate affected population and return score."""
+        hits = hits or keyword_matcher.scan(text)
+        
         # Default estimate
         estimate = 1
         
         # Check for high impact keywords
-        high_impact_matches = sum(1 for keyword in HIGH_IMPACT_KEYWORDS if keyword in text)
+        high_impact_matches = hits.count("priority.high_impact")
         if high_impact_matches > 0:
             estimate = 100 + (high_impact_matches * 50)
         
         # Look for number mentions
-        if "hundred" in text or "100" in text:
+        if hits.count("priority.hundreds"):
             estimate = max(estimate, 100)
-        if "thousand" in text or "1000" in text:
+        if hits.count("priority.thousands"):
             estimate = max(estimate, 1000)
         
         # Location-based estimation (if we have coordinates)
@@ -230,13 +254,16 @@ class PriorityCalculationService:
         
         return score, estimate
     
-    def _calculate_urgency(self, text: str, category: Optional[str]) -> tuple[float, bool]:
+    def _calculate_urgency(
+        self, text: str, category: Optional[str], hits: Optional[KeywordHits] = None
+    ) -> tuple[float, bool]:
         """Calculate urgency score and check if emergency."""
+        hits = hits or keyword_matcher.scan(text)
         is_emergency = False
         score = 0.0
         
         # Check for emergency keywords
-        emergency_matches = sum(1 for keyword in EMERGENCY_KEYWORDS if keyword in text)
+        emergency_matches = hits.count("priority.emergency")
         if emergency_matches > 0:
             is_emergency = True
             score = 1.0
@@ -249,20 +276,21 @@ class PriorityCalculationService:
                 score += 0.5
         
         # Time-sensitive words
-        urgent_words = ["urgent", "immediate", "asap", "quickly", "soon", "now"]
-        urgent_matches = sum(1 for word in urgent_words if word in text)
+        urgent_matches = hits.count("priority.urgent")
         score += min(0.5, urgent_matches * 0.15)
         
         return min(1.0, score), is_emergency
     
-    def _check_recurrence(self, text: str) -> float:
+    def _check_recurrence(self, text: str, hits: Optional[KeywordHits] = None) -> float:
         """Check if this is a recurring issue."""
-        recurrence_matches = sum(1 for keyword in RECURRENCE_KEYWORDS if keyword in text)
+        hits = hits or keyword_matcher.scan(text)
+        recurrence_matches = hits.count("priority.recurrence")
         return min(1.0, recurrence_matches * 0.3)
     
-    def _check_vulnerability(self, text: str) -> float:
+    def _check_vulnerability(self, text: str, hits: Optional[KeywordHits] = None) -> float:
         """Check if vulnerable populations are affected."""
-        vulnerability_matches = sum(1 for keyword in VULNERABILITY_KEYWORDS if keyword in text)
+        hits = hits or keyword_matcher.scan(text)
+        vulnerability_matches = hits.count("priority.vulnerability")
         return min(1.0, vulnerability_matches * 0.4)
     
     def get_sla_for_category(self, category: Optional[str], priority_level: str) -> dict:
@@ -293,28 +321,35 @@ class PriorityCalculationService:
         """
         Detect potential duplicate complaints within a radius.
         
-        Uses geographic distance and category matching.
+        Uses the shared duplicate engine: open complaints nearby, reranked
+        by text similarity (distance and category when no model answers).
         """
-        # Calculate approximate degree offset for radius
-        # 1 degree latitude ≈ 111 km
-        lat_offset = radius_meters / 111000.0
-        lng_offset = radius_meters / (111000.0 * abs(float(lng)))
+        complaint = await self.db.get(Complaint, complaint_id)
+        if complaint is None:
+            return []
         
-        # Query for nearby complaints in same category
-        result = await self.db.execute(
-            select(Complaint).where(
-                and_(
-                    Complaint.id != complaint_id,
-                    Complaint.category == category,
-                    Complaint.lat.between(lat - lat_offset, lat + lat_offset),
-                    Complaint.lng.between(lng - lng_offset, lng + lng_offset),
-                    Complaint.status.in_(["submitted", "assigned", "in_progress"]),
-                    Complaint.is_duplicate == False
-                )
-            ).limit(20)
+        statement = duplicate_engine.candidates_statement(
+            complaint.constituency_id, float(lat), float(lng), radius_meters, exclude_id=complaint_id
+        )
+        rows = (await self.db.execute(statement)).all()
+        result = await duplicate_engine.rank(
+            rows,
+            constituency_id=complaint.constituency_id,
+            title=complaint.title,
+            description=complaint.description,
+            lat=float(lat),
+            lng=float(lng),
+            category=category,
+            radius_meters=radius_meters,
+            limit=20,
         )
         
-        return result.scalars().all()
+        ids = [match.complaint_id for match in result.matches]
+        if not ids:
+            return []
+        found = await self.db.execute(select(Complaint).where(Complaint.id.in_(ids)))
+        by_id = {item.id: item for item in found.scalars().all()}
+        return [by_id[match_id] for match_id in ids if match_id in by_id]
     
     async def calculate_queue_position(
         self,
@@ -0,0 +1,406 @@
+"""Background generation of CSV, Excel, PDF and summary reports with dedup and TTL caching."""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.export import ExportService, write_excel_report, write_pdf_report
+from app.core.logging import logger
+from app.schemas.analytics import ReportFilter
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None
+
+
+class JobStatus:
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+# Requested format -> (canonical format, file extension, media type)
+REPORT_FORMATS = {
+    "csv": ("csv", "csv", "text/csv"),
+    "excel": ("xlsx", "xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "xlsx": ("xlsx", "xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "pdf": ("pdf", "pdf", "application/pdf"),
+    "summary": ("summary", "json", "application/json"),
+}
+
+
+@dataclass
+class ReportJob:
+    """State of one report generation request"""
+
+    id: str
+    key: str
+    format: str
+    filters: Dict[str, Any]
+    requested_by: Optional[str] = None
+    status: str = JobStatus.QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    rows: Optional[int] = None
+    error: Optional[str] = None
+
+    @property
+    def extension(self) -> str:
+        return REPORT_FORMATS[self.format][1]
+
+    @property
+    def media_type(self) -> str:
+        return REPORT_FORMATS[self.format][2]
+
+    @property
+    def file_name(self) -> str:
+        return f"report_{self.key[:16]}.{self.extension}"
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, payload: str) -> "ReportJob":
+        return cls(**json.loads(payload))
+
+
+def report_key(format_name: str, filters: Optional[ReportFilter]) -> str:
+    """Stable hash of a report spec; identical specs share one job and artefact"""
+    canonical = json.dumps(
+        {"format": format_name, "filters": filters.model_dump(mode="json") if filters else {}},
+        sort_keys=True,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class InMemoryJobStore:
+    """Job records and spec-key index for a single process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, str] = {}
+        self._keys: Dict[str, str] = {}
+
+    def save(self, job: ReportJob) -> None:
+        with self._lock:
+            self._jobs[job.id] = job.to_json()
+
+    def get(self, job_id: str) -> Optional[ReportJob]:
+        payload = self._jobs.get(job_id)
+        return ReportJob.from_json(payload) if payload else None
+
+    def claim_key(self, key: str, job_id: str) -> str:
+        """Register ``job_id`` for ``key`` unless another job holds it; returns the holder"""
+        with self._lock:
+            return self._keys.setdefault(key, job_id)
+
+    def release_key(self, key: str, job_id: str) -> None:
+        with self._lock:
+            if self._keys.get(key) == job_id:
+                del self._keys[key]
+
+    def delete(self, job_id: str) -> None:
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+
+class RedisJobStore:
+    """Job records shared by every API worker through Redis"""
+
+    PREFIX = "reports"
+
+    def __init__(self, client, ttl_seconds: int):
+        self.client = client
+        # Records outlive the artefact so late pollers still see the final status
+        self.record_ttl = ttl_seconds * 2
+
+    def save(self, job: ReportJob) -> None:
+        self.client.set(f"{self.PREFIX}:job:{job.id}", job.to_json(), ex=self.record_ttl)
+
+    def get(self, job_id: str) -> Optional[ReportJob]:
+        payload = self.client.get(f"{self.PREFIX}:job:{job_id}")
+        return ReportJob.from_json(payload) if payload else None
+
+    def claim_key(self, key: str, job_id: str) -> str:
+        name = f"{self.PREFIX}:key:{key}"
+        if self.client.set(name, job_id, nx=True, ex=self.record_ttl):
+            return job_id
+        holder = self.client.get(name)
+        return holder or self.claim_key(key, job_id)
+
+    def release_key(self, key: str, job_id: str) -> None:
+        name = f"{self.PREFIX}:key:{key}"
+        if self.client.get(name) == job_id:
+            self.client.delete(name)
+
+    def delete(self, job_id: str) -> None:
+        self.client.delete(f"{self.PREFIX}:job:{job_id}")
+
+    def push(self, job_id: str) -> None:
+        self.client.lpush(f"{self.PREFIX}:queue", job_id)
+
+    def pop(self, timeout: int) -> Optional[str]:
+        item = self.client.brpop(f"{self.PREFIX}:queue", timeout=timeout)
+        return item[1] if item else None
+
+
+class ReportJobQueue:
+    """
+    Render reports off the request path.
+
+    ``submit`` hashes the spec; an identical spec that is queued, running or
+    finished within ``ttl_seconds`` returns the existing job instead of
+    rendering again.  Jobs run on a thread pool in this process, or, when
+    Redis is reachable, are pushed onto a shared Redis list that every
+    worker's consumer threads pop from.  Artefacts are written to
+    ``EXPORT_DIR/reports`` (a volume shared by the workers); a sweeper
+    thread deletes them every ``sweep_interval_seconds`` once they are past
+    the TTL.  Owners are notified over the realtime websocket.
+    """
+
+    def __init__(
+        self,
+        output_dir: Optional[Path] = None,
+        workers: int = 2,
+        ttl_seconds: int = 3600,
+        session_factory: Callable[[], Session] = SessionLocal,
+        redis_url: Optional[str] = None,
+        sweep_interval_seconds: float = 300,
+    ):
+        self.output_dir = Path(output_dir or Path(getattr(settings, "EXPORT_DIR", "./exports")) / "reports")
+        self.workers = workers
+        self.ttl_seconds = ttl_seconds
+        self.session_factory = session_factory
+        self.redis_url = redis_url
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self.store = InMemoryJobStore()
+        self._redis_store: Optional[RedisJobStore] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._consumers: list = []
+        self._sweeper: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """Start workers; uses Redis when ``redis_url`` is set and reachable"""
+        self._loop = loop
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._stopping.clear()
+
+        if self.redis_url and redis is not None:
+            try:
+                client = redis.Redis.from_url(self.redis_url, decode_responses=True)
+                client.ping()
+                self._redis_store = RedisJobStore(client, self.ttl_seconds)
+                self.store = self._redis_store
+            except Exception as e:
+                logger.warning("Redis unavailable for report jobs, using in-process queue", error=str(e))
+
+        if self._redis_store is not None:
+            for index in range(self.workers):
+                consumer = threading.Thread(target=self._consume, name=f"report-worker-{index}", daemon=True)
+                consumer.start()
+                self._consumers.append(consumer)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="report-worker")
+
+        self._sweeper = threading.Thread(target=self._sweep_periodically, name="report-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def shutdown(self, timeout: float = 30.0) -> None:
+        """
+        Stop taking jobs: queued in-process jobs are cancelled, running ones
+        finish, and consumer and sweeper threads are joined (each for at
+        most ``timeout`` seconds). Blocks, so call it off the event loop.
+        """
+        self._stopping.set()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        for thread in [*self._consumers, *([self._sweeper] if self._sweeper else [])]:
+            thread.join(timeout)
+        self._consumers = []
+        self._sweeper = None
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Delete artefacts and abandoned temp files older than the TTL; returns how many"""
+        cutoff = (now if now is not None else time.time()) - self.ttl_seconds
+        removed = 0
+        for path in self.output_dir.glob("report_*"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:  # Swept by another worker sharing the directory
+                continue
+        if removed:
+            logger.info("Expired report files removed", count=removed)
+        return removed
+
+    def _sweep_periodically(self) -> None:
+        while not self._stopping.wait(self.sweep_interval_seconds):
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error("Report sweep failed", error=str(e))
+
+    def _consume(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                job_id = self._redis_store.pop(timeout=1)
+            except Exception as e:
+                logger.error("Report queue pop failed", error=str(e))
+                time.sleep(1)
+                continue
+            if job_id:
+                self._run(job_id)
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+
+    def submit(self, format_name: str, filters: Optional[ReportFilter] = None,
+               requested_by: Optional[str] = None) -> ReportJob:
+        """Queue a report, or return the job already serving the same spec"""
+        if format_name not in REPORT_FORMATS:
+            raise ValueError(f"Unsupported report format: {format_name}")
+        if self._executor is None and self._redis_store is None:
+            self.start()
+
+        canonical = REPORT_FORMATS[format_name][0]
+        key = report_key(canonical, filters)
+        job = ReportJob(
+            id=str(uuid.uuid4()),
+            key=key,
+            format=canonical,
+            filters=filters.model_dump(mode="json") if filters else {},
+            requested_by=requested_by,
+        )
+
+        while True:
+            holder_id = self.store.claim_key(key, job.id)
+            if holder_id == job.id:
+                break
+            existing = self.store.get(holder_id)
+            if existing is not None and self._is_reusable(existing):
+                return existing
+            # Failed or expired holder: drop it and claim the key again
+            self.store.release_key(key, holder_id)
+            if existing is not None and existing.status == JobStatus.COMPLETED:
+                self.artifact_path(existing).unlink(missing_ok=True)
+
+        self.store.save(job)
+        if self._redis_store is not None:
+            self._redis_store.push(job.id)
+        else:
+            self._executor.submit(self._run, job.id)
+        logger.info("Report job queued", job_id=job.id, format=canonical)
+        return job
+
+    def get(self, job_id: str) -> Optional[ReportJob]:
+        job = self.store.get(job_id)
+        if job is not None and job.status == JobStatus.COMPLETED and not self._is_reusable(job):
+            return None
+        return job
+
+    def artifact_path(self, job: ReportJob) -> Path:
+        return self.output_dir / job.file_name
+
+    def _is_reusable(self, job: ReportJob) -> bool:
+        if job.status in (JobStatus.QUEUED, JobStatus.RUNNING):
+            return True
+        if job.status == JobStatus.COMPLETED:
+            fresh = job.finished_at is not None and time.time() - job.finished_at < self.ttl_seconds
+            return fresh and self.artifact_path(job).exists()
+        return False
+
+    # ------------------------------------------------------------------
+    # Rendering
+    # ------------------------------------------------------------------
+
+    def _run(self, job_id: str) -> None:
+        job = self.store.get(job_id)
+        if job is None or job.status != JobStatus.QUEUED:
+            return
+
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+        self.store.save(job)
+
+        path = self.artifact_path(job)
+        temp_path = path.with_name(f"{path.name}.{job.id}.tmp")
+        filters = ReportFilter(**job.filters) if job.filters else None
+        db = self.session_factory()
+        try:
+            job.rows = self._render(ExportService(db), job.format, filters, temp_path)
+            os.replace(temp_path, path)
+            job.status = JobStatus.COMPLETED
+        except Exception as e:
+            logger.error("Report job failed", job_id=job.id, error=str(e))
+            job.status = JobStatus.FAILED
+            job.error = str(e)
+            temp_path.unlink(missing_ok=True)
+            self.store.release_key(job.key, job.id)
+        finally:
+            db.close()
+
+        job.finished_at = time.time()
+        self.store.save(job)
+        logger.info("Report job finished", job_id=job.id, status=job.status,
+                    rows=job.rows, duration_s=round(job.finished_at - job.started_at, 2))
+        self._notify(job)
+
+    @staticmethod
+    def _render(service: ExportService, format_name: str,
+                filters: Optional[ReportFilter], path: Path) -> int:
+        summary = service.generate_summary_report(filters)
+        if format_name == "summary":
+            path.write_text(json.dumps(summary, default=str))
+            return summary.get("total_complaints", 0)
+        if format_name == "csv":
+            with open(path, "w", newline="", encoding="utf-8") as handle:
+                for chunk in service.stream_csv(filters):
+                    handle.write(chunk)
+            return summary.get("total_complaints", 0)
+
+        records = (service._row_dict(row) for row in service.export_rows(filters))
+        if format_name == "xlsx":
+            return write_excel_report(str(path), records, summary)
+        return write_pdf_report(str(path), records, summary)
+
+    def _notify(self, job: ReportJob) -> None:
+        if not job.requested_by or self._loop is None or self._loop.is_closed():
+            return
+        from app.services.realtime_service import realtime_service
+
+        event = {"type": "report_ready" if job.status == JobStatus.COMPLETED else "report_failed",
+                 "data": {"job_id": job.id, "status": job.status, "error": job.error}}
+        asyncio.run_coroutine_threadsafe(realtime_service.send_to_user(job.requested_by, event), self._loop)
+
+
+# Global queue instance, started from the application lifespan
+report_queue = ReportJobQueue(
+    workers=getattr(settings, "REPORT_WORKERS", 2),
+    ttl_seconds=getattr(settings, "REPORT_CACHE_TTL_SECONDS", 3600),
+    redis_url=getattr(settings, "REDIS_URL", None),
+    sweep_interval_seconds=getattr(settings, "REPORT_SWEEP_INTERVAL_SECONDS", 300),
+)
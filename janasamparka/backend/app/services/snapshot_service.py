@@ -0,0 +1,428 @@
+"""Incremental Parquet snapshots of complaint, rating and budget data for offline analytics."""
+
+import asyncio
+import enum
+import json
+import os
+import re
+import shutil
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.lazy import LazyModule
+from app.core.logging import logger
+from app.models.budget import DepartmentBudget, WardBudget
+from app.models.complaint import Complaint, StatusLog
+from app.models.ward import Ward
+
+# Optional dependency, imported when the first snapshot is written
+pa = LazyModule("pyarrow")
+pq = LazyModule("pyarrow.parquet")
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None
+
+
+_ARROW_TYPES = {
+    "string": lambda: pa.string(),
+    "int": lambda: pa.int64(),
+    "float": lambda: pa.float64(),
+    "bool": lambda: pa.bool_(),
+    "timestamp": lambda: pa.timestamp("us"),
+}
+
+_PARTITION_VALUE = re.compile(r"^[0-9a-fA-F-]{36}$|^unknown$")
+_MONTH_VALUE = re.compile(r"^\d{4}-\d{2}$|^unknown$")
+_PART_FILE = re.compile(r"^part-[0-9T]+\.parquet$")
+
+
+@dataclass(frozen=True)
+class SnapshotDataset:
+    """
+    One exported table.
+
+    ``statement`` must select ``constituency_id`` plus ``columns`` and be
+    ordered by (constituency_id, ``partition_time``) so that partitions are
+    written one after another.  ``watermark`` is the column compared against
+    the previous run's cutoff.
+    """
+
+    name: str
+    statement: Callable[[], Any]
+    watermark: Any
+    partition_time: str
+    columns: Tuple[Tuple[str, str], ...]
+
+
+def _complaints_statement():
+    return select(
+        Complaint.id, Complaint.constituency_id, Complaint.ward_id, Complaint.dept_id,
+        Complaint.user_id, Complaint.assigned_to, Complaint.title, Complaint.category,
+        Complaint.status, Complaint.priority, Complaint.priority_score, Complaint.is_emergency,
+        Complaint.is_duplicate, Complaint.lat, Complaint.lng, Complaint.location_description,
+        Complaint.created_at, Complaint.updated_at, Complaint.resolved_at, Complaint.closed_at,
+        Complaint.citizen_rating,
+    ).order_by(Complaint.constituency_id, Complaint.created_at)
+
+
+def _status_logs_statement():
+    return (
+        select(
+            StatusLog.id, Complaint.constituency_id, StatusLog.complaint_id, StatusLog.old_status,
+            StatusLog.new_status, StatusLog.changed_by, StatusLog.timestamp,
+        )
+        .join(Complaint, Complaint.id == StatusLog.complaint_id)
+        .order_by(Complaint.constituency_id, StatusLog.timestamp)
+    )
+
+
+def _ratings_statement():
+    return (
+        select(
+            Complaint.id.label("complaint_id"), Complaint.constituency_id, Complaint.ward_id,
+            Complaint.dept_id, Complaint.category, Complaint.citizen_rating,
+            Complaint.citizen_feedback, Complaint.rating_submitted_at,
+        )
+        .where(Complaint.citizen_rating.isnot(None))
+        .order_by(Complaint.constituency_id, Complaint.rating_submitted_at)
+    )
+
+
+def _ward_budgets_statement():
+    return (
+        select(
+            WardBudget.id, Ward.constituency_id, WardBudget.ward_id, WardBudget.financial_year,
+            WardBudget.category, WardBudget.allocated, WardBudget.spent, WardBudget.committed,
+            WardBudget.created_at, WardBudget.updated_at,
+        )
+        .join(Ward, Ward.id == WardBudget.ward_id)
+        .order_by(Ward.constituency_id, WardBudget.created_at)
+    )
+
+
+def _department_budgets_statement():
+    return select(
+        DepartmentBudget.id, DepartmentBudget.constituency_id, DepartmentBudget.department_id,
+        DepartmentBudget.financial_year, DepartmentBudget.category, DepartmentBudget.allocated,
+        DepartmentBudget.spent, DepartmentBudget.committed, DepartmentBudget.created_at,
+        DepartmentBudget.updated_at,
+    ).order_by(DepartmentBudget.constituency_id, DepartmentBudget.created_at)
+
+
+_BUDGET_COLUMNS = (
+    ("financial_year", "string"), ("category", "string"), ("allocated", "int"),
+    ("spent", "int"), ("committed", "int"), ("created_at", "timestamp"), ("updated_at", "timestamp"),
+)
+
+SNAPSHOT_DATASETS: Tuple[SnapshotDataset, ...] = (
+    SnapshotDataset(
+        name="complaints",
+        statement=_complaints_statement,
+        watermark=Complaint.updated_at,
+        partition_time="created_at",
+        columns=(
+            ("id", "string"), ("ward_id", "string"), ("dept_id", "string"), ("user_id", "string"),
+            ("assigned_to", "string"), ("title", "string"), ("category", "string"),
+            ("status", "string"), ("priority", "string"), ("priority_score", "float"),
+            ("is_emergency", "bool"), ("is_duplicate", "bool"), ("lat", "float"), ("lng", "float"),
+            ("location_description", "string"), ("created_at", "timestamp"),
+            ("updated_at", "timestamp"), ("resolved_at", "timestamp"), ("closed_at", "timestamp"),
+            ("citizen_rating", "int"),
+        ),
+    ),
+    SnapshotDataset(
+        name="status_logs",
+        statement=_status_logs_statement,
+        watermark=StatusLog.timestamp,
+        partition_time="timestamp",
+        columns=(
+            ("id", "string"), ("complaint_id", "string"), ("old_status", "string"),
+            ("new_status", "string"), ("changed_by", "string"), ("timestamp", "timestamp"),
+        ),
+    ),
+    SnapshotDataset(
+        name="ratings",
+        statement=_ratings_statement,
+        watermark=Complaint.rating_submitted_at,
+        partition_time="rating_submitted_at",
+        columns=(
+            ("complaint_id", "string"), ("ward_id", "string"), ("dept_id", "string"),
+            ("category", "string"), ("citizen_rating", "int"), ("citizen_feedback", "string"),
+            ("rating_submitted_at", "timestamp"),
+        ),
+    ),
+    SnapshotDataset(
+        name="ward_budgets",
+        statement=_ward_budgets_statement,
+        watermark=WardBudget.updated_at,
+        partition_time="created_at",
+        columns=(("id", "string"), ("ward_id", "string")) + _BUDGET_COLUMNS,
+    ),
+    SnapshotDataset(
+        name="department_budgets",
+        statement=_department_budgets_statement,
+        watermark=DepartmentBudget.updated_at,
+        partition_time="created_at",
+        columns=(("id", "string"), ("department_id", "string")) + _BUDGET_COLUMNS,
+    ),
+)
+
+
+def _to_arrow_value(value: Any) -> Any:
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        # Store every timestamp as naive UTC so partitions share one schema
+        return (value - value.utcoffset()).replace(tzinfo=None)
+    return value
+
+
+def partition_key(constituency_id: Any, moment: Optional[datetime]) -> Tuple[str, str]:
+    """(constituency, YYYY-MM) partition for a row"""
+    return (
+        str(constituency_id) if constituency_id else "unknown",
+        moment.strftime("%Y-%m") if moment else "unknown",
+    )
+
+
+class SnapshotService:
+    """
+    Write partitioned Parquet snapshots under ``EXPORT_DIR/snapshots``.
+
+    Layout (Hive-style, readable by pyarrow.dataset, DuckDB or pandas)::
+
+        <dataset>/constituency_id=<uuid>/month=<YYYY-MM>/part-<run>.parquet
+
+    Each run appends one part per touched partition holding the rows whose
+    watermark column falls in ``(previous cutoff, this cutoff]``.  Changed
+    complaints therefore appear again in a later part; readers keep the row
+    with the latest ``updated_at`` per ``id``.  ``run(full=True)`` rebuilds
+    every dataset from scratch.  Reads can be pointed at a replica with
+    ``ANALYTICS_DATABASE_URL`` so the job never touches the primary.
+    """
+
+    STATE_FILE = "_state.json"
+    LOCK_FILE = ".lock"
+
+    def __init__(
+        self,
+        root: Optional[Path] = None,
+        session_factory: Optional[Callable[[], Session]] = None,
+        batch_size: int = 5000,
+        lag_seconds: int = 60,
+        datasets: Tuple[SnapshotDataset, ...] = SNAPSHOT_DATASETS,
+    ):
+        self.root = Path(root or Path(getattr(settings, "EXPORT_DIR", "./exports")) / "snapshots")
+        self._session_factory = session_factory
+        self.batch_size = batch_size
+        # Rows committed within this window may still be in flight; leave them to the next run
+        self.lag = timedelta(seconds=lag_seconds)
+        self.datasets = datasets
+
+    # ------------------------------------------------------------------
+    # Running
+    # ------------------------------------------------------------------
+
+    @property
+    def session_factory(self) -> Callable[[], Session]:
+        if self._session_factory is None:
+            replica_url = getattr(settings, "ANALYTICS_DATABASE_URL", None)
+            if replica_url:
+                self._session_factory = sessionmaker(bind=create_engine(replica_url, pool_pre_ping=True))
+            else:
+                self._session_factory = SessionLocal
+        return self._session_factory
+
+    def run(self, full: bool = False, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Export every dataset; returns rows written per dataset"""
+        if not pa.available:
+            raise RuntimeError("Parquet snapshots require the pyarrow package")
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        with self._lock() as acquired:
+            if not acquired:
+                logger.info("Analytics snapshot already running elsewhere, skipping")
+                return {"skipped": True}
+
+            cutoff = (now or datetime.utcnow()) - self.lag
+            state = {} if full else self._load_state()
+            summary: Dict[str, Any] = {"cutoff": cutoff.isoformat(), "datasets": {}}
+
+            db = self.session_factory()
+            try:
+                for dataset in self.datasets:
+                    if full:
+                        shutil.rmtree(self.root / dataset.name, ignore_errors=True)
+                    previous = state.get(dataset.name, {}).get("watermark")
+                    since = datetime.fromisoformat(previous) if previous else None
+                    written = self._export_dataset(db, dataset, since, cutoff)
+                    state[dataset.name] = {
+                        "watermark": cutoff.isoformat(),
+                        "rows_last_run": written,
+                        "last_run": datetime.utcnow().isoformat(),
+                    }
+                    # Persist per dataset so a failure later on keeps earlier progress
+                    self._save_state(state)
+                    summary["datasets"][dataset.name] = written
+                    db.rollback()
+            finally:
+                db.close()
+
+            logger.info("Analytics snapshot written", **summary)
+            return summary
+
+    async def run_periodically(self, interval_minutes: float) -> None:
+        """Run the snapshot job every ``interval_minutes`` until cancelled"""
+        while True:
+            try:
+                await asyncio.to_thread(self.run)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Analytics snapshot failed", error=str(e))
+            await asyncio.sleep(interval_minutes * 60)
+
+    def _export_dataset(self, db: Session, dataset: SnapshotDataset,
+                        since: Optional[datetime], cutoff: datetime) -> int:
+        statement = dataset.statement().where(dataset.watermark <= cutoff)
+        if since is not None:
+            statement = statement.where(dataset.watermark > since)
+
+        schema = pa.schema([(name, _ARROW_TYPES[kind]()) for name, kind in dataset.columns])
+        names = [name for name, _ in dataset.columns]
+        run_id = cutoff.strftime("%Y%m%dT%H%M%S")
+        self._remove_partial_files(self.root / dataset.name)
+
+        written = 0
+        for key, batches in self._partitions(db, statement, dataset.partition_time):
+            directory = self.root / dataset.name / f"constituency_id={key[0]}" / f"month={key[1]}"
+            directory.mkdir(parents=True, exist_ok=True)
+            final_path = directory / f"part-{run_id}.parquet"
+            temp_path = final_path.with_suffix(".parquet.tmp")
+
+            with pq.ParquetWriter(temp_path, schema, compression="zstd") as writer:
+                for rows in batches:
+                    columns = {name: [_to_arrow_value(getattr(row, name)) for row in rows] for name in names}
+                    writer.write_table(pa.table(columns, schema=schema))
+                    written += len(rows)
+            os.replace(temp_path, final_path)
+
+        return written
+
+    def _partitions(self, db: Session, statement, time_column: str) -> Iterator[Tuple[Tuple[str, str], Iterator[List[Any]]]]:
+        """
+        Group the ordered result stream into (partition key, row batches).
+
+        Each inner iterator must be consumed before advancing to the next
+        partition, which ``_export_dataset`` does.
+        """
+        result = db.execute(statement.execution_options(yield_per=self.batch_size))
+        rows = iter(result)
+        pending: Optional[Any] = next(rows, None)
+
+        def batches(key):
+            nonlocal pending
+            batch = []
+            while pending is not None and partition_key(pending.constituency_id, getattr(pending, time_column)) == key:
+                batch.append(pending)
+                pending = next(rows, None)
+                if len(batch) >= self.batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+        try:
+            while pending is not None:
+                key = partition_key(pending.constituency_id, getattr(pending, time_column))
+                yield key, batches(key)
+        finally:
+            result.close()
+
+    # ------------------------------------------------------------------
+    # Files
+    # ------------------------------------------------------------------
+
+    def list_files(self, constituency_id: Optional[UUID] = None) -> List[Dict[str, Any]]:
+        """Snapshot part files, optionally limited to one constituency"""
+        files = []
+        for dataset in self.datasets:
+            base = self.root / dataset.name
+            pattern = f"constituency_id={constituency_id}/month=*/part-*.parquet" if constituency_id \
+                else "constituency_id=*/month=*/part-*.parquet"
+            for path in sorted(base.glob(pattern)):
+                stat = path.stat()
+                files.append({
+                    "dataset": dataset.name,
+                    "constituency_id": path.parent.parent.name.split("=", 1)[1],
+                    "month": path.parent.name.split("=", 1)[1],
+                    "file": path.name,
+                    "size": stat.st_size,
+                    "modified_at": datetime.utcfromtimestamp(stat.st_mtime).isoformat(),
+                })
+        return files
+
+    def resolve_file(self, dataset: str, constituency_id: str, month: str, filename: str) -> Optional[Path]:
+        """Validated path of one part file, or None if it does not exist"""
+        if dataset not in {d.name for d in self.datasets}:
+            return None
+        if not (_PARTITION_VALUE.match(constituency_id) and _MONTH_VALUE.match(month) and _PART_FILE.match(filename)):
+            return None
+        path = self.root / dataset / f"constituency_id={constituency_id}" / f"month={month}" / filename
+        return path if path.is_file() else None
+
+    def load_state(self) -> Dict[str, Any]:
+        return self._load_state()
+
+    def _load_state(self) -> Dict[str, Any]:
+        try:
+            return json.loads((self.root / self.STATE_FILE).read_text())
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save_state(self, state: Dict[str, Any]) -> None:
+        temp_path = self.root / f"{self.STATE_FILE}.tmp"
+        temp_path.write_text(json.dumps(state, indent=2, sort_keys=True))
+        os.replace(temp_path, self.root / self.STATE_FILE)
+
+    @staticmethod
+    def _remove_partial_files(directory: Path) -> None:
+        for path in directory.glob("**/*.parquet.tmp"):
+            path.unlink(missing_ok=True)
+
+    @contextmanager
+    def _lock(self):
+        """Non-blocking inter-process lock so only one worker writes snapshots"""
+        if fcntl is None:
+            yield True
+            return
+        with open(self.root / self.LOCK_FILE, "w") as handle:
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+# Global service instance
+snapshot_service = SnapshotService()
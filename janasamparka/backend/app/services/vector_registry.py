@@ -0,0 +1,291 @@
+"""
+Vector registry: the one place that decides how complaints are embedded
+(model, dimension, normalisation) and keeps their vectors, one index per
+constituency, for duplicate detection and similarity search
+"""
+import hashlib
+from dataclasses import dataclass
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.metrics import vector_registry_vectors
+from app.services.inference import EmbeddingService, embedding_service
+
+
+def complaint_text(title: str, description: str) -> str:
+    """The text a complaint is embedded from, everywhere"""
+    return f"{title} {description}"
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """Unit-length float32 rows, so inner product is cosine similarity"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def fingerprint(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+@dataclass
+class Match:
+    key: str
+    similarity: float
+
+
+class VectorIndex:
+    """
+    Normalised vectors of one constituency's complaints, searched exactly by
+    inner product (what faiss.IndexFlatIP did, without the dependency).
+    Rows live in one contiguous matrix that grows by doubling; removal
+    moves the last row into the freed slot.
+    """
+
+    def __init__(self, dimension: int):
+        self.dimension = dimension
+        self._matrix = np.zeros((0, dimension), dtype=np.float32)
+        self._keys: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._fingerprints: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._rows
+
+    def keys(self) -> List[str]:
+        return list(self._keys)
+
+    def fingerprint_of(self, key: str) -> Optional[str]:
+        return self._fingerprints.get(key)
+
+    def add(self, keys: Sequence[str], vectors: np.ndarray, fingerprints: Optional[Sequence[str]] = None):
+        """Insert or replace rows; ``vectors`` must already be normalised"""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(keys), self.dimension)
+        for i, key in enumerate(keys):
+            row = self._rows.get(key)
+            if row is None:
+                row = len(self._keys)
+                if row == len(self._matrix):
+                    grown = np.zeros((max(16, 2 * len(self._matrix)), self.dimension), dtype=np.float32)
+                    grown[:row] = self._matrix[:row]
+                    self._matrix = grown
+                self._keys.append(key)
+                self._rows[key] = row
+            self._matrix[row] = vectors[i]
+            if fingerprints is not None:
+                self._fingerprints[key] = fingerprints[i]
+
+    def remove(self, key: str) -> bool:
+        row = self._rows.pop(key, None)
+        if row is None:
+            return False
+        self._fingerprints.pop(key, None)
+        last = len(self._keys) - 1
+        if row != last:
+            moved = self._keys[last]
+            self._matrix[row] = self._matrix[last]
+            self._keys[row] = moved
+            self._rows[moved] = row
+        self._keys.pop()
+        return True
+
+    def vector(self, key: str) -> Optional[np.ndarray]:
+        row = self._rows.get(key)
+        return None if row is None else self._matrix[row].copy()
+
+    def vectors(self, keys: Sequence[str]) -> np.ndarray:
+        """Rows for ``keys``, in order (KeyError for unknown keys)"""
+        return self._matrix[[self._rows[key] for key in keys]]
+
+    def search(self, vector: np.ndarray, limit: Optional[int] = None, threshold: float = -1.0,
+               exclude: Sequence[str] = ()) -> List[Match]:
+        """Rows with similarity >= ``threshold`` to ``vector``, best first"""
+        if not self._keys:
+            return []
+        scores = self._matrix[:len(self._keys)] @ np.asarray(vector, dtype=np.float32)
+        for key in exclude:
+            row = self._rows.get(key)
+            if row is not None:
+                scores[row] = -np.inf
+        candidates = np.flatnonzero(scores >= threshold)
+        if limit is not None and len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [Match(self._keys[row], float(scores[row])) for row in candidates]
+
+    def state(self) -> Dict[str, np.ndarray]:
+        """Arrays for np.savez"""
+        return {
+            "keys": np.array(self._keys, dtype=str),
+            "vectors": self._matrix[:len(self._keys)].copy(),
+            "fingerprints": np.array([self._fingerprints.get(key, "") for key in self._keys], dtype=str),
+        }
+
+    @classmethod
+    def from_state(cls, state) -> "VectorIndex":
+        index = cls(state["vectors"].shape[1])
+        index.add(state["keys"].tolist(), state["vectors"], state["fingerprints"].tolist())
+        return index
+
+
+class VectorRegistry:
+    """
+    Embeddings and per-constituency indexes shared by every AI feature.
+
+    All callers embed through ``embed`` (the EmbeddingService model, local
+    or on the inference server), so one model is loaded per deployment,
+    every vector has the same dimension and normalisation, and similarity
+    scores are comparable across features.
+    """
+
+    def __init__(self, embeddings: Optional[EmbeddingService] = None):
+        self.embeddings = embeddings or embedding_service
+        self._indexes: Dict[str, VectorIndex] = {}
+        self._dimension: Optional[int] = None
+
+    @property
+    def model_name(self) -> str:
+        return self.embeddings.encoder.model_name
+
+    @property
+    def dimension(self) -> Optional[int]:
+        """Vector width, known once anything has been embedded"""
+        return self._dimension
+
+    @property
+    def available(self) -> bool:
+        """Whether ``embed`` can run without loading the model into a process that must not hold it"""
+        return self.embeddings.available
+
+    async def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Normalised float32 rows, one per text"""
+        if not texts:
+            return np.zeros((0, self._dimension or 0), dtype=np.float32)
+        vectors = normalize(await self.embeddings.encode(list(texts)))
+        if self._dimension is None:
+            self._dimension = vectors.shape[1]
+        elif vectors.shape[1] != self._dimension:
+            raise ValueError(
+                f"{self.model_name} returned {vectors.shape[1]}-d vectors, registry holds {self._dimension}-d"
+            )
+        return vectors
+
+    def index(self, constituency_id: Hashable) -> Optional[VectorIndex]:
+        return self._indexes.get(str(constituency_id))
+
+    def _index_for(self, constituency_id: Hashable) -> VectorIndex:
+        key = str(constituency_id)
+        index = self._indexes.get(key)
+        if index is None:
+            index = self._indexes[key] = VectorIndex(self._dimension)
+        return index
+
+    async def add(self, constituency_id: Hashable, items: Dict[str, str]) -> None:
+        """Embed and store ``{key: text}`` in the constituency's index"""
+        if not items:
+            return
+        keys = list(items)
+        texts = [items[key] for key in keys]
+        vectors = await self.embed(texts)
+        self._index_for(constituency_id).add(keys, vectors, [fingerprint(text) for text in texts])
+        self._update_gauge()
+
+    async def sync(self, constituency_id: Hashable, items: Dict[str, str]) -> VectorIndex:
+        """
+        Make the constituency's index hold exactly ``{key: text}``: embed
+        only new or edited texts and drop keys that are gone.
+        """
+        index = self.index(constituency_id)
+        if index is not None:
+            for key in set(index.keys()) - set(items):
+                index.remove(key)
+        stale = {key: text for key, text in items.items()
+                 if index is None or index.fingerprint_of(key) != fingerprint(text)}
+        await self.add(constituency_id, stale)
+        self._update_gauge()
+        return self._indexes.get(str(constituency_id)) or VectorIndex(self._dimension or 0)
+
+    async def vectors_for(self, constituency_id: Hashable, items: Dict[str, str],
+                          query: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectors for ``items`` (rows in key order) and for ``query``. Vectors
+        already in the index are reused; the query and any new or edited
+        items are embedded together in one call and stored.
+        """
+        index = self.index(constituency_id)
+        missing = [key for key, text in items.items()
+                   if index is None or index.fingerprint_of(key) != fingerprint(text)]
+        embedded = await self.embed([query] + [items[key] for key in missing])
+        if missing:
+            self._index_for(constituency_id).add(
+                missing, embedded[1:], [fingerprint(items[key]) for key in missing]
+            )
+            self._update_gauge()
+        if not items:
+            return np.zeros((0, embedded.shape[1]), dtype=np.float32), embedded[0]
+        return self.index(constituency_id).vectors(list(items)), embedded[0]
+
+    def put(self, constituency_id: Hashable, key: str, text: str, vector: np.ndarray) -> None:
+        """Store a vector that was already embedded (and normalised) by this registry"""
+        if self._dimension is None:
+            self._dimension = len(vector)
+        self._index_for(constituency_id).add([key], vector[None, :], [fingerprint(text)])
+        self._update_gauge()
+
+    def remove(self, constituency_id: Hashable, key: str) -> bool:
+        index = self.index(constituency_id)
+        removed = index is not None and index.remove(key)
+        self._update_gauge()
+        return removed
+
+    async def search(self, constituency_id: Hashable, text: str, limit: Optional[int] = None,
+                     threshold: float = -1.0, exclude: Sequence[str] = ()) -> List[Match]:
+        """Complaints in the constituency most similar to ``text``"""
+        index = self.index(constituency_id)
+        if index is None or not len(index):
+            return []
+        vector = (await self.embed([text]))[0]
+        return index.search(vector, limit, threshold, exclude)
+
+    def save(self, path: str) -> None:
+        """Write every index to one .npz file"""
+        arrays = {}
+        for constituency_id, index in self._indexes.items():
+            for name, array in index.state().items():
+                arrays[f"{constituency_id}/{name}"] = array
+        np.savez(path, **arrays)
+
+    def load(self, path: str) -> None:
+        with np.load(path) as archive:
+            grouped: Dict[str, Dict[str, np.ndarray]] = {}
+            for name in archive.files:
+                constituency_id, field = name.rsplit("/", 1)
+                grouped.setdefault(constituency_id, {})[field] = archive[name]
+        for constituency_id, state in grouped.items():
+            index = VectorIndex.from_state(state)
+            if self._dimension is None:
+                self._dimension = index.dimension
+            self._indexes[constituency_id] = index
+        self._update_gauge()
+
+    def clear(self) -> None:
+        self._indexes.clear()
+        self._update_gauge()
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "model": self.model_name,
+            "dimension": self._dimension,
+            "constituencies": len(self._indexes),
+            "vectors": sum(len(index) for index in self._indexes.values()),
+        }
+
+    def _update_gauge(self) -> None:
+        vector_registry_vectors.set(sum(len(index) for index in self._indexes.values()))
+
+
+vector_registry = VectorRegistry()
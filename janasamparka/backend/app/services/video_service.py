@@ -7,10 +7,10 @@ import hmac
 import base64
 from typing import Dict, Any, Optional
 from datetime import datetime, timedelta
-import aiohttp
 import asyncio
 
 from app.core.config import settings
+from app.core.http_clients import http_clients
 from app.core.logging import logger
 
 
@@ -100,22 +100,20 @@ class ZoomPlatform(VideoConferencePlatform):
         if kwargs.get('password', False):
             meeting_data['password'] = self._generate_meeting_password()
         
-        async with aiohttp.ClientSession() as session:
-            async with session.post(f'{self.base_url}/users/me/meetings', 
-                                  headers=headers, json=meeting_data) as response:
-                if response.status == 201:
-                    meeting_info = await response.json()
-                    return {
-                        'platform': 'zoom',
-                        'meeting_id': str(meeting_info['id']),
-                        'meeting_url': meeting_info['join_url'],
-                        'password': meeting_info.get('password'),
-                        'host_url': meeting_info['start_url']
-                    }
-                else:
-                    error_text = await response.text()
-                    logger.error("Failed to create Zoom meeting", error=error_text)
-                    return self._create_mock_meeting(title, scheduled_start, scheduled_end, **kwargs)
+        response = await http_clients.request('zoom', 'POST', f'{self.base_url}/users/me/meetings',
+                                              headers=headers, json=meeting_data)
+        if response.status_code == 201:
+            meeting_info = response.json()
+            return {
+                'platform': 'zoom',
+                'meeting_id': str(meeting_info['id']),
+                'meeting_url': meeting_info['join_url'],
+                'password': meeting_info.get('password'),
+                'host_url': meeting_info['start_url']
+            }
+        else:
+            logger.error("Failed to create Zoom meeting", error=response.text)
+            return self._create_mock_meeting(title, scheduled_start, scheduled_end, **kwargs)
     
     def _create_mock_meeting(self, title: str, scheduled_start: datetime, 
                            scheduled_end: datetime, **kwargs) -> Dict[str, Any]:
@@ -159,14 +157,12 @@ class ZoomPlatform(VideoConferencePlatform):
             'Content-Type': 'application/json'
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(f'{self.base_url}/meetings/{meeting_id}/participants', 
-                                 headers=headers) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return data.get('participants', [])
-                else:
-                    return []
+        response = await http_clients.request('zoom', 'GET', f'{self.base_url}/meetings/{meeting_id}/participants',
+                                              headers=headers)
+        if response.status_code == 200:
+            return response.json().get('participants', [])
+        else:
+            return []
 
 
 class GoogleMeetPlatform(VideoConferencePlatform):
@@ -0,0 +1,241 @@
+"""
+Background delivery of webhook events from the transactional outbox
+"""
+import asyncio
+import random
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from sqlalchemy import delete, event, func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.http_clients import http_clients
+from app.core.logging import logger
+from app.core.metrics import webhook_deliveries_total, webhook_delivery_lag, webhook_outbox_pending
+from app.core.webhooks import OUTBOX_PENDING, SIGNATURE_HEADER, TIMESTAMP_HEADER, sign_payload
+from app.models.webhook import WebhookOutbox
+
+
+@dataclass(frozen=True)
+class OutboxEvent:
+    """A claimed outbox row, detached from its session"""
+
+    id: int
+    endpoint: str
+    payload: str
+    attempts: int
+    created_at: datetime
+
+
+def _host(endpoint: str) -> str:
+    return urlsplit(endpoint).netloc or endpoint
+
+
+class WebhookDispatcher:
+    """
+    Deliver outbox rows to their endpoints in batches.
+
+    Due rows are claimed by pushing ``next_attempt_at`` out by a lease
+    (``FOR UPDATE SKIP LOCKED`` on PostgreSQL), so several API workers can
+    run a dispatcher without sending an event twice. Each endpoint receives
+    up to ``batch_size`` events per POST as ``{"events": [...]}``, signed
+    with ``WEBHOOK_SIGNING_SECRET``. A failed batch is retried with
+    exponential backoff until ``max_attempts``, after which its rows are
+    marked ``dead`` and kept for inspection.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal,
+                 batch_size: Optional[int] = None, max_attempts: Optional[int] = None,
+                 poll_interval: Optional[float] = None, lease_seconds: int = 60,
+                 backoff_base: float = 5.0, backoff_max: float = 3600.0,
+                 retention_hours: Optional[int] = None):
+        self.session_factory = session_factory
+        self.batch_size = batch_size or getattr(settings, "WEBHOOK_BATCH_SIZE", 50)
+        self.max_attempts = max_attempts or getattr(settings, "WEBHOOK_MAX_ATTEMPTS", 10)
+        self.poll_interval = poll_interval or getattr(settings, "WEBHOOK_POLL_INTERVAL_SECONDS", 2.0)
+        self.lease_seconds = lease_seconds
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retention_hours = retention_hours or getattr(settings, "WEBHOOK_RETENTION_HOURS", 72)
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._last_purge = 0.0
+
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+
+    def notify(self) -> None:
+        """Wake the dispatcher; safe to call from any thread"""
+        if self._loop is not None and self._wakeup is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def run(self) -> None:
+        """Deliver until cancelled, sleeping between polls unless woken by a commit"""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        logger.info("Webhook dispatcher started", batch_size=self.batch_size, max_attempts=self.max_attempts)
+        try:
+            while True:
+                try:
+                    claimed = await self.dispatch_once()
+                    if time.monotonic() - self._last_purge > 3600:
+                        await asyncio.to_thread(self.purge_delivered)
+                except Exception as e:
+                    logger.error("Webhook dispatch cycle failed", error=str(e))
+                    claimed = 0
+                if claimed:
+                    continue
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._loop = None
+            self._wakeup = None
+
+    async def dispatch_once(self) -> int:
+        """Claim due events and deliver them; returns how many were claimed"""
+        claimed = await asyncio.to_thread(self._claim)
+        if not claimed:
+            return 0
+
+        by_endpoint: Dict[str, List[OutboxEvent]] = defaultdict(list)
+        for item in claimed:
+            by_endpoint[item.endpoint].append(item)
+
+        batches = [
+            (endpoint, events[i:i + self.batch_size])
+            for endpoint, events in by_endpoint.items()
+            for i in range(0, len(events), self.batch_size)
+        ]
+        results = await asyncio.gather(*(self._deliver(endpoint, batch) for endpoint, batch in batches))
+        await asyncio.to_thread(self._record, list(zip(batches, results)))
+        return len(claimed)
+
+    # ------------------------------------------------------------------
+    # Delivery
+    # ------------------------------------------------------------------
+
+    async def _deliver(self, endpoint: str, batch: List[OutboxEvent]) -> Optional[str]:
+        """POST one batch; returns None on success, else the error"""
+        body = ('{"events":[' + ",".join(item.payload for item in batch) + "]}").encode("utf-8")
+        timestamp = int(time.time())
+        headers = {"Content-Type": "application/json", TIMESTAMP_HEADER: str(timestamp)}
+        signature = sign_payload(body, timestamp)
+        if signature:
+            headers[SIGNATURE_HEADER] = signature
+
+        try:
+            response = await http_clients.request("webhooks", "POST", endpoint, content=body, headers=headers)
+        except Exception as e:
+            return f"{type(e).__name__}: {e}"
+        if response.is_success:
+            return None
+        return f"HTTP {response.status_code}: {response.text[:200]}"
+
+    def _backoff(self, attempts: int) -> timedelta:
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempts - 1))
+        return timedelta(seconds=random.uniform(delay / 2, delay))
+
+    # ------------------------------------------------------------------
+    # Outbox bookkeeping (worker threads)
+    # ------------------------------------------------------------------
+
+    def _claim(self) -> List[OutboxEvent]:
+        now = datetime.utcnow()
+        with self.session_factory() as db:
+            rows = db.execute(
+                select(WebhookOutbox)
+                .where(WebhookOutbox.status == "pending", WebhookOutbox.next_attempt_at <= now)
+                .order_by(WebhookOutbox.id)
+                .limit(self.batch_size * 10)
+                .with_for_update(skip_locked=True)
+            ).scalars().all()
+            claimed = [
+                OutboxEvent(row.id, row.endpoint, row.payload, row.attempts, row.created_at)
+                for row in rows
+            ]
+            if claimed:
+                db.execute(
+                    update(WebhookOutbox)
+                    .where(WebhookOutbox.id.in_([item.id for item in claimed]))
+                    .values(next_attempt_at=now + timedelta(seconds=self.lease_seconds))
+                )
+            webhook_outbox_pending.set(db.execute(
+                select(func.count()).select_from(WebhookOutbox).where(WebhookOutbox.status == "pending")
+            ).scalar_one())
+            db.commit()
+        return claimed
+
+    def _record(self, outcomes: List[Tuple[Tuple[str, List[OutboxEvent]], Optional[str]]]) -> None:
+        now = datetime.utcnow()
+        with self.session_factory() as db:
+            for (endpoint, batch), error in outcomes:
+                host = _host(endpoint)
+                if error is None:
+                    db.execute(
+                        update(WebhookOutbox)
+                        .where(WebhookOutbox.id.in_([item.id for item in batch]))
+                        .values(status="delivered", delivered_at=now, last_error=None)
+                    )
+                    webhook_deliveries_total.labels(endpoint=host, result="delivered").inc(len(batch))
+                    for item in batch:
+                        webhook_delivery_lag.labels(endpoint=host).observe((now - item.created_at).total_seconds())
+                    continue
+
+                dead = 0
+                for item in batch:
+                    attempts = item.attempts + 1
+                    exhausted = attempts >= self.max_attempts
+                    dead += exhausted
+                    db.execute(
+                        update(WebhookOutbox)
+                        .where(WebhookOutbox.id == item.id)
+                        .values(
+                            attempts=attempts,
+                            status="dead" if exhausted else "pending",
+                            next_attempt_at=now + self._backoff(attempts),
+                            last_error=error,
+                        )
+                    )
+                if dead:
+                    webhook_deliveries_total.labels(endpoint=host, result="dead").inc(dead)
+                if len(batch) > dead:
+                    webhook_deliveries_total.labels(endpoint=host, result="retry").inc(len(batch) - dead)
+                logger.warning("Webhook batch failed", endpoint=host, events=len(batch), dead=dead, error=error)
+            db.commit()
+
+    def purge_delivered(self) -> int:
+        """Drop delivered rows older than the retention period"""
+        self._last_purge = time.monotonic()
+        cutoff = datetime.utcnow() - timedelta(hours=self.retention_hours)
+        with self.session_factory() as db:
+            result = db.execute(
+                delete(WebhookOutbox)
+                .where(WebhookOutbox.status == "delivered", WebhookOutbox.delivered_at < cutoff)
+            )
+            db.commit()
+        return result.rowcount
+
+
+webhook_dispatcher = WebhookDispatcher()
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_dispatcher(session: Session) -> None:
+    # enqueue_event flags the session; deliver right after the commit instead of at the next poll
+    if session.info.pop(OUTBOX_PENDING, False):
+        webhook_dispatcher.notify()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_outbox_flag(session: Session) -> None:
+    session.info.pop(OUTBOX_PENDING, None)
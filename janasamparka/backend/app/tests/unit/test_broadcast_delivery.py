@@ -0,0 +1,195 @@
+"""
+Unit tests for chunked broadcast delivery
+"""
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
+from app.models.citizen_engagement import (
+    BroadcastDelivery,
+    BroadcastStatus,
+    BroadcastType,
+    ScheduledBroadcast,
+)
+from app.models.user import User
+from app.services.broadcast_delivery import BroadcastDeliveryEngine, DeliveryStats
+from app.services.notification_service import LocalChannel
+
+
+@compiles(UUID, "sqlite")
+def _uuid_on_sqlite(type_, compiler, **kw):
+    return "CHAR(32)"
+
+
+def make_rows(count):
+    return [
+        SimpleNamespace(
+            id=uuid4(),
+            phone=f"+91900000{i:04d}",
+            email=f"user{i}@example.com" if i % 2 == 0 else None,
+        )
+        for i in range(count)
+    ]
+
+
+MESSAGE = {"title": "Ward meeting", "message": "Sunday 10am", "data": {}}
+
+
+class TestBroadcastDeliveryEngine:
+    """Per-recipient results and bounded concurrency"""
+
+    def test_deliver_chunk_records_per_channel_results(self):
+        channels = {"sms": LocalChannel("sms"), "email": LocalChannel("email"), "in_app": LocalChannel("in_app")}
+        engine = BroadcastDeliveryEngine(channels)
+        rows = make_rows(10)
+        stats = DeliveryStats()
+        broadcast_id = uuid4()
+
+        deliveries = asyncio.run(engine.deliver_chunk(broadcast_id, rows, channels, MESSAGE, stats))
+
+        assert [d["user_id"] for d in deliveries] == [row.id for row in rows]
+        assert all(d["broadcast_id"] == broadcast_id for d in deliveries)
+        assert all(d["sms_sent"] and d["shown_in_app"] for d in deliveries)
+        # Users without an address on a channel get no flag for it
+        assert [d.get("email_sent", False) for d in deliveries] == [row.email is not None for row in rows]
+        assert channels["in_app"].sent == [str(row.id) for row in rows]
+        assert stats.sent == {"sms": 10, "email": 5, "in_app": 10}
+        assert stats.total_sent == 25
+
+    def test_failures_are_attributed_to_the_right_user(self):
+        channels = {"sms": LocalChannel("sms", failure_rate=0.5)}
+        engine = BroadcastDeliveryEngine(channels)
+        rows = make_rows(200)
+
+        deliveries = asyncio.run(engine.deliver_chunk(uuid4(), rows, channels, MESSAGE))
+
+        delivered = {row.phone for row, d in zip(rows, deliveries) if d["sms_sent"]}
+        assert delivered == set(channels["sms"].sent)
+        assert 0 < len(delivered) < len(rows)
+
+    def test_channel_concurrency_is_bounded(self):
+        channel = LocalChannel("sms", latency=0.01, concurrency=8)
+        results = asyncio.run(channel.bulk_send([str(i) for i in range(64)], MESSAGE))
+
+        assert results == [True] * 64
+        assert channel.max_in_flight == 8
+
+    def test_channel_errors_mark_chunk_failed(self):
+        class BrokenChannel(LocalChannel):
+            async def bulk_send(self, recipients, message):
+                raise RuntimeError("provider down")
+
+        channels = {"sms": BrokenChannel("sms")}
+        stats = DeliveryStats()
+        deliveries = asyncio.run(
+            BroadcastDeliveryEngine(channels).deliver_chunk(uuid4(), make_rows(3), channels, MESSAGE, stats)
+        )
+
+        assert [d["sms_sent"] for d in deliveries] == [False, False, False]
+        assert stats.failed == {"sms": 3}
+
+    def test_recipients_query_selects_contact_columns_in_keyset_order(self):
+        broadcast = SimpleNamespace(
+            constituency_id=uuid4(), target_all=False, target_roles="citizen",
+            target_wards=None, target_departments=None,
+        )
+        channels = {"sms": LocalChannel(), "whatsapp": LocalChannel(), "in_app": LocalChannel()}
+        query = BroadcastDeliveryEngine._recipients_query(broadcast, channels)
+        sql = str(query.compile(dialect=postgresql.dialect()))
+
+        assert sql.startswith("SELECT users.id, users.phone \nFROM users")
+        assert "users.role IN" in sql
+        assert sql.endswith("ORDER BY users.id")
+
+
+@pytest.fixture
+def sessions(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'broadcasts.db'}")
+    for table in (User.__table__, ScheduledBroadcast.__table__, BroadcastDelivery.__table__):
+        table.create(engine)
+    return sessionmaker(bind=engine)
+
+
+def add_broadcast(sessions, recipients=5, status=BroadcastStatus.SCHEDULED, **values):
+    constituency_id = uuid4()
+    with sessions() as db:
+        db.add_all(User(name=f"Citizen {i}", phone=f"+9190000{i:05d}", constituency_id=constituency_id)
+                   for i in range(recipients))
+        broadcast = ScheduledBroadcast(
+            title="Ward meeting", message="Sunday 10am", broadcast_type=BroadcastType.ANNOUNCEMENT,
+            sender_id=uuid4(), constituency_id=constituency_id, scheduled_at=datetime.utcnow(),
+            target_all=True, send_push=False, send_sms=True, send_email=False, send_whatsapp=False,
+            show_in_app=False, status=status, **values,
+        )
+        db.add(broadcast)
+        db.commit()
+        return broadcast.id
+
+
+def build_message(broadcast):
+    return {"title": broadcast.title, "message": broadcast.message, "data": {}}
+
+
+class TestBroadcastClaim:
+    """One delivery run per broadcast"""
+
+    def test_only_one_claim_succeeds(self, sessions):
+        broadcast_id = add_broadcast(sessions)
+        engine = BroadcastDeliveryEngine({}, session_factory=sessions)
+
+        with sessions() as db:
+            first = engine.claim(db, broadcast_id, [BroadcastStatus.SCHEDULED])
+            second = engine.claim(db, broadcast_id, [BroadcastStatus.SCHEDULED])
+            status = db.get(ScheduledBroadcast, broadcast_id).status
+
+        assert (first, second) == (True, False)
+        assert status == BroadcastStatus.SENDING
+
+    def test_concurrent_runs_deliver_once(self, sessions):
+        broadcast_id = add_broadcast(sessions, recipients=7)
+        channel = LocalChannel("sms", latency=0.01)
+        engine = BroadcastDeliveryEngine({"sms": channel}, chunk_size=3, session_factory=sessions)
+
+        async def main():
+            return await asyncio.gather(*(engine.run(broadcast_id, build_message) for _ in range(2)))
+
+        results = asyncio.run(main())
+
+        assert sorted(result["success"] for result in results) == [False, True]
+        assert len(channel.sent) == 7
+        with sessions() as db:
+            broadcast = db.get(ScheduledBroadcast, broadcast_id)
+            assert broadcast.status == BroadcastStatus.SENT
+            assert broadcast.sent_count == 7
+            assert db.scalar(select(func.count()).select_from(BroadcastDelivery)) == 7
+
+    def test_failed_run_is_released_for_retry(self, sessions):
+        broadcast_id = add_broadcast(sessions)
+
+        def broken_message(broadcast):
+            raise RuntimeError("template error")
+
+        engine = BroadcastDeliveryEngine({"sms": LocalChannel("sms")}, session_factory=sessions)
+        result = asyncio.run(engine.run(broadcast_id, broken_message))
+
+        assert result["success"] is False
+        with sessions() as db:
+            assert db.get(ScheduledBroadcast, broadcast_id).status == BroadcastStatus.FAILED
+            assert engine.claim(db, broadcast_id, [BroadcastStatus.FAILED])
+
+    def test_stale_sending_claim_can_be_taken_over(self, sessions):
+        broadcast_id = add_broadcast(sessions, status=BroadcastStatus.SENDING,
+                                     updated_at=datetime.utcnow() - timedelta(hours=1))
+        engine = BroadcastDeliveryEngine({}, session_factory=sessions, stale_after=900)
+
+        with sessions() as db:
+            assert engine.claim(db, broadcast_id, [BroadcastStatus.SCHEDULED])
+            assert not engine.claim(db, broadcast_id, [BroadcastStatus.SCHEDULED])
@@ -0,0 +1,77 @@
+"""
+Regression tests for application cold-start cost
+"""
+import json
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+from app.core.lazy import LazyModule
+
+BACKEND_DIR = Path(__file__).resolve().parents[3]
+
+# Wall-clock budget for `import app.main` in a fresh interpreter; generous
+# enough for slow CI runners, small enough to catch an eager torch import
+COLD_START_BUDGET_SECONDS = float(os.environ.get("COLD_START_BUDGET_SECONDS", "10"))
+
+# Must only be imported when a request actually needs them
+HEAVY_MODULES = ["sentence_transformers", "sklearn", "faiss", "torch", "boto3", "botocore", "pyarrow"]
+
+
+def cold_import(role):
+    script = textwrap.dedent(f"""
+        import json, sys, time
+        start = time.perf_counter()
+        import app.main
+        print(json.dumps({{
+            "seconds": time.perf_counter() - start,
+            "heavy": [name for name in {HEAVY_MODULES!r} if name in sys.modules],
+            "routers": sorted(name for name in sys.modules if name.startswith("app.routers.")),
+            "routes": len(app.main.app.routes),
+        }}))
+    """)
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=BACKEND_DIR, env={**os.environ, "APP_ROLE": role}, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class TestColdStart:
+    @pytest.mark.parametrize("role", ["all", "api"])
+    def test_import_is_within_budget_without_heavy_dependencies(self, role):
+        report = cold_import(role)
+
+        assert report["heavy"] == []
+        assert report["seconds"] < COLD_START_BUDGET_SECONDS, report
+
+    def test_roles_select_routers(self):
+        api = cold_import("api")
+        ai = cold_import("ai")
+
+        assert "app.routers.ai" not in api["routers"]
+        assert ai["routers"] == ["app.routers.ai"]
+        assert ai["routes"] < api["routes"]
+
+
+class TestLazyModule:
+    def test_imports_on_first_attribute_access(self):
+        sys.modules.pop("wave", None)
+        wave = LazyModule("wave")
+
+        assert wave.available
+        assert not wave.loaded and "wave" not in sys.modules
+        assert wave.Error is sys.modules["wave"].Error
+        assert wave.loaded
+
+    def test_missing_dependency_is_reported_without_importing(self):
+        missing = LazyModule("janasamparka_missing_dependency.sub")
+
+        assert not missing.available
+        with pytest.raises(ImportError):
+            missing.anything
@@ -0,0 +1,177 @@
+"""
+Unit tests for batch complaint creation
+"""
+import asyncio
+import uuid
+from collections import namedtuple
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.models.user import UserRole
+from app.routers import complaints as complaints_router
+from app.routers.complaints import create_complaints_batch
+from app.schemas.complaint import ComplaintBatchCreate
+from app.services.duplicate_engine import DuplicateEngine
+from app.services.predictive_planning_service import MultilingualNormalizer
+from app.services.vector_registry import VectorRegistry
+from app.tests.utils import KeywordEmbeddings
+
+CONSTITUENCY = uuid.uuid4()
+OTHER_CONSTITUENCY = uuid.uuid4()
+WARD = uuid.uuid4()
+FOREIGN_WARD = uuid.uuid4()
+DEPARTMENT = uuid.uuid4()
+LAT, LNG = 12.7, 75.2
+METERS = 1 / 111_320  # degrees of latitude per metre
+
+Candidate = namedtuple("Candidate", "id title description category lat lng")
+
+
+@pytest.fixture(autouse=True)
+def duplicate_engine(monkeypatch):
+    engine = DuplicateEngine(VectorRegistry(KeywordEmbeddings()), budget_ms=1000)
+    monkeypatch.setattr(complaints_router, "duplicate_engine", engine)
+    return engine
+
+
+class FakeSession:
+    """Answers id -> constituency lookups and records multi-row inserts"""
+
+    def __init__(self):
+        self.lookups = {
+            "wards": [SimpleNamespace(id=WARD, constituency_id=CONSTITUENCY),
+                      SimpleNamespace(id=FOREIGN_WARD, constituency_id=OTHER_CONSTITUENCY)],
+            "departments": [SimpleNamespace(id=DEPARTMENT, constituency_id=CONSTITUENCY)],
+            "complaints": [],
+        }
+        self.selects = []
+        self.inserts = {}
+        self.info = {}
+        self.committed = False
+
+    def execute(self, statement, params=None):
+        if params is None:
+            table = statement.get_final_froms()[0].name
+            self.selects.append(table)
+            return SimpleNamespace(all=lambda: self.lookups[table])
+        self.inserts[statement.table.name] = params
+
+    def commit(self):
+        self.committed = True
+
+
+def moderator():
+    return SimpleNamespace(id=uuid.uuid4(), role=UserRole.MODERATOR, constituency_id=CONSTITUENCY, phone=None)
+
+
+def item(**fields):
+    return {"title": "Complaint title", "description": "Something is broken here", **fields}
+
+
+def submit(db, items, user=None):
+    payload = ComplaintBatchCreate.model_validate({"complaints": items})
+    return asyncio.run(create_complaints_batch(payload, current_user=user or moderator(), db=db))
+
+
+class TestBatchCreate:
+    def test_items_are_validated_independently_and_reported_in_order(self):
+        db = FakeSession()
+
+        response = submit(db, [
+            item(ward_id=str(WARD), dept_id=str(DEPARTMENT), title="No niru supply",
+                 description="Niru not coming for three days", lat=12.7, lng=75.2),
+            item(ward_id=str(uuid.uuid4())),
+            item(ward_id=str(FOREIGN_WARD)),
+            item(constituency_id=str(OTHER_CONSTITUENCY)),
+            item(category="roads", description="Urgent danger on the whole area road"),
+        ])
+
+        assert (response.created, response.failed) == (2, 3)
+        assert [result.status_code for result in response.results] == [201, 404, 403, 403, 201]
+        assert response.results[1].error == "Ward not found"
+        assert response.results[0].category == "water"
+
+        complaints = db.inserts["complaints"]
+        assert [row["id"] for row in complaints] == [response.results[0].complaint_id,
+                                                    response.results[4].complaint_id]
+        assert complaints[0]["suggested_dept_id"] == DEPARTMENT
+        assert complaints[0]["priority_score"] == 0.5
+        # Emergency scoring, like single submissions, only applies to located complaints
+        assert complaints[1]["category"] == "roads" and complaints[1]["priority_score"] is None
+        assert [log["complaint_id"] for log in db.inserts["status_logs"]] == [row["id"] for row in complaints]
+        assert db.committed
+
+    def test_references_are_looked_up_once_per_table(self):
+        db = FakeSession()
+
+        submit(db, [item(ward_id=str(WARD), dept_id=str(DEPARTMENT)) for _ in range(50)])
+
+        assert sorted(db.selects) == ["departments", "wards"]
+        assert len(db.inserts["complaints"]) == 50
+
+    def test_webhook_events_are_bulk_inserted(self, monkeypatch):
+        monkeypatch.setattr(settings, "WEBHOOK_ENDPOINTS", ["https://a.example", "https://b.example"])
+        db = FakeSession()
+
+        submit(db, [item(), item()])
+
+        outbox = db.inserts["webhook_outbox"]
+        assert len(outbox) == 4
+        assert len({row["event_id"] for row in outbox}) == 2
+        assert '"event":"complaint.created"' in outbox[0]["payload"]
+
+    def test_malformed_items_fail_alone_with_422(self):
+        db = FakeSession()
+
+        response = submit(db, [item(title="x"), item(), item(lat=200), item(priority="whenever")])
+
+        assert [result.status_code for result in response.results] == [422, 201, 422, 422]
+        assert response.results[0].error.startswith("title:")
+        assert response.results[2].error.startswith("lat:")
+        assert (response.created, response.failed) == (1, 3)
+
+    def test_candidates_are_queried_once_per_grid_cell(self, duplicate_engine):
+        db = FakeSession()
+        near = Candidate(uuid.uuid4(), "Niru not coming", "No niru in the taps", "water", LAT + 20 * METERS, LNG)
+        far = Candidate(uuid.uuid4(), "Niru not coming", "No niru in the taps", "water", LAT + 0.05, LNG)
+        db.lookups["complaints"] = [near, far]
+
+        response = submit(db, [
+            item(title="Niru problem", description="Niru supply stopped", lat=LAT, lng=LNG),
+            item(title="Pothole here", description="Big pothole on the road", lat=LAT + 0.05, lng=LNG),
+            item(),
+            item(title="Niru again", description="No niru since morning", lat=LAT + 10 * METERS, lng=LNG),
+        ])
+
+        assert db.selects.count("complaints") == 2
+        assert [s.complaint_id for s in response.results[0].possible_duplicates] == [near.id]
+        assert response.results[1].possible_duplicates == []
+        assert response.results[2].possible_duplicates == []
+        assert [s.complaint_id for s in response.results[3].possible_duplicates] == [near.id]
+        created = response.results[0].complaint_id
+        assert duplicate_engine.registry.index(CONSTITUENCY).fingerprint_of(str(created)) is not None
+
+    def test_nothing_is_written_when_every_item_fails(self):
+        db = FakeSession()
+
+        response = submit(db, [item(ward_id=str(FOREIGN_WARD))])
+
+        assert response.created == 0 and db.inserts == {} and not db.committed
+
+    def test_citizens_cannot_file_batches(self):
+        citizen = SimpleNamespace(id=uuid.uuid4(), role=UserRole.CITIZEN, constituency_id=CONSTITUENCY)
+
+        with pytest.raises(HTTPException) as exc:
+            submit(FakeSession(), [item()], user=citizen)
+        assert exc.value.status_code == 403
+
+
+class TestBatchCategoryDetection:
+    def test_matches_single_text_detection(self):
+        normalizer = MultilingualNormalizer()
+        texts = ["Niru not coming", "Raste full of potholes", "Current illa since morning", "Nothing relevant"]
+
+        assert normalizer.detect_categories(texts) == [normalizer.detect_category(text) for text in texts]
@@ -0,0 +1,204 @@
+"""
+Unit tests for hybrid geo + semantic duplicate detection
+"""
+import asyncio
+import time
+import uuid
+from collections import namedtuple
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+from app.models.user import UserRole
+from app.routers import complaints as complaints_router
+from app.schemas.complaint import ComplaintCreate
+from app.services.duplicate_engine import DuplicateEngine, bounding_box, haversine_meters
+from app.services.inference import InferenceUnavailable, embedding_service
+from app.services.vector_registry import VectorRegistry
+from app.tests.utils import KeywordEmbeddings
+
+Row = namedtuple("Row", "id title description category lat lng")
+
+CONSTITUENCY = uuid.UUID(int=1)
+LAT, LNG = 12.76, 75.20
+METERS = 1 / 111_320  # degrees of latitude per metre
+
+
+def row(title, category, meters_north=0.0):
+    return Row(uuid.uuid4(), title, "", category, LAT + meters_north * METERS, LNG)
+
+
+def rank(engine, rows, title, category="road"):
+    return asyncio.run(engine.rank(rows, constituency_id=CONSTITUENCY, title=title, description="",
+                                   lat=LAT, lng=LNG, category=category))
+
+
+class TestGeometry:
+    def test_haversine_matches_known_distance(self):
+        distances = haversine_meters(LAT, LNG, np.array([LAT, LAT + 1000 * METERS]), np.array([LNG, LNG]))
+
+        assert distances[0] == pytest.approx(0.0)
+        assert distances[1] == pytest.approx(1000, rel=0.01)
+
+    def test_bounding_box_widens_longitude_with_latitude(self):
+        min_lat, max_lat, min_lng, max_lng = bounding_box(60.0, 10.0, 1000)
+
+        assert (max_lat - min_lat) / 2 == pytest.approx(1000 * METERS)
+        assert (max_lng - min_lng) / 2 == pytest.approx(2000 * METERS, rel=0.01)
+
+    def test_candidate_query_filters_open_recent_nearby_complaints(self):
+        statement = DuplicateEngine(max_candidates=7).candidates_statement(CONSTITUENCY, LAT, LNG)
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+
+        for fragment in ("complaints.status IN", "complaints.is_duplicate = false", "complaints.lat BETWEEN",
+                         "complaints.lng BETWEEN", "complaints.created_at >=", "LIMIT"):
+            assert fragment in sql
+
+    def test_batch_candidates_are_queried_per_grid_cell_with_a_limit(self):
+        engine = DuplicateEngine(max_candidates=3)
+        statements = []
+
+        class Session:
+            def execute(self, statement):
+                statements.append(statement)
+                return SimpleNamespace(all=lambda: [row(f"Pothole {i}", "road", i * 10) for i in range(5)])
+
+        points = [(LAT, LNG), (LAT + 5 * METERS, LNG), (LAT + 0.5, LNG), (LAT + 0.5, LNG + 0.5)]
+        candidates = engine.candidates_for_points(Session(), CONSTITUENCY, points)
+
+        assert len(statements) == 3
+        assert all(statement._limit_clause.value == 3 for statement in statements)
+        assert [len(rows) for rows in candidates] == [3, 3, 0, 0]
+
+
+class TestRanking:
+    def test_semantic_rerank_beats_distance(self):
+        engine = DuplicateEngine(VectorRegistry(KeywordEmbeddings()), radius_meters=200, threshold=0.8)
+        near_unrelated = row("Garbage not collected", "garbage", 10)
+        far_same = row("Huge pothole", "road", 150)
+        outside = row("Pothole again", "road", 400)
+
+        result = rank(engine, [near_unrelated, far_same, outside], "Pothole near bus stand")
+
+        assert result.mode == "semantic"
+        assert result.candidates == 2
+        assert [m.complaint_id for m in result.matches] == [far_same.id]
+        assert result.matches[0].distance_meters == pytest.approx(150, rel=0.01)
+
+    def test_candidate_vectors_are_embedded_once(self):
+        embeddings = KeywordEmbeddings()
+        engine = DuplicateEngine(VectorRegistry(embeddings))
+        rows = [row(f"Pothole {i}", "road", i) for i in range(5)]
+
+        rank(engine, rows, "Pothole")
+        rank(engine, rows, "Another pothole")
+
+        assert embeddings.calls == [6, 1]
+
+    @pytest.mark.parametrize("embeddings", [
+        KeywordEmbeddings(delay=0.2),
+        KeywordEmbeddings(error=InferenceUnavailable("no model")),
+        KeywordEmbeddings(error=KeyError("X-Embedding-Shape")),
+        KeywordEmbeddings(error=ValueError("cannot reshape array")),
+        KeywordEmbeddings(available=False),
+    ])
+    def test_falls_back_to_distance_and_category(self, embeddings):
+        engine = DuplicateEngine(VectorRegistry(embeddings), budget_ms=20)
+        rows = [row("Light broken", "street_light", 50), row("Road damaged", "road", 120),
+                row("Pothole", "road", 30)]
+
+        started = time.perf_counter()
+        result = rank(engine, rows, "Pothole", category="road")
+
+        assert time.perf_counter() - started < 0.15
+        assert result.mode == "geo"
+        assert [m.complaint_id for m in result.matches] == [rows[2].id, rows[1].id]
+        assert result.vector is None
+
+    def test_unavailable_model_is_never_called(self):
+        embeddings = KeywordEmbeddings(available=False)
+        result = rank(DuplicateEngine(VectorRegistry(embeddings)), [row("Pothole", "road", 30)], "Pothole")
+
+        assert result.mode == "geo"
+        assert embeddings.calls == []
+
+    def test_timed_out_embed_still_warms_the_registry(self):
+        embeddings = KeywordEmbeddings(delay=0.1)
+        engine = DuplicateEngine(VectorRegistry(embeddings), budget_ms=20)
+        rows = [row("Pothole", "road", 30), row("Water leak", "water", 60)]
+
+        async def check_twice():
+            first = await engine.rank(rows, constituency_id=CONSTITUENCY, title="Pothole", description="",
+                                      lat=LAT, lng=LNG, category="road")
+            await asyncio.sleep(0.2)
+            embeddings.delay = 0.0
+            second = await engine.rank(rows, constituency_id=CONSTITUENCY, title="Pothole", description="",
+                                       lat=LAT, lng=LNG, category="road")
+            return first, second
+
+        first, second = asyncio.run(check_twice())
+
+        assert first.mode == "geo"
+        assert second.mode == "semantic"
+        assert embeddings.calls == [3, 1]
+        assert not engine._pending
+
+    def test_warm_rerank_of_full_candidate_set_fits_the_budget(self):
+        engine = DuplicateEngine(VectorRegistry(KeywordEmbeddings()), max_candidates=50)
+        rows = [row(f"Pothole {i}", "road", i * 3) for i in range(50)]
+        rank(engine, rows, "warm up")
+
+        timings = []
+        for _ in range(20):
+            started = time.perf_counter()
+            rank(engine, rows, "Pothole near the market")
+            timings.append(time.perf_counter() - started)
+
+        assert sorted(timings)[18] < 0.03
+
+
+class FakeComplaintSession:
+    """Enough of a Session for create_complaint: candidate rows in, added objects out"""
+
+    def __init__(self, candidates):
+        self.candidates = candidates
+        self.added = []
+        self.info = {}
+
+    def execute(self, statement):
+        return SimpleNamespace(all=lambda: self.candidates)
+
+    def add(self, instance):
+        self.added.append(instance)
+
+    def flush(self):
+        for instance in self.added:
+            if getattr(instance, "id", None) is None:
+                instance.id = uuid.uuid4()
+
+    def commit(self):
+        pass
+
+    def refresh(self, instance):
+        pass
+
+
+class TestCreateComplaintOnApiWorkers:
+    def test_api_role_never_loads_the_encoder(self, monkeypatch):
+        loads = []
+        monkeypatch.setattr(settings, "APP_ROLE", "api")
+        monkeypatch.setattr(settings, "INFERENCE_URL", None)
+        monkeypatch.setattr(embedding_service.encoder, "load", lambda: loads.append(1))
+        monkeypatch.setattr(complaints_router, "duplicate_engine", DuplicateEngine(VectorRegistry(embedding_service)))
+        user = SimpleNamespace(id=uuid.uuid4(), role=UserRole.CITIZEN, constituency_id=CONSTITUENCY, phone=None)
+        db = FakeComplaintSession([row("Pothole on main road", "road", 40)])
+        payload = ComplaintCreate(title="Pothole near school", description="Deep pothole near the school gate",
+                                  category="road", lat=LAT, lng=LNG)
+
+        response = asyncio.run(complaints_router.create_complaint(payload, current_user=user, db=db))
+
+        assert loads == []
+        assert [s.complaint_id for s in response.possible_duplicates] == [db.candidates[0].id]
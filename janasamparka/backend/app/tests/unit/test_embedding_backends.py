@@ -0,0 +1,161 @@
+"""
+Unit tests for the embedding model backends
+"""
+import os
+
+import numpy as np
+import pytest
+
+from app.services import embedding_backends
+from app.services.embedding_backends import (
+    EMBEDDING_BACKENDS,
+    InferenceUnavailable,
+    OnnxSentenceEncoder,
+    OnnxSentenceModel,
+    build_encoder,
+    export_onnx_model,
+    pool,
+)
+
+# Small model for the parity test; override to check the production model
+PARITY_MODEL = os.environ.get("EMBEDDING_PARITY_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+
+PARITY_TEXTS = [
+    "Pothole on the main road near the bus stand",
+    "Large pothole causing accidents near the bus stand",
+    "Street light not working on 3rd cross",
+    "Drinking water supply has been irregular in ward 12",
+    "Garbage not collected from the market area",
+    "Drainage overflowing onto the road after rain",
+]
+
+# Minimum per-text cosine to the fp32 vector, and largest allowed change in
+# any pairwise similarity, per backend
+PARITY_TOLERANCE = {
+    "torch-int8": (0.97, 0.05),
+    "onnx": (0.999, 0.005),
+    "onnx-int8": (0.97, 0.05),
+}
+
+
+class FakeTokenizer:
+    """Tokenizes a text as one id per word, padded to the longest text"""
+
+    def __call__(self, texts, padding, truncation, max_length, return_tensors):
+        lengths = [min(len(text.split()), max_length) for text in texts]
+        width = max(lengths)
+        return {
+            "input_ids": np.array([[1] * n + [0] * (width - n) for n in lengths]),
+            "attention_mask": np.array([[1] * n + [0] * (width - n) for n in lengths]),
+            "token_type_ids": np.zeros((len(texts), width)),
+        }
+
+
+class FakeInput:
+    def __init__(self, name):
+        self.name = name
+
+
+class FakeSession:
+    """Token embedding i of every text is [i, 1]; records each feed"""
+
+    def __init__(self):
+        self.feeds = []
+
+    def get_inputs(self):
+        return [FakeInput("input_ids"), FakeInput("attention_mask")]
+
+    def run(self, outputs, feed):
+        self.feeds.append(feed)
+        batch, width = feed["input_ids"].shape
+        positions = np.broadcast_to(np.arange(width, dtype=np.float32), (batch, width))
+        return [np.stack([positions, np.ones_like(positions)], axis=-1)]
+
+
+class TestPooling:
+    def test_mean_pooling_ignores_padding(self):
+        tokens = np.array([[[1.0, 2.0], [3.0, 4.0], [100.0, 100.0]]])
+        mask = np.array([[1, 1, 0]])
+
+        assert pool(tokens, mask, {"mode": "mean"}).tolist() == [[2.0, 3.0]]
+
+    def test_cls_pooling_and_normalize(self):
+        tokens = np.array([[[3.0, 4.0], [1.0, 1.0]]])
+        mask = np.array([[1, 1]])
+
+        vectors = pool(tokens, mask, {"mode": "cls", "normalize": True})
+
+        assert np.allclose(vectors, [[0.6, 0.8]])
+        assert vectors.dtype == np.float32
+
+
+class TestOnnxSentenceModel:
+    def test_encode_batches_and_feeds_only_model_inputs(self):
+        session = FakeSession()
+        model = OnnxSentenceModel(FakeTokenizer(), session, {"mode": "mean", "dimension": 2})
+
+        vectors = model.encode(["one", "one two three", "one two"], batch_size=2)
+
+        assert vectors.tolist() == [[0.0, 1.0], [1.0, 1.0], [0.5, 1.0]]
+        assert [feed["input_ids"].shape[0] for feed in session.feeds] == [2, 1]
+        assert all(set(feed) == {"input_ids", "attention_mask"} for feed in session.feeds)
+
+    def test_missing_export_is_reported_as_unavailable(self, tmp_path):
+        encoder = OnnxSentenceEncoder("some-model", model_dir=str(tmp_path))
+
+        with pytest.raises(InferenceUnavailable, match="export_embedding_model"):
+            encoder.load()
+
+
+class TestBuildEncoder:
+    @pytest.mark.parametrize("backend", sorted(EMBEDDING_BACKENDS))
+    def test_backends_build_without_loading(self, backend):
+        encoder = build_encoder(backend, "some-model")
+
+        assert encoder.backend == backend
+        assert encoder.model_name == "some-model"
+        assert not encoder.loaded
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError, match="EMBEDDING_BACKEND"):
+            build_encoder("tensorrt")
+
+    def test_onnx_exports_live_under_the_configured_directory(self, monkeypatch):
+        monkeypatch.setattr(embedding_backends.settings, "EMBEDDING_ONNX_DIR", "/models", raising=False)
+
+        assert str(embedding_backends.onnx_model_dir("sentence-transformers/all-MiniLM-L6-v2")) == \
+            "/models/sentence-transformers--all-MiniLM-L6-v2"
+
+
+@pytest.fixture(scope="module")
+def parity_exports(tmp_path_factory):
+    pytest.importorskip("torch")
+    pytest.importorskip("sentence_transformers")
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("onnx")
+    reference = build_encoder("torch", PARITY_MODEL)
+    try:
+        reference.load()
+    except InferenceUnavailable as e:
+        pytest.skip(str(e))
+    return reference, export_onnx_model(PARITY_MODEL, tmp_path_factory.mktemp("onnx"))
+
+
+def normalized(vectors):
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+class TestBackendParity:
+    @pytest.mark.parametrize("backend", sorted(PARITY_TOLERANCE))
+    def test_vectors_and_similarities_match_full_precision(self, parity_exports, backend):
+        reference, export_dir = parity_exports
+        encoder = build_encoder(backend, PARITY_MODEL)
+        if isinstance(encoder, OnnxSentenceEncoder):
+            encoder.model_dir = export_dir
+        min_cosine, max_similarity_change = PARITY_TOLERANCE[backend]
+
+        expected = normalized(reference.encode_batch(PARITY_TEXTS))
+        actual = normalized(encoder.encode_batch(PARITY_TEXTS))
+
+        assert np.sum(expected * actual, axis=1).min() >= min_cosine
+        assert np.abs(expected @ expected.T - actual @ actual.T).max() <= max_similarity_change
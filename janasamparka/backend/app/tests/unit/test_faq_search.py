@@ -0,0 +1,201 @@
+"""
+Unit tests for the in-memory FAQ search index
+"""
+import threading
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.auth import get_current_user, get_user_constituency_id, require_auth
+from app.core.database import get_db
+from app.models.faq import FAQSolution
+from app.models.user import UserRole
+from app.routers import faqs as faqs_router
+from app.services.faq_search_service import FAQSearchIndex
+
+
+@compiles(UUID, "sqlite")
+def _uuid_on_sqlite(type_, compiler, **kw):
+    return "CHAR(32)"
+
+
+def make_faq(constituency_id, title, keywords, category="water", kannada_title=None):
+    return SimpleNamespace(
+        id=uuid4(),
+        constituency_id=constituency_id,
+        category=category,
+        title=title,
+        question_keywords=keywords,
+        kannada_title=kannada_title,
+    )
+
+
+@pytest.fixture
+def constituency_id():
+    return uuid4()
+
+
+@pytest.fixture
+def faqs(constituency_id):
+    return [
+        make_faq(constituency_id, "No water supply", "water, no water, tap, supply"),
+        make_faq(constituency_id, "Pothole on road", "road, pothole, hole", category="roads"),
+        make_faq(constituency_id, "Street light not working", "streetlight, dark, pole", category="electricity"),
+        make_faq(uuid4(), "Water tanker request", "water, tanker"),
+    ]
+
+
+@pytest.fixture
+def index(faqs):
+    index = FAQSearchIndex()
+    index.build(faqs)
+    return index
+
+
+class TestFAQSearchIndex:
+    """BM25 ranking and incremental maintenance"""
+
+    def test_search_is_scoped_to_constituency(self, index, faqs, constituency_id):
+        results = index.search("water", constituency_id=constituency_id)
+        assert [faq_id for faq_id, _ in results] == [faqs[0].id]
+
+    def test_search_all_constituencies(self, index, faqs):
+        results = {faq_id for faq_id, _ in index.search("water")}
+        assert results == {faqs[0].id, faqs[3].id}
+
+    def test_transliterated_query_matches(self, index, faqs, constituency_id):
+        # "raste" is Kannada for road, "guddi" for hole
+        results = index.search("raste guddi", constituency_id=constituency_id)
+        assert results[0][0] == faqs[1].id
+
+    def test_better_match_ranks_first(self, index, faqs, constituency_id):
+        results = index.search("no water supply tap", constituency_id=constituency_id)
+        assert results[0][0] == faqs[0].id
+        assert all(score > 0 for _, score in results)
+
+    def test_category_filter(self, index, constituency_id):
+        assert index.search("water", constituency_id=constituency_id, category="roads") == []
+
+    def test_upsert_and_remove(self, index, faqs, constituency_id):
+        faq = faqs[1]
+        faq.title = "Blocked gutter"
+        faq.question_keywords = "drainage, gutter"
+        index.upsert(faq)
+        assert faq.id not in {faq_id for faq_id, _ in index.search("pothole", constituency_id=constituency_id)}
+        assert index.search("gutter", constituency_id=constituency_id)[0][0] == faq.id
+
+        index.remove(faq.id)
+        assert index.search("gutter", constituency_id=constituency_id) == []
+        assert len(index) == len(faqs) - 1
+
+    def test_unloaded_index_is_stale(self):
+        assert FAQSearchIndex().is_stale
+
+    def test_background_refresh_keeps_serving_the_current_index(self, index, faqs, constituency_id):
+        release = threading.Event()
+        added = make_faq(constituency_id, "Garbage not collected", "garbage, waste", category="sanitation")
+
+        def load():
+            release.wait(5)
+            return faqs + [added]
+
+        assert index.refresh_in_background(load)
+        assert not index.refresh_in_background(load)
+        assert index.search("garbage", constituency_id=constituency_id) == []
+
+        release.set()
+        index._refresh.join(5)
+        assert index.search("garbage", constituency_id=constituency_id)[0][0] == added.id
+        assert not index.is_stale
+
+    def test_edits_made_during_a_rebuild_survive_the_swap(self, index, faqs, constituency_id):
+        loading, release = threading.Event(), threading.Event()
+        snapshot = [SimpleNamespace(**vars(faq)) for faq in faqs]
+
+        def load():
+            loading.set()
+            release.wait(5)
+            return snapshot
+
+        assert index.refresh_in_background(load)
+        assert loading.wait(5)
+        edited, removed = faqs[1], faqs[2]
+        edited.title, edited.question_keywords = "Blocked gutter", "drainage, gutter"
+        index.upsert(edited)
+        index.remove(removed.id)
+        created = make_faq(constituency_id, "Garbage not collected", "garbage, waste", category="sanitation")
+        index.upsert(created)
+
+        release.set()
+        index._refresh.join(5)
+        assert index.search("gutter", constituency_id=constituency_id)[0][0] == edited.id
+        assert index.search("pothole", constituency_id=constituency_id) == []
+        assert index.search("streetlight", constituency_id=constituency_id) == []
+        assert index.search("garbage", constituency_id=constituency_id)[0][0] == created.id
+        assert len(index) == len(faqs)
+        assert not index._rebuilds
+
+
+@pytest.fixture
+def faq_client(monkeypatch, constituency_id):
+    """The FAQ router over SQLite, as a moderator of ``constituency_id``"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    FAQSolution.__table__.create(engine)
+    session_factory = sessionmaker(bind=engine)
+    user = SimpleNamespace(id=uuid4(), role=UserRole.MODERATOR, constituency_id=constituency_id)
+    with session_factory() as db:
+        for title, keywords, category in [("No water supply", "water, no water, tap", "water"),
+                                          ("Pothole on road", "road, pothole", "roads")]:
+            db.add(FAQSolution(constituency_id=constituency_id, created_by=user.id, category=category,
+                               title=title, question_keywords=keywords, solution_text="Call the ward office"))
+        db.add(FAQSolution(constituency_id=uuid4(), created_by=user.id, category="water",
+                           title="Water tanker request", question_keywords="water, tanker",
+                           solution_text="Book a tanker"))
+        db.commit()
+
+    def override_get_db():
+        with session_factory() as db:
+            yield db
+
+    monkeypatch.setattr(faqs_router, "faq_search_index", FAQSearchIndex())
+    app = FastAPI()
+    app.include_router(faqs_router.router)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[require_auth] = lambda: user
+    app.dependency_overrides[get_current_user] = lambda: user
+    app.dependency_overrides[get_user_constituency_id] = lambda: constituency_id
+    yield TestClient(app)
+    engine.dispose()
+
+
+class TestFAQSearchEndpoint:
+    """The search route over a real (SQLite) session"""
+
+    def test_search_returns_ranked_faqs_from_the_users_constituency(self, faq_client, constituency_id):
+        response = faq_client.get("/api/v1/faqs/search", params={"q": "no water"})
+
+        assert response.status_code == 200
+        results = response.json()
+        assert [r["faq"]["title"] for r in results] == ["No water supply"]
+        assert results[0]["faq"]["constituency_id"] == str(constituency_id)
+        assert set(results[0]["matched_keywords"]) == {"water", "no water"}
+
+    def test_created_faq_is_searchable_without_a_rebuild(self, faq_client, constituency_id):
+        assert faq_client.get("/api/v1/faqs/search", params={"q": "garbage"}).json() == []
+
+        created = faq_client.post("/api/v1/faqs/", json={
+            "constituency_id": str(constituency_id), "category": "sanitation", "title": "Garbage not collected",
+            "question_keywords": "garbage, waste", "solution_text": "Report to the sanitation inspector",
+        })
+        assert created.status_code == 201
+
+        results = faq_client.get("/api/v1/faqs/search", params={"q": "garbage"}).json()
+        assert [r["faq"]["id"] for r in results] == [created.json()["id"]]
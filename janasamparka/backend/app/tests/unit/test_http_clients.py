@@ -0,0 +1,86 @@
+"""
+Unit tests for the shared outbound HTTP client registry
+"""
+import asyncio
+
+import httpx
+import pytest
+
+from app.core.http_clients import ClientProfile, HTTPClientRegistry, RetryPolicy
+
+
+NO_WAIT = dict(backoff_base=0.0, backoff_max=0.0)
+
+
+def registry_with(handler, **profiles):
+    registry = HTTPClientRegistry(profiles)
+    built = []
+
+    def build(name):
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler),
+                                   base_url=registry.profiles[name].base_url)
+        built.append(client)
+        return client
+
+    registry._build = build
+    registry.built = built
+    return registry
+
+
+class TestHTTPClientRegistry:
+    def test_clients_are_reused_within_a_loop(self):
+        registry = registry_with(lambda request: httpx.Response(200), api=ClientProfile(base_url="https://api.test"))
+
+        async def run():
+            await registry.start()
+            for _ in range(3):
+                assert (await registry.request("api", "GET", "/ping")).status_code == 200
+            await registry.close()
+
+        asyncio.run(run())
+        assert len(registry.built) == 1
+        assert registry.built[0].is_closed
+
+    def test_new_event_loop_gets_new_clients(self):
+        registry = registry_with(lambda request: httpx.Response(200), api=ClientProfile())
+
+        asyncio.run(registry.request("api", "GET", "https://api.test/"))
+        asyncio.run(registry.request("api", "GET", "https://api.test/"))
+        assert len(registry.built) == 2
+
+    def test_retryable_status_honours_method_policy(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request.method)
+            return httpx.Response(503 if len(calls) < 3 else 200)
+
+        registry = registry_with(
+            handler,
+            fcm=ClientProfile(retry=RetryPolicy(methods=frozenset({"POST"}), **NO_WAIT)),
+            twilio=ClientProfile(retry=RetryPolicy(**NO_WAIT)),
+        )
+
+        assert asyncio.run(registry.request("fcm", "POST", "https://fcm.test/send")).status_code == 200
+        assert calls == ["POST"] * 3
+
+        calls.clear()
+        assert asyncio.run(registry.request("twilio", "POST", "https://twilio.test/")).status_code == 503
+        assert calls == ["POST"]
+
+    def test_connection_errors_are_retried_then_raised(self):
+        attempts = []
+
+        def handler(request):
+            attempts.append(request)
+            raise httpx.ConnectError("refused", request=request)
+
+        registry = registry_with(handler, webhooks=ClientProfile(retry=RetryPolicy(attempts=2, **NO_WAIT)))
+        with pytest.raises(httpx.ConnectError):
+            asyncio.run(registry.request("webhooks", "POST", "https://hooks.test/"))
+        assert len(attempts) == 2
+
+    def test_retry_after_caps_at_backoff_max(self):
+        policy = RetryPolicy(backoff_max=5.0)
+        assert policy.delay(0, retry_after=120) == 5.0
+        assert 0 <= policy.delay(3) <= 4.0
@@ -0,0 +1,78 @@
+"""
+Unit tests for single-decode image renditions and the off-loop pipeline
+"""
+import asyncio
+import io
+
+from PIL import Image
+
+from app.core.image_processing import (
+    EXIF_GPS_IFD,
+    MAX_SIZE,
+    THUMBNAIL_SIZE,
+    extract_exif_data,
+    process_image,
+)
+from app.services.image_pipeline import ImagePipeline
+
+
+def make_jpeg(size=(2400, 1600), mode="RGB", with_gps=False, format="JPEG"):
+    img = Image.new(mode, size, (120, 80, 40, 128)[:len(mode)])
+    output = io.BytesIO()
+    kwargs = {}
+    if with_gps:
+        exif = Image.Exif()
+        exif[306] = "2026:03:01 09:30:00"
+        exif[EXIF_GPS_IFD] = {1: "N", 2: (12.0, 45.0, 0.0), 3: "E", 4: (75.0, 30.0, 0.0)}
+        kwargs["exif"] = exif.tobytes()
+    img.save(output, format=format, **kwargs)
+    return output.getvalue()
+
+
+class TestProcessImage:
+    def test_renditions_fit_their_bounds(self):
+        result = process_image(make_jpeg())
+        full = result.get("full")
+        medium = result.get("medium")
+        thumbnail = result.get("thumbnail")
+
+        assert full.width <= MAX_SIZE[0] and full.height <= MAX_SIZE[1]
+        assert (medium.width, medium.height) == (800, 533)
+        assert max(thumbnail.width, thumbnail.height) == THUMBNAIL_SIZE[0]
+        assert thumbnail.content[:2] == b"\xff\xd8"
+        assert set(result.timings) == {"decode", "full", "medium", "thumbnail"}
+
+    def test_small_images_are_not_upscaled(self):
+        result = process_image(make_jpeg(size=(200, 100)))
+        assert {(r.width, r.height) for r in result.renditions} == {(200, 100)}
+
+    def test_webp_renditions_are_optional(self):
+        assert process_image(make_jpeg()).get("full", "WEBP") is None
+
+        webp = process_image(make_jpeg(), webp=True).get("medium", "WEBP")
+        assert webp.extension == ".webp"
+        assert webp.content[8:12] == b"WEBP"
+
+    def test_transparent_png_is_flattened(self):
+        result = process_image(make_jpeg(size=(64, 64), mode="RGBA", format="PNG"))
+        decoded = Image.open(io.BytesIO(result.get("full").content))
+        assert decoded.mode == "RGB"
+
+    def test_exif_gps_is_converted_to_decimal(self):
+        data = make_jpeg(with_gps=True)
+        result = process_image(data)
+        assert result.gps == (12.75, 75.5)
+        assert result.exif == {"datetime": "2026:03:01 09:30:00"}
+        assert extract_exif_data(data)["gps"] == (12.75, 75.5)
+
+
+class TestImagePipeline:
+    def test_thread_mode_processes_concurrent_uploads(self):
+        pipeline = ImagePipeline(workers=0, max_pending=2)
+
+        async def run():
+            return await asyncio.gather(*[pipeline.process(make_jpeg(size=(640, 480))) for _ in range(5)])
+
+        results = asyncio.run(run())
+        assert len(results) == 5
+        assert all(r.get("thumbnail").width == 300 for r in results)
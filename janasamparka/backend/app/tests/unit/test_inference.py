@@ -0,0 +1,165 @@
+"""
+Unit tests for micro-batched embedding inference and the inference server
+"""
+import asyncio
+
+import httpx
+import numpy as np
+import pytest
+from fastapi import FastAPI
+
+from app.core import http_clients as http_clients_module
+from app.core.config import settings
+from app.core.http_clients import http_clients
+from app.routers import inference as inference_router
+from app.services.inference import EmbeddingService, MicroBatcher, pack_embeddings, unpack_embeddings
+
+
+class FakeEncoder:
+    """Embeds a text as [len(text), number]; records the size of every model call"""
+
+    model_name = "fake"
+    backend = "fake"
+    loaded = True
+    dimension = 2
+
+    def __init__(self):
+        self.batches = []
+
+    def encode_batch(self, texts):
+        self.batches.append(len(texts))
+        return np.array([[len(text), float(text.split("-")[-1])] for text in texts], dtype=np.float32)
+
+
+def run_concurrently(batcher, requests):
+    async def main():
+        try:
+            return await asyncio.gather(*(batcher.submit(texts) for texts in requests))
+        finally:
+            await batcher.close()
+
+    return asyncio.run(main())
+
+
+class TestMicroBatcher:
+    def test_concurrent_requests_share_model_calls(self):
+        encoder = FakeEncoder()
+        batcher = MicroBatcher(encoder.encode_batch, max_batch_size=8, max_wait_ms=50)
+
+        results = run_concurrently(batcher, [[f"text-{i}"] for i in range(20)])
+
+        assert encoder.batches == [8, 8, 4]
+        for i, rows in enumerate(results):
+            assert rows.tolist() == [[len(f"text-{i}"), i]]
+
+    def test_batches_are_not_overfilled(self):
+        encoder = FakeEncoder()
+        batcher = MicroBatcher(encoder.encode_batch, max_batch_size=8, max_wait_ms=50)
+
+        results = run_concurrently(batcher, [[f"a-{i}" for i in range(5)], [f"b-{i}" for i in range(5)]])
+
+        assert encoder.batches == [5, 5]
+        assert [row[1] for row in results[1].tolist()] == [0, 1, 2, 3, 4]
+
+    def test_oversized_requests_are_split_into_full_batches(self):
+        encoder = FakeEncoder()
+        batcher = MicroBatcher(encoder.encode_batch, max_batch_size=8, max_wait_ms=20)
+
+        results = run_concurrently(batcher, [[f"big-{i}" for i in range(20)]])
+
+        assert max(encoder.batches) <= 8
+        assert sum(encoder.batches) == 20
+        assert results[0][:, 1].tolist() == list(range(20))
+
+    def test_lone_request_waits_at_most_max_wait(self):
+        encoder = FakeEncoder()
+        batcher = MicroBatcher(encoder.encode_batch, max_batch_size=64, max_wait_ms=20)
+
+        async def main():
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            await batcher.submit(["only-1"])
+            elapsed = loop.time() - start
+            await batcher.close()
+            return elapsed
+
+        assert asyncio.run(main()) < 0.5
+        assert encoder.batches == [1]
+
+    def test_model_errors_reach_every_caller_in_the_batch(self):
+        def fail(texts):
+            raise RuntimeError("model crashed")
+
+        batcher = MicroBatcher(fail, max_batch_size=8, max_wait_ms=20)
+
+        async def main():
+            try:
+                return await asyncio.gather(*(batcher.submit([f"t-{i}"]) for i in range(3)),
+                                            return_exceptions=True)
+            finally:
+                await batcher.close()
+
+        assert all(isinstance(result, RuntimeError) for result in asyncio.run(main()))
+
+
+class TestInferenceServer:
+    def test_api_worker_encodes_through_the_inference_server(self, monkeypatch):
+        encoder = FakeEncoder()
+        service = EmbeddingService(encoder)
+        monkeypatch.setattr(inference_router, "embedding_service", service)
+
+        server = FastAPI()
+        server.include_router(inference_router.router, prefix="/internal/inference")
+        monkeypatch.setattr(settings, "INFERENCE_URL", "http://inference", raising=False)
+        monkeypatch.setattr(http_clients, "_build", lambda name: httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=server), base_url="http://inference"))
+
+        async def main():
+            try:
+                return await asyncio.gather(*(service.encode([f"doc-{i}", f"doc-{i + 100}"]) for i in range(6)))
+            finally:
+                await service.close()
+                await http_clients.close()
+
+        results = asyncio.run(main())
+
+        assert [rows[:, 1].tolist() for rows in results] == [[i, i + 100] for i in range(6)]
+        assert sum(encoder.batches) == 12
+        assert len(encoder.batches) < 6
+
+    def test_large_jobs_are_split_under_the_server_limit(self, monkeypatch):
+        encoder = FakeEncoder()
+        service = EmbeddingService(encoder)
+        monkeypatch.setattr(inference_router, "embedding_service", service)
+
+        server = FastAPI()
+        server.include_router(inference_router.router, prefix="/internal/inference")
+        monkeypatch.setattr(settings, "INFERENCE_URL", "http://inference", raising=False)
+        monkeypatch.setattr(http_clients, "_build", lambda name: httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=server), base_url="http://inference"))
+
+        async def main():
+            try:
+                return await service.encode([f"doc-{i}" for i in range(1200)])
+            finally:
+                await service.close()
+                await http_clients.close()
+
+        rows = asyncio.run(main())
+
+        assert rows[:, 1].tolist() == list(range(1200))
+        assert max(encoder.batches) <= service.batcher.max_batch_size
+
+    def test_wire_format_round_trips(self):
+        vectors = np.random.default_rng(0).random((3, 5), dtype=np.float32)
+        body, shape = pack_embeddings(vectors)
+
+        assert shape == "3,5"
+        assert np.array_equal(unpack_embeddings(body, shape), vectors)
+
+    def test_unix_socket_url(self, monkeypatch):
+        monkeypatch.setattr(settings, "INFERENCE_URL", "unix:///run/janasamparka/inference.sock", raising=False)
+        profile = http_clients_module._inference_profile()
+
+        assert profile.uds == "/run/janasamparka/inference.sock"
+        assert profile.base_url == "http://inference"
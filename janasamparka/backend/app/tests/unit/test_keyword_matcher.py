@@ -0,0 +1,57 @@
+"""
+Unit tests for the shared keyword matcher
+"""
+import random
+
+from app.services.keyword_matcher import KeywordMatcher, keyword_matcher
+from app.services.department_suggestion import DEPARTMENT_KEYWORDS, categories_for_code
+from app.services.priority_service import EMERGENCY_KEYWORDS, HIGH_IMPACT_KEYWORDS
+
+
+class TestKeywordMatcher:
+    """scan() must agree with `keyword in text` for every keyword"""
+
+    def test_overlapping_and_nested_keywords(self):
+        matcher = KeywordMatcher()
+        matcher.register("lights", ["street", "streetlight", "light"])
+        matcher.register("time", ["now", "no"])
+
+        hits = matcher.scan("the streetlight is not working, i know")
+        assert hits.found("lights") == {"street", "streetlight", "light"}
+        assert hits.found("time") == {"now", "no"}
+        assert hits.count("missing") == 0
+
+    def test_matches_substring_semantics(self):
+        rng = random.Random(3)
+        vocabulary = sorted(keyword_matcher.groups()["department.roads"] | set(EMERGENCY_KEYWORDS))
+        filler = "abcdefghijklmnopqrstuvwxyz   "
+
+        for _ in range(300):
+            parts = rng.sample(vocabulary, 4) + ["".join(rng.choice(filler) for _ in range(20))]
+            rng.shuffle(parts)
+            text = " ".join(parts)
+            hits = keyword_matcher.scan(text)
+            assert hits.found("priority.emergency") == {k for k in EMERGENCY_KEYWORDS if k in text}
+            assert hits.found("priority.high_impact") == {k for k in HIGH_IMPACT_KEYWORDS if k in text}
+            assert hits.found("department.roads") == {
+                k for k in DEPARTMENT_KEYWORDS["roads"]["keywords"] if k in text
+            }
+
+    def test_registration_invalidates_pattern(self):
+        matcher = KeywordMatcher()
+        matcher.register("a", ["pothole"])
+        assert matcher.scan("big pothole").count("a") == 1
+        matcher.register("b", ["big"])
+        assert matcher.scan("big pothole").count("b") == 1
+
+    def test_empty_text(self):
+        assert KeywordMatcher().scan("").keywords == frozenset()
+
+
+class TestDepartmentCodeCategories:
+    """Department code → keyword category precomputation"""
+
+    def test_categories_for_code(self):
+        assert categories_for_code("PWD-PUTTUR") == ("roads",)
+        assert categories_for_code("bbmp_health") == ("health",)
+        assert categories_for_code("UNKNOWN") == ()
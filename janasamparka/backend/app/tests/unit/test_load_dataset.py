@@ -0,0 +1,102 @@
+"""
+Unit tests for the synthetic load dataset generator (scripts/generate_load_dataset.py)
+"""
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+from app.core.database import Base
+
+SCRIPT = Path(__file__).parents[3] / "scripts" / "generate_load_dataset.py"
+
+
+@pytest.fixture(scope="module")
+def generator():
+    spec = importlib.util.spec_from_file_location("generate_load_dataset", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="module")
+def dataset(generator):
+    return generator.SyntheticDataset(generator.Scale(
+        constituencies=3, wards_per_constituency=6, gram_panchayats_per_constituency=2,
+        citizens=60, complaints=2_000, days=120,
+    ))
+
+
+def rows(dataset, chunk_size):
+    complaints, logs, media = [], [], []
+    for chunk in dataset.complaint_chunks(chunk_size):
+        for target, part in zip((complaints, logs, media), chunk):
+            target.extend(part)
+    return complaints, logs, media
+
+
+class TestLoadDataset:
+    def test_same_arguments_give_the_same_rows(self, generator, dataset):
+        again = generator.SyntheticDataset(dataset.scale)
+
+        assert rows(dataset, 500) == rows(again, 500)
+        assert list(dataset.users()) == list(again.users())
+
+    def test_references_point_at_generated_rows(self, generator, dataset):
+        complaints, logs, media = rows(dataset, 500)
+        users = {user["id"] for user in dataset.users()}
+        wards = {ward["id"]: ward["constituency_id"] for ward in dataset.wards()}
+        complaint_ids = {row[0] for row in complaints}
+        columns = {name: generator.COMPLAINT_COLUMNS.index(name)
+                   for name in ("constituency_id", "user_id", "ward_id", "assigned_to", "ward_officer_id")}
+
+        assert len(complaint_ids) == len(complaints)
+        for row in complaints:
+            assert wards[row[columns["ward_id"]]] == row[columns["constituency_id"]]
+            assert {row[columns["user_id"]], row[columns["ward_officer_id"]]} <= users
+            assert row[columns["assigned_to"]] in users | {None}
+        assert {log[1] for log in logs} == complaint_ids
+        assert {log[4] for log in logs} <= users
+        assert {item[1] for item in media} <= complaint_ids
+        assert len({log[0] for log in logs}) == len(logs)
+
+    def test_status_follows_the_logged_workflow(self, generator, dataset):
+        complaints, logs, _ = rows(dataset, 2_000)
+        status = generator.COMPLAINT_COLUMNS.index("status")
+        history = {}
+        for log in logs:
+            history.setdefault(log[1], []).append(log)
+
+        for row in complaints:
+            trail = history[row[0]]
+            assert trail[0][2] is None
+            assert trail[-1][3] == row[status]
+            assert [log[6] for log in trail] == sorted(log[6] for log in trail)
+            assert all(later[2] == earlier[3] for earlier, later in zip(trail, trail[1:]))
+        assert len({row[status] for row in complaints}) >= 4
+
+    def test_reference_rows_fill_required_columns(self, generator, dataset):
+        for name, reference in (("constituencies", dataset.constituencies()), ("users", dataset.users())):
+            table = Base.metadata.tables[name]
+            columns, values = generator.with_defaults(table, reference, dataset.scale.start)
+
+            required = {column.name for column in table.columns if not column.nullable}
+            assert required <= set(columns)
+            assert all(value is not None for row in values
+                       for column, value in zip(columns, row) if column in required)
+
+    def test_enum_columns_load_through_the_orm_types(self, generator, dataset):
+        complaints, _, media = rows(dataset, 500)
+        for name, columns, values in (("complaints", generator.COMPLAINT_COLUMNS, complaints),
+                                      ("media", generator.MEDIA_COLUMNS, media)):
+            table = Base.metadata.tables[name]
+            for column in ("status", "priority", "media_type"):
+                if column not in columns:
+                    continue
+                enum_type = table.c[column].type
+                position = columns.index(column)
+                # Raises LookupError for strings the column would not load
+                assert all(enum_type._object_value_for_elem(row[position]) is not None for row in values)
+
+    def test_array_values_become_postgres_literals(self, generator):
+        assert generator.pg_array(["Puttur", 'Say "hi"']) == '{"Puttur","Say \\"hi\\""}'
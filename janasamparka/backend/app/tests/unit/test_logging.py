@@ -0,0 +1,84 @@
+"""
+Unit tests for queued, sampled structured logging
+"""
+import json
+import logging
+import queue
+
+import pytest
+import structlog
+
+from app.core import logging as app_logging
+from app.core.config import settings
+from app.core.logging import DeferredQueueHandler, LogSampler, SamplingFilter
+
+
+@pytest.fixture
+def restore_logging():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield
+    app_logging.shutdown_logging()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+    structlog.reset_defaults()
+
+
+class TestLogSampler:
+    def test_routine_events_are_sampled_per_logger(self):
+        sampler = LogSampler({"request": 0.0, "uvicorn": 0.0}, slow_ms=500)
+        assert sampler.keep("request", logging.INFO, {"status_code": 200, "duration_ms": 3}) == 0.0
+        assert sampler.keep("uvicorn.access", logging.INFO, {}) == 0.0
+        assert sampler.keep("business", logging.INFO, {}) == 1.0
+
+    def test_errors_and_slow_requests_are_always_kept(self):
+        sampler = LogSampler({"request": 0.0}, slow_ms=500)
+        assert sampler.keep("request", logging.WARNING, {}) == 1.0
+        assert sampler.keep("request", logging.INFO, {"status_code": 503}) == 1.0
+        assert sampler.keep("request", logging.INFO, {"status_code": 200, "duration_ms": 750.0}) == 1.0
+
+    def test_kept_samples_carry_their_rate(self):
+        sampler = LogSampler({"request": 0.999999}, slow_ms=500)
+        event = sampler.processor(logging.getLogger("request"), "info", {"event": "x", "status_code": 200})
+        assert event["sample_rate"] == 0.999999
+
+        with pytest.raises(structlog.DropEvent):
+            LogSampler({"request": 0.0}, 500).processor(logging.getLogger("request"), "info", {"event": "x"})
+
+    def test_filter_applies_to_plain_records(self):
+        sampling = SamplingFilter(LogSampler({"uvicorn.access": 0.0}, slow_ms=500))
+        record = logging.LogRecord("uvicorn.access", logging.INFO, __file__, 1, "GET /", None, None)
+        assert not sampling.filter(record)
+        record.levelno = logging.ERROR
+        assert sampling.filter(record)
+
+
+class TestQueuedLogging:
+    def test_records_are_queued_unformatted(self):
+        log_queue = queue.SimpleQueue()
+        handler = DeferredQueueHandler(log_queue)
+        record = logging.LogRecord("request", logging.INFO, __file__, 1, {"event": "x"}, None, None)
+        handler.handle(record)
+        assert log_queue.get_nowait().msg == {"event": "x"}
+
+    def test_events_are_written_as_json_by_the_listener(self, tmp_path, monkeypatch, restore_logging):
+        monkeypatch.setattr(settings, "LOG_SAMPLE_RATES", {"request": 0.0}, raising=False)
+        app_logging.setup_logging(tmp_path)
+        log = structlog.get_logger("request")
+        log.info("HTTP request completed", status_code=200, duration_ms=1.0)
+        log.info("HTTP request completed", status_code=404, duration_ms=1.0)
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            log.exception("HTTP request failed")
+        app_logging.shutdown_logging()
+
+        lines = [json.loads(line) for line in (tmp_path / f"{settings.ENVIRONMENT}.log").read_text().splitlines()]
+        assert [line.get("status_code") for line in lines] == [404, None]
+        assert lines[0]["logger"] == "request"
+        assert lines[0]["environment"] == settings.ENVIRONMENT
+        assert "ValueError: boom" in lines[1]["exception"]
+        assert (tmp_path / f"{settings.ENVIRONMENT}-error.log").read_text().count("\n") == 1
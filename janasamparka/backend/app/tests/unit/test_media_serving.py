@@ -0,0 +1,132 @@
+"""
+Unit tests for serving uploaded media
+"""
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import pytest
+
+from app.core.config import settings
+from app.core.media_serving import (
+    IMMUTABLE_CACHE_CONTROL,
+    present_media_url,
+    resolve_media_path,
+    sign_media_url,
+    verify_media_signature,
+)
+from app.routers import media as media_router
+from app.schemas.complaint import ComplaintDetailResponse
+
+
+SHA = "ab" * 32
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    blob = tmp_path / "media" / "blobs" / "ab" / "ab"
+    blob.mkdir(parents=True)
+    (blob / f"{SHA}.jpg").write_bytes(b"0123456789")
+    (tmp_path / "media" / "legacy.jpg").write_bytes(b"legacy")
+    (tmp_path / "media" / ".incoming").mkdir()
+    (tmp_path / "media" / ".incoming" / "partial.upload").write_bytes(b"partial")
+
+    monkeypatch.setattr(media_router, "UPLOADS_ROOT", tmp_path)
+    app = FastAPI()
+    app.include_router(media_router.files_router)
+    return TestClient(app)
+
+
+def blob_url():
+    return f"/uploads/media/blobs/ab/ab/{SHA}.jpg"
+
+
+class TestSignedUrls:
+    def test_round_trip_and_expiry(self):
+        url = sign_media_url("/uploads/media/a.jpg", expires_in=600, now=1_000_000)
+        query = dict(part.split("=") for part in url.split("?", 1)[1].split("&"))
+        expires = int(query["expires"])
+
+        assert expires >= 1_000_600
+        assert verify_media_signature("/uploads/media/a.jpg", expires, query["sig"], now=1_000_000)
+        assert not verify_media_signature("/uploads/media/b.jpg", expires, query["sig"], now=1_000_000)
+        assert not verify_media_signature("/uploads/media/a.jpg", expires, query["sig"], now=expires + 1)
+
+    def test_urls_are_stable_within_a_window(self):
+        assert sign_media_url("/uploads/x.jpg", 600, now=1_000_000) == sign_media_url("/uploads/x.jpg", 600, now=1_000_001)
+
+    def test_presented_urls_are_signed_when_enforced(self, monkeypatch):
+        assert present_media_url(blob_url()) == blob_url()
+
+        monkeypatch.setattr(settings, "MEDIA_REQUIRE_SIGNED_URLS", True)
+        signed = present_media_url(blob_url())
+        assert signed.startswith(blob_url() + "?expires=")
+        assert present_media_url(signed) == signed
+        assert present_media_url("https://cdn.example.org/a.jpg") == "https://cdn.example.org/a.jpg"
+
+    def test_complaint_detail_media_is_signed(self, monkeypatch):
+        monkeypatch.setattr(settings, "MEDIA_REQUIRE_SIGNED_URLS", True)
+        detail = ComplaintDetailResponse.model_validate({
+            "id": "00000000-0000-0000-0000-000000000001", "user_id": "00000000-0000-0000-0000-000000000002",
+            "constituency_id": "00000000-0000-0000-0000-000000000003", "title": "Broken pipe",
+            "description": "Water leaking on main road", "category": None, "lat": None, "lng": None,
+            "ward_id": None, "location_description": None, "dept_id": None, "assigned_to": None,
+            "status": "submitted", "priority": "medium", "voice_transcript": None,
+            "created_at": "2026-01-01T00:00:00", "updated_at": "2026-01-01T00:00:00",
+            "resolved_at": None, "closed_at": None,
+            "media": [{"id": "00000000-0000-0000-0000-000000000004", "url": blob_url(),
+                       "media_type": "photo", "uploaded_at": "2026-01-01T00:00:00"}],
+        })
+        assert "sig=" in detail.media[0].url
+
+
+class TestResolveMediaPath:
+    def test_rejects_traversal_and_dot_files(self, tmp_path):
+        (tmp_path / "ok.jpg").write_bytes(b"x")
+        (tmp_path / ".secret").write_bytes(b"x")
+        assert resolve_media_path(tmp_path, "ok.jpg") == (tmp_path / "ok.jpg").resolve()
+        assert resolve_media_path(tmp_path, "../etc/passwd") is None
+        assert resolve_media_path(tmp_path, ".secret") is None
+        assert resolve_media_path(tmp_path, "missing.jpg") is None
+
+
+class TestServeUpload:
+    def test_content_hashed_files_are_immutable(self, client):
+        response = client.get(blob_url())
+        assert response.status_code == 200
+        assert response.content == b"0123456789"
+        assert response.headers["etag"] == f'"{SHA}"'
+        assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+
+        cached = client.get(blob_url(), headers={"If-None-Match": f'"{SHA}"'})
+        assert cached.status_code == 304
+        assert cached.content == b""
+
+    def test_range_request(self, client):
+        response = client.get(blob_url(), headers={"Range": "bytes=2-5"})
+        assert response.status_code == 206
+        assert response.content == b"2345"
+        assert response.headers["content-range"] == "bytes 2-5/10"
+
+    def test_legacy_files_get_revalidated(self, client):
+        response = client.get("/uploads/media/legacy.jpg")
+        assert response.status_code == 200
+        assert "immutable" not in response.headers["cache-control"]
+
+    def test_incoming_files_are_not_served(self, client):
+        assert client.get("/uploads/media/.incoming/partial.upload").status_code == 404
+
+    def test_signatures_are_enforced(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "MEDIA_REQUIRE_SIGNED_URLS", True, raising=False)
+        assert client.get(blob_url()).status_code == 403
+        assert client.get(f"{blob_url()}?expires=1&sig=bad").status_code == 403
+
+        response = client.get(sign_media_url(blob_url()))
+        assert response.status_code == 200
+        assert response.headers["cache-control"].startswith("private")
+
+    def test_accel_redirect_leaves_bytes_to_nginx(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "MEDIA_ACCEL_REDIRECT_PREFIX", "/_media/", raising=False)
+        response = client.get(blob_url())
+        assert response.status_code == 200
+        assert response.content == b""
+        assert response.headers["x-accel-redirect"] == f"/_media/media/blobs/ab/ab/{SHA}.jpg"
+        assert response.headers["content-type"] == "image/jpeg"
@@ -0,0 +1,134 @@
+"""
+Unit tests for content-addressed, reference-counted media storage
+"""
+import asyncio
+import hashlib
+import io
+import uuid
+
+import pytest
+from PIL import Image
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.core.uploads import SpooledUpload
+from app.models.complaint import MediaBlob
+from app.services import media_store as media_store_module
+from app.services.image_pipeline import ImagePipeline
+from app.services.media_store import MediaBlobStore
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    MediaBlob.__table__.create(engine)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(media_store_module, "image_pipeline", ImagePipeline(workers=0))
+    return MediaBlobStore(tmp_path / "blobs", url_prefix="/uploads/media/blobs", grace_seconds=3600)
+
+
+def spool(tmp_path, content, filename):
+    path = tmp_path / f"{uuid.uuid4().hex}.upload"
+    path.write_bytes(content)
+    return SpooledUpload(path=path, size=len(content), sha256=hashlib.sha256(content).hexdigest(), filename=filename)
+
+
+def jpeg_bytes():
+    output = io.BytesIO()
+    Image.new("RGB", (1200, 900), (10, 120, 200)).save(output, format="JPEG")
+    return output.getvalue()
+
+
+class TestMediaBlobStore:
+    def test_identical_uploads_share_one_copy(self, db, store, tmp_path):
+        content = b"\x00\x00\x00\x18ftypmp42" * 100
+        first = asyncio.run(store.put(db, spool(tmp_path, content, "clip.mp4"), ".mp4"))
+        second = asyncio.run(store.put(db, spool(tmp_path, content, "again.mp4"), ".mp4"))
+        db.commit()
+
+        sha = hashlib.sha256(content).hexdigest()
+        assert first.sha256 == second.sha256 == sha
+        assert second.ref_count == 2
+        assert first.path == f"{sha[:2]}/{sha[2:4]}/{sha}.mp4"
+        assert first.content_type == "video/mp4"
+        assert store.file_path(first.path).read_bytes() == content
+        assert len(store.blob_files(sha)) == 1
+
+    def test_images_are_processed_once(self, db, store, tmp_path, monkeypatch):
+        calls = []
+        pipeline = media_store_module.image_pipeline
+        original = pipeline.process
+
+        async def counting_process(source, webp=None):
+            calls.append(source)
+            return await original(source, webp)
+
+        monkeypatch.setattr(pipeline, "process", counting_process)
+        content = jpeg_bytes()
+        blob = asyncio.run(store.put(db, spool(tmp_path, content, "a.jpg"), ".jpg"))
+        asyncio.run(store.put(db, spool(tmp_path, content, "b.jpg"), ".jpg"))
+
+        assert len(calls) == 1
+        assert blob.ref_count == 2
+        assert blob.path.endswith(".jpg")
+        assert store.rendition_url(blob, "thumbnail").endswith(f"thumb_{blob.sha256}.jpg")
+        assert store.rendition_url(blob, "medium") is not None
+
+    def test_release_and_collect_garbage(self, db, store, tmp_path):
+        content = b"%PDF-1.4 test"
+        blob = asyncio.run(store.put(db, spool(tmp_path, content, "doc.pdf"), ".pdf"))
+        asyncio.run(store.put(db, spool(tmp_path, content, "doc.pdf"), ".pdf"))
+        db.commit()
+
+        store.release(db, blob.sha256)
+        db.commit()
+        assert store.collect_garbage(db, older_than_seconds=-60) == 0
+
+        store.release(db, blob.sha256)
+        db.commit()
+        db.refresh(blob)
+        assert blob.ref_count == 0
+        assert blob.released_at is not None
+
+        # Still inside the grace period
+        assert store.collect_garbage(db) == 0
+        assert store.collect_garbage(db, older_than_seconds=-60) == 1
+        assert store.blob_files(blob.sha256) == []
+        assert db.get(MediaBlob, blob.sha256) is None
+
+    def test_reupload_during_grace_period_revives_blob(self, db, store, tmp_path):
+        content = b"GIF89a-bytes"
+        blob = asyncio.run(store.put(db, spool(tmp_path, content, "x.mov"), ".mov"))
+        store.release(db, blob.sha256)
+        db.commit()
+
+        revived = asyncio.run(store.put(db, spool(tmp_path, content, "x.mov"), ".mov"))
+        db.commit()
+        assert revived.ref_count == 1
+        assert revived.released_at is None
+        assert store.collect_garbage(db, older_than_seconds=-60) == 0
+
+    def test_rollback_discards_files_of_uncommitted_blobs(self, db, store, tmp_path):
+        kept = asyncio.run(store.put(db, spool(tmp_path, b"kept-bytes", "kept.mp4"), ".mp4"))
+        db.commit()
+        asyncio.run(store.put(db, spool(tmp_path, b"kept-bytes", "kept.mp4"), ".mp4"))
+        dropped = asyncio.run(store.put(db, spool(tmp_path, b"dropped-bytes", "dropped.mp4"), ".mp4"))
+        dropped_sha = dropped.sha256
+
+        store.rollback(db)
+
+        assert store.blob_files(dropped_sha) == []
+        assert db.get(MediaBlob, dropped_sha) is None
+        assert len(store.blob_files(kept.sha256)) == 1
+        assert db.get(MediaBlob, kept.sha256).ref_count == 1
+
+    def test_sha_from_name(self):
+        sha = "a" * 64
+        assert MediaBlobStore.sha_from_name(f"thumb_{sha}.jpg") == sha
+        assert MediaBlobStore.sha_from_name("photo_20250101_abcd.jpg") is None
@@ -0,0 +1,94 @@
+"""
+Unit tests for bounded metric label cardinality
+"""
+import uuid
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY, CollectorRegistry, Counter
+
+from app.core import metrics
+from app.core.metrics import OVERFLOW_LABEL, BoundedMetric, hash_label, metrics_collector
+from app.middleware.monitoring import ObservabilityMiddleware
+
+USERS = 100_000
+
+
+def series(metric_name, registry=REGISTRY):
+    """Label sets exposed for a counter (its ``_total`` samples)"""
+    return {
+        tuple(sorted(sample.labels.items()))
+        for family in registry.collect()
+        for sample in family.samples
+        if sample.name == f"{metric_name}_total"
+    }
+
+
+class TestBoundedMetric:
+    def test_series_stay_bounded_under_distinct_users(self):
+        registry = CollectorRegistry()
+        counter = BoundedMetric(
+            Counter("test_actions", "Actions", ["user", "action"], registry=registry),
+            max_series=50,
+            bounded=["user"],
+            hashed=["user"],
+        )
+
+        for i in range(USERS):
+            counter.labels(user=f"+9198{i:08d}", action="vote" if i % 2 else "login").inc()
+
+        exposed = series("test_actions", registry)
+        # 50 recorded label sets plus one overflow series per action
+        assert len(exposed) <= 52
+        assert sum(
+            registry.get_sample_value("test_actions_total", dict(labels)) for labels in exposed
+        ) == USERS
+        assert (("action", "login"), ("user", OVERFLOW_LABEL)) in exposed
+        assert not any("+9198" in value for labels in exposed for _, value in labels)
+
+    def test_existing_series_keep_counting_after_cap(self):
+        registry = CollectorRegistry()
+        counter = BoundedMetric(
+            Counter("test_capped", "Capped", ["key"], registry=registry), max_series=2
+        )
+        counter.labels(key="a").inc()
+        counter.labels(key="b").inc()
+        counter.labels(key="c").inc()
+        counter.labels("a").inc()
+
+        assert registry.get_sample_value("test_capped_total", {"key": "a"}) == 2
+        assert registry.get_sample_value("test_capped_total", {"key": OVERFLOW_LABEL}) == 1
+        assert counter.series_count == 2
+        assert hash_label("+919800000000") == hash_label("+919800000000")
+
+    def test_business_metrics_do_not_grow_with_users(self):
+        for i in range(USERS):
+            metrics_collector.record_auth_attempt(f"+9197{i:08d}", success=i % 3 != 0)
+            metrics_collector.record_complaint_created(str(uuid.uuid4()), "roads", "high")
+
+        assert len(series("janasamparka_auth_attempts")) == 2
+        complaints = series("janasamparka_complaints")
+        assert len(complaints) <= metrics.complaints_total.max_series + 1
+
+
+class TestRouteTemplateLabels:
+    def test_http_metrics_use_route_template(self):
+        app = FastAPI()
+        app.add_middleware(ObservabilityMiddleware)
+
+        @app.get("/api/complaints/{complaint_id}")
+        def read_complaint(complaint_id: str):
+            return {"id": complaint_id}
+
+        client = TestClient(app)
+        for _ in range(20):
+            assert client.get(f"/api/complaints/{uuid.uuid4()}").status_code == 200
+            assert client.get(f"/no/such/{uuid.uuid4()}").status_code == 404
+
+        endpoints = {
+            dict(labels)["endpoint"] for labels in series("janasamparka_http_requests")
+        }
+        assert "/api/complaints/{complaint_id}" in endpoints
+        assert "unmatched" in endpoints
+        assert not any(endpoint.startswith(("/api/complaints/", "/no/such/")) and "{" not in endpoint
+                       for endpoint in endpoints)
@@ -0,0 +1,71 @@
+"""
+Unit tests for background-sampled system metrics
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import textwrap
+import time
+
+from prometheus_client import REGISTRY
+
+from app.core import metrics
+from app.core.metrics import SystemMetricsSampler, get_metrics_response
+
+
+def sample_value(name, **labels):
+    return REGISTRY.get_sample_value(name, labels or None)
+
+
+class TestSystemMetricsSampler:
+    def test_sample_fills_gauges_without_blocking(self):
+        sampler = SystemMetricsSampler()
+        start = time.perf_counter()
+        sampler.sample()
+        assert time.perf_counter() - start < 0.5
+
+        assert sample_value("janasamparka_system_memory_usage_bytes") > 0
+        assert sample_value("janasamparka_process_open_fds") > 0
+        assert sample_value("janasamparka_gc_collections", generation="0") >= 0
+
+    def test_run_records_event_loop_lag(self):
+        sampler = SystemMetricsSampler(interval=0.05)
+
+        async def main():
+            task = asyncio.create_task(sampler.run())
+            await asyncio.sleep(0.3)
+            time.sleep(0.2)  # block the loop while the sampler sleeps
+            await asyncio.sleep(0.01)
+            task.cancel()
+
+        asyncio.run(main())
+        assert sample_value("janasamparka_event_loop_lag_seconds") >= 0.1
+
+    def test_scrape_does_not_sample(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(metrics.system_metrics_sampler, "sample", lambda: calls.append(1))
+        response = get_metrics_response()
+        assert b"janasamparka_system_cpu_usage_percent" in response.body
+        assert calls == []
+
+
+def test_multiprocess_values_are_merged(tmp_path):
+    """Two worker processes write gauges; one scrape reports both"""
+    worker = textwrap.dedent("""
+        from app.core.metrics import image_processing_in_flight
+        image_processing_in_flight.inc(2)
+    """)
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    backend = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    scrape = textwrap.dedent("""
+        from app.core.metrics import get_metrics_response
+        print(get_metrics_response().body.decode())
+    """)
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", worker], env=env, cwd=backend, check=True)
+    output = subprocess.run([sys.executable, "-c", scrape], env=env, cwd=backend,
+                            check=True, capture_output=True, text=True).stdout
+    # Nothing marked the writers dead, so both still count towards the sum
+    assert "janasamparka_image_processing_in_flight 4.0" in output
+    assert "janasamparka_app_info_info" in output
@@ -0,0 +1,59 @@
+"""
+Unit tests for the multilingual text normalizer
+"""
+import random
+import string
+
+from app.services.predictive_planning_service import (
+    DeletionIndex,
+    MultilingualNormalizer,
+    levenshtein_distance,
+    multilingual_normalizer,
+)
+
+
+def linear_fuzzy_correct(word: str) -> str:
+    """Reference implementation: first map entry within edit distance 2."""
+    if len(word) < 3:
+        return word
+    for known_word, correct in MultilingualNormalizer.KANNADA_ENGLISH_MAP.items():
+        if levenshtein_distance(word, known_word) <= 2:
+            return correct
+    return word
+
+
+class TestMultilingualNormalizer:
+    """Fuzzy correction must match the original linear scan"""
+
+    def test_known_words_and_misspellings(self):
+        assert multilingual_normalizer.normalize_text("Raste guddi, niru illa!") == "road hole water no"
+        assert multilingual_normalizer.normalize_text("watr problm") == "water problem"
+
+    def test_fuzzy_correction_matches_linear_scan(self):
+        rng = random.Random(7)
+        vocabulary = list(MultilingualNormalizer.KANNADA_ENGLISH_MAP)
+        words = []
+        for _ in range(500):
+            word = rng.choice(vocabulary)
+            position = rng.randrange(len(word))
+            words.append(word[:position] + rng.choice(string.ascii_lowercase) + word[position + 1:])
+            words.append("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9))))
+
+        for word in words:
+            assert multilingual_normalizer._fuzzy_correct(word) == linear_fuzzy_correct(word), word
+
+    def test_normalize_many_matches_normalize_text(self):
+        texts = ["Bega current illa", "", "Kachada near school", "garbge garbge"]
+        assert multilingual_normalizer.normalize_many(texts) == [
+            multilingual_normalizer.normalize_text(text) for text in texts
+        ]
+
+    def test_bounded_levenshtein(self):
+        assert levenshtein_distance("kitten", "sitting") == 3
+        assert levenshtein_distance("kitten", "sitting", max_distance=1) == 2
+        assert levenshtein_distance("abc", "abcdefg", max_distance=2) == 3
+
+    def test_deletion_index_returns_earliest_entry(self):
+        index = DeletionIndex(["road", "rode", "load"], max_distance=1)
+        assert index.closest("roae") == "road"
+        assert index.closest("xyz") is None
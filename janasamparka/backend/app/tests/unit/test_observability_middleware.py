@@ -0,0 +1,77 @@
+"""
+Unit tests for the pure ASGI observability middleware
+"""
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.middleware.monitoring import ObservabilityMiddleware
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(ObservabilityMiddleware)
+
+    @app.get("/echo-id")
+    def echo_id(request: Request):
+        return {"request_id": request.state.request_id}
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse((f"chunk{i}\n".encode() for i in range(5)), media_type="text/plain")
+
+    @app.get("/boom")
+    def boom():
+        raise RuntimeError("boom")
+
+    @app.get("/health")
+    def health():
+        return {"status": "healthy"}
+
+    return TestClient(app, raise_server_exceptions=False)
+
+
+class TestObservabilityMiddleware:
+    def test_request_id_and_security_headers(self, client):
+        first = client.get("/echo-id")
+        second = client.get("/echo-id")
+
+        assert first.headers["x-request-id"] == first.json()["request_id"]
+        assert first.headers["x-request-id"] != second.headers["x-request-id"]
+        assert first.headers["x-content-type-options"] == "nosniff"
+        assert first.headers["x-frame-options"] == "DENY"
+
+    def test_streaming_response_passes_through(self, client):
+        before = REGISTRY.get_sample_value(
+            "janasamparka_http_response_size_bytes_sum",
+            {"method": "GET", "endpoint": "/stream", "status_code": "200"},
+        ) or 0
+
+        response = client.get("/stream")
+
+        assert response.text == "".join(f"chunk{i}\n" for i in range(5))
+        assert "x-request-id" in response.headers
+        assert REGISTRY.get_sample_value(
+            "janasamparka_http_response_size_bytes_sum",
+            {"method": "GET", "endpoint": "/stream", "status_code": "200"},
+        ) == before + len(response.content)
+
+    def test_unhandled_error_is_counted_as_500(self, client):
+        labels = {"method": "GET", "endpoint": "/boom", "status_code": "500", "user_role": "authenticated"}
+        before = REGISTRY.get_sample_value("janasamparka_http_requests_total", labels) or 0
+
+        assert client.get("/boom", headers={"Authorization": "Bearer x"}).status_code == 500
+        assert REGISTRY.get_sample_value("janasamparka_http_requests_total", labels) == before + 1
+
+    def test_health_checks_bypass_monitoring(self, client):
+        response = client.get("/health")
+
+        assert response.status_code == 200
+        assert "x-request-id" not in response.headers
+        assert REGISTRY.get_sample_value(
+            "janasamparka_http_requests_total",
+            {"method": "GET", "endpoint": "/health", "status_code": "200", "user_role": "anonymous"},
+        ) is None
@@ -0,0 +1,181 @@
+"""
+Unit tests for the background report job queue and report renderers
+"""
+import os
+import threading
+import time
+from datetime import datetime
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+
+from app.core.export import create_excel_report, create_pdf_report
+from app.schemas.analytics import ReportFilter
+from app.services.report_jobs import JobStatus, ReportJobQueue, report_key
+
+
+class FakeRenderQueue(ReportJobQueue):
+    """Queue whose renderer writes a stub file and counts calls"""
+
+    def __init__(self, *args, fail=False, gate=None, **kwargs):
+        super().__init__(*args, session_factory=MagicMock, **kwargs)
+        self.renders = 0
+        self.fail = fail
+        self.gate = gate
+
+    def _render(self, service, format_name, filters, path):
+        if self.gate:
+            self.gate.wait(timeout=5)
+        self.renders += 1
+        if self.fail:
+            raise RuntimeError("database went away")
+        path.write_text(format_name)
+        return 3
+
+
+def wait_for(queue, job_id, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.store.get(job_id)
+        if job.status in (JobStatus.COMPLETED, JobStatus.FAILED):
+            return job
+        time.sleep(0.01)
+    raise AssertionError("report job did not finish")
+
+
+@pytest.fixture
+def make_queue(tmp_path):
+    queues = []
+
+    def factory(**kwargs):
+        queue = FakeRenderQueue(output_dir=tmp_path, workers=2, **kwargs)
+        queue.start()
+        queues.append(queue)
+        return queue
+
+    yield factory
+    for queue in queues:
+        queue.shutdown()
+
+
+class TestReportKey:
+    def test_equal_specs_share_key(self):
+        cid = uuid4()
+        first = ReportFilter(constituency_id=cid, status="resolved")
+        second = ReportFilter(status="resolved", constituency_id=cid)
+        assert report_key("pdf", first) == report_key("pdf", second)
+
+    def test_format_and_filters_change_key(self):
+        filters = ReportFilter(category="water")
+        assert report_key("pdf", filters) != report_key("xlsx", filters)
+        assert report_key("pdf", filters) != report_key("pdf", ReportFilter(category="roads"))
+
+
+class TestReportJobQueue:
+    def test_job_completes_and_writes_artifact(self, make_queue):
+        queue = make_queue()
+        job = queue.submit("excel", ReportFilter(category="water"), requested_by="u1")
+        assert job.format == "xlsx"
+
+        done = wait_for(queue, job.id)
+        assert done.status == JobStatus.COMPLETED
+        assert done.rows == 3
+        assert queue.artifact_path(done).read_text() == "xlsx"
+
+    def test_identical_in_flight_request_is_deduplicated(self, make_queue):
+        gate = threading.Event()
+        queue = make_queue(gate=gate)
+        filters = ReportFilter(status="resolved")
+        first = queue.submit("pdf", filters)
+        second = queue.submit("pdf", filters)
+        gate.set()
+
+        assert second.id == first.id
+        wait_for(queue, first.id)
+        assert queue.submit("pdf", filters).id == first.id
+        assert queue.renders == 1
+
+    def test_expired_artifact_is_regenerated(self, make_queue):
+        queue = make_queue(ttl_seconds=60)
+        first = queue.submit("csv")
+        done = wait_for(queue, first.id)
+        done.finished_at -= 120
+        queue.store.save(done)
+
+        assert queue.get(first.id) is None
+        second = queue.submit("csv")
+        assert second.id != first.id
+        assert wait_for(queue, second.id).status == JobStatus.COMPLETED
+        assert queue.renders == 2
+
+    def test_failed_job_releases_key(self, make_queue):
+        queue = make_queue(fail=True)
+        job = queue.submit("summary")
+        failed = wait_for(queue, job.id)
+        assert failed.status == JobStatus.FAILED
+        assert "database went away" in failed.error
+        assert not list(queue.output_dir.glob("*.tmp"))
+
+        retry = queue.submit("summary")
+        assert retry.id != job.id
+
+    def test_sweep_removes_only_expired_files(self, make_queue):
+        queue = make_queue(ttl_seconds=60)
+        job = wait_for(queue, queue.submit("csv").id)
+        old = queue.output_dir / "report_0123456789abcdef.pdf"
+        old.write_text("pdf")
+        abandoned = queue.output_dir / "report_fedcba9876543210.xlsx.job.tmp"
+        abandoned.write_text("partial")
+        expired = time.time() - 120
+        for path in (old, abandoned):
+            os.utime(path, (expired, expired))
+
+        assert queue.sweep() == 2
+        assert not old.exists() and not abandoned.exists()
+        assert queue.artifact_path(job).exists()
+
+    def test_sweeper_runs_periodically_and_shutdown_joins_threads(self, make_queue):
+        queue = make_queue(ttl_seconds=0, sweep_interval_seconds=0.05)
+        job = wait_for(queue, queue.submit("summary").id)
+        path = queue.artifact_path(job)
+        expired = time.time() - 10
+        os.utime(path, (expired, expired))
+
+        deadline = time.time() + 5
+        while path.exists() and time.time() < deadline:
+            time.sleep(0.01)
+        assert not path.exists()
+
+        sweeper = queue._sweeper
+        queue.shutdown()
+        assert not sweeper.is_alive()
+        assert queue._executor is None
+
+    def test_unknown_format_rejected(self, make_queue):
+        with pytest.raises(ValueError):
+            make_queue().submit("docx")
+
+
+class TestReportRenderers:
+    SUMMARY = {
+        "total_complaints": 2,
+        "by_status": {"resolved": 1, "submitted": 1},
+        "by_category": {"water": 2},
+        "resolution_rate": 50.0,
+    }
+
+    def rows(self):
+        return [
+            {"id": str(uuid4()), "title": f"Complaint {i}", "category": "water",
+             "priority": "high", "status": "resolved", "created_at": datetime(2026, 1, 1).isoformat()}
+            for i in range(2)
+        ]
+
+    def test_excel_report_is_xlsx(self):
+        content = create_excel_report(self.rows(), self.SUMMARY)
+        assert content[:2] == b"PK"
+
+    def test_pdf_report_is_pdf(self):
+        content = create_pdf_report(self.rows(), self.SUMMARY)
+        assert content.startswith(b"%PDF-")
@@ -0,0 +1,75 @@
+"""
+Unit tests for full-text search helpers
+"""
+import pytest
+from unittest.mock import MagicMock
+from sqlalchemy import Column, Integer, MetaData, String, Table, Text, create_engine, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.core.search import text_search_clause
+
+
+metadata = MetaData()
+documents = Table(
+    "search_documents",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("title", String(200)),
+    Column("body", Text),
+)
+
+
+@pytest.fixture
+def search_db():
+    """In-memory SQLite session with a few searchable rows"""
+    engine = create_engine("sqlite://")
+    metadata.create_all(engine)
+    with Session(engine) as session:
+        session.execute(documents.insert(), [
+            {"id": 1, "title": "Street light broken", "body": "Dark road near school"},
+            {"id": 2, "title": "Pothole on main road", "body": "Road damaged after rain"},
+            {"id": 3, "title": "Water supply", "body": "No water for 3 days, 100% outage"},
+            {"id": 4, "title": "Garbage", "body": None},
+        ])
+        yield session
+
+
+class TestTextSearchFallback:
+    """SQLite fallback used by the test suite"""
+
+    def _search(self, session, term):
+        clause, rank = text_search_clause(session, (documents.c.title, documents.c.body), term)
+        query = select(documents.c.id).where(clause).order_by(rank.desc(), documents.c.id)
+        return [row.id for row in session.execute(query)]
+
+    def test_title_matches_rank_above_body_matches(self, search_db):
+        assert self._search(search_db, "road") == [2, 1]
+
+    def test_all_terms_must_match(self, search_db):
+        assert self._search(search_db, "road rain") == [2]
+
+    def test_case_insensitive(self, search_db):
+        assert self._search(search_db, "GARBAGE") == [4]
+
+    def test_like_wildcards_are_literal(self, search_db):
+        assert self._search(search_db, "100%") == [3]
+        assert self._search(search_db, "_") == []
+
+
+class TestTextSearchPostgres:
+    """Compiled SQL must match the expression indexes from the migration"""
+
+    def test_postgres_clause_uses_tsvector_and_trigram(self):
+        session = MagicMock()
+        session.get_bind.return_value.dialect = postgresql.dialect()
+
+        clause, rank = text_search_clause(session, (documents.c.title, documents.c.body), "pothole")
+        sql = str(clause.compile(dialect=postgresql.dialect()))
+
+        assert "to_tsvector('english'::regconfig, (coalesce(search_documents.title, '') || ' ') " \
+            "|| coalesce(search_documents.body, ''))" in sql
+        assert "to_tsvector('simple'::regconfig" in sql
+        assert "websearch_to_tsquery" in sql
+        assert "ILIKE" in sql
+        assert "ts_rank_cd" in str(rank.compile(dialect=postgresql.dialect()))
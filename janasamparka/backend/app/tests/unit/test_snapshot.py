@@ -0,0 +1,117 @@
+"""
+Unit tests for Parquet analytics snapshots and HTTP range serving
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.http_range import parse_range_header
+from app.services.snapshot_service import SnapshotDataset, SnapshotService, partition_key
+
+
+metadata = MetaData()
+events = Table(
+    "snapshot_events",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("constituency_id", String(36)),
+    Column("value", Integer),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+)
+
+EVENTS = SnapshotDataset(
+    name="events",
+    statement=lambda: select(events).order_by(events.c.constituency_id, events.c.created_at),
+    watermark=events.c.updated_at,
+    partition_time="created_at",
+    columns=(("id", "int"), ("value", "int"), ("created_at", "timestamp"), ("updated_at", "timestamp")),
+)
+
+CONSTITUENCY_A = "00000000-0000-0000-0000-00000000000a"
+CONSTITUENCY_B = "00000000-0000-0000-0000-00000000000b"
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    engine = create_engine("sqlite://")
+    metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    service = SnapshotService(root=tmp_path, session_factory=Session, batch_size=2,
+                              lag_seconds=0, datasets=(EVENTS,))
+    return service, engine
+
+
+def insert_events(engine, rows):
+    with engine.begin() as connection:
+        connection.execute(events.insert(), rows)
+
+
+class TestSnapshotService:
+    """Partition layout and incremental appends"""
+
+    def test_partitions_and_incremental_runs(self, snapshot):
+        pq = pytest.importorskip("pyarrow.parquet")
+        service, engine = snapshot
+        t0 = datetime(2026, 1, 15)
+        insert_events(engine, [
+            {"id": 1, "constituency_id": CONSTITUENCY_A, "value": 1, "created_at": t0, "updated_at": t0},
+            {"id": 2, "constituency_id": CONSTITUENCY_A, "value": 2, "created_at": t0, "updated_at": t0},
+            {"id": 3, "constituency_id": CONSTITUENCY_A, "value": 3, "created_at": t0 + timedelta(days=31), "updated_at": t0},
+            {"id": 4, "constituency_id": CONSTITUENCY_B, "value": 4, "created_at": t0, "updated_at": t0},
+            {"id": 5, "constituency_id": CONSTITUENCY_B, "value": 5, "created_at": t0, "updated_at": t0},
+            {"id": 6, "constituency_id": CONSTITUENCY_B, "value": 6, "created_at": t0, "updated_at": t0},
+        ])
+
+        first = service.run(now=datetime(2026, 3, 1))
+        assert first["datasets"] == {"events": 6}
+
+        files = service.list_files()
+        assert {(f["constituency_id"], f["month"]) for f in files} == {
+            (CONSTITUENCY_A, "2026-01"), (CONSTITUENCY_A, "2026-02"), (CONSTITUENCY_B, "2026-01"),
+        }
+        path = service.resolve_file("events", CONSTITUENCY_B, "2026-01", files[-1]["file"])
+        assert pq.read_table(path).column("id").to_pylist() == [4, 5, 6]
+
+        # Only rows changed after the previous cutoff are appended
+        insert_events(engine, [
+            {"id": 7, "constituency_id": CONSTITUENCY_A, "value": 7, "created_at": t0, "updated_at": datetime(2026, 3, 2)},
+        ])
+        second = service.run(now=datetime(2026, 3, 3))
+        assert second["datasets"] == {"events": 1}
+        assert len(service.list_files(CONSTITUENCY_A)) == 3
+
+        rebuilt = service.run(full=True, now=datetime(2026, 3, 4))
+        assert rebuilt["datasets"] == {"events": 7}
+        assert len(service.list_files()) == 3
+
+    def test_resolve_file_rejects_traversal(self, snapshot):
+        service, _ = snapshot
+        assert service.resolve_file("events", "..", "2026-01", "part-1.parquet") is None
+        assert service.resolve_file("events", CONSTITUENCY_A, "2026-01", "../../etc/passwd") is None
+        assert service.resolve_file("unknown", CONSTITUENCY_A, "2026-01", "part-1.parquet") is None
+
+    def test_partition_key(self):
+        assert partition_key(None, None) == ("unknown", "unknown")
+        assert partition_key(CONSTITUENCY_A, datetime(2026, 7, 9)) == (CONSTITUENCY_A, "2026-07")
+
+
+class TestRangeHeader:
+    """Single byte-range parsing"""
+
+    def test_ranges(self):
+        assert parse_range_header(None, 100) is None
+        assert parse_range_header("bytes=0-9", 100) == (0, 9)
+        assert parse_range_header("bytes=90-", 100) == (90, 99)
+        assert parse_range_header("bytes=-10", 100) == (90, 99)
+        assert parse_range_header("bytes=50-500", 100) == (50, 99)
+        assert parse_range_header("bytes=0-1,5-6", 100) is None
+
+    def test_unsatisfiable(self):
+        with pytest.raises(HTTPException) as error:
+            parse_range_header("bytes=100-", 100)
+        assert error.value.status_code == 416
+        assert error.value.headers["Content-Range"] == "bytes */100"
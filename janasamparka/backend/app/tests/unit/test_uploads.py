@@ -0,0 +1,108 @@
+"""
+Unit tests for chunked and resumable uploads
+"""
+import asyncio
+import base64
+import hashlib
+import io
+
+import pytest
+from fastapi import UploadFile
+
+from app.core.uploads import (
+    ResumableUploadStore,
+    UploadConflict,
+    UploadTooLarge,
+    parse_upload_metadata,
+    receive_upload,
+)
+
+
+class CountingFile(io.BytesIO):
+    """BytesIO that records how much was read"""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+async def chunks(*parts):
+    for part in parts:
+        yield part
+
+
+class TestReceiveUpload:
+    def test_streams_to_disk_and_hashes(self, tmp_path):
+        data = b"x" * 2500
+        upload = asyncio.run(receive_upload(
+            UploadFile(io.BytesIO(data), filename="clip.mp4"), tmp_path, max_size=10_000, chunk_size=1000
+        ))
+
+        assert upload.size == 2500
+        assert upload.sha256 == hashlib.sha256(data).hexdigest()
+        assert upload.path.read_bytes() == data
+        assert upload.filename == "clip.mp4"
+
+        moved = upload.move_to(tmp_path / "media" / "clip.mp4")
+        assert moved.read_bytes() == data
+        assert not upload.path.exists()
+
+    def test_size_limit_stops_reading_early(self, tmp_path):
+        source = CountingFile(b"y" * 50_000)
+        with pytest.raises(UploadTooLarge):
+            asyncio.run(receive_upload(UploadFile(source, filename="big.mov"), tmp_path,
+                                       max_size=3000, chunk_size=1000))
+
+        assert source.bytes_read == 4000
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestResumableUploads:
+    def test_upload_resumes_from_committed_offset(self, tmp_path):
+        store = ResumableUploadStore(tmp_path)
+        upload = store.create(length=10, filename="photo.jpg", owner_id="u1")
+
+        offset = asyncio.run(store.append(upload, 0, chunks(b"abcd")))
+        assert offset == 4
+        assert store.get(upload.id).offset == 4
+
+        with pytest.raises(UploadConflict):
+            asyncio.run(store.append(upload, 0, chunks(b"abcd")))
+
+        assert asyncio.run(store.append(upload, 4, chunks(b"ef", b"ghij"))) == 10
+        spooled = store.complete(store.get(upload.id))
+        assert spooled.path.read_bytes() == b"abcdefghij"
+        assert spooled.sha256 == hashlib.sha256(b"abcdefghij").hexdigest()
+        assert store.get(upload.id) is None
+
+    def test_body_longer_than_declared_length_is_rejected(self, tmp_path):
+        store = ResumableUploadStore(tmp_path)
+        upload = store.create(length=3, filename="a.jpg", owner_id="u1")
+        with pytest.raises(UploadTooLarge):
+            asyncio.run(store.append(upload, 0, chunks(b"ab", b"cd")))
+        assert store.get(upload.id).offset == 2
+
+    def test_expired_uploads_are_purged(self, tmp_path):
+        store = ResumableUploadStore(tmp_path, max_age_seconds=-1)
+        upload = store.create(length=3, filename="a.jpg", owner_id="u1")
+        assert store.purge_expired() == 1
+        assert store.get(upload.id) is None
+
+    def test_unknown_or_malformed_ids(self, tmp_path):
+        store = ResumableUploadStore(tmp_path)
+        assert store.get("../../etc/passwd") is None
+        assert store.get("0" * 32) is None
+
+
+def test_parse_upload_metadata():
+    encoded = base64.b64encode("ರಸ್ತೆ.jpg".encode()).decode()
+    assert parse_upload_metadata(f"filename {encoded},is_confidential") == {
+        "filename": "ರಸ್ತೆ.jpg",
+        "is_confidential": "",
+    }
+    assert parse_upload_metadata(None) == {}
@@ -0,0 +1,96 @@
+"""
+Unit tests for the shared vector registry
+"""
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.services import ai_service
+from app.services.vector_registry import VectorIndex, VectorRegistry, complaint_text
+from app.tests.utils import KeywordEmbeddings
+
+
+@pytest.fixture
+def registry():
+    return VectorRegistry(KeywordEmbeddings())
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+class TestVectorIndex:
+    def test_search_is_best_first_with_threshold_and_limit(self):
+        index = VectorIndex(2)
+        index.add(["a", "b", "c"], np.array([[1, 0], [0.8, 0.6], [0, 1]], dtype=np.float32))
+
+        matches = index.search(np.array([1, 0]), threshold=0.5)
+
+        assert [(m.key, round(m.similarity, 2)) for m in matches] == [("a", 1.0), ("b", 0.8)]
+        assert [m.key for m in index.search(np.array([1, 0]), limit=1)] == ["a"]
+        assert [m.key for m in index.search(np.array([1, 0]), exclude=["a"])] == ["b", "c"]
+
+    def test_growth_replace_and_remove_keep_rows_consistent(self):
+        index = VectorIndex(2)
+        for i in range(40):
+            index.add([f"k{i}"], np.array([[np.cos(i / 10), np.sin(i / 10)]]))
+        index.add(["k5"], np.array([[0.0, -1.0]]))
+
+        assert index.remove("k0") and not index.remove("k0")
+        assert len(index) == 39
+        assert index.search(np.array([0.0, -1.0]), limit=1)[0].key == "k5"
+        assert np.allclose(index.vector("k39"), [np.cos(3.9), np.sin(3.9)])
+
+
+class TestVectorRegistry:
+    def test_vectors_are_normalised_and_dimension_is_fixed(self, registry):
+        vectors = run(registry.embed(["pothole pothole", "water"]))
+
+        assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0)
+        assert registry.dimension == len(KeywordEmbeddings.words)
+
+    def test_sync_embeds_only_new_or_edited_texts_and_drops_missing(self, registry):
+        embeddings = registry.embeddings
+
+        run(registry.sync("c1", {"1": "pothole", "2": "water", "3": "light"}))
+        embeddings.texts.clear()
+        index = run(registry.sync("c1", {"1": "pothole", "2": "water leak", "4": "light pole"}))
+
+        assert sorted(embeddings.texts) == ["light pole", "water leak"]
+        assert sorted(index.keys()) == ["1", "2", "4"]
+
+    def test_indexes_are_per_constituency(self, registry):
+        run(registry.add("c1", {"1": "pothole on road"}))
+        run(registry.add("c2", {"2": "pothole near school"}))
+
+        matches = run(registry.search("c1", "big pothole", threshold=0.9))
+
+        assert [m.key for m in matches] == ["1"]
+        assert run(registry.search("c3", "big pothole")) == []
+
+    def test_save_and_load_round_trip(self, registry, tmp_path):
+        run(registry.add("c1", {"1": "pothole", "2": "water"}))
+        registry.save(str(tmp_path / "vectors.npz"))
+
+        restored = VectorRegistry(registry.embeddings)
+        restored.load(str(tmp_path / "vectors.npz"))
+
+        assert restored.stats()["vectors"] == 2
+        assert np.allclose(restored.index("c1").vector("2"), registry.index("c1").vector("2"))
+        assert restored.index("c1").fingerprint_of("1") == registry.index("c1").fingerprint_of("1")
+
+
+class TestPredictionServiceUsesRegistry:
+    def test_classifier_and_duplicates_share_one_model(self, registry, monkeypatch):
+        monkeypatch.setattr(ai_service, "vector_registry", registry)
+        service = ai_service.PredictionService()
+        run(service.duplicate_detector.add_complaint("old", "Pothole", "pothole near bus stand", "c1"))
+
+        result = run(service.process_new_complaint("Pothole", "pothole near bus stand", "c1", 12.0, 75.0))
+
+        assert result["classification"]["category"] == "road"
+        assert result["duplicates"][0]["complaint_id"] == "old"
+        assert registry.index("c1").search(
+            run(registry.embed([complaint_text("Pothole", "pothole near bus stand")]))[0]
+        )[0].similarity == pytest.approx(1.0)
@@ -0,0 +1,126 @@
+"""
+Unit tests for the webhook outbox and its dispatcher
+"""
+import asyncio
+import hashlib
+import hmac
+import json
+
+import httpx
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.core.webhooks import OUTBOX_PENDING, SIGNATURE_HEADER, TIMESTAMP_HEADER, enqueue_event
+from app.models.webhook import WebhookOutbox
+from app.services import webhook_dispatcher as dispatcher_module
+from app.services.webhook_dispatcher import WebhookDispatcher
+
+
+ENDPOINTS = ["https://a.example/hooks", "https://b.example/hooks"]
+
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    monkeypatch.setattr(settings, "WEBHOOK_ENDPOINTS", ENDPOINTS)
+    monkeypatch.setattr(settings, "WEBHOOK_SIGNING_SECRET", "s3cret", raising=False)
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    WebhookOutbox.__table__.create(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def receiver(monkeypatch):
+    """Stand-in for the shared client: records POSTs and answers with ``status``"""
+
+    class Receiver:
+        status = 200
+        requests = []
+
+        async def request(self, name, method, url, content=None, headers=None):
+            self.requests.append((url, content, headers))
+            return httpx.Response(self.status, request=httpx.Request(method, url))
+
+    stub = Receiver()
+    stub.requests = []
+    monkeypatch.setattr(dispatcher_module, "http_clients", stub)
+    return stub
+
+
+def enqueue(session_factory, *events, commit=True):
+    with session_factory() as db:
+        for name in events:
+            enqueue_event(db, name, {"complaint_id": name})
+        if commit:
+            db.commit()
+        else:
+            db.rollback()
+
+
+def rows(session_factory):
+    with session_factory() as db:
+        return db.execute(select(WebhookOutbox).order_by(WebhookOutbox.id)).scalars().all()
+
+
+class TestEnqueueEvent:
+    def test_rows_follow_the_transaction(self, session_factory):
+        enqueue(session_factory, "complaint.created", commit=False)
+        assert rows(session_factory) == []
+
+        enqueue(session_factory, "complaint.created")
+        stored = rows(session_factory)
+        assert [row.endpoint for row in stored] == ENDPOINTS
+        assert stored[0].event_id == stored[1].event_id
+        assert json.loads(stored[0].payload)["payload"] == {"complaint_id": "complaint.created"}
+
+    def test_no_endpoints_no_rows(self, session_factory, monkeypatch):
+        monkeypatch.setattr(settings, "WEBHOOK_ENDPOINTS", [])
+        with session_factory() as db:
+            enqueue_event(db, "complaint.created", {})
+            assert OUTBOX_PENDING not in db.info
+            assert not db.new
+
+
+class TestWebhookDispatcher:
+    def test_events_are_batched_and_signed_per_endpoint(self, session_factory, receiver):
+        enqueue(session_factory, "one", "two", "three")
+        dispatcher = WebhookDispatcher(session_factory, batch_size=2)
+
+        assert asyncio.run(dispatcher.dispatch_once()) == 6
+        assert asyncio.run(dispatcher.dispatch_once()) == 0
+
+        assert sorted(len(json.loads(body)["events"]) for _, body, _ in receiver.requests) == [1, 1, 2, 2]
+        url, body, headers = receiver.requests[0]
+        expected = hmac.new(b"s3cret", f"{headers[TIMESTAMP_HEADER]}.".encode() + body, hashlib.sha256).hexdigest()
+        assert headers[SIGNATURE_HEADER] == f"sha256={expected}"
+        assert {row.status for row in rows(session_factory)} == {"delivered"}
+
+    def test_failures_back_off_then_go_dead(self, session_factory, receiver):
+        receiver.status = 503
+        enqueue(session_factory, "complaint.updated")
+        dispatcher = WebhookDispatcher(session_factory, max_attempts=2, backoff_base=3600)
+
+        asyncio.run(dispatcher.dispatch_once())
+        first = rows(session_factory)
+        assert {(row.status, row.attempts) for row in first} == {("pending", 1)}
+        assert all(row.last_error.startswith("HTTP 503") for row in first)
+        # Not due again until the backoff has passed
+        assert asyncio.run(dispatcher.dispatch_once()) == 0
+
+        with session_factory() as db:
+            for row in db.execute(select(WebhookOutbox)).scalars():
+                row.next_attempt_at = row.created_at
+            db.commit()
+        asyncio.run(dispatcher.dispatch_once())
+        assert {(row.status, row.attempts) for row in rows(session_factory)} == {("dead", 2)}
+
+    def test_commit_wakes_the_dispatcher(self, session_factory, receiver, monkeypatch):
+        woken = []
+        monkeypatch.setattr(dispatcher_module.webhook_dispatcher, "notify", lambda: woken.append(True))
+        enqueue(session_factory, "complaint.created", commit=False)
+        assert woken == []
+        enqueue(session_factory, "complaint.created")
+        assert woken == [True]
@@ -1,6 +1,7 @@
 """
 Test utilities and helper functions
 """
+import asyncio
 import random
 import string
 from datetime import datetime, timezone, timedelta
@@ -8,6 +9,8 @@ from decimal import Decimal
 from typing import Dict, Any
 from uuid import uuid4
 
+import numpy as np
+
 from app.models.user import UserRole
 from app.models.complaint import ComplaintStatus, ComplaintPriority, MediaType
 
@@ -282,3 +285,32 @@ def wait_for_condition(condition_func, timeout: float = 5.0, interval: float = 0
         time.sleep(interval)
     
     raise TimeoutError(f"Condition not met within {timeout} seconds")
+
+
+class KeywordEmbeddings:
+    """
+    EmbeddingService stand-in that embeds a text by counting a few keywords.
+    Records the size of every call and every text; can be made slow,
+    unavailable (no model in this process), or fail with a given error.
+    """
+
+    model_name = "keywords"
+    words = ("pothole", "water", "light", "garbage", "niru")
+
+    def __init__(self, delay: float = 0.0, error: Exception = None, available: bool = True):
+        self.delay = delay
+        self.error = error
+        self.available = available
+        self.calls = []
+        self.texts = []
+        self.encoder = self
+
+    async def encode(self, texts):
+        self.calls.append(len(texts))
+        self.texts.extend(texts)
+        if self.error is not None:
+            raise self.error
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return np.array([[text.lower().count(word) + 0.01 for word in self.words] for text in texts],
+                        dtype=np.float32)
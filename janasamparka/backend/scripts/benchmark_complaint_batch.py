@@ -0,0 +1,183 @@
+"""
+Benchmark complaint ingestion: one POST per complaint vs POST /batch.
+
+Mounts the complaints router on a scratch SQLite database (or
+--database-url, e.g. a Postgres copy) with a moderator as the caller, then
+files the same synthetic complaints through ``POST /api/complaints/`` one
+at a time and through ``POST /api/complaints/batch`` in chunks, and
+reports complaints per second for each. Complaints carry no location
+unless --with-location is given, so the single path's duplicate check does
+not dominate the comparison.
+
+Run: python scripts/benchmark_complaint_batch.py [--complaints 2000] [--batch-size 200]
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add the parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import httpx
+from geoalchemy2 import Geometry
+from fastapi import FastAPI
+from sqlalchemy import create_engine, event, func, insert, select
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.schema import CreateTable
+
+import app.models  # noqa: F401  (register every mapper)
+from app.core.auth import require_auth
+from app.core.database import get_db
+from app.models.complaint import Complaint, StatusLog
+from app.models.constituency import Constituency
+from app.models.department import Department
+from app.models.user import UserRole
+from app.models.ward import Ward
+from app.models.webhook import WebhookOutbox
+from app.routers import complaints
+
+
+# Scratch database only: map PostgreSQL column types onto SQLite ones
+@compiles(UUID, "sqlite")
+def _uuid_for_sqlite(type_, compiler, **kw):
+    return "CHAR(32)"
+
+
+@compiles(ARRAY, "sqlite")
+def _array_for_sqlite(type_, compiler, **kw):
+    return "TEXT"
+
+
+@compiles(Geometry, "sqlite")
+def _geometry_for_sqlite(type_, compiler, **kw):
+    return "BLOB"
+
+
+TEXTS = [
+    ("Pothole on main road", "Large pothole near the bus stand is causing accidents"),
+    ("Street light not working", "Street light on 3rd cross has been off for two weeks"),
+    ("No drinking water", "Niru supply has been irregular in our ward since Monday"),
+    ("Garbage not collected", "Kasa not collected from the market area for days"),
+    ("Drain overflowing", "Drainage overflowing onto the road after every rain"),
+]
+
+
+def scratch_engine(url):
+    """SQLite engine; ward geometry is stored as an untyped column and read back as NULL"""
+    engine = create_engine(url)
+
+    @event.listens_for(engine, "connect")
+    def _geometry_functions(connection, record):
+        connection.create_function("AsEWKB", 1, lambda value: None)
+
+    with engine.begin() as connection:
+        # Plain CREATE TABLE: skips the SpatiaLite-only DDL events geoalchemy2 adds to table.create()
+        connection.execute(CreateTable(Ward.__table__, if_not_exists=True))
+    return engine
+
+
+def seed(engine):
+    for table in (Constituency.__table__, Ward.__table__, Department.__table__, Complaint.__table__,
+                  StatusLog.__table__, WebhookOutbox.__table__):
+        if table is not Ward.__table__ or engine.dialect.name != "sqlite":
+            table.create(engine, checkfirst=True)
+    constituency_id, ward_ids, dept_id = uuid.uuid4(), [uuid.uuid4() for _ in range(10)], uuid.uuid4()
+    with Session(engine) as session:
+        session.execute(insert(Constituency), [{"id": constituency_id, "name": "Puttur", "code": "PUT",
+                                                 "district": "Dakshina Kannada", "state": "Karnataka"}])
+        session.execute(insert(Ward), [{"id": ward_id, "name": f"Ward {i}", "ward_number": i, "taluk": "Puttur",
+                                        "constituency_id": constituency_id} for i, ward_id in enumerate(ward_ids)])
+        session.execute(insert(Department), [{"id": dept_id, "name": "Public Works", "code": "PWD",
+                                              "constituency_id": constituency_id}])
+        session.commit()
+    return constituency_id, ward_ids, dept_id
+
+
+def payloads(count, constituency_id, ward_ids, dept_id, with_location, seed_value=7):
+    rng = random.Random(seed_value)
+    items = []
+    for index in range(count):
+        title, description = rng.choice(TEXTS)
+        item = {"title": f"{title} #{index}", "description": description, "constituency_id": str(constituency_id),
+                "ward_id": str(rng.choice(ward_ids)), "priority": rng.choice(["low", "medium", "high"])}
+        if rng.random() < 0.3:
+            item["dept_id"] = str(dept_id)
+        if with_location:
+            item["lat"], item["lng"] = 12.76 + rng.uniform(-0.05, 0.05), 75.20 + rng.uniform(-0.05, 0.05)
+        items.append(item)
+    return items
+
+
+def build_app(session_factory, constituency_id):
+    api = FastAPI()
+    api.include_router(complaints.router, prefix="/api/complaints")
+    operator = SimpleNamespace(id=uuid.uuid4(), role=UserRole.MODERATOR, constituency_id=constituency_id, phone=None)
+
+    def get_session():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    api.dependency_overrides[get_db] = get_session
+    api.dependency_overrides[require_auth] = lambda: operator
+    return api
+
+
+async def run(api, items, batch_size):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=api), base_url="http://bench") as client:
+        started = time.perf_counter()
+        for item in items:
+            response = await client.post("/api/complaints/", json=item)
+            assert response.status_code == 201, response.text
+        single = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for start in range(0, len(items), batch_size):
+            response = await client.post("/api/complaints/batch", json={"complaints": items[start:start + batch_size]})
+            assert response.status_code == 200 and response.json()["failed"] == 0, response.text
+        batched = time.perf_counter() - started
+    return single, batched
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--complaints", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--with-location", action="store_true")
+    parser.add_argument("--database-url", help="benchmark an existing database instead of a scratch SQLite file")
+    args = parser.parse_args()
+
+    if args.database_url:
+        engine = create_engine(args.database_url)
+    else:
+        scratch = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        scratch.close()
+        engine = scratch_engine(f"sqlite:///{scratch.name}")
+    constituency_id, ward_ids, dept_id = seed(engine)
+    items = payloads(args.complaints, constituency_id, ward_ids, dept_id, args.with_location)
+    api = build_app(sessionmaker(bind=engine), constituency_id)
+
+    single, batched = asyncio.run(run(api, items, args.batch_size))
+
+    with Session(engine) as db:
+        stored = db.scalar(select(func.count()).select_from(Complaint))
+        logs = db.scalar(select(func.count()).select_from(StatusLog))
+    print(f"{args.complaints:,} complaints each way; {stored:,} complaints and {logs:,} status logs stored")
+    print(f"{'single POST /':<28} {single:7.2f}s  {args.complaints / single:>8,.0f} complaints/s")
+    print(f"{'POST /batch (' + str(args.batch_size) + ' per call)':<28} {batched:7.2f}s  "
+          f"{args.complaints / batched:>8,.0f} complaints/s  ({single / batched:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
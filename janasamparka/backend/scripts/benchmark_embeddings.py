@@ -0,0 +1,128 @@
+"""
+Benchmark embedding backends: load time, memory, single and batched encodes.
+
+For each EMBEDDING_BACKEND (torch, torch-int8, onnx, onnx-int8) that can be
+loaded here, measures model load time and the process RSS it added, the
+p50/p95 latency of encoding one text, batched throughput, and the mean
+cosine similarity of its vectors to the fp32 model's. Each backend runs in
+a fresh interpreter so memory figures do not include earlier models.
+The ONNX backends need scripts/export_embedding_model.py to have run first.
+
+Run: python scripts/benchmark_embeddings.py [--model NAME] [--batch 32] [--rounds 50]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Add the parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import numpy as np
+
+TEXTS = [
+    "Pothole on the main road near the bus stand is causing accidents",
+    "Street light not working on 3rd cross for two weeks",
+    "Drinking water supply has been irregular in ward 12",
+    "Garbage not collected from the market area since Monday",
+    "ರಸ್ತೆಯಲ್ಲಿ ದೊಡ್ಡ ಗುಂಡಿ ಇದೆ, ಅಪಘಾತ ಸಂಭವಿಸುತ್ತಿದೆ",
+    "ಕುಡಿಯುವ ನೀರಿನ ಪೂರೈಕೆ ಸರಿಯಾಗಿಲ್ಲ",
+    "Drainage overflowing onto the road after rain",
+    "Transformer sparking near the school compound",
+]
+
+
+def run_backend(backend: str, model: str, batch: int, rounds: int) -> dict:
+    """Measure one backend in this process (called in a child interpreter)"""
+    import psutil
+
+    from app.services.embedding_backends import build_encoder
+
+    process = psutil.Process()
+    rss_before = process.memory_info().rss
+    encoder = build_encoder(backend, model)
+    start = time.perf_counter()
+    encoder.load()
+    load_seconds = time.perf_counter() - start
+    rss_model = process.memory_info().rss - rss_before
+
+    encoder.encode_batch(TEXTS[:1])  # warm up
+    single = []
+    for i in range(rounds):
+        start = time.perf_counter()
+        encoder.encode_batch([TEXTS[i % len(TEXTS)]])
+        single.append(time.perf_counter() - start)
+
+    batch_texts = [TEXTS[i % len(TEXTS)] for i in range(batch)]
+    batch_rounds = max(rounds // 10, 3)
+    start = time.perf_counter()
+    for _ in range(batch_rounds):
+        encoder.encode_batch(batch_texts)
+    batched = time.perf_counter() - start
+
+    single.sort()
+    return {
+        "backend": backend,
+        "load_s": load_seconds,
+        "rss_mb": rss_model / 1024 / 1024,
+        "peak_rss_mb": process.memory_info().rss / 1024 / 1024,
+        "p50_ms": statistics.median(single) * 1000,
+        "p95_ms": single[int(len(single) * 0.95) - 1] * 1000,
+        "texts_per_s": batch * batch_rounds / batched,
+        "vectors": encoder.encode_batch(TEXTS).tolist(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model", default=None, help="default: EMBEDDING_MODEL")
+    parser.add_argument("--batch", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--backends", default="torch,torch-int8,onnx,onnx-int8")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.model is None:
+        from app.core.config import settings
+        args.model = settings.EMBEDDING_MODEL
+
+    if args.child:
+        print(json.dumps(run_backend(args.child, args.model, args.batch, args.rounds)))
+        return
+
+    results = []
+    for backend in args.backends.split(","):
+        child = subprocess.run(
+            [sys.executable, __file__, "--child", backend, "--model", args.model,
+             "--batch", str(args.batch), "--rounds", str(args.rounds)],
+            capture_output=True, text=True, cwd=Path(__file__).parent.parent, env=dict(os.environ),
+        )
+        if child.returncode != 0:
+            reason = (child.stderr.strip().splitlines() or ["failed"])[-1]
+            print(f"{backend:<11} skipped: {reason[:120]}")
+            continue
+        results.append(json.loads(child.stdout.strip().splitlines()[-1]))
+
+    if not results:
+        return
+    reference = np.array(results[0]["vectors"])
+    reference /= np.linalg.norm(reference, axis=1, keepdims=True)
+
+    print(f"\nmodel {args.model}, batch {args.batch}")
+    print(f"{'backend':<11} {'load s':>7} {'model MB':>9} {'RSS MB':>7} {'1 text p50':>11} {'p95':>7} "
+          f"{'batch texts/s':>14} {'cos vs ' + results[0]['backend']:>14}")
+    for result in results:
+        vectors = np.array(result["vectors"])
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        parity = float(np.mean(np.sum(vectors * reference, axis=1)))
+        print(f"{result['backend']:<11} {result['load_s']:7.1f} {result['rss_mb']:9.0f} {result['peak_rss_mb']:7.0f} "
+              f"{result['p50_ms']:9.1f}ms {result['p95_ms']:5.1f}ms {result['texts_per_s']:14.0f} {parity:14.4f}")
+
+
+if __name__ == "__main__":
+    main()
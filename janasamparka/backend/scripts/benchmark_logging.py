@@ -0,0 +1,119 @@
+"""
+Benchmark per-request logging overhead on the calling thread.
+
+Compares the previous setup (structlog JSONRenderer feeding synchronous
+RotatingFileHandlers, start and end line per request) with the queue-based
+setup from app.core.logging, without and with 1% sampling of routine
+request logs.
+
+Run: python scripts/benchmark_logging.py [--requests 20000]
+"""
+
+import argparse
+import logging
+import logging.config
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import structlog
+
+from app.core import logging as app_logging
+from app.core.config import settings
+
+
+def configure_legacy(log_dir: Path) -> None:
+    """The pre-queue configuration: render and write on the request thread."""
+    structlog.configure(
+        processors=[
+            structlog.stdlib.filter_by_level,
+            structlog.stdlib.add_logger_name,
+            structlog.stdlib.add_log_level,
+            structlog.stdlib.PositionalArgumentsFormatter(),
+            structlog.processors.TimeStamper(fmt="iso"),
+            structlog.processors.StackInfoRenderer(),
+            structlog.processors.format_exc_info,
+            structlog.processors.UnicodeDecoder(),
+            structlog.processors.JSONRenderer(),
+        ],
+        context_class=dict,
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        wrapper_class=structlog.stdlib.BoundLogger,
+        cache_logger_on_first_use=False,
+    )
+    handlers = {
+        name: {
+            "class": "logging.handlers.RotatingFileHandler",
+            "level": level,
+            "filename": str(log_dir / filename),
+            "maxBytes": 10485760,
+            "backupCount": 5,
+            "encoding": "utf8",
+        }
+        for name, level, filename in (("file", "INFO", "legacy.log"), ("error_file", "ERROR", "legacy-error.log"))
+    }
+    logging.config.dictConfig({
+        "version": 1,
+        "disable_existing_loggers": False,
+        "handlers": handlers,
+        "loggers": {"": {"level": "INFO", "handlers": list(handlers)}},
+    })
+
+
+def simulate_requests(count: int, two_lines: bool) -> float:
+    """Log like RequestMonitoringMiddleware; returns microseconds per request."""
+    request_log = structlog.get_logger("request")
+    start = time.perf_counter()
+    for i in range(count):
+        if two_lines:
+            request_log.info("HTTP request started", method="GET", path="/api/complaints",
+                             client_ip="10.0.0.1", user_agent="bench", request_id=str(i))
+        request_log.info("HTTP request completed", method="GET", path="/api/complaints",
+                         status_code=500 if i % 200 == 0 else 200, duration_ms=12.5,
+                         client_ip="10.0.0.1", user_agent="bench", request_id=str(i))
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def run_queue_setup(log_dir: Path, count: int, sample_rate: float) -> tuple:
+    settings.LOG_SAMPLE_RATES = {"request": sample_rate} if sample_rate < 1.0 else {}
+    app_logging.setup_logging(log_dir)
+    # Keep the console quiet; the file handlers still do the work
+    for handler in app_logging._listener.handlers:
+        if isinstance(handler, logging.StreamHandler) and handler.stream is sys.stdout:
+            handler.setStream(open(os.devnull, "w"))
+    per_request = simulate_requests(count, two_lines=False)
+    start = time.perf_counter()
+    app_logging.shutdown_logging()
+    drain = time.perf_counter() - start
+    return per_request, drain
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_dir = Path(tmp)
+        print(f"{'setup':<44} {'us/request':>12} {'drain ms':>10}")
+
+        configure_legacy(log_dir)
+        legacy = simulate_requests(args.requests, two_lines=True)
+        print(f"{'sync handlers, start+end lines':<44} {legacy:12.1f} {'-':>10}")
+
+        queued, drain = run_queue_setup(log_dir, args.requests, 1.0)
+        print(f"{'queue listener, orjson, one line':<44} {queued:12.1f} {drain * 1000:10.1f}")
+
+        sampled, drain = run_queue_setup(log_dir, args.requests, 0.01)
+        print(f"{'queue listener, 1% of 2xx sampled':<44} {sampled:12.1f} {drain * 1000:10.1f}")
+
+        print(f"\nspeed-up on the request path: {legacy / queued:.1f}x, sampled {legacy / sampled:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark requests per second through the monitoring middleware.
+
+Compares the previous stack (HealthCheckMiddleware, RequestMonitoringMiddleware
+and SecurityHeadersMiddleware on BaseHTTPMiddleware, uuid4 request IDs and a
+get_current_user attempt per request) with ObservabilityMiddleware, on a
+small JSON endpoint and a streaming endpoint. Requests are sent in-process
+through httpx's ASGI transport, so the numbers measure framework overhead.
+
+Run: python scripts/benchmark_middleware.py [--requests 3000]
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Add the parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import httpx
+import structlog
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.auth import get_current_user
+from app.core.logging import request_logger
+from app.core.metrics import metrics_collector
+from app.middleware.monitoring import ObservabilityMiddleware
+
+
+class LegacyHealthCheckMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        return await call_next(request)
+
+
+class LegacyRequestMonitoringMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        request_id = str(uuid.uuid4())
+        request.state.request_id = request_id
+        start_time = time.time()
+        try:
+            await get_current_user(request.headers.get("authorization"), None)
+        except Exception:
+            pass
+        response = await call_next(request)
+        duration = time.time() - start_time
+        metrics_collector.record_http_request(request.scope, response.status_code, duration)
+        request_logger.log_request(
+            method=request.method, path=request.url.path, status_code=response.status_code,
+            duration=duration, request_id=request_id,
+            client_ip=request.client.host if request.client else "unknown",
+            user_agent=request.headers.get("user-agent", "unknown"),
+        )
+        response.headers["X-Request-ID"] = request_id
+        return response
+
+
+class LegacySecurityHeadersMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        response = await call_next(request)
+        response.headers["X-Content-Type-Options"] = "nosniff"
+        response.headers["X-Frame-Options"] = "DENY"
+        response.headers["X-XSS-Protection"] = "1; mode=block"
+        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
+        return response
+
+
+def build_app(legacy: bool) -> FastAPI:
+    app = FastAPI()
+    if legacy:
+        app.add_middleware(LegacyHealthCheckMiddleware)
+        app.add_middleware(LegacyRequestMonitoringMiddleware)
+        app.add_middleware(LegacySecurityHeadersMiddleware)
+    else:
+        app.add_middleware(ObservabilityMiddleware)
+
+    @app.get("/api/complaints/{complaint_id}")
+    async def read_complaint(complaint_id: str):
+        return {"id": complaint_id, "status": "submitted"}
+
+    @app.get("/api/export")
+    async def export():
+        return StreamingResponse((b"row,%d\n" % i for i in range(50)), media_type="text/csv")
+
+    return app
+
+
+async def measure(app: FastAPI, path: str, count: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(50):  # warm up
+            await client.get(path)
+        start = time.perf_counter()
+        for _ in range(count):
+            response = await client.get(path)
+            assert response.status_code == 200
+        return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=3000)
+    args = parser.parse_args()
+
+    # Logging cost is measured by scripts/benchmark_logging.py; keep it out of this one
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+    print(f"{'endpoint':<28} {'legacy req/s':>14} {'asgi req/s':>12} {'speed-up':>9}")
+    for label, path in (("JSON", f"/api/complaints/{uuid.uuid4()}"), ("streaming CSV", "/api/export")):
+        legacy = asyncio.run(measure(build_app(legacy=True), path, args.requests))
+        pure = asyncio.run(measure(build_app(legacy=False), path, args.requests))
+        print(f"{label:<28} {legacy:14.0f} {pure:12.0f} {pure / legacy:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark MultilingualNormalizer throughput (words per second).
+
+Compares the original linear Levenshtein scan over KANNADA_ENGLISH_MAP with
+the deletion (SymSpell-style) index, with and without the normalized-word cache, and the
+batch normalize_many() API.
+
+Run: python scripts/benchmark_normalizer.py [--words 20000]
+"""
+
+import argparse
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+# Add the parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.services import predictive_planning_service as pps
+from app.services.predictive_planning_service import (
+    MultilingualNormalizer,
+    levenshtein_distance,
+    multilingual_normalizer,
+)
+
+
+def legacy_normalize_text(text: str) -> str:
+    """The pre-index implementation: linear scan per unknown word."""
+    words = []
+    for word in text.lower().split():
+        clean_word = pps._PUNCTUATION.sub('', word)
+        if clean_word in MultilingualNormalizer.KANNADA_ENGLISH_MAP:
+            words.append(MultilingualNormalizer.KANNADA_ENGLISH_MAP[clean_word])
+        elif len(clean_word) < 3:
+            words.append(clean_word)
+        else:
+            for known_word, correct in MultilingualNormalizer.KANNADA_ENGLISH_MAP.items():
+                if levenshtein_distance(clean_word, known_word) <= 2:
+                    words.append(correct)
+                    break
+            else:
+                words.append(clean_word)
+    return " ".join(words)
+
+
+def make_corpus(word_count: int, seed: int = 42) -> list:
+    """Complaint-like sentences mixing known words, typos and noise."""
+    rng = random.Random(seed)
+    vocabulary = list(MultilingualNormalizer.KANNADA_ENGLISH_MAP)
+    filler = ["near", "the", "since", "days", "our", "street", "please", "fix", "ward", "bus", "stand"]
+
+    def typo(word: str) -> str:
+        position = rng.randrange(len(word))
+        return word[:position] + rng.choice(string.ascii_lowercase) + word[position + 1:]
+
+    words = []
+    for _ in range(word_count):
+        roll = rng.random()
+        if roll < 0.3:
+            words.append(rng.choice(vocabulary))
+        elif roll < 0.5:
+            words.append(typo(rng.choice(vocabulary)))
+        elif roll < 0.8:
+            words.append(rng.choice(filler))
+        else:
+            words.append("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 10))))
+
+    return [" ".join(words[i:i + 12]) for i in range(0, len(words), 12)]
+
+
+def measure(label: str, func, texts: list, word_count: int) -> float:
+    start = time.perf_counter()
+    func(texts)
+    elapsed = time.perf_counter() - start
+    rate = word_count / elapsed if elapsed else float("inf")
+    print(f"{label:<40} {elapsed * 1000:10.1f} ms {rate:14,.0f} words/s")
+    return rate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--words", type=int, default=20000)
+    args = parser.parse_args()
+
+    texts = make_corpus(args.words)
+    word_count = sum(len(text.split()) for text in texts)
+    print(f"Corpus: {len(texts)} texts, {word_count} words\n")
+
+    legacy = measure("legacy linear scan", lambda batch: [legacy_normalize_text(t) for t in batch], texts, word_count)
+
+    pps._normalize_word.cache_clear()
+    cold = measure("deletion index, cold cache", lambda batch: [multilingual_normalizer.normalize_text(t) for t in batch], texts, word_count)
+    warm = measure("deletion index, warm cache", lambda batch: [multilingual_normalizer.normalize_text(t) for t in batch], texts, word_count)
+
+    pps._normalize_word.cache_clear()
+    batch = measure("normalize_many, cold cache", multilingual_normalizer.normalize_many, texts, word_count)
+
+    mismatches = sum(
+        legacy_normalize_text(text) != multilingual_normalizer.normalize_text(text) for text in texts
+    )
+    print(f"\nSpeed-up vs legacy: cold {cold / legacy:.1f}x, warm {warm / legacy:.1f}x, batch {batch / legacy:.1f}x")
+    print(f"Output mismatches vs legacy: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Export the embedding model to ONNX (plus an int8 quantised copy) for the
+"onnx" and "onnx-int8" EMBEDDING_BACKENDs.
+
+Writes model.onnx, model.int8.onnx, the tokenizer and pooling.json to
+EMBEDDING_ONNX_DIR/<model name>, where OnnxSentenceEncoder looks for them.
+Needs torch, sentence-transformers and onnxruntime on the machine doing the
+export; the API only needs onnxruntime and transformers (for the tokenizer).
+
+Run: python scripts/export_embedding_model.py [--model NAME] [--output DIR] [--no-quantize]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add the parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.services.embedding_backends import export_onnx_model
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model", default=settings.EMBEDDING_MODEL)
+    parser.add_argument("--output", type=Path, default=None,
+                        help="export directory (default: EMBEDDING_ONNX_DIR/<model>)")
+    parser.add_argument("--no-quantize", action="store_true", help="skip the int8 copy")
+    parser.add_argument("--opset", type=int, default=14)
+    args = parser.parse_args()
+
+    output = export_onnx_model(args.model, args.output, quantize=not args.no_quantize, opset=args.opset)
+    for path in sorted(output.iterdir()):
+        print(f"{path.stat().st_size / 1024 / 1024:9.1f} MB  {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,679 @@
+"""
+Generate a deterministic synthetic dataset for load and performance tests.
+
+Creates constituencies, zilla/taluk/gram panchayats, wards, departments,
+users (staff and citizens), complaints, status logs, citizen ratings and
+media rows. Complaints cluster around ward centres (with a few tight
+hotspots, so duplicate detection has work to do), arrive mostly in
+daytime, and move through the status workflow according to their age.
+
+The same arguments always produce the same rows: ids are derived from the
+table and row number, and every complaint chunk has its own seeded
+generator. Rows are written with COPY FROM STDIN on PostgreSQL, batched
+executemany inserts on other databases, or as CSV files (--output-dir) for
+psql \\copy. Complaints, their status logs and media are generated and
+loaded chunk by chunk, so memory stays flat at any scale; with --workers
+the chunks are generated and CSV-encoded in parallel processes while the
+main process streams them to the database in order.
+
+Run: python scripts/generate_load_dataset.py --complaints 5000000 --citizens 1000000 --workers 4 --truncate
+     python scripts/generate_load_dataset.py --complaints 10000 --output-dir /tmp/dataset
+"""
+
+import argparse
+import csv
+import io
+import math
+import multiprocessing
+import os
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+# Add the parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import numpy as np
+from sqlalchemy import ARRAY, create_engine
+from sqlalchemy.schema import Table
+
+import app.models  # noqa: F401  (register every mapper)
+from app.core.database import Base
+from app.models.complaint import ComplaintPriority, ComplaintStatus, MediaType
+from app.models.user import UserRole
+
+# Leading 32 bits of every generated id; the rest is the row number, so ids
+# are stable across runs and recognisable as synthetic
+TABLE_ID_PREFIXES = {
+    "constituencies": 0x5EED0001,
+    "zilla_panchayats": 0x5EED0002,
+    "taluk_panchayats": 0x5EED0003,
+    "gram_panchayats": 0x5EED0004,
+    "wards": 0x5EED0005,
+    "departments": 0x5EED0006,
+    "users": 0x5EED0007,
+    "complaints": 0x5EED0008,
+    "status_logs": 0x5EED0009,
+    "media": 0x5EED000A,
+}
+
+# Load order (foreign keys first)
+TABLES = list(TABLE_ID_PREFIXES)
+
+CONSTITUENCY_NAMES = [
+    "Puttur", "Bantwal", "Mangalore", "Mangalore City North", "Mangalore City South", "Moodabidri",
+    "Belthangady", "Sullia", "Udupi", "Kaup", "Karkala", "Kundapura", "Byndoor",
+]
+DISTRICT_NAMES = ["Dakshina Kannada", "Udupi", "Uttara Kannada", "Kodagu", "Shivamogga", "Chikkamagaluru"]
+FIRST_NAMES = [
+    "Ramesh", "Lakshmi", "Suresh", "Savitha", "Prakash", "Geetha", "Mahesh", "Shobha", "Ganesh", "Pavithra",
+    "Harish", "Divya", "Nagaraj", "Rekha", "Santhosh", "Kavya", "Mohammed", "Fathima", "Joseph", "Mary", "Vinay",
+]
+LAST_NAMES = ["Shetty", "Rai", "Bhat", "Gowda", "Poojary", "Naik", "Kamath", "Hegde", "D'Souza", "Ahmed", "Acharya"]
+
+# Department name, code, and the complaint categories it handles
+DEPARTMENTS = [
+    ("Public Works", "PWD", ["roads"]),
+    ("Water Supply", "WTR", ["water", "drainage"]),
+    ("Electricity (MESCOM)", "ELE", ["electricity", "street_light"]),
+    ("Sanitation", "SAN", ["garbage"]),
+    ("Health", "HLT", ["health"]),
+    ("Education", "EDU", ["education"]),
+    ("Revenue", "REV", ["other"]),
+]
+
+# Category, share of complaints, title/description templates (English and transliterated Kannada)
+CATEGORIES = [
+    ("roads", 0.24, [("Pothole on main road", "Large pothole near the {place} is causing accidents"),
+                     ("Raste hallagide", "Raste tumba hallagide {place} hattira, vahana hogalu kasta")]),
+    ("water", 0.18, [("No drinking water", "Water supply near the {place} irregular for {days} days"),
+                     ("Niru barta illa", "{place} hattira {days} dinadinda niru barta illa")]),
+    ("electricity", 0.12, [("Frequent power cuts", "Power cut every evening near the {place}"),
+                           ("Current illa", "{place} hattira current illa, transformer problem")]),
+    ("street_light", 0.10, [("Street light not working", "Street light near the {place} off for {days} days")]),
+    ("garbage", 0.12, [("Garbage not collected", "Garbage not collected near the {place} for {days} days"),
+                       ("Kasa bidilla", "{place} hattira kasa tegedukondu hogilla")]),
+    ("drainage", 0.09, [("Drain overflowing", "Drain overflowing onto the road near the {place} after rain")]),
+    ("health", 0.05, [("PHC short of staff", "Health centre near the {place} has no doctor in the evening")]),
+    ("education", 0.04, [("School building leaking", "Roof of the school near the {place} leaks in the rain")]),
+    ("other", 0.06, [("Encroachment on footpath", "Shops have encroached the footpath near the {place}")]),
+]
+PLACES = ["bus stand", "market", "temple", "school", "hospital", "panchayat office", "railway gate", "church",
+          "mosque", "college", "petrol bunk", "post office"]
+
+PRIORITIES = [ComplaintPriority.LOW, ComplaintPriority.MEDIUM, ComplaintPriority.HIGH, ComplaintPriority.URGENT]
+PRIORITY_WEIGHTS = [0.2, 0.5, 0.22, 0.08]
+WORKFLOW = [ComplaintStatus.SUBMITTED, ComplaintStatus.ASSIGNED, ComplaintStatus.IN_PROGRESS,
+            ComplaintStatus.RESOLVED, ComplaintStatus.CLOSED]
+WORKFLOW_NOTES = ["Complaint submitted", "Assigned to department", "Work started", "Work completed",
+                  "Closed after citizen confirmation"]
+RATING_WEIGHTS = [0.08, 0.1, 0.17, 0.3, 0.35]
+
+HOTSPOTS_PER_WARD = 3
+DAY = 86400.0
+
+COMPLAINT_COLUMNS = [
+    "id", "constituency_id", "user_id", "title", "description", "category", "lat", "lng", "ward_id",
+    "location_description", "dept_id", "citizen_selected_dept", "assigned_to", "ward_officer_id",
+    "assignment_type", "status", "priority", "priority_score", "is_emergency", "is_duplicate", "duplicate_count",
+    "created_at", "updated_at", "last_activity_at", "resolved_at", "closed_at", "rejection_reason", "rejected_at",
+    "rejected_by", "citizen_rating", "citizen_feedback", "rating_submitted_at", "notes_are_internal",
+]
+STATUS_LOG_COLUMNS = ["id", "complaint_id", "old_status", "new_status", "changed_by", "note", "timestamp"]
+MEDIA_COLUMNS = ["id", "complaint_id", "url", "media_type", "file_size", "lat", "lng", "proof_type",
+                 "photo_type", "uploaded_at", "uploaded_by"]
+
+
+def row_id(table: str, index: int) -> str:
+    """Canonical UUID text for row ``index`` of ``table`` (index < 2**64)"""
+    index = int(index)
+    return f"{TABLE_ID_PREFIXES[table]:08x}-0000-0000-{index >> 48:04x}-{index & 0xFFFFFFFFFFFF:012x}"
+
+
+def timestamps(base: np.datetime64, seconds: np.ndarray) -> List[str]:
+    """'YYYY-MM-DD HH:MM:SS.ffffff' for every offset, formatted in one vectorised call"""
+    stamps = np.datetime_as_string(base + (seconds * 1e6).astype("timedelta64[us]"), unit="us")
+    return np.char.replace(stamps, "T", " ").tolist()
+
+
+@dataclass
+class Scale:
+    constituencies: int = 10
+    wards_per_constituency: int = 40
+    gram_panchayats_per_constituency: int = 12
+    citizens: int = 100_000
+    complaints: int = 100_000
+    days: int = 730
+    located_rate: float = 0.85
+    hotspot_rate: float = 0.05
+    media_rate: float = 0.35
+    rating_rate: float = 0.6
+    seed: int = 20240601
+    start: datetime = datetime(2024, 1, 1)
+
+
+class SyntheticDataset:
+    """
+    Deterministic rows for every table, derived from ``scale``. Values are
+    already in their database text form (UUID strings, enum values,
+    timestamp strings), so they go to COPY or the driver unconverted.
+    """
+
+    def __init__(self, scale: Scale):
+        self.scale = scale
+        rng = np.random.default_rng([scale.seed, 0])
+        C, W, D = scale.constituencies, scale.wards_per_constituency, len(DEPARTMENTS)
+
+        self.constituency_lat = rng.uniform(12.4, 13.9, C)
+        self.constituency_lng = rng.uniform(74.7, 75.8, C)
+        self.constituency_weights = rng.uniform(0.5, 1.5, C)
+        self.constituency_weights /= self.constituency_weights.sum()
+
+        # Wards within ~8 km of their constituency centre; a few busy wards get most complaints
+        self.ward_lat = np.repeat(self.constituency_lat, W) + rng.normal(0, 0.04, C * W)
+        self.ward_lng = np.repeat(self.constituency_lng, W) + rng.normal(0, 0.04, C * W)
+        ward_weights = 1.0 / np.arange(1, W + 1) ** 0.8
+        self.ward_cdf = np.cumsum(ward_weights / ward_weights.sum())
+        self.hotspot_lat = self.ward_lat[:, None] + rng.normal(0, 0.002, (C * W, HOTSPOTS_PER_WARD))
+        self.hotspot_lng = self.ward_lng[:, None] + rng.normal(0, 0.002, (C * W, HOTSPOTS_PER_WARD))
+
+        self.category_weights = np.array([weight for _, weight, _ in CATEGORIES])
+        self.category_weights /= self.category_weights.sum()
+        department_of = {category: index for index, (_, _, categories) in enumerate(DEPARTMENTS)
+                         for category in categories}
+        self.category_department = np.array([department_of[name] for name, _, _ in CATEGORIES])
+
+        # User numbering: per constituency one MLA, two moderators, a ward officer per
+        # ward and an officer per department, then every citizen
+        self.staff_per_constituency = 3 + W + D
+        self.first_citizen = C * self.staff_per_constituency
+        self.citizens_per_constituency = max(1, scale.citizens // C)
+
+        self.constituency_ids = [row_id("constituencies", c) for c in range(C)]
+        self.ward_ids = [row_id("wards", w) for w in range(C * W)]
+        self.department_ids = [row_id("departments", d) for d in range(C * D)]
+        self.moderator_ids = [row_id("users", self.moderator(c)) for c in range(C)]
+        self.ward_officer_ids = [row_id("users", self.ward_officer(w)) for w in range(C * W)]
+        self.department_officer_ids = [row_id("users", self.department_officer(d // D, d % D))
+                                       for d in range(C * D)]
+
+    # -- user numbering -----------------------------------------------------
+
+    def mla(self, constituency: int) -> int:
+        return constituency * self.staff_per_constituency
+
+    def moderator(self, constituency: int) -> int:
+        return constituency * self.staff_per_constituency + 1
+
+    def ward_officer(self, ward: int) -> int:
+        W = self.scale.wards_per_constituency
+        return (ward // W) * self.staff_per_constituency + 3 + ward % W
+
+    def department_officer(self, constituency: int, department: int) -> int:
+        return constituency * self.staff_per_constituency + 3 + self.scale.wards_per_constituency + department
+
+    def user_name(self, index: int) -> str:
+        return f"{FIRST_NAMES[index % len(FIRST_NAMES)]} {LAST_NAMES[(index // len(FIRST_NAMES)) % len(LAST_NAMES)]}"
+
+    # -- reference tables ---------------------------------------------------
+
+    def constituency_name(self, c: int) -> str:
+        return CONSTITUENCY_NAMES[c] if c < len(CONSTITUENCY_NAMES) else f"Synthetic Constituency {c + 1}"
+
+    def district_of(self, c: int) -> int:
+        return c // 6
+
+    def district_name(self, d: int) -> str:
+        return DISTRICT_NAMES[d] if d < len(DISTRICT_NAMES) else f"Synthetic District {d + 1}"
+
+    def constituencies(self) -> Iterator[Dict[str, Any]]:
+        for c in range(self.scale.constituencies):
+            name = self.constituency_name(c)
+            yield {
+                "id": self.constituency_ids[c], "name": name, "code": f"SYN{c:04d}",
+                "district": self.district_name(self.district_of(c)), "state": "Karnataka",
+                "mla_name": self.user_name(self.mla(c)), "total_population": 150_000 + 1_000 * (c % 50),
+                "total_wards": self.scale.wards_per_constituency, "assembly_number": 100 + c, "taluks": [name],
+                "description": f"{name} Assembly Constituency (synthetic)", "activated_at": self.scale.start,
+            }
+
+    def zilla_panchayats(self) -> Iterator[Dict[str, Any]]:
+        for d in range(self.district_of(self.scale.constituencies - 1) + 1):
+            yield {"id": row_id("zilla_panchayats", d), "name": f"{self.district_name(d)} Zilla Panchayat",
+                   "code": f"ZP{d:04d}", "district": self.district_name(d)}
+
+    def taluk_panchayats(self) -> Iterator[Dict[str, Any]]:
+        for c in range(self.scale.constituencies):
+            yield {"id": row_id("taluk_panchayats", c), "name": f"{self.constituency_name(c)} Taluk Panchayat",
+                   "code": f"TP{c:04d}", "zilla_panchayat_id": row_id("zilla_panchayats", self.district_of(c)),
+                   "constituency_id": self.constituency_ids[c], "taluk_name": self.constituency_name(c),
+                   "district": self.district_name(self.district_of(c)),
+                   "total_gram_panchayats": self.scale.gram_panchayats_per_constituency}
+
+    def gram_panchayats(self) -> Iterator[Dict[str, Any]]:
+        G = self.scale.gram_panchayats_per_constituency
+        for c in range(self.scale.constituencies):
+            for g in range(G):
+                yield {"id": row_id("gram_panchayats", c * G + g), "name": f"{self.constituency_name(c)} GP {g + 1}",
+                       "code": f"GP{c:04d}{g:03d}", "taluk_panchayat_id": row_id("taluk_panchayats", c),
+                       "constituency_id": self.constituency_ids[c], "taluk_name": self.constituency_name(c),
+                       "district": self.district_name(self.district_of(c)), "population": 4_000 + 150 * g,
+                       "households": 900 + 30 * g, "villages_covered": 1 + g % 4}
+
+    def wards(self) -> Iterator[Dict[str, Any]]:
+        W, G = self.scale.wards_per_constituency, self.scale.gram_panchayats_per_constituency
+        urban = math.ceil(W * 0.6)
+        for c in range(self.scale.constituencies):
+            for w in range(W):
+                rural = w >= urban and G > 0
+                yield {"id": self.ward_ids[c * W + w], "name": f"{self.constituency_name(c)} Ward {w + 1}",
+                       "ward_number": w + 1, "taluk": self.constituency_name(c),
+                       "constituency_id": self.constituency_ids[c], "ward_type": "rural" if rural else "urban",
+                       "gram_panchayat_id": row_id("gram_panchayats", c * G + w % G) if rural else None,
+                       "taluk_panchayat_id": row_id("taluk_panchayats", c) if rural else None,
+                       "population": 3_000 + 97 * w}
+
+    def departments(self) -> Iterator[Dict[str, Any]]:
+        D = len(DEPARTMENTS)
+        for c in range(self.scale.constituencies):
+            for d, (name, code, _) in enumerate(DEPARTMENTS):
+                yield {"id": self.department_ids[c * D + d], "name": name, "code": f"{code}-{c:04d}",
+                       "constituency_id": self.constituency_ids[c],
+                       "description": f"{name} department, {self.constituency_name(c)}"}
+
+    def users(self) -> Iterator[Dict[str, Any]]:
+        C, W, D = self.scale.constituencies, self.scale.wards_per_constituency, len(DEPARTMENTS)
+        joined = self.scale.start - timedelta(days=30)
+        for c in range(C):
+            staff = [(self.mla(c), UserRole.MLA, {}), (self.moderator(c), UserRole.MODERATOR, {}),
+                     (self.moderator(c) + 1, UserRole.MODERATOR, {})]
+            staff += [(self.ward_officer(c * W + w), UserRole.WARD_OFFICER, {"ward_id": self.ward_ids[c * W + w]})
+                      for w in range(W)]
+            staff += [(self.department_officer(c, d), UserRole.DEPARTMENT_OFFICER,
+                       {"department_id": self.department_ids[c * D + d]}) for d in range(D)]
+            for index, role, extra in staff:
+                yield self._user(index, role, c, joined, extra)
+        span = int(self.scale.days * DAY)
+        for j in range(self.citizens_per_constituency * C):
+            joined = self.scale.start + timedelta(seconds=(j * 7919) % span)
+            yield self._user(self.first_citizen + j, UserRole.CITIZEN, j % C, joined, {})
+
+    def _user(self, index: int, role: UserRole, constituency: int, joined: datetime, extra: Dict) -> Dict[str, Any]:
+        return {"id": row_id("users", index), "name": self.user_name(index), "phone": f"{6 + index % 4}{index:09d}",
+                "role": role.value, "locale_pref": "kn" if index % 3 else "en",
+                "constituency_id": self.constituency_ids[constituency], "ward_id": None, "department_id": None,
+                "created_at": joined, "updated_at": joined, **extra}
+
+    # -- complaints ---------------------------------------------------------
+
+    def complaint_chunks(self, chunk_size: int) -> Iterator[Tuple[List[tuple], List[tuple], List[tuple]]]:
+        """(complaints, status logs, media) rows, ``chunk_size`` complaints at a time"""
+        for chunk, first in enumerate(range(0, self.scale.complaints, chunk_size)):
+            yield self.complaint_chunk(chunk, first, min(chunk_size, self.scale.complaints - first))
+
+    def complaint_chunk(self, chunk: int, first: int, size: int) -> Tuple[List[tuple], List[tuple], List[tuple]]:
+        s = self.scale
+        rng = np.random.default_rng([s.seed, 1, chunk])
+        C, W, D = s.constituencies, s.wards_per_constituency, len(DEPARTMENTS)
+
+        constituency = rng.choice(C, size=size, p=self.constituency_weights)
+        ward = constituency * W + (np.searchsorted(self.ward_cdf, rng.random(size)) + constituency * 7) % W
+        located = rng.random(size) < s.located_rate
+        hotspot = rng.random(size) < s.hotspot_rate
+        spot = rng.integers(0, HOTSPOTS_PER_WARD, size)
+        lat = np.where(hotspot, self.hotspot_lat[ward, spot] + rng.normal(0, 0.0002, size),
+                       self.ward_lat[ward] + rng.normal(0, 0.003, size))
+        lng = np.where(hotspot, self.hotspot_lng[ward, spot] + rng.normal(0, 0.0002, size),
+                       self.ward_lng[ward] + rng.normal(0, 0.003, size))
+
+        # Seconds since scale.start: a uniform day, at a daytime-heavy hour
+        created = np.floor(rng.random(size) * s.days) * DAY + np.clip(rng.normal(13, 4, size), 0, 23.99) * 3600
+        end = s.days * DAY
+        category = rng.choice(len(CATEGORIES), size=size, p=self.category_weights)
+        variant = rng.integers(0, 1 << 30, size)
+        place = rng.integers(0, len(PLACES), size)
+        priority = rng.choice(len(PRIORITIES), size=size, p=PRIORITY_WEIGHTS)
+        emergency = (priority == 3) & (rng.random(size) < 0.4)
+        score = np.round(np.clip(0.3 + 0.15 * priority + rng.normal(0, 0.05, size), 0, 0.99), 2)
+        citizen = self.first_citizen + constituency + C * rng.integers(0, self.citizens_per_constituency, size)
+        department = constituency * D + self.category_department[category]
+
+        # Workflow: each step follows the previous after an exponential delay, and
+        # the status is the last step reached before the end of the window
+        events = np.cumsum(np.stack([
+            created,
+            rng.exponential(1.0 * DAY, size),
+            rng.exponential(2.0 * DAY, size),
+            rng.exponential(6.0 * DAY, size),
+            rng.exponential(3.0 * DAY, size),
+        ]), axis=0)
+        closes = rng.random(size) < 0.7
+        rejected = (rng.random(size) < 0.03) & (events[1] <= end)
+        stage = np.where(rejected, 0, (events[1:4] <= end).sum(axis=0) + ((events[4] <= end) & closes))
+        rated = (stage >= 3) & (rng.random(size) < s.rating_rate)
+        rating = rng.choice(5, size=size, p=RATING_WEIGHTS) + 1
+        rated_at = np.minimum(events[3] + rng.exponential(1.0 * DAY, size), end)
+        photos = np.where(rng.random(size) < s.media_rate, rng.integers(1, 4, size), 0)
+        after_photo = (stage >= 3) & (rng.random(size) < 0.5)
+        file_size = rng.integers(80_000, 4_000_000, (size, 4))
+
+        # Element access on numpy arrays is slow; the row loop works on plain lists
+        base = np.datetime64(s.start, "us")
+        times = [timestamps(base, events[k]) for k in range(5)]
+        rated_times = timestamps(base, rated_at)
+        lat, lng = np.round(lat, 7).tolist(), np.round(lng, 7).tolist()
+        (constituency, ward, located, category, variant, place, priority, emergency, score, citizen, department,
+         rejected, stage, rated, rating, photos, after_photo, file_size) = (
+            array.tolist() for array in (constituency, ward, located, category, variant, place, priority,
+                                         emergency, score, citizen, department, rejected, stage, rated, rating,
+                                         photos, after_photo, file_size))
+
+        complaints, logs, media = [], [], []
+        for i in range(size):
+            index = first + i
+            complaint_id = row_id("complaints", index)
+            step = stage[i]
+            name, _, templates = CATEGORIES[category[i]]
+            title, description = templates[variant[i] % len(templates)]
+            user_id = row_id("users", citizen[i])
+            ward_officer = self.ward_officer_ids[ward[i]]
+            officer = self.department_officer_ids[department[i]]
+            moderator = self.moderator_ids[constituency[i]]
+            at = [times[k][i] for k in range(5)]
+            point = (lat[i], lng[i]) if located[i] else (None, None)
+            if rejected[i]:
+                status, last = ComplaintStatus.REJECTED.value, at[1]
+            else:
+                status, last = WORKFLOW[step].value, at[step]
+
+            complaints.append((
+                complaint_id, self.constituency_ids[constituency[i]], user_id, f"{title} #{index}",
+                description.format(place=PLACES[place[i]], days=1 + variant[i] % 14), name, *point,
+                self.ward_ids[ward[i]], f"Near the {PLACES[place[i]]}",
+                self.department_ids[department[i]] if step >= 1 else None, False,
+                officer if step >= 2 else None, ward_officer, "department" if step >= 1 else "ward",
+                status, PRIORITIES[priority[i]].value, score[i], emergency[i], False, 0,
+                at[0], last, last, at[3] if step >= 3 else None, at[4] if step >= 4 else None,
+                *(("Outside the constituency's jurisdiction", at[1], moderator) if rejected[i] else (None, None, None)),
+                *((rating[i], "Resolved quickly, thank you" if rating[i] >= 4 else "Took too long", rated_times[i])
+                  if rated[i] else (None, None, None)),
+                True,
+            ))
+
+            # At most five log rows and four media rows per complaint, so their ids
+            # follow from the complaint number alone
+            actors = (user_id, ward_officer, officer, officer, moderator)
+            logs.append((row_id("status_logs", index * 5), complaint_id, None, WORKFLOW[0].value, user_id,
+                         WORKFLOW_NOTES[0], at[0]))
+            if rejected[i]:
+                logs.append((row_id("status_logs", index * 5 + 1), complaint_id, WORKFLOW[0].value,
+                             ComplaintStatus.REJECTED.value, moderator, "Rejected", at[1]))
+            for k in range(1, step + 1):
+                logs.append((row_id("status_logs", index * 5 + k), complaint_id, WORKFLOW[k - 1].value,
+                             WORKFLOW[k].value, actors[k], WORKFLOW_NOTES[k], at[k]))
+
+            for m in range(photos[i]):
+                media.append(self._media(index * 4 + m, complaint_id, file_size[i][m], point, None, "before",
+                                         at[0], user_id))
+            if after_photo[i]:
+                media.append(self._media(index * 4 + 3, complaint_id, file_size[i][3], point, "after", "after",
+                                         at[3], officer))
+        return complaints, logs, media
+
+    @staticmethod
+    def _media(index, complaint_id, size, point, proof_type, photo_type, uploaded_at, uploaded_by) -> tuple:
+        media_id = row_id("media", index)
+        # media.media_type stores enum names, unlike the values_callable status/priority columns
+        return (media_id, complaint_id, f"/uploads/synthetic/{media_id}.jpg", MediaType.PHOTO.name, size,
+                *point, proof_type, photo_type, uploaded_at, uploaded_by)
+
+
+# -- loading ---------------------------------------------------------------
+
+
+def csv_text(rows: Sequence[tuple]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+
+_worker_dataset = None
+
+
+def _start_worker(scale: Scale) -> None:
+    global _worker_dataset
+    _worker_dataset = SyntheticDataset(scale)
+
+
+def _encoded_chunk(task: Tuple[int, int, int]) -> Tuple[Tuple[int, str], ...]:
+    """(row count, CSV text) for the complaints, status logs and media of one chunk"""
+    return tuple((len(rows), csv_text(rows)) for rows in _worker_dataset.complaint_chunk(*task))
+
+
+def pg_array(values: Sequence[Any]) -> str:
+    """PostgreSQL array literal, e.g. {"Puttur","Bantwal"}"""
+    return "{" + ",".join('"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"' for value in values) + "}"
+
+
+def with_defaults(table: Table, rows: Iterable[Dict[str, Any]], created: datetime) -> Tuple[List[str], List[tuple]]:
+    """
+    Columns and value tuples for dict rows. Scalar column defaults are added
+    (COPY and raw inserts skip ORM defaults), missing created_at/updated_at
+    become ``created``, and ARRAY values become literals.
+    """
+    rows = list(rows)
+    provided = list(rows[0]) if rows else []
+    defaults = {}
+    for column in table.columns:
+        if column.name in provided:
+            continue
+        if column.default is not None and column.default.is_scalar:
+            defaults[column.name] = column.default.arg
+        elif column.name in ("created_at", "updated_at"):
+            defaults[column.name] = created
+    arrays = {name for name in provided if isinstance(table.c[name].type, ARRAY)}
+    values = [
+        tuple(pg_array(row[name]) if name in arrays and row[name] is not None else row[name] for name in provided)
+        + tuple(defaults.values())
+        for row in rows
+    ]
+    return provided + list(defaults), values
+
+
+class DatabaseLoader:
+    """COPY FROM STDIN on PostgreSQL, raw executemany inserts elsewhere"""
+
+    def __init__(self, database_url: str):
+        self.engine = create_engine(database_url)
+        self.postgres = self.engine.dialect.name == "postgresql"
+        self.connection = self.engine.raw_connection()
+        if self.postgres:
+            with self.connection.cursor() as cursor:
+                cursor.execute("SET synchronous_commit = off")
+
+    def truncate(self, tables: Sequence[str]) -> None:
+        cursor = self.connection.cursor()
+        if self.postgres:
+            cursor.execute(f"TRUNCATE {', '.join(tables)} CASCADE")
+        else:
+            for name in reversed(tables):
+                cursor.execute(f"DELETE FROM {name}")
+        cursor.close()
+
+    @property
+    def accepts_csv(self) -> bool:
+        return self.postgres
+
+    def load(self, table: Table, columns: Sequence[str], rows) -> None:
+        """Insert value tuples, or (PostgreSQL only) CSV text"""
+        if not rows:
+            return
+        cursor = self.connection.cursor()
+        if self.postgres:
+            buffer = io.StringIO(rows if isinstance(rows, str) else csv_text(rows))
+            cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        else:
+            marker = "?" if self.engine.dialect.paramstyle == "qmark" else "%s"
+            cursor.executemany(
+                f"INSERT INTO {table.name} ({', '.join(columns)}) VALUES ({', '.join([marker] * len(columns))})",
+                rows,
+            )
+        cursor.close()
+
+    def commit(self) -> None:
+        self.connection.commit()
+
+    def finish(self, tables: Sequence[str]) -> None:
+        self.commit()
+        if self.postgres:
+            with self.connection.cursor() as cursor:
+                cursor.execute(f"ANALYZE {', '.join(tables)}")
+            self.connection.commit()
+        self.connection.close()
+
+
+class CsvDirectoryLoader:
+    """One CSV file per table, with a header row, for psql \\copy ... WITH (FORMAT csv, HEADER)"""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.writers: Dict[str, Tuple[Any, Any]] = {}
+
+    def truncate(self, tables: Sequence[str]) -> None:
+        for name in tables:
+            (self.directory / f"{name}.csv").unlink(missing_ok=True)
+
+    accepts_csv = True
+
+    def load(self, table: Table, columns: Sequence[str], rows) -> None:
+        """Append value tuples or CSV text"""
+        if table.name not in self.writers:
+            handle = open(self.directory / f"{table.name}.csv", "w", newline="", encoding="utf-8")
+            self.writers[table.name] = (handle, csv.writer(handle))
+            self.writers[table.name][1].writerow(columns)
+        handle, writer = self.writers[table.name]
+        if isinstance(rows, str):
+            handle.write(rows)
+        else:
+            writer.writerows(rows)
+
+    def commit(self) -> None:
+        pass
+
+    def finish(self, tables: Sequence[str]) -> None:
+        for handle, _ in self.writers.values():
+            handle.close()
+
+
+def generate(dataset: SyntheticDataset, loader, chunk_size: int, truncate: bool = False,
+             workers: int = 1) -> Dict[str, int]:
+    """Write every table in foreign-key order; returns row counts"""
+    if workers > 1 and not getattr(loader, "accepts_csv", False):
+        raise ValueError("--workers needs PostgreSQL or --output-dir")
+    tables = {name: Base.metadata.tables[name] for name in TABLES}
+    counts = {name: 0 for name in TABLES}
+    if truncate:
+        loader.truncate(TABLES)
+
+    reference = [
+        ("constituencies", dataset.constituencies()), ("zilla_panchayats", dataset.zilla_panchayats()),
+        ("taluk_panchayats", dataset.taluk_panchayats()), ("gram_panchayats", dataset.gram_panchayats()),
+        ("wards", dataset.wards()), ("departments", dataset.departments()), ("users", dataset.users()),
+    ]
+    for name, rows in reference:
+        while True:
+            batch = [row for _, row in zip(range(chunk_size), rows)]
+            if not batch:
+                break
+            columns, values = with_defaults(tables[name], batch, dataset.scale.start - timedelta(days=30))
+            loader.load(tables[name], columns, values)
+            counts[name] += len(values)
+    loader.commit()
+
+    pool = None
+    if workers > 1:
+        pool = multiprocessing.Pool(workers, _start_worker, (dataset.scale,))
+        tasks = ((chunk, first, min(chunk_size, dataset.scale.complaints - first))
+                 for chunk, first in enumerate(range(0, dataset.scale.complaints, chunk_size)))
+        # imap keeps chunk order, so the output matches a single-process run
+        chunks = pool.imap(_encoded_chunk, tasks)
+    else:
+        chunks = (tuple((len(rows), rows) for rows in chunk) for chunk in dataset.complaint_chunks(chunk_size))
+
+    started = time.perf_counter()
+    try:
+        for chunk in chunks:
+            for (count, rows), name, columns in zip(chunk, ("complaints", "status_logs", "media"),
+                                                     (COMPLAINT_COLUMNS, STATUS_LOG_COLUMNS, MEDIA_COLUMNS)):
+                loader.load(tables[name], columns, rows)
+                counts[name] += count
+            loader.commit()
+            elapsed = time.perf_counter() - started
+            print(f"  {counts['complaints']:>12,} complaints  {counts['complaints'] / elapsed:>9,.0f}/s", flush=True)
+    finally:
+        if pool is not None:
+            pool.terminate()
+
+    loader.finish(TABLES)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    defaults = Scale()
+    parser.add_argument("--constituencies", type=int, default=defaults.constituencies)
+    parser.add_argument("--wards-per-constituency", type=int, default=defaults.wards_per_constituency)
+    parser.add_argument("--gram-panchayats-per-constituency", type=int,
+                        default=defaults.gram_panchayats_per_constituency)
+    parser.add_argument("--citizens", type=int, default=defaults.citizens)
+    parser.add_argument("--complaints", type=int, default=defaults.complaints)
+    parser.add_argument("--days", type=int, default=defaults.days, help="complaints are spread over this window")
+    parser.add_argument("--start", type=datetime.fromisoformat, default=defaults.start)
+    parser.add_argument("--located-rate", type=float, default=defaults.located_rate)
+    parser.add_argument("--hotspot-rate", type=float, default=defaults.hotspot_rate)
+    parser.add_argument("--media-rate", type=float, default=defaults.media_rate)
+    parser.add_argument("--rating-rate", type=float, default=defaults.rating_rate)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes generating complaint chunks (PostgreSQL or --output-dir)")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--output-dir", help="write CSV files here instead of loading a database")
+    parser.add_argument("--truncate", action="store_true",
+                        help="empty the generated tables first (TRUNCATE ... CASCADE on PostgreSQL)")
+    args = parser.parse_args()
+
+    scale = Scale(
+        constituencies=args.constituencies, wards_per_constituency=args.wards_per_constituency,
+        gram_panchayats_per_constituency=args.gram_panchayats_per_constituency, citizens=args.citizens,
+        complaints=args.complaints, days=args.days, located_rate=args.located_rate,
+        hotspot_rate=args.hotspot_rate, media_rate=args.media_rate, rating_rate=args.rating_rate,
+        seed=args.seed, start=args.start,
+    )
+    if args.workers > 1 and not args.output_dir and not (args.database_url or "").startswith("postgresql"):
+        sys.exit("--workers needs a PostgreSQL --database-url or --output-dir")
+    if args.output_dir:
+        loader = CsvDirectoryLoader(args.output_dir)
+        target = args.output_dir
+    elif args.database_url:
+        loader = DatabaseLoader(args.database_url)
+        target = loader.engine.url.render_as_string(hide_password=True)
+    else:
+        sys.exit("Give --database-url (or set DATABASE_URL) or --output-dir")
+
+    print(f"Generating {scale.complaints:,} complaints into {target}")
+    started = time.perf_counter()
+    counts = generate(SyntheticDataset(scale), loader, args.chunk_size, truncate=args.truncate,
+                      workers=args.workers)
+    elapsed = time.perf_counter() - started
+    for name, count in counts.items():
+        print(f"{name:<18} {count:>12,}")
+    print(f"Done in {elapsed:.1f}s ({sum(counts.values()) / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Summarise `python -X importtime` for the application's cold start.
+
+Imports the target module (app.main by default) in a fresh interpreter
+with -X importtime and reports the total, the modules with the highest
+self time and the cost per package, so slow or unexpected imports show up
+at a glance. APP_ROLE can be set to compare what each kind of pod loads.
+
+Run: python scripts/profile_imports.py [--module app.main] [--role api] [--top 25]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+
+def run_importtime(module: str, role: str = None) -> List[Tuple[int, int, str, int]]:
+    """(self us, cumulative us, module, depth) for every import, in import order"""
+    env = dict(os.environ)
+    if role:
+        env["APP_ROLE"] = role
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        sys.exit(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(self_us), int(cumulative_us), name.strip(), depth))
+    return rows
+
+
+def package_of(name: str) -> str:
+    """Group app modules by subpackage (app.routers, app.schemas), others by distribution"""
+    parts = name.split(".")
+    return ".".join(parts[:2]) if parts[0] == "app" else parts[0]
+
+
+def summarise(rows: List[Tuple[int, int, str, int]]) -> Dict[str, int]:
+    per_package: Dict[str, int] = defaultdict(int)
+    for self_us, _, name, _ in rows:
+        per_package[package_of(name)] += self_us
+    return per_package
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--role", choices=["all", "api", "ai", "inference"], default=None)
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args()
+
+    rows = run_importtime(args.module, args.role)
+    total_us = sum(self_us for self_us, _, _, _ in rows)
+    print(f"import {args.module}" + (f" (APP_ROLE={args.role})" if args.role else "")
+          + f": {total_us / 1e6:.2f}s, {len(rows)} modules\n")
+
+    print(f"{'self ms':>9} {'cumul ms':>9}  module")
+    for self_us, cumulative_us, name, _ in sorted(rows, reverse=True)[:args.top]:
+        print(f"{self_us / 1000:9.1f} {cumulative_us / 1000:9.1f}  {name}")
+
+    print(f"\n{'self ms':>9} {'share':>6}  package")
+    per_package = summarise(rows)
+    for package, self_us in sorted(per_package.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{self_us / 1000:9.1f} {self_us / total_us:6.1%}  {package}")
+
+
+if __name__ == "__main__":
+    main()